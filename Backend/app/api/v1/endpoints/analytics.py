@@ -0,0 +1,89 @@
+"""Analytics endpoints"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from supabase import Client
+
+from app.db.supabase_client import get_supabase_service
+from app.schemas.analytics import AnalyticsFunnel, AnalyticsTimeSeries, Granularity
+from app.schemas.auth import TokenData
+from app.core.security import require_staff_or_owner
+from app.services.analytics_service import (
+    AnalyticsService,
+    BUCKET_SIZES,
+    EVENT_TYPES,
+    MAX_BUCKETS,
+    as_utc,
+)
+
+router = APIRouter()
+
+DEFAULT_RANGES = {"hour": timedelta(hours=48), "day": timedelta(days=30)}
+
+
+def resolve_range(start: Optional[datetime], end: Optional[datetime], default: timedelta):
+    """Fill in a missing range end (now) or start, and validate ordering"""
+    end = as_utc(end) if end else datetime.now(timezone.utc)
+    start = as_utc(start) if start else end - default
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+    return start, end
+
+
+def require_workspace(current_user: TokenData) -> str:
+    if not current_user.workspace_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No workspace found",
+        )
+    return current_user.workspace_id
+
+
+@router.get("/timeseries", response_model=AnalyticsTimeSeries)
+async def get_timeseries(
+    granularity: Granularity = Query("day"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    event_type: Optional[List[str]] = Query(None),
+    current_user: TokenData = Depends(require_staff_or_owner),
+    supabase: Client = Depends(get_supabase_service)
+):
+    """Get event counts per hour or day"""
+    workspace_id = require_workspace(current_user)
+    start, end = resolve_range(start, end, DEFAULT_RANGES[granularity])
+
+    if (end - start) / BUCKET_SIZES[granularity] > MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too large: at most {MAX_BUCKETS} {granularity} buckets",
+        )
+
+    unknown = set(event_type or []) - set(EVENT_TYPES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown event types: {', '.join(sorted(unknown))}",
+        )
+
+    series = await AnalyticsService(supabase).get_timeseries(
+        workspace_id, granularity, start, end, event_type
+    )
+    return AnalyticsTimeSeries(**series)
+
+
+@router.get("/funnel", response_model=AnalyticsFunnel)
+async def get_funnel(
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    current_user: TokenData = Depends(require_staff_or_owner),
+    supabase: Client = Depends(get_supabase_service)
+):
+    """Get the workspace view -> contact -> booking conversion funnel"""
+    workspace_id = require_workspace(current_user)
+    start, end = resolve_range(start, end, DEFAULT_RANGES["day"])
+
+    funnel = await AnalyticsService(supabase).get_funnel(workspace_id, start, end)
+    return AnalyticsFunnel(**funnel)
@@ -6,12 +6,14 @@ import structlog
 from app.db.supabase_client import get_supabase, get_supabase_service
 from app.schemas.auth import UserRegister, UserLogin, Token, UserResponse
 from app.core.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
     create_access_token,
     create_refresh_token,
     get_current_user,
 )
+from app.core.permissions import load_permission_mask
 from app.schemas.auth import TokenData
 from app.models.enums import UserRole
 
@@ -38,7 +40,7 @@ async def register(
         # Create user first without workspace
         try:
             # Hash the password using bcrypt
-            hashed_password = hash_password(user_data.password)
+            hashed_password = await hash_password_async(user_data.password)
             logger.debug("password_hashed", password_length=len(user_data.password), hash_length=len(hashed_password), hash_prefix=hashed_password[:20] if hashed_password else None)
         except ValueError as e:
             # Password validation error (e.g., too long for bcrypt)
@@ -149,6 +151,16 @@ async def register(
         )
 
 
+async def rehash_password(supabase: Client, user_id: str, password: str) -> None:
+    """Store a new hash at the current bcrypt cost; failures never block login"""
+    try:
+        new_hash = await hash_password_async(password)
+        supabase.table("users").update({"password_hash": new_hash}).eq("id", user_id).execute()
+        logger.info("password_rehashed", user_id=user_id)
+    except Exception as e:
+        logger.warning("password_rehash_failed", user_id=user_id, error=str(e))
+
+
 @router.post("/login", response_model=Token)
 async def login(
     credentials: UserLogin,
@@ -168,7 +180,7 @@ async def login(
         user = user_response.data[0]
         
         # Verify password
-        if not verify_password(credentials.password, user["password_hash"]):
+        if not await verify_password_async(credentials.password, user["password_hash"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
@@ -180,6 +192,10 @@ async def login(
                 detail="Account is inactive"
             )
         
+        # Upgrade hashes made with an old work factor while we have the password
+        if password_needs_rehash(user["password_hash"]):
+            await rehash_password(supabase, user["id"], credentials.password)
+        
         # Create tokens
         token_data = {
             "sub": user["id"],
@@ -187,6 +203,8 @@ async def login(
             "role": user["role"],
             "workspace_id": user.get("workspace_id"),
         }
+        if user["role"] == UserRole.STAFF.value:
+            token_data["perms"] = load_permission_mask(supabase, user["id"])
         
         access_token = create_access_token(token_data)
         refresh_token = create_refresh_token(token_data)
@@ -16,6 +16,7 @@ from app.schemas.auth import TokenData
 from app.core.security import require_owner, require_staff_or_owner
 from app.services.booking_type_service import BookingTypeService
 from app.core.exceptions import ValidationException
+from app.core.responses import model_list_response
 import logging
 
 logger = logging.getLogger(__name__)
@@ -230,7 +231,7 @@ async def get_available_slots(
             start_date=start_date,
             end_date=end_date
         )
-        return slots
+        return model_list_response(slots, TimeSlotResponse)
     except HTTPException:
         raise
     except ValidationException as e:
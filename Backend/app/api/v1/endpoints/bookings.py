@@ -13,12 +13,16 @@ from app.schemas.booking import (
     BookingTypeResponse,
 )
 from app.schemas.auth import TokenData
-from app.core.security import get_current_user, require_staff_or_owner
+from app.core.permissions import require_permission
+from app.core.realtime import notify_counters_changed
+from app.core.responses import model_list_response
 from app.services.booking_service import BookingService
 from app.models.enums import BookingStatus
 
 router = APIRouter()
 
+require_manage_bookings = require_permission("can_manage_bookings")
+
 
 @router.post("", response_model=BookingResponse)
 async def create_booking(
@@ -29,6 +33,7 @@ async def create_booking(
     """Create new booking (public endpoint for customers)"""
     service = BookingService(supabase)
     booking = await service.create_booking(workspace_id, booking_data.model_dump())
+    await notify_counters_changed(workspace_id, "bookings", "leads")
     return BookingResponse(**booking)
 
 
@@ -36,7 +41,7 @@ async def create_booking(
 async def get_bookings(
     start_date: datetime = Query(None),
     end_date: datetime = Query(None),
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_manage_bookings),
     supabase: Client = Depends(get_supabase)
 ):
     """Get bookings for workspace"""
@@ -49,42 +54,46 @@ async def get_bookings(
     else:
         bookings = await service.get_all({"workspace_id": current_user.workspace_id})
     
-    return [BookingResponse(**b) for b in bookings]
+    return model_list_response(bookings, BookingResponse)
 
 
 @router.get("/today", response_model=List[BookingResponse])
 async def get_today_bookings(
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_manage_bookings),
     supabase: Client = Depends(get_supabase)
 ):
     """Get today's bookings"""
     service = BookingService(supabase)
     bookings = await service.get_today_bookings(current_user.workspace_id)
-    return [BookingResponse(**b) for b in bookings]
+    return model_list_response(bookings, BookingResponse)
 
 
 @router.get("/upcoming", response_model=List[BookingResponse])
 async def get_upcoming_bookings(
     days: int = Query(7, ge=1, le=30),
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_manage_bookings),
     supabase: Client = Depends(get_supabase)
 ):
     """Get upcoming bookings"""
     service = BookingService(supabase)
     bookings = await service.get_upcoming_bookings(current_user.workspace_id, days)
-    return [BookingResponse(**b) for b in bookings]
+    return model_list_response(bookings, BookingResponse)
 
 
 @router.patch("/{booking_id}", response_model=BookingResponse)
 async def update_booking(
     booking_id: str,
     booking_data: BookingUpdate,
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_manage_bookings),
     supabase: Client = Depends(get_supabase)
 ):
     """Update booking"""
     service = BookingService(supabase)
-    booking = await service.update(booking_id, booking_data.model_dump(exclude_unset=True))
+    changes = booking_data.model_dump(exclude_unset=True)
+    booking = await service.update(booking_id, changes)
+    if "scheduled_at" in changes or "status" in changes:
+        await service.sync_reminder(booking)
+    await notify_counters_changed(booking.get("workspace_id"), "bookings")
     return BookingResponse(**booking)
 
 
@@ -92,10 +101,12 @@ async def update_booking(
 async def update_booking_status(
     booking_id: str,
     status: BookingStatus,
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_manage_bookings),
     supabase: Client = Depends(get_supabase)
 ):
     """Update booking status"""
     service = BookingService(supabase)
     booking = await service.update_booking_status(booking_id, status)
+    await service.sync_reminder(booking)
+    await notify_counters_changed(booking.get("workspace_id"), "bookings")
     return BookingResponse(**booking)
@@ -1,13 +1,15 @@
 """Contact endpoints"""
 from fastapi import APIRouter, Depends, Query
-from typing import List
+from typing import List, Optional
 from supabase import Client
 
 from app.db.supabase_client import get_supabase
-from app.schemas.contact import ContactCreate, ContactUpdate, ContactResponse
+from app.schemas.contact import ContactCreate, ContactUpdate, ContactResponse, ContactSearchResult
 from app.schemas.auth import TokenData
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.responses import model_list_response
 from app.core.security import require_staff_or_owner
-from app.services.base_service import BaseService
+from app.services.contact_service import ContactService
 
 router = APIRouter()
 
@@ -28,11 +30,14 @@ async def create_contact(
             detail="Cannot create contacts for other workspaces"
         )
     
-    service = BaseService(supabase, "contacts")
-    contact = await service.create({
-        **contact_data.model_dump(),
-        "workspace_id": workspace_id
-    })
+    service = ContactService(supabase)
+    contact, _ = await service.upsert_contact(
+        workspace_id=workspace_id,
+        name=contact_data.name,
+        email=contact_data.email,
+        phone=contact_data.phone,
+        message=contact_data.message,
+    )
     return ContactResponse(**contact)
 
 
@@ -42,11 +47,31 @@ async def get_contacts(
     supabase: Client = Depends(get_supabase)
 ):
     """Get all contacts for workspace"""
-    service = BaseService(supabase, "contacts")
+    service = ContactService(supabase)
     contacts = await service.get_all({"workspace_id": current_user.workspace_id})
     return [ContactResponse(**c) for c in contacts]
 
 
+@router.get("/search", response_model=List[ContactSearchResult])
+async def search_contacts(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    current_user: TokenData = Depends(require_staff_or_owner),
+    supabase: Client = Depends(get_supabase)
+):
+    """Search contacts by name, email or phone, best match first"""
+    service = ContactService(supabase)
+    contacts, next_cursor = await service.search_contacts(
+        current_user.workspace_id, q, limit=limit, cursor=cursor
+    )
+
+    response = model_list_response(contacts, ContactSearchResult)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+
 @router.get("/{contact_id}", response_model=ContactResponse)
 async def get_contact(
     contact_id: str,
@@ -54,7 +79,7 @@ async def get_contact(
     supabase: Client = Depends(get_supabase)
 ):
     """Get contact by ID"""
-    service = BaseService(supabase, "contacts")
+    service = ContactService(supabase)
     contact = await service.get_by_id(contact_id)
     return ContactResponse(**contact)
 
@@ -67,6 +92,6 @@ async def update_contact(
     supabase: Client = Depends(get_supabase)
 ):
     """Update contact"""
-    service = BaseService(supabase, "contacts")
+    service = ContactService(supabase)
     contact = await service.update(contact_id, contact_data.model_dump(exclude_unset=True))
     return ContactResponse(**contact)
@@ -14,13 +14,18 @@ from app.schemas.form import (
     FormSubmissionResponse,
 )
 from app.schemas.auth import TokenData
-from app.core.security import require_owner, require_staff_or_owner
+from app.core.security import require_owner
+from app.core.permissions import require_permission
+from app.core.realtime import notify_counters_changed
+from app.core.responses import model_list_response
 from app.services.base_service import BaseService
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+require_view_forms = require_permission("can_view_forms")
+
 
 @router.post("/templates", response_model=FormTemplateResponse, status_code=201)
 async def create_form_template(
@@ -43,7 +48,7 @@ async def create_form_template(
 
 @router.get("/templates", response_model=List[FormTemplateResponse])
 async def get_form_templates(
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_view_forms),
     supabase: Client = Depends(get_supabase)
 ):
     """Get all form templates (Staff or Owner)"""
@@ -59,7 +64,7 @@ async def get_form_templates(
 @router.get("/templates/{template_id}", response_model=FormTemplateResponse)
 async def get_form_template(
     template_id: str,
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_view_forms),
     supabase: Client = Depends(get_supabase)
 ):
     """Get single form template (Staff or Owner)"""
@@ -139,7 +144,7 @@ async def delete_form_template(
 @router.get("/submissions", response_model=List[FormSubmissionResponse])
 async def get_form_submissions(
     status: str = Query(None),
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_view_forms),
     supabase: Client = Depends(get_supabase)
 ):
     """Get form submissions (Staff or Owner)"""
@@ -151,7 +156,7 @@ async def get_form_submissions(
             filters["status"] = status
         
         submissions = await service.get_all(filters)
-        return [FormSubmissionResponse(**s) for s in submissions]
+        return model_list_response(submissions, FormSubmissionResponse)
     except Exception as e:
         logger.error(f"Error getting form submissions: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get form submissions")
@@ -161,7 +166,7 @@ async def get_form_submissions(
 async def update_form_submission(
     submission_id: str,
     submission_data: FormSubmissionUpdate,
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_view_forms),
     supabase: Client = Depends(get_supabase)
 ):
     """Update form submission status (Staff or Owner)"""
@@ -177,6 +182,7 @@ async def update_form_submission(
             raise HTTPException(status_code=403, detail="Access denied")
         
         submission = await service.update(submission_id, submission_data.model_dump(exclude_unset=True))
+        await notify_counters_changed(current_user.workspace_id, "forms")
         return FormSubmissionResponse(**submission)
     except HTTPException:
         raise
@@ -9,7 +9,7 @@ from app.schemas.auth import TokenData
 from app.core.security import require_owner
 from app.services.base_service import BaseService
 from app.services.integration_service import IntegrationService
-from app.models.enums import IntegrationProvider, IntegrationStatus
+from app.models.enums import IntegrationProvider
 from app.core.exceptions import IntegrationException
 
 router = APIRouter()
@@ -92,12 +92,9 @@ async def create_integration(
             raise HTTPException(status_code=400, detail=verification.get("message", "Verification failed"))
         
         # Create integration
-        integration = await service.create({
-            "workspace_id": current_user.workspace_id,
-            "provider": request.provider.value,
-            "config": request.config,
-            "status": IntegrationStatus.ACTIVE.value
-        })
+        integration = await service.create_integration(
+            current_user.workspace_id, request.provider, request.config
+        )
         
         return integration
     except IntegrationException as e:
@@ -125,5 +122,5 @@ async def delete_integration(
 ):
     """Delete integration"""
     service = IntegrationService(supabase)
-    await service.delete(integration_id)
+    await service.delete_integration(current_user.workspace_id, integration_id)
     return {"success": True}
@@ -15,12 +15,17 @@ from app.schemas.inventory import (
     InventoryForecast,
 )
 from app.schemas.auth import TokenData
-from app.core.security import require_owner, require_staff_or_owner
+from app.core.security import require_owner
+from app.core.permissions import require_permission
+from app.core.responses import model_list_response
+from app.core.realtime import notify_counters_changed
 from app.services.inventory_service import InventoryService
 
 router = APIRouter()
 logger = structlog.get_logger()
 
+require_view_inventory = require_permission("can_view_inventory")
+
 
 @router.post("/items", response_model=InventoryItemResponse, status_code=status.HTTP_201_CREATED)
 async def create_inventory_item(
@@ -35,6 +40,7 @@ async def create_inventory_item(
             **item_data.model_dump(),
             "workspace_id": current_user.workspace_id
         })
+        await notify_counters_changed(current_user.workspace_id, "inventory")
         return InventoryItemResponse(**item)
         
     except Exception as e:
@@ -48,14 +54,14 @@ async def create_inventory_item(
 @router.get("/items", response_model=List[InventoryItemResponse])
 async def get_inventory_items(
     low_stock_only: bool = Query(False, description="Filter to low stock items only"),
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_view_inventory),
     supabase: Client = Depends(get_supabase)
 ):
     """Get inventory items (Staff or Owner)"""
     try:
         service = InventoryService(supabase)
         items = await service.get_items(current_user.workspace_id, low_stock_only)
-        return [InventoryItemResponse(**item) for item in items]
+        return model_list_response(items, InventoryItemResponse)
         
     except Exception as e:
         logger.error("get_inventory_items_failed", error=str(e))
@@ -68,7 +74,7 @@ async def get_inventory_items(
 @router.get("/items/{item_id}", response_model=InventoryItemResponse)
 async def get_inventory_item(
     item_id: str,
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_view_inventory),
     supabase: Client = Depends(get_supabase)
 ):
     """Get single inventory item (Staff or Owner)"""
@@ -126,6 +132,7 @@ async def update_inventory_item(
             )
         
         item = await service.update_item(item_id, item_data.model_dump(exclude_unset=True))
+        await notify_counters_changed(current_user.workspace_id, "inventory")
         return InventoryItemResponse(**item)
         
     except HTTPException:
@@ -163,6 +170,7 @@ async def delete_inventory_item(
             )
         
         await service.delete_item(item_id)
+        await notify_counters_changed(current_user.workspace_id, "inventory")
         return None
         
     except HTTPException:
@@ -179,7 +187,7 @@ async def delete_inventory_item(
 async def adjust_inventory_quantity(
     item_id: str,
     adjustment_data: InventoryAdjustment,
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_view_inventory),
     supabase: Client = Depends(get_supabase)
 ):
     """Adjust inventory quantity (Staff or Owner)"""
@@ -205,6 +213,7 @@ async def adjust_inventory_quantity(
             adjustment_data.adjustment,
             adjustment_data.reason
         )
+        await notify_counters_changed(current_user.workspace_id, "inventory")
         return InventoryItemResponse(**item)
         
     except HTTPException:
@@ -221,7 +230,7 @@ async def adjust_inventory_quantity(
 async def get_usage_history(
     item_id: str,
     limit: int = Query(50, ge=1, le=100),
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_view_inventory),
     supabase: Client = Depends(get_supabase)
 ):
     """Get usage history for an item (Staff or Owner)"""
@@ -258,7 +267,7 @@ async def get_usage_history(
 @router.get("/forecast", response_model=List[InventoryForecast])
 async def get_inventory_forecast(
     days_ahead: int = Query(30, ge=1, le=90, description="Days to forecast ahead"),
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_view_inventory),
     supabase: Client = Depends(get_supabase)
 ):
     """Get inventory usage forecast (Staff or Owner)"""
@@ -278,7 +287,7 @@ async def get_inventory_forecast(
 @router.post("/usage", response_model=InventoryUsageResponse, status_code=status.HTTP_201_CREATED)
 async def record_inventory_usage(
     usage_data: InventoryUsageCreate,
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_view_inventory),
     supabase: Client = Depends(get_supabase)
 ):
     """Record inventory usage (Staff or Owner)"""
@@ -300,6 +309,7 @@ async def record_inventory_usage(
             )
         
         usage = await service.record_usage(usage_data.model_dump())
+        await notify_counters_changed(current_user.workspace_id, "inventory")
         return InventoryUsageResponse(**usage)
         
     except HTTPException:
@@ -1,88 +1,262 @@
 """Message and conversation endpoints"""
-from fastapi import APIRouter, Depends
-from typing import List
+import asyncio
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from typing import List, Optional
 from supabase import Client
+import structlog
 
 from app.db.supabase_client import get_supabase
-from app.schemas.message import MessageCreate, MessageResponse, ConversationResponse
+from app.schemas.message import (
+    ConversationResponse,
+    MarkReadRequest,
+    MarkReadResponse,
+    MessageCreate,
+    MessageResponse,
+    MessageSearchResult,
+    UnreadCounts,
+)
 from app.schemas.auth import TokenData
-from app.core.security import require_staff_or_owner
-from app.services.base_service import BaseService
+from app.core.exceptions import AppException, NotFoundException
+from app.core.pagination import NEXT_CURSOR_HEADER, SINCE_CURSOR_HEADER
+from app.core.permissions import has_permission, require_permission
+from app.core.realtime import (
+    CONVERSATION_UPDATED,
+    conversation_channel,
+    hub,
+    notify_counters_changed,
+    publish_event_async,
+    publish_message_async,
+    workspace_channel,
+)
+from app.core.responses import model_list_response
+from app.core.security import decode_token_cached
+from app.services.message_service import MessageService
 
 router = APIRouter()
+logger = structlog.get_logger()
+
+# Conversation channels one inbox socket may follow at a time
+MAX_SOCKET_CONVERSATIONS = 20
+
+require_inbox_access = require_permission("can_access_inbox")
 
 
 @router.get("/conversations", response_model=List[ConversationResponse])
 async def get_conversations(
-    current_user: TokenData = Depends(require_staff_or_owner),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    current_user: TokenData = Depends(require_inbox_access),
     supabase: Client = Depends(get_supabase)
 ):
-    """Get all conversations for workspace"""
-    service = BaseService(supabase, "conversations")
-    conversations = await service.get_all({"workspace_id": current_user.workspace_id})
-    
-    # Enrich with last message preview and channel
-    enriched_conversations = []
-    for convo in conversations:
-        # Get last message
-        last_msg = supabase.table("messages")\
-            .select("content, channel")\
-            .eq("conversation_id", convo["id"])\
-            .order("sent_at", desc=True)\
-            .limit(1)\
-            .execute()
-        
-        convo["last_message_preview"] = last_msg.data[0]["content"][:100] if last_msg.data else None
-        convo["last_channel"] = last_msg.data[0]["channel"] if last_msg.data else None
-        enriched_conversations.append(ConversationResponse(**convo))
-    
-    return enriched_conversations
+    """Get conversations for workspace, most recent activity first"""
+    service = MessageService(supabase)
+    conversations, next_cursor = await service.list_conversations(
+        current_user.workspace_id, limit=limit, cursor=cursor
+    )
+
+    response = model_list_response(conversations, ConversationResponse)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+
+@router.get("/search", response_model=List[MessageSearchResult])
+async def search_messages(
+    q: str = Query(..., min_length=2, max_length=200, description="Words, \"phrases\", -excluded"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    current_user: TokenData = Depends(require_inbox_access),
+    supabase: Client = Depends(get_supabase)
+):
+    """Full-text search over the workspace's messages, best match first"""
+    service = MessageService(supabase)
+    messages, next_cursor = await service.search_messages(
+        current_user.workspace_id, q, limit=limit, cursor=cursor
+    )
+
+    response = model_list_response(messages, MessageSearchResult)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
 
 
 @router.get("/conversations/{conversation_id}/messages", response_model=List[MessageResponse])
 async def get_conversation_messages(
     conversation_id: str,
-    current_user: TokenData = Depends(require_staff_or_owner),
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="X-Next-Cursor of a page, to load older messages"),
+    since: Optional[str] = Query(None, description="X-Since-Cursor of a page, to load newer messages"),
+    current_user: TokenData = Depends(require_inbox_access),
     supabase: Client = Depends(get_supabase)
 ):
-    """Get messages for a conversation"""
-    service = BaseService(supabase, "messages")
-    messages = await service.get_all({"conversation_id": conversation_id})
-    return [MessageResponse(**m) for m in messages]
+    """Get messages for a conversation, oldest first
+
+    Without a cursor returns the latest messages.
+    """
+    if before and since:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either before or since, not both",
+        )
+
+    service = MessageService(supabase)
+    messages, next_cursor, since_cursor = await service.list_messages(
+        conversation_id, current_user.workspace_id, limit=limit, before=before, since=since
+    )
+
+    response = model_list_response(messages, MessageResponse)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if since_cursor:
+        response.headers[SINCE_CURSOR_HEADER] = since_cursor
+    return response
 
 
 @router.post("/conversations/{conversation_id}/messages", response_model=MessageResponse)
 async def send_message(
     conversation_id: str,
     message_data: MessageCreate,
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_inbox_access),
     supabase: Client = Depends(get_supabase)
 ):
     """Send message in conversation"""
-    service = BaseService(supabase, "messages")
-    message = await service.create({
-        **message_data.model_dump(),
-        "sender_id": current_user.user_id,
-        "message_type": "manual"
-    })
-    
-    # Pause automation when staff replies
-    conv_service = BaseService(supabase, "conversations")
-    await conv_service.update(conversation_id, {"is_automated_paused": True})
-    
+    service = MessageService(supabase)
+    service.verify_conversation(conversation_id, current_user.workspace_id)
+    message = await service.send_message(
+        conversation_id, message_data.model_dump(), current_user.user_id
+    )
+    await publish_message_async(current_user.workspace_id, message)
     return MessageResponse(**message)
 
 
+@router.get("/unread-count", response_model=UnreadCounts)
+async def get_unread_count(
+    current_user: TokenData = Depends(require_inbox_access),
+    supabase: Client = Depends(get_supabase)
+):
+    """Unread badge counts for the workspace (one counter row read)"""
+    service = MessageService(supabase)
+    return UnreadCounts(**await service.get_unread_counts(current_user.workspace_id))
+
+
+@router.post("/conversations/mark-read", response_model=MarkReadResponse)
+async def mark_conversations_read(
+    request: MarkReadRequest,
+    current_user: TokenData = Depends(require_inbox_access),
+    supabase: Client = Depends(get_supabase)
+):
+    """Mark several conversations read at once"""
+    result = await _mark_read(supabase, current_user.workspace_id, request.conversation_ids)
+    return MarkReadResponse(**result)
+
+
 @router.post("/conversations/{conversation_id}/mark-read")
 async def mark_conversation_read(
     conversation_id: str,
-    current_user: TokenData = Depends(require_staff_or_owner),
+    current_user: TokenData = Depends(require_inbox_access),
     supabase: Client = Depends(get_supabase)
 ):
     """Mark all messages in conversation as read"""
-    supabase.table("messages").update({"is_read": True}).eq("conversation_id", conversation_id).execute()
-    
-    # Update unread count
-    supabase.table("conversations").update({"unread_count": 0}).eq("id", conversation_id).execute()
-    
+    await _mark_read(supabase, current_user.workspace_id, [conversation_id])
     return {"success": True}
+
+
+async def _mark_read(supabase: Client, workspace_id: str, conversation_ids: List[str]) -> dict:
+    """Reset unread counts and tell open inboxes and dashboards"""
+    result = await MessageService(supabase).mark_read(workspace_id, conversation_ids)
+    if result["conversation_ids"]:
+        await asyncio.gather(
+            *(
+                publish_event_async(
+                    workspace_id,
+                    CONVERSATION_UPDATED,
+                    {"conversation_id": conversation_id, "unread_count": 0, "unread_total": result["unread_total"]},
+                )
+                for conversation_id in result["conversation_ids"]
+            ),
+            notify_counters_changed(workspace_id, "leads"),
+        )
+    return result
+
+
+@router.websocket("/ws")
+async def inbox_socket(
+    websocket: WebSocket,
+    token: str = Query(...),
+    supabase: Client = Depends(get_supabase)
+):
+    """Live inbox updates
+
+    Authenticated with an access token in the query string (browsers cannot
+    set headers on WebSocket requests). The socket receives
+    `conversation.updated` events for the whole workspace. Clients send
+    {"action": "subscribe" | "unsubscribe", "conversation_id": ...} to follow
+    the full `message.created` stream of open threads, and
+    {"action": "ping"} to check liveness. The socket is closed with code
+    1008 when the token expires.
+    """
+    try:
+        current_user = decode_token_cached(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if not current_user.workspace_id or not has_permission(current_user, supabase, "can_access_inbox"):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    service = MessageService(supabase)
+
+    async with hub.subscribe(workspace_channel(current_user.workspace_id)) as queue:
+
+        async def forward_events():
+            while True:
+                event = await queue.get()
+                await websocket.send_json({key: value for key, value in event.items() if key != "seq"})
+
+        async def handle_commands():
+            following = set()
+            while True:
+                command = await websocket.receive_json()
+                if not isinstance(command, dict):
+                    command = {}
+                action = command.get("action")
+                conversation_id = command.get("conversation_id")
+
+                if action == "ping":
+                    await websocket.send_json({"type": "pong"})
+                elif action == "subscribe" and conversation_id:
+                    if len(following) >= MAX_SOCKET_CONVERSATIONS:
+                        await websocket.send_json({"type": "error", "detail": "Too many subscriptions"})
+                        continue
+                    try:
+                        service.verify_conversation(conversation_id, current_user.workspace_id)
+                    except NotFoundException:
+                        await websocket.send_json({"type": "error", "detail": "Conversation not found"})
+                        continue
+                    hub.attach(queue, conversation_channel(conversation_id))
+                    following.add(conversation_id)
+                    await websocket.send_json({"type": "subscribed", "conversation_id": conversation_id})
+                elif action == "unsubscribe" and conversation_id:
+                    hub.detach(queue, conversation_channel(conversation_id))
+                    following.discard(conversation_id)
+                    await websocket.send_json({"type": "unsubscribed", "conversation_id": conversation_id})
+                else:
+                    await websocket.send_json({"type": "error", "detail": "Unknown action"})
+
+        tasks = [asyncio.create_task(forward_events()), asyncio.create_task(handle_commands())]
+        lifetime = None if current_user.expires_at is None else max(current_user.expires_at - time.time(), 0)
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=lifetime, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                if error and not isinstance(error, (WebSocketDisconnect, AppException)):
+                    logger.warning("inbox_socket_failed", user_id=current_user.user_id, error=str(error))
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    if not done:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Token expired")
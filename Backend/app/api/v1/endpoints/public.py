@@ -1,13 +1,16 @@
 """Public endpoints (no authentication required)"""
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
 from supabase import Client
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import structlog
 from collections import defaultdict
 from time import time
+from uuid import UUID
 
 from app.db.supabase_client import get_supabase
+from app.core.realtime import ALERT_CREATED, notify_counters_changed, publish_event_async
+from app.core.security import is_legacy_form_token, is_signed_form_token, verify_form_access_token
 from app.schemas.workspace import WorkspacePublicResponse
 from app.schemas.contact import ContactCreate, ContactResponse
 from app.schemas.booking import (
@@ -20,6 +23,10 @@ from app.services.booking_type_service import BookingTypeService
 from app.schemas.form import FormSubmissionPublicCreate, FormSubmissionResponse
 from app.services.workspace_service import WorkspaceService
 from app.services.booking_service import BookingService
+from app.services.communication.workspace_providers import email_service_for
+from app.services.communication.templates import format_datetime, load_overrides, render_email
+from app.services.contact_service import ContactService
+from app.services.form_submission_service import FormSubmissionService
 from app.tasks.automation_tasks import (
     send_welcome_message,
     send_booking_confirmation,
@@ -160,54 +167,18 @@ async def create_public_booking(
                 detail="Booking type is not active"
             )
         
-        # Check if contact exists by email or phone
-        contact = None
-        if booking_data.contact_email:
-            contact_response = (
-                supabase.table("contacts")
-                .select("*")
-                .eq("workspace_id", booking_data.workspace_id)
-                .eq("email", booking_data.contact_email)
-                .limit(1)
-                .execute()
-            )
-            if contact_response.data:
-                contact = contact_response.data[0]
-                logger.info("existing_contact_found", contact_id=contact["id"])
-        
-        # Create or update contact
-        if not contact:
-            contact_dict = {
-                "workspace_id": booking_data.workspace_id,
-                "name": booking_data.contact_name,
-                "email": booking_data.contact_email,
-                "phone": booking_data.contact_phone,
-                "source": "booking_page",
-            }
-            contact_response = supabase.table("contacts").insert(contact_dict).execute()
-            contact = contact_response.data[0]
-            logger.info("contact_created", contact_id=contact["id"])
-            
-            # Create conversation for new contact
-            conversation_data = {
-                "workspace_id": booking_data.workspace_id,
-                "contact_id": contact["id"],
-                "unread_count": 1,
-            }
-            conversation_response = supabase.table("conversations").insert(conversation_data).execute()
-            logger.info("conversation_created", conversation_id=conversation_response.data[0]["id"])
-        else:
-            # Update existing contact if needed
-            update_dict = {}
-            if booking_data.contact_name and booking_data.contact_name != contact.get("name"):
-                update_dict["name"] = booking_data.contact_name
-            if booking_data.contact_phone and booking_data.contact_phone != contact.get("phone"):
-                update_dict["phone"] = booking_data.contact_phone
-            
-            if update_dict:
-                supabase.table("contacts").update(update_dict).eq("id", contact["id"]).execute()
-                logger.info("contact_updated", contact_id=contact["id"])
-        
+        # Create or update contact (and its conversation) in one round-trip
+        contact_service = ContactService(supabase)
+        contact, _ = await contact_service.upsert_contact(
+            workspace_id=booking_data.workspace_id,
+            name=booking_data.contact_name,
+            email=booking_data.contact_email,
+            phone=booking_data.contact_phone,
+            source="booking_page",
+            ensure_conversation=True,
+            unread_count=1,
+        )
+
         # Combine date and time to create scheduled_at
         scheduled_at = f"{booking_data.booking_date}T{booking_data.start_time}:00"
         
@@ -224,42 +195,35 @@ async def create_public_booking(
         booking_response = supabase.table("bookings").insert(booking_dict).execute()
         booking = booking_response.data[0]
         logger.info("booking_created", booking_id=booking["id"])
+        await notify_counters_changed(booking_data.workspace_id, "bookings", "leads")
+        
+        # Shared by the client confirmation and the owner notification
+        formatted_date = format_datetime(scheduled_at)
+        notification_context = {
+            "workspace_name": workspace["name"],
+            "contact_name": booking_data.contact_name,
+            "contact_email": booking_data.contact_email,
+            "contact_phone": booking_data.contact_phone,
+            "service": booking_type["name"],
+            "scheduled_at": scheduled_at,
+            "duration_minutes": booking_type["duration_minutes"],
+            "location": booking_type["location_type"],
+            "notes": booking_data.notes,
+        }
         
         # Send confirmation email if integration configured
         email_sent = False
         if booking_data.contact_email:
             try:
-                from app.services.communication.email_provider import EmailService
-                email_service = EmailService()
-                
-                # Format booking details for email
-                scheduled_datetime = datetime.fromisoformat(scheduled_at)
-                formatted_date = scheduled_datetime.strftime("%B %d, %Y at %I:%M %p")
-                
-                email_content = f"""
-                <html>
-                <body>
-                    <h2>Booking Confirmation</h2>
-                    <p>Dear {booking_data.contact_name},</p>
-                    <p>Your booking has been confirmed!</p>
-                    <h3>Booking Details:</h3>
-                    <ul>
-                        <li><strong>Service:</strong> {booking_type['name']}</li>
-                        <li><strong>Date & Time:</strong> {formatted_date}</li>
-                        <li><strong>Duration:</strong> {booking_type['duration_minutes']} minutes</li>
-                        <li><strong>Location:</strong> {booking_type['location_type']}</li>
-                    </ul>
-                    {f'<p><strong>Notes:</strong> {booking_data.notes}</p>' if booking_data.notes else ''}
-                    <p>If you need to make any changes, please contact us.</p>
-                    <p>Thank you!</p>
-                </body>
-                </html>
-                """
+                email_service = email_service_for(booking_data.workspace_id)
+                email = render_email(
+                    "booking_confirmation",
+                    notification_context,
+                    load_overrides(supabase, booking_data.workspace_id),
+                )
                 
                 await email_service.send_email(
-                    to=booking_data.contact_email,
-                    subject=f"Booking Confirmation - {booking_type['name']}",
-                    content=email_content
+                    to=booking_data.contact_email, subject=email.subject, content=email.content
                 )
                 email_sent = True
                 logger.info("booking_confirmation_email_sent", booking_id=booking["id"])
@@ -288,39 +252,24 @@ async def create_public_booking(
                 "message": f"New booking from {booking_data.contact_name} for {booking_type['name']} on {formatted_date}",
                 "metadata": {"booking_id": booking["id"]},
             }
-            supabase.table("alerts").insert(alert_data).execute()
+            alert_response = supabase.table("alerts").insert(alert_data).execute()
             logger.info("owner_notification_created", booking_id=booking["id"])
+            if alert_response.data:
+                await publish_event_async(booking_data.workspace_id, ALERT_CREATED, alert_response.data[0])
+                await notify_counters_changed(booking_data.workspace_id, "alerts")
             
             # Send email notification to owner if available
             if owner_response.data and owner_response.data[0].get("email"):
                 try:
-                    from app.services.communication.email_provider import EmailService
-                    email_service = EmailService()
-                    
-                    owner_email_content = f"""
-                    <html>
-                    <body>
-                        <h2>New Booking Notification</h2>
-                        <p>You have a new booking!</p>
-                        <h3>Booking Details:</h3>
-                        <ul>
-                            <li><strong>Client:</strong> {booking_data.contact_name}</li>
-                            <li><strong>Email:</strong> {booking_data.contact_email or 'Not provided'}</li>
-                            <li><strong>Phone:</strong> {booking_data.contact_phone or 'Not provided'}</li>
-                            <li><strong>Service:</strong> {booking_type['name']}</li>
-                            <li><strong>Date & Time:</strong> {formatted_date}</li>
-                            <li><strong>Duration:</strong> {booking_type['duration_minutes']} minutes</li>
-                            <li><strong>Location:</strong> {booking_type['location_type']}</li>
-                        </ul>
-                        {f'<p><strong>Notes:</strong> {booking_data.notes}</p>' if booking_data.notes else ''}
-                    </body>
-                    </html>
-                    """
+                    email_service = email_service_for(booking_data.workspace_id)
+                    email = render_email(
+                        "owner_new_booking",
+                        notification_context,
+                        load_overrides(supabase, booking_data.workspace_id),
+                    )
                     
                     await email_service.send_email(
-                        to=owner_response.data[0]["email"],
-                        subject=f"New Booking - {booking_type['name']}",
-                        content=owner_email_content
+                        to=owner_response.data[0]["email"], subject=email.subject, content=email.content
                     )
                     logger.info("owner_notification_email_sent", booking_id=booking["id"])
                 except Exception as owner_email_error:
@@ -392,23 +341,20 @@ async def submit_contact_form(
         workspace_service = WorkspaceService(supabase)
         workspace = await workspace_service.get_by_slug(slug)
         
-        # Create contact
-        contact_dict = contact_data.model_dump()
-        contact_dict["workspace_id"] = workspace["id"]
-        contact_dict["source"] = "contact_form"
-        contact_dict["source_url"] = f"/public/{slug}/contact"
-        
-        contact_response = supabase.table("contacts").insert(contact_dict).execute()
-        contact = contact_response.data[0]
-        
-        # Create conversation
-        conversation_data = {
-            "workspace_id": workspace["id"],
-            "contact_id": contact["id"],
-            "unread_count": 1,
-        }
-        supabase.table("conversations").insert(conversation_data).execute()
-        
+        # Create or update contact and ensure it has a conversation
+        contact_service = ContactService(supabase)
+        contact, _ = await contact_service.upsert_contact(
+            workspace_id=workspace["id"],
+            name=contact_data.name,
+            email=contact_data.email,
+            phone=contact_data.phone,
+            source="contact_form",
+            source_url=f"/public/{slug}/contact",
+            message=contact_data.message,
+            ensure_conversation=True,
+            unread_count=1,
+        )
+
         # Track analytics
         supabase.table("analytics_events").insert({
             "workspace_id": workspace["id"],
@@ -515,40 +461,18 @@ async def create_booking_by_slug(
         workspace_service = WorkspaceService(supabase)
         workspace = await workspace_service.get_by_slug(slug)
         
-        # Check if contact exists by email or phone
-        contact = None
-        if booking_data.contact_email:
-            contact_response = (
-                supabase.table("contacts")
-                .select("*")
-                .eq("workspace_id", workspace["id"])
-                .eq("email", booking_data.contact_email)
-                .limit(1)
-                .execute()
-            )
-            if contact_response.data:
-                contact = contact_response.data[0]
-        
-        # Create contact if doesn't exist
-        if not contact:
-            contact_dict = {
-                "workspace_id": workspace["id"],
-                "name": booking_data.contact_name,
-                "email": booking_data.contact_email,
-                "phone": booking_data.contact_phone,
-                "source": "booking_page",
-                "source_url": f"/public/{slug}/book",
-            }
-            contact_response = supabase.table("contacts").insert(contact_dict).execute()
-            contact = contact_response.data[0]
-            
-            # Create conversation for new contact
-            conversation_data = {
-                "workspace_id": workspace["id"],
-                "contact_id": contact["id"],
-            }
-            supabase.table("conversations").insert(conversation_data).execute()
-        
+        # Create or update contact (and its conversation) in one round-trip
+        contact_service = ContactService(supabase)
+        contact, _ = await contact_service.upsert_contact(
+            workspace_id=workspace["id"],
+            name=booking_data.contact_name,
+            email=booking_data.contact_email,
+            phone=booking_data.contact_phone,
+            source="booking_page",
+            source_url=f"/public/{slug}/book",
+            ensure_conversation=True,
+        )
+
         # Create booking
         booking_service = BookingService(supabase)
         booking_dict = {
@@ -561,6 +485,8 @@ async def create_booking_by_slug(
         }
         
         booking = await booking_service.create(booking_dict)
+        await booking_service.sync_reminder(booking)
+        await notify_counters_changed(workspace["id"], "bookings", "leads")
         
         # Track analytics
         supabase.table("analytics_events").insert({
@@ -595,6 +521,37 @@ async def create_booking_by_slug(
         )
 
 
+async def verify_form_token(supabase: Client, submission_id: str, token: Optional[str]) -> str:
+    """Verify a form link token, returning its workspace_id
+
+    Signed tokens are checked without a database call. Links emailed before
+    signed tokens (no token, or the old stored one) are still honoured until
+    they expire. Anything else, including a malformed submission id, is
+    rejected before any lookup; every rejection is the same 404.
+    """
+    token = token or None
+    workspace_id = None
+    try:
+        UUID(submission_id)
+    except ValueError:
+        pass
+    else:
+        if token and is_signed_form_token(token):
+            workspace_id = verify_form_access_token(submission_id, token)
+        elif token is None or is_legacy_form_token(token):
+            try:
+                workspace_id = await FormSubmissionService(supabase).get_legacy_link_workspace(submission_id, token)
+            except Exception as e:
+                logger.error("legacy_form_link_lookup_failed", submission_id=submission_id, error=str(e))
+    if not workspace_id:
+        logger.warning("form_token_rejected", submission_id=submission_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Form submission not found"
+        )
+    return workspace_id
+
+
 @router.get("/form/{submission_id}/{token}", response_model=FormSubmissionResponse)
 async def get_form_submission(
     submission_id: str,
@@ -602,23 +559,19 @@ async def get_form_submission(
     supabase: Client = Depends(get_supabase)
 ):
     """Get form submission by ID and token (for public form completion)"""
+    workspace_id = await verify_form_token(supabase, submission_id, token)
+    
     try:
-        response = (
-            supabase.table("form_submissions")
-            .select("*, form_templates(*), contacts(*)")
-            .eq("id", submission_id)
-            .eq("access_token", token)
-            .single()
-            .execute()
-        )
+        service = FormSubmissionService(supabase)
+        submission = await service.get_public_submission(submission_id, workspace_id)
         
-        if not response.data:
+        if not submission:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Form submission not found"
             )
         
-        return FormSubmissionResponse(**response.data)
+        return FormSubmissionResponse(**submission)
         
     except Exception as e:
         logger.error("get_form_submission_failed", submission_id=submission_id, error=str(e))
@@ -636,25 +589,9 @@ async def submit_form(
     supabase: Client = Depends(get_supabase)
 ):
     """Submit completed form"""
+    workspace_id = await verify_form_token(supabase, submission_id, token)
+    
     try:
-        # Verify token
-        response = (
-            supabase.table("form_submissions")
-            .select("*")
-            .eq("id", submission_id)
-            .eq("access_token", token)
-            .single()
-            .execute()
-        )
-        
-        if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Form submission not found"
-            )
-        
-        submission = response.data
-        
         # Update submission
         update_data = {
             "data": form_data.data,
@@ -662,24 +599,28 @@ async def submit_form(
             "submitted_at": datetime.utcnow().isoformat(),
         }
         
-        updated_response = (
-            supabase.table("form_submissions")
-            .update(update_data)
-            .eq("id", submission_id)
-            .execute()
-        )
+        service = FormSubmissionService(supabase)
+        submission = await service.update_public_submission(submission_id, workspace_id, update_data)
+        
+        if not submission:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Form submission not found"
+            )
         
         # Track analytics
         supabase.table("analytics_events").insert({
-            "workspace_id": submission["workspace_id"],
+            "workspace_id": workspace_id,
             "event_type": "form_completed",
             "event_data": {"submission_id": submission_id}
         }).execute()
         
         logger.info("form_submitted", submission_id=submission_id)
         
-        return FormSubmissionResponse(**updated_response.data[0])
+        return FormSubmissionResponse(**submission)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("submit_form_failed", submission_id=submission_id, error=str(e))
         raise HTTPException(
@@ -736,30 +677,26 @@ async def get_public_form(
 @router.get("/forms/view/{submission_id}")
 async def view_form_submission(
     submission_id: str,
+    token: Optional[str] = Query(None),
     supabase: Client = Depends(get_supabase)
 ):
     """View form submission details (public access for clients)"""
+    workspace_id = await verify_form_token(supabase, submission_id, token)
+    
     try:
-        # Get submission
-        submission_response = (
-            supabase.table("form_submissions")
-            .select("*, form_templates(*), bookings(*, booking_types(*)), contacts(*)")
-            .eq("id", submission_id)
-            .single()
-            .execute()
-        )
+        service = FormSubmissionService(supabase)
+        submission = await service.get_public_submission(submission_id, workspace_id)
         
-        if not submission_response.data:
+        if not submission:
             raise HTTPException(status_code=404, detail="Form not found")
         
-        submission = submission_response.data
         form_template = submission["form_templates"]
         
         # Track that form was viewed
         if not submission.get("viewed_at"):
-            supabase.table("form_submissions").update({
+            await service.update_public_submission(submission_id, workspace_id, {
                 "viewed_at": datetime.utcnow().isoformat()
-            }).eq("id", submission_id).execute()
+            })
         
         logger.info("form_viewed", submission_id=submission_id)
         
@@ -784,14 +721,18 @@ async def view_form_submission(
 @router.post("/forms/track-download/{submission_id}")
 async def track_form_download(
     submission_id: str,
+    token: Optional[str] = Query(None),
     supabase: Client = Depends(get_supabase)
 ):
     """Track when a form is downloaded"""
+    workspace_id = await verify_form_token(supabase, submission_id, token)
+    
     try:
         # Update download timestamp
-        supabase.table("form_submissions").update({
+        service = FormSubmissionService(supabase)
+        await service.update_public_submission(submission_id, workspace_id, {
             "downloaded_at": datetime.utcnow().isoformat()
-        }).eq("id", submission_id).execute()
+        })
         
         logger.info("form_downloaded", submission_id=submission_id)
         
@@ -805,15 +746,19 @@ async def track_form_download(
 @router.post("/forms/mark-complete/{submission_id}")
 async def mark_form_complete(
     submission_id: str,
+    token: Optional[str] = Query(None),
     supabase: Client = Depends(get_supabase)
 ):
     """Mark form as completed by client"""
+    workspace_id = await verify_form_token(supabase, submission_id, token)
+    
     try:
         # Update status to completed
-        supabase.table("form_submissions").update({
+        service = FormSubmissionService(supabase)
+        await service.update_public_submission(submission_id, workspace_id, {
             "status": "completed",
             "submitted_at": datetime.utcnow().isoformat()
-        }).eq("id", submission_id).execute()
+        })
         
         logger.info("form_completed", submission_id=submission_id)
         
@@ -14,7 +14,12 @@ from app.schemas.staff import (
     WorkspaceActivationResponse,
 )
 from app.schemas.auth import TokenData
-from app.core.security import require_owner, require_staff_or_owner
+from app.core.security import (
+    require_owner,
+    create_access_token,
+    create_refresh_token,
+)
+from app.core.permissions import load_permission_mask
 from app.services.staff_service import StaffService
 
 router = APIRouter()
@@ -103,10 +108,22 @@ async def accept_staff_invitation(
             password=accept_data.password
         )
         
+        # Sign the new staff member in with their permissions embedded
+        token_data = {
+            "sub": user["id"],
+            "email": user["email"],
+            "role": user["role"],
+            "workspace_id": user["workspace_id"],
+            "perms": load_permission_mask(supabase, user["id"]),
+        }
+        
         return {
             "message": "Invitation accepted successfully",
             "user_id": user["id"],
-            "email": user["email"]
+            "email": user["email"],
+            "access_token": create_access_token(token_data),
+            "refresh_token": create_refresh_token(token_data),
+            "token_type": "bearer"
         }
         
     except Exception as e:
@@ -1,5 +1,6 @@
 """Workspace endpoints"""
-from fastapi import APIRouter, Depends, status
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
 from supabase import Client
 
 from app.db.supabase_client import get_supabase
@@ -10,10 +11,13 @@ from app.schemas.workspace import (
     OnboardingStatus,
     PublicURLsResponse,
     SlugCheckResponse,
+    NotificationTemplateUpdate,
+    NotificationTemplateResponse,
 )
 from app.schemas.auth import TokenData
 from app.core.security import get_current_user, require_owner
 from app.services.workspace_service import WorkspaceService
+from app.services.notification_template_service import NotificationTemplateService
 from app.models.enums import OnboardingStep
 
 router = APIRouter()
@@ -127,3 +131,47 @@ async def update_onboarding_step(
     service = WorkspaceService(supabase)
     workspace = await service.update_onboarding_step(workspace_id, step)
     return WorkspaceResponse(**workspace)
+
+
+def _require_own_workspace(workspace_id: str, current_user: TokenData) -> None:
+    if current_user.workspace_id != workspace_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workspace not found")
+
+
+@router.get("/{workspace_id}/notification-templates", response_model=List[NotificationTemplateResponse])
+async def list_notification_templates(
+    workspace_id: str,
+    current_user: TokenData = Depends(require_owner),
+    supabase: Client = Depends(get_supabase)
+):
+    """List notification templates with the workspace's overrides"""
+    _require_own_workspace(workspace_id, current_user)
+    service = NotificationTemplateService(supabase)
+    return await service.list_templates(workspace_id)
+
+
+@router.put("/{workspace_id}/notification-templates/{name}", response_model=NotificationTemplateResponse)
+async def set_notification_template(
+    workspace_id: str,
+    name: str,
+    template: NotificationTemplateUpdate,
+    current_user: TokenData = Depends(require_owner),
+    supabase: Client = Depends(get_supabase)
+):
+    """Override a notification template for this workspace"""
+    _require_own_workspace(workspace_id, current_user)
+    service = NotificationTemplateService(supabase)
+    return await service.set_override(workspace_id, name, template.source)
+
+
+@router.delete("/{workspace_id}/notification-templates/{name}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_notification_template(
+    workspace_id: str,
+    name: str,
+    current_user: TokenData = Depends(require_owner),
+    supabase: Client = Depends(get_supabase)
+):
+    """Revert a notification template to the default"""
+    _require_own_workspace(workspace_id, current_user)
+    service = NotificationTemplateService(supabase)
+    await service.delete_override(workspace_id, name)
@@ -12,6 +12,7 @@ from app.api.v1.endpoints import (
     forms,
     inventory,
     dashboard,
+    analytics,
     integrations,
     staff,
     public,
@@ -34,4 +35,5 @@ api_router.include_router(forms.router, prefix="/forms", tags=["Forms"])
 api_router.include_router(inventory.router, prefix="/inventory", tags=["Inventory"])
 api_router.include_router(staff.router, prefix="/staff", tags=["Staff"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
 api_router.include_router(integrations.router, prefix="/integrations", tags=["Integrations"])
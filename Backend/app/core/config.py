@@ -28,32 +28,87 @@ class Settings(BaseSettings):
     # Email
     RESEND_API_KEY: str = ""
     SENDGRID_API_KEY: str = ""
+    EMAIL_FROM: str = "CareOps <notifications@careops.app>"
+    RESEND_API_URL: str = "https://api.resend.com"
+    SENDGRID_API_URL: str = "https://api.sendgrid.com"
     
     # SMS
     TWILIO_ACCOUNT_SID: str = ""
     TWILIO_AUTH_TOKEN: str = ""
     TWILIO_PHONE_NUMBER: str = ""
+    TWILIO_API_URL: str = "https://api.twilio.com"
+    
+    # "local" sends every email/SMS to the provider stand-in at LOCAL_PROVIDER_URL
+    # (python -m app.services.communication.standin) instead of the real APIs
+    COMMUNICATION_MODE: str = "live"
+    LOCAL_PROVIDER_URL: str = "http://127.0.0.1:8765"
+    
+    # Provider HTTP connection pool (shared by all email/SMS sends in a process)
+    PROVIDER_HTTP_TIMEOUT_SECONDS: float = 10.0
+    PROVIDER_HTTP_MAX_CONNECTIONS: int = 20
+    
+    # Workspaces whose own-credential email/SMS services are kept built (LRU)
+    PROVIDER_SERVICE_POOL_SIZE: int = 1024
+    
+    # Provider routing: circuit breaker, slow-provider demotion, hedged email sends
+    PROVIDER_HEALTH_WINDOW: int = 100
+    PROVIDER_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    PROVIDER_CIRCUIT_RESET_SECONDS: float = 30.0
+    PROVIDER_SLOW_SECONDS: float = 2.0
+    EMAIL_HEDGE_AFTER_SECONDS: float = 0.0  # 0 disables; a hedged send may deliver twice
+    
+    # Compiled notification template bytecode ("" uses the system temp dir)
+    NOTIFICATION_TEMPLATE_CACHE_DIR: str = ""
+    
+    # Booking reminders: how far ahead they go out, bookings claimed per
+    # subtask, how long a claim is held before a retry, pages per run
+    REMINDER_LEAD_HOURS: int = 24
+    REMINDER_CHUNK_SIZE: int = 500
+    REMINDER_CLAIM_LEASE_MINUTES: int = 15
+    REMINDER_MAX_CHUNKS_PER_RUN: int = 400
+    # Reminder ETA tasks are queued at most this far ahead, by the booking
+    # update or by the sweep that runs every REMINDER_SWEEP_MINUTES; keep the
+    # horizon under the broker's visibility timeout (Redis default: one hour)
+    # or workers holding an ETA task see it redelivered. The sweep sends any
+    # reminder more than the grace period overdue
+    REMINDER_ETA_HORIZON_MINUTES: int = 40
+    REMINDER_SWEEP_MINUTES: int = 15
+    REMINDER_RECONCILE_GRACE_MINUTES: int = 30
     
     # Security
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     ALGORITHM: str = "HS256"
+    FORM_ACCESS_TOKEN_EXPIRE_DAYS: int = 30
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
     
     # CORS - comma-separated string that will be split into list
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
     
     # Monitoring
     SENTRY_DSN: str = ""
+    # Shared secret for /health/metrics (X-Metrics-Token header); "" disables it
+    METRICS_TOKEN: str = ""
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     
+    # Dashboard
+    DASHBOARD_QUERY_TIMEOUT_SECONDS: float = 2.0
+    DASHBOARD_QUERY_WORKERS: int = 8
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True,
         extra="ignore"
     )
     
+    @property
+    def local_providers(self) -> bool:
+        """Whether providers talk to the local stand-in"""
+        return self.COMMUNICATION_MODE == "local"
+    
     @property
     def cors_origins_list(self) -> List[str]:
         """Convert CORS_ORIGINS string to list"""
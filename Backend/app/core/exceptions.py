@@ -81,3 +81,7 @@ class IntegrationException(AppException):
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             error_code="INTEGRATION_ERROR",
         )
+
+
+class ProviderNotConfiguredException(IntegrationException):
+    """No provider is configured for a channel, so there is nothing to send through"""
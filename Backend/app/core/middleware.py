@@ -0,0 +1,19 @@
+"""Custom ASGI middleware"""
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import Receive, Scope, Send
+
+
+class EventStreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves Server-Sent Events uncompressed
+
+    Streaming gzip buffers output inside the compressor, which would hold SSE
+    events back until enough bytes accumulate.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = dict(scope["headers"])
+            if b"text/event-stream" in headers.get(b"accept", b""):
+                await self.app(scope, receive, send)
+                return
+        await super().__call__(scope, receive, send)
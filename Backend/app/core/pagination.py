@@ -0,0 +1,69 @@
+"""Keyset (cursor) pagination helpers
+
+A cursor is the opaque, URL-safe encoding of the sort key of the last row a
+client has seen, e.g. (last_message_at, id). The next page is the rows
+strictly after that key, which stays an index range scan however deep the
+client pages, unlike OFFSET. The cursor for the following page is returned
+in the `X-Next-Cursor` response header; it is absent on the last page.
+Message history also returns `X-Since-Cursor`, marking the newest message
+the client holds, for fetching only newer ones on refresh.
+"""
+import base64
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+SINCE_CURSOR_HEADER = "X-Since-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque cursor for a sort key"""
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Sort key from a cursor; 400 if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+    return values
+
+
+def _quote(value: Any) -> str:
+    """PostgREST logic-tree value, quoted so ',', ':' and '()' are literal"""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def keyset_filter(column: str, value: Any, id_value: Any, descending: bool = True) -> str:
+    """PostgREST `or` filter selecting rows after (value, id) in sort order
+
+    Meant for an ORDER BY column, id in the same direction, with `id` as the
+    tie-breaker so rows sharing a timestamp are neither skipped nor repeated.
+    """
+    op = "lt" if descending else "gt"
+    return (
+        f"{column}.{op}.{_quote(value)},"
+        f"and({column}.eq.{_quote(value)},id.{op}.{_quote(id_value)})"
+    )
+
+
+def split_page(
+    rows: Sequence[Dict[str, Any]], limit: int, key: Tuple[str, ...]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Trim a `limit + 1` fetch to one page and build the next cursor"""
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(*(last[field] for field in key))
@@ -0,0 +1,124 @@
+"""Staff permission checks
+
+Staff permissions are embedded in access tokens as a compact bitmask claim
+(`perms`) so most checks need no database round-trip. The claim is only
+trusted for PERMISSION_CLAIM_MAX_AGE seconds after the token was issued, the
+same staleness the cached lookup allows, since other processes do not see a
+permission change. Tokens without the claim or an `iat`, older ones, and
+ones issued before the user's permissions last changed in this process fall
+back to a cached `staff_permissions` lookup.
+"""
+import time
+from typing import Any, Dict, Optional
+
+import structlog
+from fastapi import Depends, HTTPException, status
+from supabase import Client
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import require_staff_or_owner
+from app.db.supabase_client import get_supabase
+from app.models.enums import UserRole
+from app.schemas.auth import TokenData
+from app.schemas.staff import StaffPermissions
+
+logger = structlog.get_logger()
+
+PERMISSION_BITS: Dict[str, int] = {
+    "can_access_inbox": 1 << 0,
+    "can_manage_bookings": 1 << 1,
+    "can_view_forms": 1 << 2,
+    "can_view_inventory": 1 << 3,
+}
+
+# Staff without a staff_permissions row get the column defaults
+DEFAULT_PERMISSIONS_MASK = sum(
+    bit for name, bit in PERMISSION_BITS.items() if getattr(StaffPermissions(), name)
+)
+
+PERMISSION_CACHE_TTL = 300
+
+_permission_cache = TTLCache("staff_permissions", maxsize=4096, ttl=PERMISSION_CACHE_TTL)
+
+# Never longer than an access token lives
+PERMISSION_CLAIM_MAX_AGE = min(PERMISSION_CACHE_TTL, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# user_id -> unix time of the last permission change seen by this process
+_permissions_changed_at: Dict[str, float] = {}
+
+
+def encode_permissions(permissions: Optional[Dict[str, Any]]) -> int:
+    """Pack permission flags into a bitmask"""
+    if permissions is None:
+        return DEFAULT_PERMISSIONS_MASK
+    return sum(
+        bit for name, bit in PERMISSION_BITS.items()
+        if permissions.get(name, bool(DEFAULT_PERMISSIONS_MASK & bit))
+    )
+
+
+def load_permission_mask(supabase: Client, user_id: str) -> int:
+    """Permission bitmask for a staff user, cached per process"""
+    mask = _permission_cache.get(user_id)
+    if mask is not None:
+        return mask
+
+    response = (
+        supabase.table("staff_permissions")
+        .select(",".join(PERMISSION_BITS))
+        .eq("user_id", user_id)
+        .limit(1)
+        .execute()
+    )
+    mask = encode_permissions(response.data[0] if response.data else None)
+    _permission_cache.set(user_id, mask)
+    return mask
+
+
+def invalidate_permissions(user_id: str) -> None:
+    """Forget cached permissions and distrust claims issued before now"""
+    _permission_cache.invalidate(user_id)
+    _permissions_changed_at[user_id] = time.time()
+
+
+def _claim_is_current(current_user: TokenData) -> bool:
+    issued_at = current_user.issued_at
+    if issued_at is None or time.time() - issued_at > PERMISSION_CLAIM_MAX_AGE:
+        return False
+    changed_at = _permissions_changed_at.get(current_user.user_id)
+    return changed_at is None or issued_at > changed_at
+
+
+def has_permission(current_user: TokenData, supabase: Client, permission: str) -> bool:
+    """Whether an owner or staff user holds a permission"""
+    if current_user.role == UserRole.OWNER:
+        return True
+    if current_user.role != UserRole.STAFF:
+        return False
+
+    if current_user.permissions is not None and _claim_is_current(current_user):
+        mask = current_user.permissions
+    else:
+        mask = load_permission_mask(supabase, current_user.user_id)
+    return bool(mask & PERMISSION_BITS[permission])
+
+
+def require_permission(permission: str):
+    """Dependency factory requiring a staff permission (owners always pass)"""
+    if permission not in PERMISSION_BITS:
+        raise ValueError(f"Unknown permission: {permission}")
+
+    async def dependency(
+        current_user: TokenData = Depends(require_staff_or_owner),
+        supabase: Client = Depends(get_supabase),
+    ) -> TokenData:
+        if not has_permission(current_user, supabase, permission):
+            logger.info("permission_denied", user_id=current_user.user_id, permission=permission)
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have permission to perform this action",
+            )
+        return current_user
+
+    return dependency
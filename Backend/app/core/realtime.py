@@ -0,0 +1,262 @@
+"""Realtime events over Redis pub/sub
+
+Write paths publish small JSON events to per-workspace and per-conversation
+Redis channels. Each API process holds a single pattern subscription
+(RealtimeHub) and fans events out to in-memory queues, one per open stream
+or socket, so an idle client costs one queue rather than one Redis
+connection. Every process receives every event, so clients can connect to
+any worker without sticky sessions.
+"""
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import redis
+import redis.asyncio as aioredis
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+CHANNEL_PREFIX = "careops:"
+WORKSPACE_PREFIX = f"{CHANNEL_PREFIX}workspace:"
+CONVERSATION_PREFIX = f"{CHANNEL_PREFIX}conversation:"
+
+# Event types
+COUNTERS_CHANGED = "counters.changed"
+ALERT_CREATED = "alert.created"
+MESSAGE_CREATED = "message.created"
+CONVERSATION_UPDATED = "conversation.updated"
+
+_sync_client: Optional[redis.Redis] = None
+_async_client: Optional[aioredis.Redis] = None
+
+
+def workspace_channel(workspace_id: str) -> str:
+    """Redis channel carrying a workspace's events"""
+    return f"{WORKSPACE_PREFIX}{workspace_id}"
+
+
+def conversation_channel(conversation_id: str) -> str:
+    """Redis channel carrying a conversation's messages"""
+    return f"{CONVERSATION_PREFIX}{conversation_id}"
+
+
+def _encode_event(event_type: str, data: Optional[Dict[str, Any]]) -> str:
+    return json.dumps({"type": event_type, "data": data or {}}, default=str)
+
+
+def _message_events(workspace_id: str, message: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(channel, payload) pairs announcing a new message
+
+    The conversation channel carries the full message for open threads; the
+    workspace channel carries what the inbox list needs.
+    """
+    conversation_id = message["conversation_id"]
+    summary = {
+        "conversation_id": conversation_id,
+        "last_message_preview": (message.get("content") or "")[:100],
+        "last_channel": message.get("channel"),
+        "last_message_at": message.get("sent_at"),
+        "message_type": message.get("message_type"),
+    }
+    return [
+        (conversation_channel(conversation_id), _encode_event(MESSAGE_CREATED, message)),
+        (workspace_channel(workspace_id), _encode_event(CONVERSATION_UPDATED, summary)),
+    ]
+
+
+def _sync_redis() -> redis.Redis:
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(
+            settings.REDIS_URL, socket_timeout=1, socket_connect_timeout=1
+        )
+    return _sync_client
+
+
+def _async_redis() -> aioredis.Redis:
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(
+            settings.REDIS_URL, socket_timeout=1, socket_connect_timeout=1
+        )
+    return _async_client
+
+
+def publish_event(workspace_id: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+    """Publish a workspace event from synchronous code (Celery tasks)
+
+    Best effort: a Redis outage is logged and never fails the write path.
+    """
+    try:
+        _sync_redis().publish(workspace_channel(workspace_id), _encode_event(event_type, data))
+    except Exception as e:
+        logger.warning("realtime_publish_failed", workspace_id=workspace_id, event=event_type, error=str(e))
+
+
+async def publish_event_async(
+    workspace_id: str, event_type: str, data: Optional[Dict[str, Any]] = None
+) -> None:
+    """Publish a workspace event from request handlers (best effort)"""
+    try:
+        await _async_redis().publish(workspace_channel(workspace_id), _encode_event(event_type, data))
+    except Exception as e:
+        logger.warning("realtime_publish_failed", workspace_id=workspace_id, event=event_type, error=str(e))
+
+
+def publish_message(workspace_id: str, message: Dict[str, Any]) -> None:
+    """Announce a stored message from synchronous code (best effort)"""
+    try:
+        pipe = _sync_redis().pipeline(transaction=False)
+        for channel, payload in _message_events(workspace_id, message):
+            pipe.publish(channel, payload)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("realtime_publish_failed", workspace_id=workspace_id, event=MESSAGE_CREATED, error=str(e))
+
+
+async def publish_message_async(workspace_id: str, message: Dict[str, Any]) -> None:
+    """Announce a stored message from request handlers (best effort)"""
+    try:
+        pipe = _async_redis().pipeline(transaction=False)
+        for channel, payload in _message_events(workspace_id, message):
+            pipe.publish(channel, payload)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning("realtime_publish_failed", workspace_id=workspace_id, event=MESSAGE_CREATED, error=str(e))
+
+
+async def notify_counters_changed(workspace_id: Optional[str], *sections: str) -> None:
+    """Tell open dashboards that some of the workspace's counters changed"""
+    if workspace_id:
+        await publish_event_async(workspace_id, COUNTERS_CHANGED, {"sections": list(sections)})
+
+
+class RealtimeHub:
+    """Per-process fan-out of channel events to local subscribers"""
+
+    def __init__(self, redis_url: Optional[str] = None, queue_size: int = 100):
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._channels: Dict[asyncio.Queue, Set[str]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self.sequence = 0
+        self.dropped = 0
+
+    @asynccontextmanager
+    async def subscribe(self, *channels: str) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving the channels' events while the context is open
+
+        Channels can be added to and removed from the queue with attach()
+        and detach(); all of them are dropped when the context exits.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._channels[queue] = set()
+        for channel in channels:
+            self.attach(queue, channel)
+        self._ensure_reader()
+        try:
+            yield queue
+        finally:
+            for channel in self._channels.pop(queue, ()):
+                self._remove(queue, channel)
+
+    def attach(self, queue: asyncio.Queue, channel: str) -> None:
+        """Also deliver a channel's events to a subscribed queue"""
+        self._subscribers.setdefault(channel, set()).add(queue)
+        self._channels.setdefault(queue, set()).add(channel)
+
+    def detach(self, queue: asyncio.Queue, channel: str) -> None:
+        """Stop delivering a channel's events to a queue"""
+        self._channels.get(queue, set()).discard(channel)
+        self._remove(queue, channel)
+
+    def dispatch(self, channel: str, event: Dict[str, Any]) -> int:
+        """Deliver an event to local subscribers; returns how many received it
+
+        A subscriber whose queue is full is skipped rather than blocking the
+        others. Counter events carry no values, so a dropped one is caught up
+        by the next read. Each event is stamped with a process-local `seq` so
+        subscribers can tell which of them saw the same event. Every queue
+        gets its own copy, so a subscriber changing it never affects another.
+        """
+        self.sequence += 1
+        event = {**event, "seq": self.sequence}
+        delivered = 0
+        for queue in self._subscribers.get(channel, ()):
+            try:
+                queue.put_nowait(dict(event))
+                delivered += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+        return delivered
+
+    def stats(self) -> Dict[str, int]:
+        """Connection counts for monitoring"""
+        return {
+            "connections": len(self._channels),
+            "channels": len(self._subscribers),
+            "dropped_events": self.dropped,
+        }
+
+    async def close(self) -> None:
+        """Stop the Redis reader"""
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+
+    def _remove(self, queue: asyncio.Queue, channel: str) -> None:
+        queues = self._subscribers.get(channel)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[channel]
+
+    def _ensure_reader(self) -> None:
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_forever())
+
+    async def _read_forever(self) -> None:
+        """Pattern-subscribe to all workspace and conversation channels, reconnecting on errors"""
+        while True:
+            client = aioredis.Redis.from_url(self.redis_url)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{WORKSPACE_PREFIX}*", f"{CONVERSATION_PREFIX}*")
+                logger.info("realtime_hub_subscribed")
+                async for message in pubsub.listen():
+                    self._handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("realtime_hub_disconnected", error=str(e))
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+    def _handle_message(self, message: Dict[str, Any]) -> None:
+        if message.get("type") != "pmessage":
+            return
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf-8")
+        if channel not in self._subscribers:
+            return
+        try:
+            event = json.loads(message["data"])
+        except (TypeError, ValueError):
+            logger.warning("realtime_event_invalid", channel=channel)
+            return
+        self.dispatch(channel, event)
+
+
+hub = RealtimeHub()
@@ -0,0 +1,50 @@
+"""Response classes and serialization helpers"""
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Cached TypeAdapter for a list of `model`"""
+    return TypeAdapter(List[model])
+
+
+class PydanticJSONResponse(ORJSONResponse):
+    """JSON response with a fast path for validated Pydantic models
+
+    Models and lists of models are serialized directly by pydantic-core
+    (`model_dump_json` / `TypeAdapter.dump_json`) instead of being walked by
+    `jsonable_encoder`; pre-rendered bytes are passed through and anything
+    else falls back to orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+
+        if isinstance(content, list) and content and isinstance(content[0], BaseModel):
+            return _list_adapter(type(content[0])).dump_json(content)
+
+        return super().render(content)
+
+
+def model_list_response(
+    rows: Iterable[Any],
+    model: Type[BaseModel],
+    status_code: int = 200,
+) -> PydanticJSONResponse:
+    """Validate raw rows against `model` and serialize them in one pass
+
+    Returning a Response skips FastAPI's own response_model validation and
+    encoding, so list endpoints keep `response_model` for the OpenAPI schema
+    while the payload is validated exactly once.
+    """
+    adapter = _list_adapter(model)
+    content = adapter.dump_json(adapter.validate_python(list(rows)))
+    return PydanticJSONResponse(content=content, status_code=status_code)
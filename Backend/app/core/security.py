@@ -1,17 +1,46 @@
 """Security utilities for authentication and authorization"""
-from datetime import datetime, timedelta
-from typing import Optional
+import asyncio
+import base64
+import hashlib
+import hmac
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 import bcrypt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.schemas.auth import TokenData
 from app.models.enums import UserRole
 
 security = HTTPBearer()
 
+# bcrypt is CPU bound (~250ms at the default cost) and releases the GIL, so
+# it runs on a small dedicated pool instead of blocking the event loop or
+# starving the default executor used by other blocking calls. Created on
+# first use, so the app lifespan can shut it down and start again.
+_password_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_password_executor() -> ThreadPoolExecutor:
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash",
+        )
+    return _password_executor
+
+# Verified access tokens keyed by SHA-256 of the raw token. Entries live until
+# the token's own expiry, capped so a process never trusts a token for long
+# after its signing key rotates.
+_token_cache = TTLCache("access_tokens", maxsize=4096, ttl=300)
+
 
 def hash_password(password: str) -> str:
     """Hash password with bcrypt
@@ -29,7 +58,7 @@ def hash_password(password: str) -> str:
     
     try:
         # Generate salt and hash password using bcrypt directly
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
         hashed_bytes = bcrypt.hashpw(password_bytes, salt)
         hashed = hashed_bytes.decode('utf-8')
         
@@ -53,6 +82,38 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash was made with a different bcrypt cost"""
+    try:
+        # Format: $2b$<cost>$<salt+hash>
+        cost = int(hashed_password.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return True
+    return cost != settings.BCRYPT_ROUNDS
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash password on the password hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_password_executor(), hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password on the password hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_password_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+def shutdown_password_executor() -> None:
+    """Stop the password hashing pool (the next use starts a new one)"""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False, cancel_futures=True)
+        _password_executor = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -62,24 +123,34 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "iat": int(time.time()), "type": "access"})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
 def create_refresh_token(data: dict) -> str:
-    """Create JWT refresh token"""
-    to_encode = data.copy()
+    """Create JWT refresh token
+
+    Permission claims are left out: they are only trusted briefly, and a
+    refresh token lives for days.
+    """
+    to_encode = {key: value for key, value in data.items() if key != "perms"}
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "iat": int(time.time()), "type": "refresh"})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
-def decode_token(token: str) -> TokenData:
-    """Decode and validate JWT token"""
+def _decode_claims(token: str, token_type: str = "access") -> Tuple[TokenData, Optional[int]]:
+    """Verify a JWT of the given type and return its TokenData and expiry timestamp"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        if payload.get("type") != token_type:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials",
+            )
+
         user_id: str = payload.get("sub")
         email: str = payload.get("email")
         role: str = payload.get("role")
@@ -91,12 +162,16 @@ def decode_token(token: str) -> TokenData:
                 detail="Invalid authentication credentials",
             )
         
-        return TokenData(
+        token_data = TokenData(
             user_id=user_id,
             email=email,
             role=UserRole(role),
-            workspace_id=workspace_id
+            workspace_id=workspace_id,
+            permissions=payload.get("perms"),
+            issued_at=payload.get("iat"),
+            expires_at=payload.get("exp"),
         )
+        return token_data, payload.get("exp")
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -104,12 +179,107 @@ def decode_token(token: str) -> TokenData:
         )
 
 
+def decode_token(token: str, token_type: str = "access") -> TokenData:
+    """Decode and validate JWT token"""
+    return _decode_claims(token, token_type)[0]
+
+
+def decode_token_cached(token: str) -> TokenData:
+    """Decode a JWT, reusing the result of an earlier verification
+
+    Only successfully verified access tokens are cached, and never past
+    their `exp`.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    token_data = _token_cache.get(key)
+    if token_data is not None:
+        return token_data
+
+    token_data, expires_at = _decode_claims(token)
+    if expires_at is not None:
+        _token_cache.set(key, token_data, ttl=expires_at - time.time())
+    return token_data
+
+
+def _form_token_signature(submission_id: str, workspace_id: str, expires_at: int) -> str:
+    """HMAC-SHA256 signature for a form access token"""
+    message = f"form:{submission_id}:{workspace_id}:{expires_at}".encode("utf-8")
+    digest = hmac.new(settings.SECRET_KEY.encode("utf-8"), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def create_form_access_token(
+    submission_id: str,
+    workspace_id: str,
+    expires_delta: Optional[timedelta] = None
+) -> str:
+    """Create a signed access token for a public form link
+
+    Format: <workspace_id>.<expiry unix timestamp>.<signature>
+    """
+    if expires_delta is None:
+        expires_delta = timedelta(days=settings.FORM_ACCESS_TOKEN_EXPIRE_DAYS)
+
+    expires_at = int((datetime.now(timezone.utc) + expires_delta).timestamp())
+    signature = _form_token_signature(submission_id, workspace_id, expires_at)
+    return f"{workspace_id}.{expires_at}.{signature}"
+
+
+# Tokens stored with submissions before signed tokens: opaque URL-safe strings
+_LEGACY_FORM_TOKEN = re.compile(r"[A-Za-z0-9_-]{16,256}")
+
+
+def is_signed_form_token(token: str) -> bool:
+    """Whether a token has the signed format (links issued before it have none)"""
+    return token.count(".") == 2
+
+
+def is_legacy_form_token(token: str) -> bool:
+    """Whether a token could be one stored with a submission before signed tokens"""
+    return _LEGACY_FORM_TOKEN.fullmatch(token) is not None
+
+
+def verify_form_access_token(submission_id: str, token: str) -> Optional[str]:
+    """Verify a form access token without touching the database
+
+    Returns the workspace_id the token was issued for, or None when the token
+    is malformed, tampered with or expired.
+    """
+    try:
+        workspace_id, expires_at_str, signature = token.split(".")
+        expires_at = int(expires_at_str)
+    except (AttributeError, ValueError):
+        return None
+
+    expected = _form_token_signature(submission_id, workspace_id, expires_at)
+    if not hmac.compare_digest(expected, signature):
+        return None
+
+    if expires_at < int(datetime.now(timezone.utc).timestamp()):
+        return None
+
+    return workspace_id
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> TokenData:
     """Get current authenticated user"""
     token = credentials.credentials
-    return decode_token(token)
+    return decode_token_cached(token)
+
+
+async def require_metrics_token(x_metrics_token: Optional[str] = Header(None)) -> None:
+    """Allow internal callers presenting METRICS_TOKEN
+
+    The metrics are process-wide (every tenant's caches and provider
+    health), so workspace credentials are not enough. Without a configured
+    token the endpoint is not served at all.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if not x_metrics_token or not hmac.compare_digest(x_metrics_token, settings.METRICS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
 
 
 async def require_owner(current_user: TokenData = Depends(get_current_user)) -> TokenData:
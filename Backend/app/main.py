@@ -1,8 +1,7 @@
 """Main FastAPI application entry point"""
-from fastapi import FastAPI, Request, status
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
 import structlog
@@ -11,6 +10,13 @@ from app.core.config import settings
 from app.core.logging_config import setup_logging
 from app.api.v1.router import api_router
 from app.core.exceptions import AppException
+from app.core.cache import get_cache_stats
+from app.core.middleware import EventStreamAwareGZipMiddleware
+from app.core.realtime import hub
+from app.core.security import require_metrics_token, shutdown_password_executor
+from app.services.communication.http_client import close_http_client
+from app.services.dashboard_service import shutdown_dashboard_executor
+from app.services.communication.provider_health import get_provider_stats
 
 # Setup logging
 setup_logging()
@@ -21,7 +27,13 @@ logger = structlog.get_logger()
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("application_startup", environment=settings.ENVIRONMENT)
+    if settings.local_providers:
+        logger.warning("local_communication_providers", url=settings.LOCAL_PROVIDER_URL)
     yield
+    shutdown_password_executor()
+    shutdown_dashboard_executor()
+    await hub.close()
+    await close_http_client()
     logger.info("application_shutdown")
 
 
@@ -32,6 +44,7 @@ app = FastAPI(
     redoc_url=f"/api/{settings.API_VERSION}/redoc",
     openapi_url=f"/api/{settings.API_VERSION}/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Middleware
@@ -56,10 +69,10 @@ app.add_middleware(
         "Access-Control-Request-Method",
         "Access-Control-Request-Headers",
     ],
-    expose_headers=["*"],
+    expose_headers=["*", "X-Next-Cursor", "X-Since-Cursor"],
     max_age=3600,
 )
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(EventStreamAwareGZipMiddleware, minimum_size=1000)
 
 
 # Global exception handler
@@ -116,5 +129,11 @@ async def health_check():
     return {"status": "healthy", "version": settings.API_VERSION}
 
 
+@app.get("/health/metrics", tags=["Health"], dependencies=[Depends(require_metrics_token)])
+async def health_metrics():
+    """In-process cache, realtime connection and provider health metrics"""
+    return {"caches": get_cache_stats(), "realtime": hub.stats(), "providers": get_provider_stats()}
+
+
 # Include API router
 app.include_router(api_router, prefix=f"/api/{settings.API_VERSION}")
@@ -0,0 +1,38 @@
+"""Analytics schemas"""
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+from datetime import datetime
+
+Granularity = Literal["hour", "day"]
+
+
+class TimeSeriesPoint(BaseModel):
+    """Event count for one bucket"""
+    bucket: datetime
+    event_type: str
+    count: int
+
+
+class AnalyticsTimeSeries(BaseModel):
+    """Time-bucketed event counts, zero-filled"""
+    granularity: Granularity
+    start: datetime
+    end: datetime
+    event_types: List[str]
+    points: List[TimeSeriesPoint]
+
+
+class FunnelStep(BaseModel):
+    """One step of the conversion funnel"""
+    event_type: str
+    count: int
+    # Share of the previous step that reached this one
+    conversion_rate: Optional[float] = None
+
+
+class AnalyticsFunnel(BaseModel):
+    """View -> contact -> booking conversion funnel"""
+    start: datetime
+    end: datetime
+    steps: List[FunnelStep]
+    overall_conversion_rate: Optional[float] = None
@@ -1,5 +1,6 @@
 """Authentication schemas"""
 import re
+from typing import Optional
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from app.models.enums import UserRole
 
@@ -53,6 +54,13 @@ class TokenData(BaseModel):
     email: str
     role: UserRole
     workspace_id: str
+    permissions: Optional[int] = None
+    issued_at: Optional[int] = None
+    expires_at: Optional[int] = None
+    
+    class Config:
+        # Instances are shared between requests by the verified-token cache
+        frozen = True
 
 
 class UserResponse(BaseModel):
@@ -31,3 +31,8 @@ class ContactResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class ContactSearchResult(ContactResponse):
+    """Contact search hit"""
+    rank: float
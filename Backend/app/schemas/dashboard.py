@@ -41,3 +41,6 @@ class DashboardStats(BaseModel):
     total_alerts: int
     critical_alerts: int
     generated_at: datetime
+    # Set when some sections could not be computed and are reported as zero
+    partial: bool = False
+    unavailable_sections: List[str] = []
@@ -1,6 +1,6 @@
 """Message and conversation schemas"""
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from app.models.enums import CommunicationChannel, MessageType
 
@@ -42,3 +42,27 @@ class ConversationResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class MessageSearchResult(MessageResponse):
+    """Message search hit"""
+    contact_id: str
+    headline: str  # Matching fragment, search terms wrapped in <b></b>
+    rank: float
+
+
+class MarkReadRequest(BaseModel):
+    """Bulk mark-as-read request"""
+    conversation_ids: List[str] = Field(..., min_length=1, max_length=100)
+
+
+class MarkReadResponse(BaseModel):
+    """Conversations reset by a mark-as-read and the new workspace total"""
+    conversation_ids: List[str]
+    unread_total: int
+
+
+class UnreadCounts(BaseModel):
+    """Inbox badge counts for a workspace"""
+    unread_total: int  # Unread messages across all conversations
+    unread_conversations: int
@@ -78,3 +78,16 @@ class SlugCheckResponse(BaseModel):
     """Slug availability check response"""
     available: bool
     suggested_slug: Optional[str] = None
+
+
+class NotificationTemplateUpdate(BaseModel):
+    """Override source for one notification template file"""
+    source: str = Field(..., min_length=1, max_length=20000)
+
+
+class NotificationTemplateResponse(BaseModel):
+    """A notification template file and the workspace's override, if any"""
+    name: str
+    default_source: str
+    source: Optional[str] = None
+    is_overridden: bool = False
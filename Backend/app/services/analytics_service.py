@@ -0,0 +1,136 @@
+"""Analytics service backed by the analytics_events rollups"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import structlog
+from supabase import Client
+
+logger = structlog.get_logger()
+
+# Event types written to analytics_events by the public endpoints
+EVENT_TYPES = ["workspace_view", "contact_form_submit", "booking_created", "form_completed"]
+
+FUNNEL_STEPS = ["workspace_view", "contact_form_submit", "booking_created"]
+
+BUCKET_SIZES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Upper bound on buckets per series so a request cannot ask for years of hours
+MAX_BUCKETS = 1000
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC, convert aware ones"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def truncate(value: datetime, granularity: str) -> datetime:
+    """Start of the UTC hour or day containing value"""
+    value = as_utc(value).replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        value = value.replace(hour=0)
+    return value
+
+
+def conversion_rate(count: int, previous: int) -> Optional[float]:
+    return round(count / previous, 4) if previous else None
+
+
+class AnalyticsService:
+    """Service for workspace analytics
+
+    Reads only analytics_hourly and analytics_daily, which the
+    rollup_analytics_events beat task keeps up to date; the most recent few
+    minutes of events are not included yet.
+    """
+
+    def __init__(self, supabase: Client):
+        self.supabase = supabase
+
+    async def get_timeseries(
+        self,
+        workspace_id: str,
+        granularity: str,
+        start: datetime,
+        end: datetime,
+        event_types: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Event counts per bucket in [start, end), with empty buckets as zero"""
+        event_types = event_types or EVENT_TYPES
+        first = truncate(start, granularity)
+        end = as_utc(end)
+
+        rows = await asyncio.to_thread(
+            self._rpc,
+            "analytics_timeseries",
+            {
+                "p_workspace_id": workspace_id,
+                "p_granularity": granularity,
+                "p_start": first.isoformat(),
+                "p_end": end.isoformat(),
+                "p_event_types": event_types,
+            },
+        )
+        counts = {
+            (as_utc(datetime.fromisoformat(row["bucket"])), row["event_type"]): row["count"]
+            for row in rows or []
+        }
+
+        points = []
+        bucket = first
+        step = BUCKET_SIZES[granularity]
+        while bucket < end:
+            for event_type in event_types:
+                points.append({
+                    "bucket": bucket,
+                    "event_type": event_type,
+                    "count": counts.get((bucket, event_type), 0),
+                })
+            bucket += step
+
+        return {
+            "granularity": granularity,
+            "start": first,
+            "end": end,
+            "event_types": event_types,
+            "points": points,
+        }
+
+    async def get_funnel(self, workspace_id: str, start: datetime, end: datetime) -> Dict[str, Any]:
+        """Workspace view -> contact form -> booking counts and step conversion"""
+        start = truncate(start, "hour")
+        end = as_utc(end)
+
+        totals = await asyncio.to_thread(
+            self._rpc,
+            "analytics_totals",
+            {
+                "p_workspace_id": workspace_id,
+                "p_start": start.isoformat(),
+                "p_end": end.isoformat(),
+                "p_event_types": FUNNEL_STEPS,
+            },
+        ) or {}
+
+        steps = []
+        previous = None
+        for event_type in FUNNEL_STEPS:
+            count = int(totals.get(event_type, 0))
+            steps.append({
+                "event_type": event_type,
+                "count": count,
+                "conversion_rate": None if previous is None else conversion_rate(count, previous),
+            })
+            previous = count
+
+        return {
+            "start": start,
+            "end": end,
+            "steps": steps,
+            "overall_conversion_rate": conversion_rate(steps[-1]["count"], steps[0]["count"]),
+        }
+
+    def _rpc(self, name: str, params: Dict[str, Any]) -> Any:
+        return self.supabase.rpc(name, params).execute().data
@@ -1,4 +1,5 @@
 """Booking service"""
+import asyncio
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
 from supabase import Client
@@ -6,6 +7,7 @@ from supabase import Client
 from app.services.base_service import BaseService
 from app.models.enums import BookingStatus
 from app.core.exceptions import ValidationException, ConflictException
+from app.tasks.automation_tasks import schedule_booking_reminder
 
 
 class BookingService(BaseService):
@@ -63,6 +65,18 @@ class BookingService(BaseService):
         """Update booking status"""
         return await self.update(booking_id, {"status": status.value})
     
+    async def sync_reminder(self, booking: Dict[str, Any]) -> None:
+        """Revoke and reschedule a booking's reminder after its status or time changed
+
+        The revoke broadcast, the task id update and queueing the task are
+        all blocking calls, so they run in a worker thread.
+        """
+        try:
+            await asyncio.to_thread(schedule_booking_reminder, self.supabase, booking)
+        except Exception as e:
+            # The reconciliation sweep picks the booking up; don't fail the update
+            self.logger.warning("booking_reminder_sync_failed", booking_id=booking.get("id"), error=str(e))
+    
     async def get_today_bookings(self, workspace_id: str) -> List[Dict[str, Any]]:
         """Get today's bookings"""
         today = datetime.now().date()
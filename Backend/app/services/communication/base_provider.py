@@ -1,23 +1,58 @@
 """Base communication provider interface"""
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import structlog
 
+from app.core.config import settings
+
 logger = structlog.get_logger()
 
 
+def provider_base_url(url: str) -> str:
+    """A provider's API base URL, or the local stand-in's in local mode"""
+    return settings.LOCAL_PROVIDER_URL if settings.local_providers else url
+
+
+def provider_credential(value: str, local_default: str) -> str:
+    """A configured credential, with a placeholder in local mode"""
+    return value or (local_default if settings.local_providers else "")
+
+
 class CommunicationProvider(ABC):
     """Abstract base class for communication providers"""
     
-    def __init__(self, provider_name: str):
+    def __init__(self, provider_name: str, workspace_id: Optional[str] = None):
         self.provider_name = provider_name
-        self.logger = logger.bind(provider=provider_name)
+        # Health is tracked per credential: platform keys share one tracker,
+        # a workspace's own keys get theirs, so one tenant's revoked key
+        # cannot open the circuit for everyone
+        self.health_key = f"{provider_name}:{workspace_id}" if workspace_id else provider_name
+        self.logger = logger.bind(provider=provider_name, workspace_id=workspace_id)
     
     @abstractmethod
     async def send(self, to: str, subject: str, content: str, **kwargs) -> Dict[str, Any]:
         """Send message through provider"""
         pass
     
+    async def send_batch(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send several messages; one result per message, in order
+
+        Each message is a dict with `to`, `subject` and `content` (plus
+        optional `from_email`). Each result has `to` and `success`, and
+        the provider's message id or `error`. This default sends them concurrently one by
+        one; providers with a native batch API override it.
+        """
+        async def send_one(message: Dict[str, Any]) -> Dict[str, Any]:
+            extra = {k: v for k, v in message.items() if k not in ("to", "subject", "content")}
+            try:
+                result = await self.send(message["to"], message.get("subject", ""), message["content"], **extra)
+                return {**result, "to": message["to"], "success": True}
+            except Exception as e:
+                return {"to": message["to"], "success": False, "error": str(e)}
+
+        return list(await asyncio.gather(*(send_one(message) for message in messages)))
+
     @abstractmethod
     async def verify_connection(self) -> bool:
         """Verify provider connection"""
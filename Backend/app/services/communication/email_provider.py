@@ -1,123 +1,361 @@
 """Email provider implementations"""
-from typing import Dict, Any, Optional
-import resend
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+import asyncio
+from functools import lru_cache
+from time import monotonic
+from typing import Dict, Any, List, Optional
+import structlog
 
 from app.core.config import settings
-from app.core.exceptions import IntegrationException
-from app.services.communication.base_provider import CommunicationProvider
+from app.core.exceptions import IntegrationException, ProviderNotConfiguredException
+from app.services.communication.base_provider import (
+    CommunicationProvider,
+    provider_base_url,
+    provider_credential,
+)
+from app.services.communication.http_client import get_http_client
+from app.services.communication.provider_health import get_provider_health
+
+logger = structlog.get_logger()
+
+# Provider limits per batch request
+RESEND_BATCH_SIZE = 100
+SENDGRID_BATCH_SIZE = 1000
+
+
+def chunked(items: List[Any], size: int) -> List[List[Any]]:
+    """Split a list into consecutive chunks of at most `size`"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def failed_results(messages: List[Dict[str, Any]], error: Exception) -> List[Dict[str, Any]]:
+    return [{"to": m["to"], "success": False, "error": str(error)} for m in messages]
 
 
 class ResendEmailProvider(CommunicationProvider):
-    """Resend email provider"""
+    """Resend email provider (REST API over the shared HTTP client)
     
-    def __init__(self):
-        super().__init__("Resend")
-        if not settings.RESEND_API_KEY:
+    Uses the platform credentials from settings unless a workspace's
+    integration config is given, in which case its key is required.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None, workspace_id: Optional[str] = None):
+        super().__init__("Resend", workspace_id)
+        # A workspace integration never borrows the platform key
+        api_key = provider_credential(
+            settings.RESEND_API_KEY if config is None else config.get("api_key"), "re_local"
+        )
+        config = config or {}
+        self.from_email = config.get("from_email") or settings.EMAIL_FROM
+        if not api_key:
             raise IntegrationException("Resend API key not configured", service="Resend")
-        resend.api_key = settings.RESEND_API_KEY
+        self.url = f"{provider_base_url(settings.RESEND_API_URL)}/emails"
+        self.headers = {"Authorization": f"Bearer {api_key}"}
     
     async def send(self, to: str, subject: str, content: str, **kwargs) -> Dict[str, Any]:
         """Send email via Resend"""
         try:
-            from_email = kwargs.get("from_email", settings.CORS_ORIGINS[0])
-            
-            response = resend.Emails.send({
-                "from": from_email,
-                "to": to,
-                "subject": subject,
-                "html": content,
-            })
+            response = await get_http_client().post(
+                self.url,
+                headers=self.headers,
+                json={
+                    "from": kwargs.get("from_email", self.from_email),
+                    "to": [to],
+                    "subject": subject,
+                    "html": content,
+                },
+            )
+            response.raise_for_status()
             
             self.logger.info("email_sent", recipient=to, provider="Resend")
-            return {"success": True, "message_id": response.get("id")}
+            return {"success": True, "message_id": response.json().get("id")}
         except Exception as e:
             await self.log_failure(e, to)
             raise IntegrationException(f"Failed to send email: {str(e)}", service="Resend")
     
+    async def send_batch(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send via the Resend batch endpoint, up to 100 emails per request
+
+        Resend accepts or rejects a batch as a whole, so a failed request
+        fails every recipient in its chunk.
+        """
+        chunks = chunked(messages, RESEND_BATCH_SIZE)
+        results = await asyncio.gather(*(self._send_chunk(chunk) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
+
+    async def _send_chunk(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            response = await get_http_client().post(
+                f"{self.url}/batch",
+                headers=self.headers,
+                json=[
+                    {
+                        "from": m.get("from_email", self.from_email),
+                        "to": [m["to"]],
+                        "subject": m["subject"],
+                        "html": m["content"],
+                    }
+                    for m in messages
+                ],
+            )
+            response.raise_for_status()
+            ids = [item.get("id") for item in response.json().get("data", [])]
+        except Exception as e:
+            self.logger.error("email_batch_failed", provider="Resend", size=len(messages), error=str(e))
+            return failed_results(messages, e)
+
+        self.logger.info("email_batch_sent", provider="Resend", size=len(messages))
+        return [
+            {"to": m["to"], "success": True, "message_id": ids[i] if i < len(ids) else None}
+            for i, m in enumerate(messages)
+        ]
+
     async def verify_connection(self) -> bool:
         """Verify Resend connection"""
         try:
             # Resend doesn't have a dedicated health check, so we check if API key is set
-            return bool(settings.RESEND_API_KEY)
+            return bool(settings.RESEND_API_KEY) or settings.local_providers
         except Exception:
             return False
 
 
 class SendGridEmailProvider(CommunicationProvider):
-    """SendGrid email provider"""
+    """SendGrid email provider (v3 REST API over the shared HTTP client)
+    
+    Uses the platform credentials from settings unless a workspace's
+    integration config is given, in which case its key is required.
+    """
     
-    def __init__(self):
-        super().__init__("SendGrid")
-        if not settings.SENDGRID_API_KEY:
+    def __init__(self, config: Optional[Dict[str, Any]] = None, workspace_id: Optional[str] = None):
+        super().__init__("SendGrid", workspace_id)
+        # A workspace integration never borrows the platform key
+        api_key = provider_credential(
+            settings.SENDGRID_API_KEY if config is None else config.get("api_key"), "SG.local"
+        )
+        config = config or {}
+        self.from_email = config.get("from_email") or settings.EMAIL_FROM
+        if not api_key:
             raise IntegrationException("SendGrid API key not configured", service="SendGrid")
-        self.client = SendGridAPIClient(settings.SENDGRID_API_KEY)
+        self.url = f"{provider_base_url(settings.SENDGRID_API_URL)}/v3/mail/send"
+        self.headers = {"Authorization": f"Bearer {api_key}"}
     
     async def send(self, to: str, subject: str, content: str, **kwargs) -> Dict[str, Any]:
         """Send email via SendGrid"""
         try:
-            from_email = kwargs.get("from_email", settings.CORS_ORIGINS[0])
-            
-            message = Mail(
-                from_email=from_email,
-                to_emails=to,
-                subject=subject,
-                html_content=content
+            response = await get_http_client().post(
+                self.url,
+                headers=self.headers,
+                json={
+                    "personalizations": [{"to": [{"email": to}]}],
+                    "from": {"email": kwargs.get("from_email", self.from_email)},
+                    "subject": subject,
+                    "content": [{"type": "text/html", "value": content}],
+                },
             )
-            
-            response = self.client.send(message)
+            response.raise_for_status()
             
             self.logger.info("email_sent", recipient=to, provider="SendGrid")
-            return {"success": True, "status_code": response.status_code}
+            return {
+                "success": True,
+                "status_code": response.status_code,
+                "message_id": response.headers.get("X-Message-Id"),
+            }
         except Exception as e:
             await self.log_failure(e, to)
             raise IntegrationException(f"Failed to send email: {str(e)}", service="SendGrid")
     
+    async def send_batch(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send via SendGrid personalizations
+
+        Messages sharing a sender and body go out as one request with a
+        personalization (recipient and subject) each, up to 1000 per request.
+        Messages carrying a shared `template` body are grouped by it instead,
+        each personalization with the recipient's `substitutions`. Other
+        distinct bodies need separate requests; those run concurrently.
+        """
+        groups: Dict[tuple, List[int]] = {}
+        for index, m in enumerate(messages):
+            body = ("template", m["template"]) if "template" in m else ("content", m["content"])
+            key = (m.get("from_email", self.from_email), body)
+            groups.setdefault(key, []).append(index)
+
+        requests = [
+            (key, chunk)
+            for key, indexes in groups.items()
+            for chunk in chunked(indexes, SENDGRID_BATCH_SIZE)
+        ]
+        outcomes = await asyncio.gather(*(
+            self._send_personalizations(from_email, content, [messages[i] for i in chunk])
+            for (from_email, (_, content)), chunk in requests
+        ))
+
+        results: List[Dict[str, Any]] = [{} for _ in messages]
+        for (_, chunk), chunk_results in zip(requests, outcomes):
+            for index, result in zip(chunk, chunk_results):
+                results[index] = result
+        return results
+
+    async def _send_personalizations(
+        self, from_email: str, content: str, messages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        personalizations = []
+        for m in messages:
+            personalization = {"to": [{"email": m["to"]}], "subject": m["subject"]}
+            if "template" in m:
+                personalization["substitutions"] = m["substitutions"]
+            personalizations.append(personalization)
+
+        try:
+            response = await get_http_client().post(
+                self.url,
+                headers=self.headers,
+                json={
+                    "personalizations": personalizations,
+                    "from": {"email": from_email},
+                    "content": [{"type": "text/html", "value": content}],
+                },
+            )
+            response.raise_for_status()
+        except Exception as e:
+            self.logger.error("email_batch_failed", provider="SendGrid", size=len(messages), error=str(e))
+            return failed_results(messages, e)
+
+        self.logger.info("email_batch_sent", provider="SendGrid", size=len(messages))
+        message_id = response.headers.get("X-Message-Id")
+        return [{"to": m["to"], "success": True, "message_id": message_id} for m in messages]
+
     async def verify_connection(self) -> bool:
         """Verify SendGrid connection"""
         try:
             # Simple API key validation
-            return bool(self.client)
+            return bool(settings.SENDGRID_API_KEY) or settings.local_providers
         except Exception:
             return False
 
 
 class EmailService:
-    """Email service with fallback support"""
+    """Email service with fallback support
+    
+    Sends through `providers` when given (a workspace's own integrations),
+    otherwise through the platform providers configured in settings.
+    """
     
-    def __init__(self):
-        self.providers = []
+    def __init__(self, providers: Optional[List[CommunicationProvider]] = None):
+        self.providers = list(providers or [])
+        if self.providers:
+            return
         
-        # Initialize available providers
-        if settings.RESEND_API_KEY:
+        # Initialize available providers (all of them against the stand-in in local mode)
+        if settings.RESEND_API_KEY or settings.local_providers:
             try:
                 self.providers.append(ResendEmailProvider())
             except Exception:
                 pass
         
-        if settings.SENDGRID_API_KEY:
+        if settings.SENDGRID_API_KEY or settings.local_providers:
             try:
                 self.providers.append(SendGridEmailProvider())
             except Exception:
                 pass
         
         if not self.providers:
-            raise IntegrationException("No email provider configured")
+            raise ProviderNotConfiguredException("No email provider configured")
+    
+    def routed_providers(self) -> List[CommunicationProvider]:
+        """Providers to try, in order
+
+        Configured order, minus providers whose circuit is open, with
+        providers running slow moved behind the healthy ones. If every
+        circuit is open all providers are tried rather than none.
+        """
+        available = [p for p in self.providers if get_provider_health(p.health_key).available()]
+        if not available:
+            return list(self.providers)
+        return sorted(available, key=lambda p: get_provider_health(p.health_key).is_slow())
     
     async def send_email(self, to: str, subject: str, content: str, **kwargs) -> Dict[str, Any]:
-        """Send email with fallback to next provider on failure"""
+        """Send email with fallback to the next provider on failure
+        
+        With EMAIL_HEDGE_AFTER_SECONDS set, a send still pending after that
+        long is raced against the next provider and the first success wins.
+        """
+        hedge_after = settings.EMAIL_HEDGE_AFTER_SECONDS or None
+        remaining = self.routed_providers()
+        in_flight = set()
         last_error = None
         
-        for provider in self.providers:
-            try:
-                return await provider.send(to, subject, content, **kwargs)
-            except Exception as e:
-                last_error = e
-                continue
+        try:
+            while remaining or in_flight:
+                if not in_flight:
+                    in_flight.add(asyncio.ensure_future(self._attempt(remaining.pop(0), to, subject, content, **kwargs)))
+                
+                done, in_flight = await asyncio.wait(
+                    in_flight,
+                    timeout=hedge_after if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logger.info("email_send_hedged", recipient=to, provider=remaining[0].provider_name)
+                    in_flight.add(asyncio.ensure_future(self._attempt(remaining.pop(0), to, subject, content, **kwargs)))
+                    continue
+                
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+        finally:
+            # The losing hedge (or everything, if the caller was cancelled)
+            for task in in_flight:
+                task.cancel()
         
         # All providers failed
         raise IntegrationException(
             f"All email providers failed. Last error: {str(last_error)}",
             service="Email"
         )
+    
+    async def _attempt(self, provider: CommunicationProvider, to: str, subject: str, content: str, **kwargs) -> Dict[str, Any]:
+        """One provider send, recorded against its health"""
+        health = get_provider_health(provider.health_key)
+        health.begin_attempt()
+        start = monotonic()
+        try:
+            result = await provider.send(to, subject, content, **kwargs)
+        except Exception:
+            health.record(monotonic() - start, ok=False)
+            raise
+        health.record(monotonic() - start, ok=True)
+        return result
+    
+    async def send_batch(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send many emails with each provider's batch API
+
+        Recipients a provider fails are retried on the next one. Returns one
+        result per message, in order: `to`, `success`, `provider`, and
+        `message_id` or `error`. Never raises for individual failures.
+        """
+        results: List[Dict[str, Any]] = [
+            {"to": m["to"], "success": False, "error": "Not sent"} for m in messages
+        ]
+        pending = list(range(len(messages)))
+
+        for provider in self.routed_providers():
+            if not pending:
+                break
+            health = get_provider_health(provider.health_key)
+            health.begin_attempt()
+            start = monotonic()
+            batch = await provider.send_batch([messages[i] for i in pending])
+            health.record(monotonic() - start, ok=any(result["success"] for result in batch))
+            for index, result in zip(pending, batch):
+                results[index] = {**result, "provider": provider.provider_name}
+            pending = [index for index in pending if not results[index]["success"]]
+
+        if pending:
+            logger.warning("email_batch_partial_failure", failed=len(pending), total=len(messages))
+        return results
+
+
+@lru_cache()
+def get_email_service() -> EmailService:
+    """Process-wide email service on the platform credentials (raises if none are configured)"""
+    return EmailService()
@@ -0,0 +1,46 @@
+"""Shared HTTP client for communication provider APIs
+
+Providers send through one process-wide httpx.AsyncClient so TLS sessions
+and keep-alive connections to each provider are reused across sends. An
+AsyncClient's connections belong to the event loop that opened them, so a
+client is kept per loop: the API process has one loop, and Celery workers
+run every task on a single long-lived loop (see
+app.tasks.celery_app.run_async).
+"""
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Pooled client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        for stale in [other for other in _clients if other.is_closed()]:
+            del _clients[stale]
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.PROVIDER_HTTP_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=settings.PROVIDER_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PROVIDER_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=60,
+            ),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """Close the running (or given) loop's client"""
+    client = _clients.pop(loop or asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,111 @@
+"""Rolling health and circuit breaking for communication providers
+
+Every send through EmailService records its latency and outcome against the
+provider. After PROVIDER_CIRCUIT_FAILURE_THRESHOLD consecutive failures the
+provider's circuit opens and sends skip it; once PROVIDER_CIRCUIT_RESET_SECONDS
+have passed it is half open and the next send probes it again, closing the
+circuit on success and reopening it on failure.
+
+Health is per process (the API and each Celery worker keep their own).
+"""
+from collections import deque
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ProviderHealth:
+    """Rolling latency/error window and circuit breaker for one provider"""
+
+    def __init__(self, name: str, window: Optional[int] = None):
+        self.name = name
+        self._samples: "deque[tuple]" = deque(maxlen=window or settings.PROVIDER_HEALTH_WINDOW)
+        self._lock = Lock()
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+        self.circuit_opens = 0
+
+    @property
+    def state(self) -> str:
+        """closed, open, or half_open once the reset timeout has passed"""
+        if self.opened_at is None:
+            return "closed"
+        if monotonic() - self.opened_at < settings.PROVIDER_CIRCUIT_RESET_SECONDS:
+            return "open"
+        return "half_open"
+
+    def available(self) -> bool:
+        """Whether a send may be routed to this provider"""
+        return self.state != "open"
+
+    def is_slow(self) -> bool:
+        """Whether recent p95 latency exceeds PROVIDER_SLOW_SECONDS"""
+        latencies = [latency for latency, _ in self._samples]
+        return bool(latencies) and percentile(latencies, 0.95) > settings.PROVIDER_SLOW_SECONDS
+
+    def begin_attempt(self) -> None:
+        """Claim the half-open probe so concurrent sends keep skipping the provider"""
+        with self._lock:
+            if self.state == "half_open":
+                self.opened_at = monotonic()
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Record one attempt and update the circuit"""
+        with self._lock:
+            self._samples.append((latency, ok))
+            if ok:
+                self.successes += 1
+                self.consecutive_failures = 0
+                self.opened_at = None
+                return
+
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.opened_at is not None or self.consecutive_failures >= settings.PROVIDER_CIRCUIT_FAILURE_THRESHOLD:
+                if self.opened_at is None:
+                    self.circuit_opens += 1
+                self.opened_at = monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """Window latency and error rate plus circuit state for monitoring"""
+        with self._lock:
+            samples = list(self._samples)
+        latencies = [latency for latency, _ in samples]
+        errors = sum(1 for _, ok in samples if not ok)
+        return {
+            "state": self.state,
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "circuit_opens": self.circuit_opens,
+            "window": len(samples),
+            "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+            "latency_p50_ms": round(percentile(latencies, 0.5) * 1000, 1) if latencies else None,
+            "latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+        }
+
+
+_registry: Dict[str, ProviderHealth] = {}
+
+
+def get_provider_health(name: str) -> ProviderHealth:
+    """Health tracker for a provider, created on first use"""
+    health = _registry.get(name)
+    if health is None:
+        health = _registry.setdefault(name, ProviderHealth(name))
+    return health
+
+
+def get_provider_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every provider used in this process"""
+    return {name: health.stats() for name, health in _registry.items()}
@@ -1,35 +1,59 @@
 """SMS provider implementation"""
-from typing import Dict, Any
-from twilio.rest import Client
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 
 from app.core.config import settings
-from app.core.exceptions import IntegrationException
-from app.services.communication.base_provider import CommunicationProvider
+from app.core.exceptions import IntegrationException, ProviderNotConfiguredException
+from app.services.communication.base_provider import (
+    CommunicationProvider,
+    provider_base_url,
+    provider_credential,
+)
+from app.services.communication.http_client import get_http_client
 
 
 class TwilioSMSProvider(CommunicationProvider):
-    """Twilio SMS provider"""
+    """Twilio SMS provider (REST API over the shared HTTP client)
     
-    def __init__(self):
-        super().__init__("Twilio")
+    Uses the platform credentials from settings unless a workspace's
+    integration config is given, in which case all of its credentials are
+    required.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None, workspace_id: Optional[str] = None):
+        super().__init__("Twilio", workspace_id)
         
-        if not all([settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN, settings.TWILIO_PHONE_NUMBER]):
+        # A workspace integration never borrows the platform account
+        if config is None:
+            config = {
+                "account_sid": settings.TWILIO_ACCOUNT_SID,
+                "auth_token": settings.TWILIO_AUTH_TOKEN,
+                "phone_number": settings.TWILIO_PHONE_NUMBER,
+            }
+        account_sid = provider_credential(config.get("account_sid"), "AClocal")
+        auth_token = provider_credential(config.get("auth_token"), "local")
+        from_number = provider_credential(config.get("phone_number"), "+15550000000")
+        if not all([account_sid, auth_token, from_number]):
             raise IntegrationException("Twilio credentials not configured", service="Twilio")
         
-        self.client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-        self.from_number = settings.TWILIO_PHONE_NUMBER
+        base_url = provider_base_url(settings.TWILIO_API_URL)
+        self.account_url = f"{base_url}/2010-04-01/Accounts/{account_sid}"
+        self.auth = (account_sid, auth_token)
+        self.from_number = from_number
     
     async def send(self, to: str, subject: str, content: str, **kwargs) -> Dict[str, Any]:
         """Send SMS via Twilio"""
         try:
-            message = self.client.messages.create(
-                body=content,
-                from_=self.from_number,
-                to=to
+            response = await get_http_client().post(
+                f"{self.account_url}/Messages.json",
+                auth=self.auth,
+                data={"Body": content, "From": self.from_number, "To": to},
             )
+            response.raise_for_status()
+            message_sid = response.json().get("sid")
             
-            self.logger.info("sms_sent", recipient=to, message_sid=message.sid)
-            return {"success": True, "message_sid": message.sid}
+            self.logger.info("sms_sent", recipient=to, message_sid=message_sid)
+            return {"success": True, "message_sid": message_sid}
         except Exception as e:
             await self.log_failure(e, to)
             raise IntegrationException(f"Failed to send SMS: {str(e)}", service="Twilio")
@@ -38,19 +62,24 @@ class TwilioSMSProvider(CommunicationProvider):
         """Verify Twilio connection"""
         try:
             # Fetch account to verify credentials
-            account = self.client.api.accounts(settings.TWILIO_ACCOUNT_SID).fetch()
-            return account.status == "active"
+            response = await get_http_client().get(f"{self.account_url}.json", auth=self.auth)
+            response.raise_for_status()
+            return response.json().get("status") == "active"
         except Exception:
             return False
 
 
 class SMSService:
-    """SMS service"""
+    """SMS service
+    
+    Sends through `provider` when given (a workspace's own integration),
+    otherwise through the platform Twilio account configured in settings.
+    """
     
-    def __init__(self):
-        self.provider = None
+    def __init__(self, provider: Optional[CommunicationProvider] = None):
+        self.provider = provider
         
-        if all([settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN]):
+        if not self.provider and (all([settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN]) or settings.local_providers):
             try:
                 self.provider = TwilioSMSProvider()
             except Exception:
@@ -59,6 +88,22 @@ class SMSService:
     async def send_sms(self, to: str, content: str) -> Dict[str, Any]:
         """Send SMS"""
         if not self.provider:
-            raise IntegrationException("No SMS provider configured", service="SMS")
+            raise ProviderNotConfiguredException("No SMS provider configured", service="SMS")
         
         return await self.provider.send(to, "", content)
+    
+    async def send_batch(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send many SMS ({"to", "content"} each) concurrently over the shared pool
+
+        Twilio has no batch endpoint; returns one result per message, in order.
+        """
+        if not self.provider:
+            raise ProviderNotConfiguredException("No SMS provider configured", service="SMS")
+        
+        return await self.provider.send_batch(messages)
+
+
+@lru_cache()
+def get_sms_service() -> SMSService:
+    """Process-wide SMS service on the platform credentials"""
+    return SMSService()
@@ -0,0 +1,162 @@
+"""Local stand-in for the Resend, SendGrid and Twilio HTTP APIs
+
+Accepts the requests the providers in this package make and answers like
+the real APIs after a simulated latency (`latency` plus up to `jitter`
+seconds), failing a fraction `error_rate` of requests with the provider's
+500 response. With COMMUNICATION_MODE=local every provider sends here (see
+base_provider.provider_base_url), so notification paths can be load-tested
+and benchmarked offline.
+
+Counts requests, messages, injected errors and distinct client connections;
+GET /_standin/stats returns them. Run it with:
+
+    python -m app.services.communication.standin [--port 8765] [--latency-ms 20]
+        [--jitter-ms 0] [--error-rate 0]
+
+or in-process with `serve()`.
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Set
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+class StandInStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.messages = 0
+        self.errors = 0
+        self.connections: Set[str] = set()
+
+    def record(self, request: Request) -> None:
+        self.requests += 1
+        if request.client:
+            self.connections.add(f"{request.client.host}:{request.client.port}")
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "messages": self.messages,
+            "errors": self.errors,
+            "connections": len(self.connections),
+        }
+
+
+def build_app(
+    latency: float = 0.02,
+    stats: Optional[StandInStats] = None,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    seed: Optional[int] = None,
+) -> Starlette:
+    """ASGI app mimicking the provider APIs"""
+    stats = stats or StandInStats()
+    rng = random.Random(seed)
+
+    async def respond(request: Request, messages: int, error: Dict[str, Any], body: Any, status_code: int = 200, **kwargs) -> Response:
+        stats.record(request)
+        await asyncio.sleep(latency + (rng.uniform(0, jitter) if jitter else 0))
+        if error_rate and rng.random() < error_rate:
+            stats.errors += 1
+            return JSONResponse(error, status_code=500)
+        stats.messages += messages
+        if body is None:
+            return Response(status_code=status_code, **kwargs)
+        return JSONResponse(body, status_code=status_code, **kwargs)
+
+    resend_error = {"statusCode": 500, "name": "application_error", "message": "Simulated failure"}
+
+    async def resend_send(request: Request) -> Response:
+        await request.body()
+        return await respond(request, 1, resend_error, {"id": str(uuid.uuid4())})
+
+    async def resend_batch(request: Request) -> Response:
+        emails = await request.json()
+        body = {"data": [{"id": str(uuid.uuid4())} for _ in emails]}
+        return await respond(request, len(emails), resend_error, body)
+
+    async def sendgrid_send(request: Request) -> Response:
+        payload = await request.json()
+        recipients = sum(len(p.get("to", [])) for p in payload.get("personalizations", []))
+        return await respond(
+            request, recipients, {"errors": [{"message": "Simulated failure"}]}, None,
+            status_code=202, headers={"X-Message-Id": uuid.uuid4().hex},
+        )
+
+    async def twilio_send(request: Request) -> Response:
+        await request.form()
+        return await respond(
+            request, 1, {"code": 20500, "message": "Simulated failure", "status": 500},
+            {"sid": f"SM{uuid.uuid4().hex}", "status": "queued"}, status_code=201,
+        )
+
+    async def twilio_account(request: Request) -> Response:
+        return JSONResponse({"sid": request.path_params["sid"], "status": "active"})
+
+    async def read_stats(request: Request) -> Response:
+        return JSONResponse(stats.as_dict())
+
+    return Starlette(routes=[
+        Route("/emails", resend_send, methods=["POST"]),
+        Route("/emails/batch", resend_batch, methods=["POST"]),
+        Route("/v3/mail/send", sendgrid_send, methods=["POST"]),
+        Route("/2010-04-01/Accounts/{sid}/Messages.json", twilio_send, methods=["POST"]),
+        Route("/2010-04-01/Accounts/{sid}.json", twilio_account, methods=["GET"]),
+        Route("/_standin/stats", read_stats, methods=["GET"]),
+    ])
+
+
+@contextmanager
+def serve(port: int = 8765, **options: Any) -> Iterator[Dict[str, Any]]:
+    """Run the stand-in in a background thread; yields {"url", "stats"}
+
+    `options` are passed to build_app (latency, jitter, error_rate, seed).
+    """
+    stats = StandInStats()
+    config = uvicorn.Config(
+        build_app(stats=stats, **options), host="127.0.0.1", port=port,
+        log_level="warning", access_log=False, timeout_keep_alive=60,
+    )
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield {"url": f"http://127.0.0.1:{port}", "stats": stats}
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the email and SMS provider APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    app = build_app(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False, timeout_keep_alive=60)
+
+
+if __name__ == "__main__":
+    main()
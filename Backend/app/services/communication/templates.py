@@ -0,0 +1,327 @@
+"""Notification templates
+
+Built-in templates live in app/templates/notifications: an email is
+`<name>.subject.txt` plus `<name>.html`, an SMS is `<name>.txt`. Each is
+compiled once per process (auto_reload is off, so Jinja's in-memory cache
+holds it for the life of the worker) and the compiled bytecode is cached on
+disk, so freshly forked Celery workers skip compilation too. HTML templates
+are autoescaped.
+
+A workspace can override any of these files with a row in
+`notification_templates`. Overrides are compiled in a sandbox, cached per
+workspace for OVERRIDE_TTL seconds, and dropped from this process's cache
+when they change (other processes pick changes up when the entry expires).
+An override that fails to compile or render falls back to the built-in.
+Overrides run in shared workers, so rendering is bounded: loops share an
+iteration budget per render, operators can't build values past
+MAX_RENDERED_SIZE, and output past it is an error. Saving an override
+renders it against SAMPLE_CONTEXT to reject ones that hit these limits.
+
+For batched sends, render_email_template() renders an email body once with
+a substitution tag in place of each context value, so a provider can send
+one shared body with per-recipient values.
+"""
+import re
+from datetime import datetime
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+import structlog
+from jinja2 import FileSystemBytecodeCache, FileSystemLoader, Template, TemplateError, nodes
+from jinja2.compiler import CodeGenerator
+from jinja2.exceptions import SecurityError
+from jinja2.sandbox import SandboxedEnvironment
+from markupsafe import escape
+from supabase import Client
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+TEMPLATE_DIR = Path(__file__).resolve().parents[2] / "templates" / "notifications"
+
+OVERRIDE_TTL = 60
+
+_override_cache = TTLCache("notification_templates", maxsize=1024, ttl=OVERRIDE_TTL)
+
+MAX_LOOP_ITERATIONS = 10_000
+MAX_RENDERED_SIZE = 100_000
+# Integer powers beyond this many bits are rejected
+MAX_POWER_BITS = 4096
+
+_FORMAT_WIDTH = re.compile(r"%[#0 +-]*(\d*)(?:\.(\d+))?")
+
+# Every value a built-in notification is rendered with, for checking overrides
+SAMPLE_CONTEXT = {
+    "contact_name": "Alex Sample",
+    "contact_email": "alex@example.com",
+    "contact_phone": "+15555550100",
+    "workspace_name": "Sample Studio",
+    "service": "Consultation",
+    "scheduled_at": "2026-01-15T14:30:00+00:00",
+    "duration_minutes": 60,
+    "location": "123 Main St",
+    "notes": "Please arrive 10 minutes early.",
+    "forms": [{"name": "Intake form", "url": "https://example.com/forms/sample"}],
+}
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    content: str
+
+
+def format_datetime(value: Union[str, datetime], fmt: str = "%B %d, %Y at %I:%M %p") -> str:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime(fmt)
+
+
+def format_time(value: Union[str, datetime]) -> str:
+    return format_datetime(value, "%I:%M %p")
+
+
+class Placeholder(str):
+    """Stand-in for a context value while rendering a shared email body
+
+    Renders as a substitution tag; `resolve(context)` is a recipient's value
+    for that tag, through any filters the template applied.
+    """
+
+    def __new__(cls, resolve: Callable[[Dict[str, Any]], Any], tags: Dict[str, "Placeholder"]):
+        placeholder = super().__new__(cls, f"[%{len(tags)}%]")
+        placeholder.resolve = resolve
+        placeholder.tags = tags
+        tags[str(placeholder)] = placeholder
+        return placeholder
+
+    def derive(self, func: Callable[[Any], Any]) -> "Placeholder":
+        return Placeholder(lambda context: func(self.resolve(context)), self.tags)
+
+
+def passes_placeholders(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Let a filter defer a Placeholder to substitution time"""
+
+    @wraps(func)
+    def wrapper(value: Any, *args: Any) -> Any:
+        if isinstance(value, Placeholder):
+            return value.derive(lambda resolved: func(resolved, *args))
+        return func(value, *args)
+    return wrapper
+
+
+class BoundedCodeGenerator(CodeGenerator):
+    """Routes for loops and `~` concatenation through BoundedEnvironment's checks"""
+
+    def visit_For(self, node: nodes.For, frame) -> None:
+        node.iter = nodes.Call(
+            nodes.EnvironmentAttribute("bounded_iter"), [nodes.ContextReference(), node.iter], [], None, None
+        )
+        super().visit_For(node, frame)
+
+    def visit_Concat(self, node: nodes.Concat, frame) -> None:
+        self.write("environment.bounded_size(")
+        super().visit_Concat(node, frame)
+        self.write(")")
+
+
+class BoundedEnvironment(SandboxedEnvironment):
+    """Sandbox that also bounds how much work a render can do
+
+    Loops in one render share MAX_LOOP_ITERATIONS, and strings or lists
+    built with operators are capped at MAX_RENDERED_SIZE; going past either
+    raises SecurityError.
+    """
+
+    code_generator_class = BoundedCodeGenerator
+    intercepted_binops = frozenset(["+", "*", "**", "%"])
+
+    def bounded_iter(self, context, iterable):
+        eval_ctx = context.eval_ctx
+        for item in iterable:
+            eval_ctx.iterations = getattr(eval_ctx, "iterations", 0) + 1
+            if eval_ctx.iterations > MAX_LOOP_ITERATIONS:
+                raise SecurityError(f"Template loops ran more than {MAX_LOOP_ITERATIONS} times")
+            yield item
+
+    def bounded_size(self, value: Any) -> Any:
+        if isinstance(value, (str, list, tuple)) and len(value) > MAX_RENDERED_SIZE:
+            raise SecurityError(f"Template value longer than {MAX_RENDERED_SIZE}")
+        return value
+
+    def call_binop(self, context, operator: str, left: Any, right: Any) -> Any:
+        if operator == "*":
+            for sequence, count in ((left, right), (right, left)):
+                if isinstance(sequence, (str, list, tuple)) and isinstance(count, int) \
+                        and len(sequence) * count > MAX_RENDERED_SIZE:
+                    raise SecurityError(f"Template value longer than {MAX_RENDERED_SIZE}")
+        elif operator == "**":
+            if isinstance(left, int) and isinstance(right, int) and right * max(abs(left), 2).bit_length() > MAX_POWER_BITS:
+                raise SecurityError("Template power too large")
+        elif operator == "%" and isinstance(left, str):
+            for width, precision in _FORMAT_WIDTH.findall(left):
+                if int(width or 0) > MAX_RENDERED_SIZE or int(precision or 0) > MAX_RENDERED_SIZE:
+                    raise SecurityError("Template format width too large")
+        return self.bounded_size(super().call_binop(context, operator, left, right))
+
+
+@lru_cache()
+def get_environment(autoescape: bool) -> SandboxedEnvironment:
+    """Shared environment for HTML (autoescaped) or plain-text templates"""
+    bytecode_cache = (
+        FileSystemBytecodeCache(settings.NOTIFICATION_TEMPLATE_CACHE_DIR)
+        if settings.NOTIFICATION_TEMPLATE_CACHE_DIR
+        else FileSystemBytecodeCache()
+    )
+    environment = BoundedEnvironment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=autoescape,
+        auto_reload=False,
+        bytecode_cache=bytecode_cache,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    environment.filters["datetime"] = passes_placeholders(format_datetime)
+    environment.filters["time"] = passes_placeholders(format_time)
+    return environment
+
+
+def environment_for(name: str) -> SandboxedEnvironment:
+    return get_environment(autoescape=name.endswith(".html"))
+
+
+def template_names() -> List[str]:
+    """Built-in template files a workspace may override"""
+    return sorted(path.name for path in TEMPLATE_DIR.iterdir() if not path.name.startswith("_"))
+
+
+def compile_template(name: str, source: str) -> Template:
+    """Compile override source for template `name` (raises TemplateError)"""
+    return environment_for(name).from_string(source)
+
+
+def render_override(template: Template, context: Dict[str, Any]) -> str:
+    """Render an override, raising SecurityError once output passes MAX_RENDERED_SIZE"""
+    parts = []
+    size = 0
+    for part in template.generate(context):
+        size += len(part)
+        if size > MAX_RENDERED_SIZE:
+            raise SecurityError(f"Template output longer than {MAX_RENDERED_SIZE}")
+        parts.append(part)
+    return "".join(parts).strip()
+
+
+def validate_override(name: str, source: str) -> Template:
+    """Compile override source and check it renders within the limits (raises TemplateError)
+
+    Other render errors are let through: SAMPLE_CONTEXT can't match every
+    notification, and at send time a failing override falls back anyway.
+    """
+    template = compile_template(name, source)
+    try:
+        render_override(template, SAMPLE_CONTEXT)
+    except SecurityError:
+        raise
+    except Exception:
+        pass
+    return template
+
+
+def load_overrides(supabase: Client, workspace_id: str) -> Dict[str, Template]:
+    """A workspace's compiled overrides, by template name"""
+    overrides = _override_cache.get(workspace_id)
+    if overrides is not None:
+        return overrides
+
+    response = (
+        supabase.table("notification_templates")
+        .select("name, source")
+        .eq("workspace_id", workspace_id)
+        .execute()
+    )
+    overrides = {}
+    for row in response.data or []:
+        try:
+            overrides[row["name"]] = compile_template(row["name"], row["source"])
+        except TemplateError as e:
+            logger.warning("template_override_invalid", workspace_id=workspace_id, name=row["name"], error=str(e))
+    _override_cache.set(workspace_id, overrides)
+    return overrides
+
+
+def invalidate_overrides(workspace_id: str) -> None:
+    """Forget a workspace's cached overrides"""
+    _override_cache.invalidate(workspace_id)
+
+
+def render(name: str, context: Dict[str, Any], overrides: Optional[Dict[str, Template]] = None) -> str:
+    """Render one template file, preferring the workspace's override"""
+    override = (overrides or {}).get(name)
+    if override is not None:
+        try:
+            return render_override(override, context)
+        except Exception as e:
+            logger.warning("template_override_failed", name=name, error=str(e))
+    return environment_for(name).get_template(name).render(context).strip()
+
+
+def render_email(
+    notification: str, context: Dict[str, Any], overrides: Optional[Dict[str, Template]] = None
+) -> RenderedEmail:
+    """Subject and HTML body for an email notification"""
+    return RenderedEmail(
+        subject=render(f"{notification}.subject.txt", context, overrides),
+        content=render(f"{notification}.html", context, overrides),
+    )
+
+
+def render_sms(notification: str, context: Dict[str, Any], overrides: Optional[Dict[str, Template]] = None) -> str:
+    """Body for an SMS notification"""
+    return render(f"{notification}.txt", context, overrides)
+
+
+class EmailTemplate(NamedTuple):
+    """An HTML body with substitution tags, shared by many recipients"""
+    content: str
+    tags: Dict[str, Placeholder]
+
+    def personalize(self, context: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Message fields sending `content` as this template with `context`'s values
+
+        Empty when substituting the values does not reproduce `content`
+        exactly (say the template branches on a value), in which case the
+        message is sent with its own body.
+        """
+        try:
+            values = {
+                tag: str(escape(placeholder.resolve(context)))
+                for tag, placeholder in self.tags.items()
+                if tag in self.content
+            }
+        except Exception:
+            return {}
+        if any("[%" in value for value in values.values()):
+            return {}
+
+        rendered = self.content
+        for tag, value in values.items():
+            rendered = rendered.replace(tag, value)
+        if rendered != content:
+            return {}
+        return {"template": self.content, "substitutions": values}
+
+
+def render_email_template(
+    notification: str, keys: Iterable[str], overrides: Optional[Dict[str, Template]] = None
+) -> Optional[EmailTemplate]:
+    """An email notification's HTML body with a tag for each context key"""
+    tags: Dict[str, Placeholder] = {}
+    context = {key: Placeholder(lambda values, key=key: values.get(key), tags) for key in keys}
+    try:
+        return EmailTemplate(render(f"{notification}.html", context, overrides), tags)
+    except Exception as e:
+        logger.warning("email_template_unavailable", notification=notification, error=str(e))
+        return None
@@ -0,0 +1,125 @@
+"""Per-workspace email and SMS provider resolution
+
+A workspace that has connected its own Resend, SendGrid or Twilio account
+(an active row in `integrations`) sends through it; other workspaces use the
+platform credentials from settings.
+
+Active integrations are cached per workspace (workspaces without any are
+cached too), and prefetch_credentials() loads many workspaces in one query
+for bulk runs. The services built from them are pooled per workspace in an
+LRU, keyed by the integration rows' id and updated_at so a changed
+credential never reuses a stale service. IntegrationService invalidates a
+workspace's entry in this process when its integrations change; other
+processes pick the change up when the entry expires.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+import structlog
+from supabase import Client
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.supabase_client import get_supabase_client
+from app.models.enums import IntegrationProvider, IntegrationStatus
+from app.services.communication.email_provider import (
+    EmailService,
+    ResendEmailProvider,
+    SendGridEmailProvider,
+    get_email_service,
+)
+from app.services.communication.sms_provider import SMSService, TwilioSMSProvider, get_sms_service
+
+logger = structlog.get_logger()
+
+# Fallback order when a workspace connects more than one email provider
+EMAIL_PROVIDERS = {
+    IntegrationProvider.RESEND.value: ResendEmailProvider,
+    IntegrationProvider.SENDGRID.value: SendGridEmailProvider,
+}
+
+# Workspaces looked up per integrations query
+PREFETCH_CHUNK = 200
+
+_credential_cache = TTLCache("provider_credentials", maxsize=4096, ttl=60)
+_service_pool = TTLCache("provider_services", maxsize=settings.PROVIDER_SERVICE_POOL_SIZE, ttl=3600)
+
+
+def _integrations_query(supabase: Client):
+    return (
+        supabase.table("integrations")
+        .select("id, workspace_id, provider, config, updated_at")
+        .eq("status", IntegrationStatus.ACTIVE.value)
+    )
+
+
+def _by_provider(rows: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Latest active integration per provider"""
+    latest: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        current = latest.get(row["provider"])
+        if current is None or (row.get("updated_at") or "") > (current.get("updated_at") or ""):
+            latest[row["provider"]] = row
+    return latest
+
+
+def load_credentials(supabase: Client, workspace_id: str) -> Dict[str, Dict[str, Any]]:
+    """A workspace's active integrations by provider, cached"""
+    credentials = _credential_cache.get(workspace_id)
+    if credentials is None:
+        response = _integrations_query(supabase).eq("workspace_id", workspace_id).execute()
+        credentials = _by_provider(response.data or [])
+        _credential_cache.set(workspace_id, credentials)
+    return credentials
+
+
+def prefetch_credentials(supabase: Client, workspace_ids: Iterable[str]) -> None:
+    """Load credentials for every uncached workspace in a few bulk queries"""
+    missing = [ws for ws in set(workspace_ids) if _credential_cache.get(ws) is None]
+    for i in range(0, len(missing), PREFETCH_CHUNK):
+        chunk = missing[i:i + PREFETCH_CHUNK]
+        response = _integrations_query(supabase).in_("workspace_id", chunk).execute()
+        rows: Dict[str, List[Dict[str, Any]]] = {ws: [] for ws in chunk}
+        for row in response.data or []:
+            rows[row["workspace_id"]].append(row)
+        for workspace_id, workspace_rows in rows.items():
+            _credential_cache.set(workspace_id, _by_provider(workspace_rows))
+
+
+def invalidate_credentials(workspace_id: str) -> None:
+    """Forget a workspace's cached integrations"""
+    _credential_cache.invalidate(workspace_id)
+
+
+def _pooled(key: tuple, build):
+    service = _service_pool.get(key)
+    if service is None:
+        service = build()
+        _service_pool.set(key, service)
+    return service
+
+
+def email_service_for(workspace_id: str, supabase: Optional[Client] = None) -> EmailService:
+    """Email service for a workspace: its own integrations, else the platform's"""
+    credentials = load_credentials(supabase or get_supabase_client().service_client, workspace_id)
+    rows = [credentials[name] for name in EMAIL_PROVIDERS if name in credentials]
+    if not rows:
+        return get_email_service()
+
+    def build() -> EmailService:
+        return EmailService([
+            EMAIL_PROVIDERS[row["provider"]](row["config"] or {}, workspace_id) for row in rows
+        ])
+
+    key = ("email", workspace_id, tuple((row["id"], row.get("updated_at")) for row in rows))
+    return _pooled(key, build)
+
+
+def sms_service_for(workspace_id: str, supabase: Optional[Client] = None) -> SMSService:
+    """SMS service for a workspace: its own Twilio account, else the platform's"""
+    credentials = load_credentials(supabase or get_supabase_client().service_client, workspace_id)
+    row = credentials.get(IntegrationProvider.TWILIO.value)
+    if row is None:
+        return get_sms_service()
+
+    key = ("sms", workspace_id, row["id"], row.get("updated_at"))
+    return _pooled(key, lambda: SMSService(TwilioSMSProvider(row["config"] or {}, workspace_id)))
@@ -0,0 +1,97 @@
+"""Contact service"""
+from typing import Dict, Any, List, Optional, Tuple
+from supabase import Client
+import structlog
+
+from app.services.base_service import BaseService
+from app.core.exceptions import IntegrationException
+from app.core.pagination import decode_cursor, split_page
+
+logger = structlog.get_logger()
+
+# Search result sort key, descending
+SEARCH_ORDER = ("rank", "id")
+
+
+class ContactService(BaseService):
+    """Contact management service"""
+
+    def __init__(self, supabase: Client):
+        super().__init__(supabase, "contacts")
+
+    async def upsert_contact(
+        self,
+        workspace_id: str,
+        name: str,
+        email: Optional[str] = None,
+        phone: Optional[str] = None,
+        source: Optional[str] = None,
+        source_url: Optional[str] = None,
+        message: Optional[str] = None,
+        ensure_conversation: bool = False,
+        unread_count: int = 0,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Insert or update a contact keyed on (workspace_id, lower(email))
+
+        Runs as a single `upsert_contact` RPC so concurrent submissions for the
+        same email cannot create duplicates. When `ensure_conversation` is set,
+        the contact's conversation is created in the same round-trip.
+
+        Returns the contact and whether it was newly created.
+        """
+        try:
+            response = self.supabase.rpc(
+                "upsert_contact",
+                {
+                    "p_workspace_id": workspace_id,
+                    "p_name": name,
+                    "p_email": email,
+                    "p_phone": phone,
+                    "p_source": source,
+                    "p_source_url": source_url,
+                    "p_message": message,
+                    "p_ensure_conversation": ensure_conversation,
+                    "p_unread_count": unread_count,
+                },
+            ).execute()
+
+            if not response.data:
+                raise IntegrationException("Failed to upsert contact", service="Supabase")
+
+            contact = response.data["contact"]
+            created = bool(response.data["created"])
+
+            self.logger.info(
+                "contact_created" if created else "contact_updated",
+                contact_id=contact["id"],
+                workspace_id=workspace_id,
+            )
+            return contact, created
+        except Exception as e:
+            self.logger.error("upsert_contact_failed", workspace_id=workspace_id, error=str(e))
+            raise
+
+    async def search_contacts(
+        self,
+        workspace_id: str,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of contacts matching `query` by name, email or phone
+
+        Runs the `search_contacts` RPC (pg_trgm indexes), best match first.
+        Returns the page and the cursor for the next one.
+        """
+        after_rank, after_id = decode_cursor(cursor, len(SEARCH_ORDER)) if cursor else (None, None)
+        response = self.supabase.rpc(
+            "search_contacts",
+            {
+                "p_workspace_id": workspace_id,
+                "p_query": query,
+                "p_limit": limit + 1,
+                "p_after_rank": after_rank,
+                "p_after_id": after_id,
+            },
+        ).execute()
+        return split_page(response.data or [], limit, SEARCH_ORDER)
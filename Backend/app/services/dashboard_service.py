@@ -0,0 +1,300 @@
+"""Dashboard statistics service"""
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import structlog
+from supabase import Client
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.realtime import COUNTERS_CHANGED, hub, workspace_channel
+
+logger = structlog.get_logger()
+
+# Counter reads shared by the open streams of a workspace
+_snapshot_cache = TTLCache("dashboard_snapshots", maxsize=4096, ttl=1.0)
+_snapshot_inflight: Dict[Tuple[str, Optional[int]], asyncio.Task] = {}
+
+# Counter queries are blocking Supabase calls. They run on a small dedicated
+# pool rather than the default executor: a call that outlives its deadline
+# cannot be interrupted, so a slow database ties up at most this many
+# threads, and queued calls are dropped once their request gives up. Created
+# on first use, so the app lifespan can shut it down and start again.
+_query_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_query_executor() -> ThreadPoolExecutor:
+    global _query_executor
+    if _query_executor is None:
+        _query_executor = ThreadPoolExecutor(
+            max_workers=settings.DASHBOARD_QUERY_WORKERS,
+            thread_name_prefix="dashboard-query",
+        )
+    return _query_executor
+
+
+def shutdown_dashboard_executor() -> None:
+    """Stop the dashboard query pool (the next use starts a new one)"""
+    global _query_executor
+    if _query_executor is not None:
+        _query_executor.shutdown(wait=False, cancel_futures=True)
+        _query_executor = None
+
+
+# Zero values used for a section whose queries failed or timed out
+EMPTY_SECTIONS: Dict[str, Dict[str, int]] = {
+    "bookings": {"today_count": 0, "upcoming_count": 0, "completed_count": 0, "no_show_count": 0},
+    "leads": {"new_inquiries": 0, "ongoing_conversations": 0, "unanswered_messages": 0},
+    "forms": {"pending_count": 0, "overdue_count": 0, "completed_count": 0},
+    "inventory": {"low_stock_items": 0, "critical_items": 0},
+    "alerts": {"total_alerts": 0, "critical_alerts": 0},
+}
+
+
+class DashboardService:
+    """Service for workspace dashboard counters"""
+
+    def __init__(self, supabase: Client, timeout: Optional[float] = None):
+        self.supabase = supabase
+        self.timeout = settings.DASHBOARD_QUERY_TIMEOUT_SECONDS if timeout is None else timeout
+
+    async def get_stats(self, workspace_id: str, upcoming_days: int = 7) -> Dict[str, Any]:
+        """Get all dashboard counters with one `get_workspace_counters` RPC
+
+        Reads the trigger-maintained counter row for the workspace. Uses the
+        same time windows as BookingService.get_today_bookings and
+        get_upcoming_bookings, rounded out to whole hours. If the RPC fails,
+        the counters are computed by concurrent per-section count queries
+        within what is left of the same `timeout`; if it times out, every
+        section is reported unavailable.
+        """
+        windows = self._windows(upcoming_days)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+
+        try:
+            return await asyncio.wait_for(
+                self._run(self._read_counters, workspace_id, windows),
+                timeout=self.timeout,
+            )
+        except asyncio.TimeoutError:
+            # The database is slow, not missing the RPC: fourteen more
+            # queries would only add to its load
+            logger.warning("dashboard_counters_timed_out", workspace_id=workspace_id)
+            return self._assemble({}, list(EMPTY_SECTIONS))
+        except Exception as e:
+            logger.warning(
+                "dashboard_counters_unavailable",
+                workspace_id=workspace_id,
+                error=str(e) or type(e).__name__,
+            )
+
+        return await self.get_stats_fan_out(workspace_id, windows, deadline=deadline)
+
+    async def get_stats_fan_out(
+        self,
+        workspace_id: str,
+        windows: Optional[Dict[str, str]] = None,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Run every counter query concurrently under one deadline
+
+        Endpoint latency is bounded by the deadline (event loop time; by
+        default `timeout` from now) rather than the sum of the queries.
+        Queries still queued or running when it passes are cancelled or
+        abandoned, and sections with a failed or unfinished query are zeroed
+        and listed in `unavailable_sections`.
+        """
+        windows = windows or self._windows()
+        queries = self._count_queries(workspace_id, windows)
+        loop = asyncio.get_running_loop()
+        if deadline is None:
+            deadline = loop.time() + self.timeout
+
+        futures = [self._run(query) for _, _, query in queries]
+        _, pending = await asyncio.wait(futures, timeout=max(deadline - loop.time(), 0))
+        for future in pending:
+            future.cancel()
+
+        sections: Dict[str, Dict[str, int]] = {name: {} for name in EMPTY_SECTIONS}
+        unavailable: List[str] = []
+        for (section, field, _), future in zip(queries, futures):
+            error = "timed out" if future in pending else future.exception()
+            if error is not None:
+                if section not in unavailable:
+                    unavailable.append(section)
+                    logger.warning(
+                        "dashboard_section_unavailable",
+                        workspace_id=workspace_id,
+                        section=section,
+                        error=str(error) or type(error).__name__,
+                    )
+                continue
+            sections[section][field] = future.result().count or 0
+
+        return self._assemble(sections, unavailable)
+
+    async def get_shared_stats(self, workspace_id: str, seq: Optional[int] = None) -> Dict[str, Any]:
+        """get_stats shared by every stream of the workspace in this process
+
+        Streams reacting to the same hub event (same `seq`) await a single
+        read, so one write causes one query per workspace rather than one per
+        open connection. Without `seq` (initial snapshots) a read from the
+        last second is reused.
+        """
+        key = (workspace_id, seq)
+        stats = _snapshot_cache.get(key)
+        if stats is not None:
+            return stats
+
+        task = _snapshot_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.get_stats(workspace_id))
+            _snapshot_inflight[key] = task
+            task.add_done_callback(lambda _: _snapshot_inflight.pop(key, None))
+
+        stats = await asyncio.shield(task)
+        _snapshot_cache.set(key, stats)
+        return stats
+
+    async def stream_events(
+        self, workspace_id: str, heartbeat: float = 15.0, expires_at: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Server-Sent Events for a workspace dashboard
+
+        Sends a `snapshot` of all counters first, then `counters` events with
+        the changed values and their deltas, and passes other workspace
+        events (such as `alert.created`) through unchanged. At `expires_at`
+        (the token's expiry) it sends `expired` and ends, so the client
+        reconnects with a fresh token.
+        """
+        async with hub.subscribe(workspace_channel(workspace_id)) as queue:
+            current = await self.get_shared_stats(workspace_id)
+            yield format_sse("snapshot", current)
+
+            while True:
+                timeout = heartbeat
+                if expires_at is not None:
+                    remaining = expires_at - time.time()
+                    if remaining <= 0:
+                        yield format_sse("expired", {})
+                        return
+                    timeout = min(timeout, remaining)
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    if expires_at is None or time.time() < expires_at:
+                        yield ": keepalive\n\n"
+                    continue
+
+                if event.get("type") != COUNTERS_CHANGED:
+                    yield format_sse(event.get("type", "message"), event.get("data", {}))
+                    continue
+
+                latest = await self.get_shared_stats(workspace_id, event.get("seq"))
+                delta = counter_delta(current, latest)
+                if delta:
+                    yield format_sse("counters", {"delta": delta, "counters": latest})
+                    current = latest
+
+    @staticmethod
+    def _run(func: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        return asyncio.get_running_loop().run_in_executor(_get_query_executor(), func, *args)
+
+    @staticmethod
+    def _assemble(sections: Dict[str, Dict[str, int]], unavailable: List[str]) -> Dict[str, Any]:
+        sections = {name: sections.get(name, {}) for name in EMPTY_SECTIONS}
+        for section in unavailable:
+            sections[section] = dict(EMPTY_SECTIONS[section])
+
+        alerts = sections.pop("alerts")
+        return {
+            **sections,
+            **alerts,
+            "partial": bool(unavailable),
+            "unavailable_sections": unavailable,
+        }
+
+    def _read_counters(self, workspace_id: str, windows: Dict[str, str]) -> Dict[str, Any]:
+        response = self.supabase.rpc(
+            "get_workspace_counters", {"p_workspace_id": workspace_id, **windows}
+        ).execute()
+        return response.data
+
+    def _count_queries(
+        self, workspace_id: str, windows: Dict[str, str]
+    ) -> List[Tuple[str, str, Callable[[], Any]]]:
+        """(section, field, query) for every dashboard counter"""
+
+        def count(table: str, build: Callable[[Any], Any] = lambda q: q) -> Callable[[], Any]:
+            def query():
+                builder = (
+                    self.supabase.table(table)
+                    .select("id", count="exact")
+                    .eq("workspace_id", workspace_id)
+                )
+                return build(builder).limit(1).execute()
+            return query
+
+        def today(q):
+            return q.gte("scheduled_at", windows["p_today_start"]).lte("scheduled_at", windows["p_today_end"])
+
+        return [
+            ("bookings", "today_count", count("bookings", today)),
+            ("bookings", "upcoming_count", count(
+                "bookings",
+                lambda q: q.gte("scheduled_at", windows["p_now"]).lte("scheduled_at", windows["p_upcoming_end"]),
+            )),
+            ("bookings", "completed_count", count("bookings", lambda q: today(q).eq("status", "completed"))),
+            ("bookings", "no_show_count", count("bookings", lambda q: today(q).eq("status", "no_show"))),
+            ("leads", "new_inquiries", count("conversations")),
+            ("leads", "ongoing_conversations", count(
+                "conversations",
+                lambda q: q.or_("is_automated_paused.is.null,is_automated_paused.eq.false"),
+            )),
+            ("leads", "unanswered_messages", count("conversations", lambda q: q.gt("unread_count", 0))),
+            ("forms", "pending_count", count("form_submissions", lambda q: q.eq("status", "pending"))),
+            ("forms", "overdue_count", count("form_submissions", lambda q: q.eq("status", "overdue"))),
+            ("forms", "completed_count", count("form_submissions", lambda q: q.eq("status", "completed"))),
+            ("inventory", "low_stock_items", count("inventory_items", lambda q: q.eq("is_low_stock", True))),
+            ("inventory", "critical_items", count("inventory_items", lambda q: q.eq("quantity", 0))),
+            ("alerts", "total_alerts", count("alerts", lambda q: q.eq("is_resolved", False))),
+            ("alerts", "critical_alerts", count(
+                "alerts", lambda q: q.eq("is_resolved", False).eq("priority", "critical")
+            )),
+        ]
+
+    @staticmethod
+    def _windows(upcoming_days: int = 7) -> Dict[str, str]:
+        now = datetime.now()
+        today = now.date()
+        return {
+            "p_now": now.isoformat(),
+            "p_today_start": datetime.combine(today, datetime.min.time()).isoformat(),
+            "p_today_end": datetime.combine(today, datetime.max.time()).isoformat(),
+            "p_upcoming_end": (now + timedelta(days=upcoming_days)).isoformat(),
+        }
+
+
+def counter_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Nested {field: new - old} for every numeric counter that changed"""
+    delta: Dict[str, Any] = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = counter_delta(previous, value)
+            if nested:
+                delta[key] = nested
+        elif isinstance(value, int) and not isinstance(value, bool) and isinstance(previous, int):
+            if value != previous:
+                delta[key] = value - previous
+    return delta
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,93 @@
+"""Form submission service for public form access"""
+import hmac
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+from supabase import Client
+import structlog
+
+from app.core.config import settings
+from app.services.base_service import BaseService
+
+logger = structlog.get_logger()
+
+PUBLIC_SUBMISSION_SELECT = "*, form_templates(*), bookings(*, booking_types(*)), contacts(*)"
+
+
+class FormSubmissionService(BaseService):
+    """Service for form submissions accessed through signed public links"""
+
+    def __init__(self, supabase: Client):
+        super().__init__(supabase, "form_submissions")
+
+    async def get_public_submission(
+        self, submission_id: str, workspace_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """Get submission with template, booking and contact
+
+        `workspace_id` comes from an already verified access token; a row from
+        another workspace is treated as not found.
+        """
+        response = (
+            self.supabase.table(self.table_name)
+            .select(PUBLIC_SUBMISSION_SELECT)
+            .eq("id", submission_id)
+            .eq("workspace_id", workspace_id)
+            .limit(1)
+            .execute()
+        )
+        return response.data[0] if response.data else None
+
+    async def get_legacy_link_workspace(
+        self, submission_id: str, token: Optional[str]
+    ) -> Optional[str]:
+        """Workspace for a form link emailed before signed tokens, if still valid
+
+        Those links carried no token (or the submission's stored access_token).
+        They are honoured for FORM_ACCESS_TOKEN_EXPIRE_DAYS after the submission
+        was created; submissions issued with a signed token never match a
+        tokenless link.
+        """
+        response = (
+            self.supabase.table(self.table_name)
+            .select("workspace_id, access_token, created_at")
+            .eq("id", submission_id)
+            .limit(1)
+            .execute()
+        )
+        if not response.data:
+            return None
+
+        row = response.data[0]
+        stored = row.get("access_token")
+        if token is None:
+            if stored:
+                return None
+        elif not stored or not hmac.compare_digest(stored, token):
+            return None
+
+        created_at = datetime.fromisoformat(row["created_at"])
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        if created_at + timedelta(days=settings.FORM_ACCESS_TOKEN_EXPIRE_DAYS) < datetime.now(timezone.utc):
+            return None
+
+        logger.info("legacy_form_link_used", submission_id=submission_id)
+        return row["workspace_id"]
+
+    async def update_public_submission(
+        self, submission_id: str, workspace_id: str, data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Update a submission scoped to the token's workspace"""
+        response = (
+            self.supabase.table(self.table_name)
+            .update(data)
+            .eq("id", submission_id)
+            .eq("workspace_id", workspace_id)
+            .execute()
+        )
+
+        if not response.data:
+            return None
+
+        self.logger.info("form_submission_updated", submission_id=submission_id)
+        return response.data[0]
@@ -5,7 +5,8 @@ import structlog
 
 from app.services.base_service import BaseService
 from app.models.enums import IntegrationProvider, IntegrationStatus, AlertType, AlertPriority
-from app.core.exceptions import IntegrationException
+from app.core.exceptions import IntegrationException, NotFoundException
+from app.services.communication.workspace_providers import invalidate_credentials
 
 logger = structlog.get_logger()
 
@@ -150,6 +151,35 @@ class IntegrationService(BaseService):
         except Exception as e:
             raise IntegrationException(f"Twilio verification failed: {str(e)}", service="Twilio")
     
+    async def create_integration(
+        self,
+        workspace_id: str,
+        provider: IntegrationProvider,
+        config: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Store a verified integration; sends switch to it right away"""
+        integration = await self.create({
+            "workspace_id": workspace_id,
+            "provider": provider.value,
+            "config": config,
+            "status": IntegrationStatus.ACTIVE.value
+        })
+        invalidate_credentials(workspace_id)
+        return integration
+    
+    async def delete_integration(self, workspace_id: str, integration_id: str) -> None:
+        """Delete a workspace's integration; sends fall back to the platform providers"""
+        response = (
+            self.supabase.table("integrations")
+            .delete()
+            .eq("id", integration_id)
+            .eq("workspace_id", workspace_id)
+            .execute()
+        )
+        invalidate_credentials(workspace_id)
+        if not response.data:
+            raise NotFoundException("Integration not found")
+    
     async def log_integration_failure(
         self,
         workspace_id: str,
@@ -0,0 +1,175 @@
+"""Message and conversation service"""
+from typing import Any, Dict, List, Optional, Tuple
+from supabase import Client
+import structlog
+
+from app.services.base_service import BaseService
+from app.core.exceptions import NotFoundException
+from app.core.pagination import decode_cursor, encode_cursor, keyset_filter, split_page
+
+logger = structlog.get_logger()
+
+# Inbox sort key; matches idx_conversations_workspace_last_message
+CONVERSATION_ORDER = ("last_message_at", "id")
+
+# Message history sort key; matches idx_messages_conversation_sent
+MESSAGE_ORDER = ("sent_at", "id")
+
+# Search result sort key, descending
+SEARCH_ORDER = ("rank", "id")
+
+
+class MessageService(BaseService):
+    """Inbox service"""
+
+    def __init__(self, supabase: Client):
+        super().__init__(supabase, "messages")
+
+    async def list_conversations(
+        self,
+        workspace_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of the inbox, most recent activity first
+
+        last_message_preview and last_channel are maintained on the
+        conversation row by the messages_last_message trigger, so this is a
+        single index range scan. Returns the page and the cursor for the next
+        one (None on the last page).
+        """
+        query = (
+            self.supabase.table("conversations")
+            .select("*")
+            .eq("workspace_id", workspace_id)
+        )
+        if cursor:
+            last_message_at, last_id = decode_cursor(cursor, len(CONVERSATION_ORDER))
+            query = query.or_(keyset_filter("last_message_at", last_message_at, last_id))
+
+        response = (
+            query.order("last_message_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit + 1)
+            .execute()
+        )
+        return split_page(response.data, limit, CONVERSATION_ORDER)
+
+    async def list_messages(
+        self,
+        conversation_id: str,
+        workspace_id: str,
+        limit: int = 50,
+        before: Optional[str] = None,
+        since: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+        """One page of a conversation's history, oldest first
+
+        Without a cursor, returns the latest `limit` messages. With `before`,
+        the `limit` messages preceding that cursor ("load older"). With
+        `since`, up to `limit` messages after it, so a refresh transfers only
+        what is new.
+
+        Returns (messages, next_cursor, since_cursor). next_cursor continues
+        in the same direction and is None when there is nothing further;
+        since_cursor points at the newest message the client now has, for its
+        next refresh.
+        """
+        self.verify_conversation(conversation_id, workspace_id)
+
+        query = self.supabase.table("messages").select("*").eq("conversation_id", conversation_id)
+        descending = since is None
+        cursor = since or before
+        if cursor:
+            sent_at, last_id = decode_cursor(cursor, len(MESSAGE_ORDER))
+            query = query.or_(keyset_filter("sent_at", sent_at, last_id, descending=descending))
+
+        response = (
+            query.order("sent_at", desc=descending)
+            .order("id", desc=descending)
+            .limit(limit + 1)
+            .execute()
+        )
+        messages, next_cursor = split_page(response.data, limit, MESSAGE_ORDER)
+
+        if descending:
+            messages.reverse()
+            newest = response.data[0] if response.data and before is None else None
+        else:
+            newest = messages[-1] if messages else None
+        since_cursor = encode_cursor(*(newest[field] for field in MESSAGE_ORDER)) if newest else since
+
+        return messages, next_cursor, since_cursor
+
+    async def search_messages(
+        self,
+        workspace_id: str,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of the workspace's messages matching `query`, best first
+
+        Runs the `search_messages` RPC (full-text, web search syntax). Each
+        hit carries its contact_id, a highlighted `headline` and its `rank`.
+        Returns the page and the cursor for the next one.
+        """
+        after_rank, after_id = decode_cursor(cursor, len(SEARCH_ORDER)) if cursor else (None, None)
+        response = self.supabase.rpc(
+            "search_messages",
+            {
+                "p_workspace_id": workspace_id,
+                "p_query": query,
+                "p_limit": limit + 1,
+                "p_after_rank": after_rank,
+                "p_after_id": after_id,
+            },
+        ).execute()
+        return split_page(response.data or [], limit, SEARCH_ORDER)
+
+    async def send_message(
+        self, conversation_id: str, message_data: Dict[str, Any], sender_id: str
+    ) -> Dict[str, Any]:
+        """Store a staff message and pause automation for the conversation"""
+        message = await self.create({
+            **message_data,
+            "conversation_id": conversation_id,
+            "sender_id": sender_id,
+            "message_type": "manual",
+        })
+
+        self.supabase.table("conversations").update(
+            {"is_automated_paused": True}
+        ).eq("id", conversation_id).execute()
+
+        return message
+
+    async def mark_read(self, workspace_id: str, conversation_ids: List[str]) -> Dict[str, Any]:
+        """Mark conversations and their messages read in one RPC
+
+        Conversations outside the workspace are ignored. Returns the ids that
+        had unread messages and the workspace's new unread total.
+        """
+        response = self.supabase.rpc(
+            "mark_conversations_read",
+            {"p_workspace_id": workspace_id, "p_conversation_ids": conversation_ids},
+        ).execute()
+        return {"conversation_ids": [], "unread_total": 0, **(response.data or {})}
+
+    async def get_unread_counts(self, workspace_id: str) -> Dict[str, int]:
+        """Unread totals from the trigger-maintained workspace counters"""
+        response = self.supabase.rpc("get_unread_counts", {"p_workspace_id": workspace_id}).execute()
+        return {"unread_total": 0, "unread_conversations": 0, **(response.data or {})}
+
+    def verify_conversation(self, conversation_id: str, workspace_id: str) -> None:
+        """Raise NotFoundException unless the conversation is in the workspace"""
+        response = (
+            self.supabase.table("conversations")
+            .select("id")
+            .eq("id", conversation_id)
+            .eq("workspace_id", workspace_id)
+            .limit(1)
+            .execute()
+        )
+        if not response.data:
+            raise NotFoundException("Conversation not found")
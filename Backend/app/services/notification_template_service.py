@@ -0,0 +1,69 @@
+"""Notification template override service"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from jinja2 import TemplateError
+from supabase import Client
+
+from app.services.base_service import BaseService
+from app.services.communication import templates
+from app.core.exceptions import NotFoundException, ValidationException
+
+
+class NotificationTemplateService(BaseService):
+    """Per-workspace overrides of the built-in notification templates"""
+
+    def __init__(self, supabase: Client):
+        super().__init__(supabase, "notification_templates")
+
+    async def list_templates(self, workspace_id: str) -> List[Dict[str, Any]]:
+        """Every overridable template with its default and override source"""
+        response = (
+            self.supabase.table("notification_templates")
+            .select("name, source")
+            .eq("workspace_id", workspace_id)
+            .execute()
+        )
+        overrides = {row["name"]: row["source"] for row in response.data or []}
+        return [
+            {
+                "name": name,
+                "default_source": (templates.TEMPLATE_DIR / name).read_text(),
+                "source": overrides.get(name),
+                "is_overridden": name in overrides,
+            }
+            for name in templates.template_names()
+        ]
+
+    async def set_override(self, workspace_id: str, name: str, source: str) -> Dict[str, Any]:
+        """Validate and store an override, replacing any existing one"""
+        self._check_name(name)
+        try:
+            templates.validate_override(name, source)
+        except TemplateError as e:
+            raise ValidationException(f"Invalid template: {e}")
+
+        self.supabase.table("notification_templates").upsert(
+            {"workspace_id": workspace_id, "name": name, "source": source, "updated_at": datetime.now(timezone.utc).isoformat()},
+            on_conflict="workspace_id,name",
+        ).execute()
+        templates.invalidate_overrides(workspace_id)
+        self.logger.info("notification_template_overridden", workspace_id=workspace_id, name=name)
+
+        return {
+            "name": name,
+            "default_source": (templates.TEMPLATE_DIR / name).read_text(),
+            "source": source,
+            "is_overridden": True,
+        }
+
+    async def delete_override(self, workspace_id: str, name: str) -> None:
+        """Revert a template to the built-in"""
+        self._check_name(name)
+        self.supabase.table("notification_templates").delete().eq(
+            "workspace_id", workspace_id
+        ).eq("name", name).execute()
+        templates.invalidate_overrides(workspace_id)
+
+    def _check_name(self, name: str) -> None:
+        if name not in templates.template_names():
+            raise NotFoundException(f"Notification template {name} not found")
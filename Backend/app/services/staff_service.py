@@ -4,7 +4,8 @@ from datetime import datetime, timedelta
 from supabase import Client
 import structlog
 import secrets
-from app.core.security import hash_password
+from app.core.security import hash_password_async
+from app.core.permissions import invalidate_permissions
 
 logger = structlog.get_logger()
 
@@ -125,7 +126,7 @@ class StaffService:
             # Create user
             user_data = {
                 "email": invitation["email"],
-                "password_hash": hash_password(password),
+                "password_hash": await hash_password_async(password),
                 "full_name": full_name,
                 "role": "staff",
                 "workspace_id": invitation["workspace_id"],
@@ -230,6 +231,7 @@ class StaffService:
             if not response.data:
                 raise Exception("Failed to update permissions")
             
+            invalidate_permissions(user_id)
             logger.info("staff_permissions_updated", user_id=user_id)
             
             return response.data[0]
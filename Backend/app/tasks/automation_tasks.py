@@ -1,15 +1,122 @@
 """Automation tasks for CareOps"""
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
 import structlog
-from app.tasks.celery_app import celery_app
+from app.tasks.celery_app import celery_app, run_async
 from app.db.supabase_client import get_supabase_client
-from app.services.communication.email_provider import EmailService
-from app.services.communication.sms_provider import SMSService
-from app.models.enums import FormStatus, AlertType, AlertPriority
+from app.core.config import settings
+from app.core.exceptions import ProviderNotConfiguredException
+from app.core.realtime import ALERT_CREATED, COUNTERS_CHANGED, publish_event, publish_message
+from app.core.security import create_form_access_token
+from app.services.communication.workspace_providers import (
+    email_service_for,
+    prefetch_credentials,
+    sms_service_for,
+)
+from app.services.communication.templates import (
+    load_overrides,
+    render_email,
+    render_email_template,
+    render_sms,
+)
+from app.models.enums import BookingStatus, FormStatus, AlertType, AlertPriority
 
 logger = structlog.get_logger()
 
 
+def record_automated_message(supabase, workspace_id: str, contact_id: str, channel: str, content: str) -> None:
+    """Store an automated send in the contact's conversation and announce it"""
+    record_automated_messages(supabase, [(workspace_id, contact_id, channel, content)])
+
+
+# Contacts looked up per conversations query
+RECORD_LOOKUP_CHUNK = 200
+
+
+def record_automated_messages(supabase, sends: List[Tuple[str, str, str, str]]) -> None:
+    """Store automated sends, (workspace_id, contact_id, channel, content) each
+
+    Conversations are looked up and messages inserted in bulk, then each
+    message is announced. Best effort: the messages have already gone out,
+    so a failure here is logged and never fails the task.
+    """
+    if not sends:
+        return
+    try:
+        contact_ids = list({contact_id for _, contact_id, _, _ in sends})
+        conversations = {}
+        for i in range(0, len(contact_ids), RECORD_LOOKUP_CHUNK):
+            response = (
+                supabase.table("conversations")
+                .select("id, workspace_id, contact_id")
+                .in_("contact_id", contact_ids[i:i + RECORD_LOOKUP_CHUNK])
+                .execute()
+            )
+            for row in response.data:
+                conversations.setdefault((row["workspace_id"], row["contact_id"]), row["id"])
+
+        rows = [
+            {
+                "conversation_id": conversations[(workspace_id, contact_id)],
+                "content": content,
+                "channel": channel,
+                "message_type": "automated",
+                "is_read": True,
+            }
+            for workspace_id, contact_id, channel, content in sends
+            if (workspace_id, contact_id) in conversations
+        ]
+        if not rows:
+            return
+
+        workspaces = {conversation_id: workspace_id for (workspace_id, _), conversation_id in conversations.items()}
+        messages = supabase.table("messages").insert(rows).execute()
+        for message in messages.data or []:
+            publish_message(workspaces[message["conversation_id"]], message)
+    except Exception as e:
+        logger.warning("automated_message_record_failed", count=len(sends), error=str(e))
+
+
+async def send_batches(
+    sends: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    service_for: Callable[[str], Any],
+) -> List[Dict[str, Any]]:
+    """Batch-send (booking, message) pairs, one result per pair in order
+
+    Bookings are grouped by the service their workspace sends through, so
+    workspaces on the platform providers share batches and workspaces with
+    their own integration get one batch each; the batches run concurrently.
+    Sends on a channel with no provider configured are marked `skipped`.
+    """
+    groups: Dict[int, Tuple[Any, List[int]]] = {}
+    results: List[Dict[str, Any]] = [{} for _ in sends]
+    for index, (booking, message) in enumerate(sends):
+        try:
+            service = service_for(booking["workspace_id"])
+        except ProviderNotConfiguredException as e:
+            results[index] = {"to": message["to"], "success": False, "skipped": True, "error": str(e)}
+            continue
+        except Exception as e:
+            results[index] = {"to": message["to"], "success": False, "error": str(e)}
+            continue
+        groups.setdefault(id(service), (service, []))[1].append(index)
+
+    async def send_group(service, indexes: List[int]) -> None:
+        try:
+            batch = await service.send_batch([sends[i][1] for i in indexes])
+        except ProviderNotConfiguredException as e:
+            batch = [{"to": sends[i][1]["to"], "success": False, "skipped": True, "error": str(e)} for i in indexes]
+        except Exception as e:
+            batch = [{"to": sends[i][1]["to"], "success": False, "error": str(e)} for i in indexes]
+        for index, result in zip(indexes, batch):
+            results[index] = result
+
+    await asyncio.gather(*(send_group(service, indexes) for service, indexes in groups.values()))
+    return results
+
+
 @celery_app.task(name="app.tasks.automation_tasks.send_welcome_message")
 def send_welcome_message(contact_id: str, workspace_id: str):
     """Send welcome message to new contact"""
@@ -29,12 +136,15 @@ def send_welcome_message(contact_id: str, workspace_id: str):
         
         # Send welcome email
         if contact_data.get("email"):
-            email_service = EmailService()
-            email_service.send_email(
-                to=contact_data["email"],
-                subject=f"Welcome to {workspace_data['name']}",
-                content=f"<p>Thank you for contacting us! We'll get back to you shortly.</p>"
+            email = render_email(
+                "welcome",
+                {"workspace_name": workspace_data["name"], "contact_name": contact_data.get("name")},
+                load_overrides(supabase, workspace_id),
             )
+            run_async(email_service_for(workspace_id, supabase).send_email(
+                to=contact_data["email"], subject=email.subject, content=email.content
+            ))
+            record_automated_message(supabase, workspace_id, contact_id, "email", email.subject)
         
         logger.info("welcome_message_sent", contact_id=contact_id)
     except Exception as e:
@@ -72,19 +182,22 @@ def send_booking_confirmation(booking_id: str):
         
         # Send confirmation email
         if contact.get("email"):
-            email_service = EmailService()
-            scheduled_time = datetime.fromisoformat(booking_data["scheduled_at"])
-            
-            email_service.send_email(
-                to=contact["email"],
-                subject=f"Booking Confirmed - {booking_type['name']}",
-                content=f"""
-                <h2>Your booking is confirmed!</h2>
-                <p><strong>Service:</strong> {booking_type['name']}</p>
-                <p><strong>Date & Time:</strong> {scheduled_time.strftime('%B %d, %Y at %I:%M %p')}</p>
-                <p><strong>Duration:</strong> {booking_type['duration_minutes']} minutes</p>
-                <p><strong>Location:</strong> {booking_type.get('location', workspace['address'])}</p>
-                """
+            email = render_email(
+                "booking_confirmation",
+                {
+                    "workspace_name": workspace["name"],
+                    "service": booking_type["name"],
+                    "scheduled_at": booking_data["scheduled_at"],
+                    "duration_minutes": booking_type["duration_minutes"],
+                    "location": booking_type.get("location", workspace["address"]),
+                },
+                load_overrides(supabase, booking_data["workspace_id"]),
+            )
+            run_async(email_service_for(booking_data["workspace_id"], supabase).send_email(
+                to=contact["email"], subject=email.subject, content=email.content
+            ))
+            record_automated_message(
+                supabase, booking_data["workspace_id"], booking_data["contact_id"], "email", email.subject
             )
         
         logger.info("booking_confirmation_sent", booking_id=booking_id)
@@ -92,49 +205,237 @@ def send_booking_confirmation(booking_id: str):
         logger.exception("booking_confirmation_failed", booking_id=booking_id, error=str(e))
 
 
+def _parse_timestamp(value: Any) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def schedule_booking_reminder(supabase, booking: Dict[str, Any]) -> Optional[str]:
+    """(Re)schedule a booking's reminder as an ETA task, returning its task id
+
+    Revokes the reminder task the booking already has, then queues one for
+    scheduled_at minus REMINDER_LEAD_HOURS if the booking is confirmed, not
+    yet reminded, and its reminder is due within REMINDER_ETA_HORIZON_MINUTES;
+    reminders further out are queued by the send_booking_reminders sweep.
+    The task id is recorded (compare-and-set on the previous id, so the
+    sweep and a concurrent update never both queue one) before it is queued.
+    """
+    previous = booking.get("reminder_task_id")
+    if previous:
+        try:
+            celery_app.control.revoke(previous)
+        except Exception as e:
+            # The task re-checks the booking when it runs, so a missed revoke is harmless
+            logger.warning("booking_reminder_revoke_failed", booking_id=booking["id"], error=str(e))
+    
+    now = datetime.now(timezone.utc)
+    scheduled_at = _parse_timestamp(booking["scheduled_at"])
+    eta = scheduled_at - timedelta(hours=settings.REMINDER_LEAD_HOURS)
+    schedule = (
+        booking.get("status") == BookingStatus.CONFIRMED.value
+        and not booking.get("reminder_sent_at")
+        and scheduled_at > now
+        and eta <= now + timedelta(minutes=settings.REMINDER_ETA_HORIZON_MINUTES)
+    )
+    if not schedule and not previous:
+        return None
+    
+    task_id = str(uuid4()) if schedule else None
+    query = supabase.table("bookings").update({"reminder_task_id": task_id}).eq("id", booking["id"])
+    query = query.eq("reminder_task_id", previous) if previous else query.is_("reminder_task_id", "null")
+    if not query.execute().data or task_id is None:
+        return None
+    
+    send_booking_reminder.apply_async(
+        (booking["id"], booking["scheduled_at"]), task_id=task_id, eta=max(eta, now)
+    )
+    logger.info("booking_reminder_scheduled", booking_id=booking["id"], eta=max(eta, now).isoformat())
+    return task_id
+
+
+@celery_app.task(name="app.tasks.automation_tasks.send_booking_reminder")
+def send_booking_reminder(booking_id: str, scheduled_at: str):
+    """Send one booking's reminder at its ETA
+
+    Claims the booking only if it is still confirmed, unreminded and at the
+    time the task was scheduled for, so a task that outlived a cancel or a
+    reschedule does nothing.
+    """
+    try:
+        supabase = get_supabase_client().service_client
+        claimed = supabase.rpc("claim_booking_reminder", {
+            "p_booking_id": booking_id,
+            "p_scheduled_at": scheduled_at,
+            "p_lease": f"{settings.REMINDER_CLAIM_LEASE_MINUTES} minutes",
+        }).execute().data or []
+        if not claimed:
+            logger.info("booking_reminder_skipped", booking_id=booking_id)
+            return
+        
+        send_reminders(supabase, claimed)
+    except Exception as e:
+        logger.exception("booking_reminder_failed", booking_id=booking_id, error=str(e))
+
+
 @celery_app.task(name="app.tasks.automation_tasks.send_booking_reminders")
 def send_booking_reminders():
-    """Send reminders for upcoming bookings"""
+    """Reconcile booking reminders with the schedule
+
+    Reminders go out from per-booking ETA tasks. This sweep queues tasks for
+    confirmed bookings whose reminder has come within the ETA horizon and
+    have none, then starts send_booking_reminder_chunk to pick up any
+    reminder more than REMINDER_RECONCILE_GRACE_MINUTES overdue (its task
+    was lost or never queued). Both read only bookings still waiting for a
+    reminder, so the work is proportional to bookings made, not to the
+    size of the reminder window.
+    """
     try:
         supabase = get_supabase_client().service_client
+        now = datetime.now(timezone.utc)
+        lead = timedelta(hours=settings.REMINDER_LEAD_HOURS)
+        grace = timedelta(minutes=settings.REMINDER_RECONCILE_GRACE_MINUTES)
+        horizon = timedelta(minutes=settings.REMINDER_ETA_HORIZON_MINUTES)
         
-        # Get bookings in next 24 hours
-        tomorrow = datetime.now() + timedelta(hours=24)
-        now = datetime.now()
+        scheduled = 0
+        for _ in range(settings.REMINDER_MAX_CHUNKS_PER_RUN):
+            page = (
+                supabase.table("bookings")
+                .select("id, scheduled_at, status, reminder_sent_at, reminder_task_id")
+                .eq("status", BookingStatus.CONFIRMED.value)
+                .is_("reminder_sent_at", "null")
+                .is_("reminder_task_id", "null")
+                .gt("scheduled_at", (now + lead - grace).isoformat())
+                .lte("scheduled_at", (now + lead + horizon).isoformat())
+                .order("scheduled_at")
+                .limit(settings.REMINDER_CHUNK_SIZE)
+                .execute()
+            ).data or []
+            for booking in page:
+                if schedule_booking_reminder(supabase, booking):
+                    scheduled += 1
+            if len(page) < settings.REMINDER_CHUNK_SIZE:
+                break
         
-        bookings = supabase.table("bookings").select("*, contacts(*), booking_types(*), workspaces(*)").gte("scheduled_at", now.isoformat()).lte("scheduled_at", tomorrow.isoformat()).eq("status", "confirmed").execute()
-        
-        for booking in bookings.data:
-            contact = booking["contacts"]
-            booking_type = booking["booking_types"]
-            scheduled_time = datetime.fromisoformat(booking["scheduled_at"])
-            
-            # Send reminder via email
-            if contact.get("email"):
-                email_service = EmailService()
-                email_service.send_email(
-                    to=contact["email"],
-                    subject=f"Reminder: {booking_type['name']} Tomorrow",
-                    content=f"""
-                    <h2>Reminder: Your appointment is tomorrow</h2>
-                    <p><strong>Service:</strong> {booking_type['name']}</p>
-                    <p><strong>Date & Time:</strong> {scheduled_time.strftime('%B %d, %Y at %I:%M %p')}</p>
-                    """
-                )
-            
-            # Send SMS reminder if phone available
-            if contact.get("phone"):
-                sms_service = SMSService()
-                sms_service.send_sms(
-                    to=contact["phone"],
-                    content=f"Reminder: {booking_type['name']} tomorrow at {scheduled_time.strftime('%I:%M %p')}"
-                )
-        
-        logger.info("booking_reminders_sent", count=len(bookings.data))
+        send_booking_reminder_chunk.delay(settings.REMINDER_MAX_CHUNKS_PER_RUN)
+        logger.info("booking_reminders_reconciled", scheduled=scheduled)
     except Exception as e:
         logger.exception("booking_reminders_failed", error=str(e))
 
 
+@celery_app.task(name="app.tasks.automation_tasks.send_booking_reminder_chunk")
+def send_booking_reminder_chunk(remaining: int = 1):
+    """Claim and send one page of overdue reminders
+
+    The page is claimed when the task runs, not when the sweep queues it,
+    so time spent waiting in the queue never counts against the claim
+    lease. A full page queues the next chunk (at most `remaining` in all)
+    before sending, so pages are worked on concurrently.
+    """
+    try:
+        supabase = get_supabase_client().service_client
+        grace = timedelta(minutes=settings.REMINDER_RECONCILE_GRACE_MINUTES)
+        horizon = timedelta(hours=settings.REMINDER_LEAD_HOURS) - grace
+        page = supabase.rpc("claim_due_reminders", {
+            "p_horizon": f"{int(horizon.total_seconds())} seconds",
+            "p_limit": settings.REMINDER_CHUNK_SIZE,
+            "p_lease": f"{settings.REMINDER_CLAIM_LEASE_MINUTES} minutes",
+        }).execute().data or []
+        if not page:
+            return
+        
+        if len(page) >= settings.REMINDER_CHUNK_SIZE and remaining > 1:
+            send_booking_reminder_chunk.delay(remaining - 1)
+        logger.warning("booking_reminders_overdue", bookings=len(page))
+        send_reminders(supabase, page)
+    except Exception as e:
+        logger.exception("booking_reminder_chunk_failed", error=str(e))
+
+
+def send_reminders(supabase, bookings: List[Dict[str, Any]]) -> None:
+    """Send claimed reminders, then mark each booking sent or released
+
+    A booking counts as reminded once any of its channels went out, so a
+    failed SMS never re-sends a delivered email; bookings where every send
+    failed are released for the sweep to retry. A channel with no provider
+    configured is skipped like a missing address, since a retry can't help.
+    If the worker dies before finishing, the claim lapses after the lease
+    and the sweep retries.
+    """
+    emails = []
+    texts = []
+    # Per workspace (overrides differ), so SendGrid can send one shared body
+    email_templates = {}
+    for booking in bookings:
+        context = {
+            "contact_name": booking.get("contact_name"),
+            "service": booking["service"],
+            "scheduled_at": booking["scheduled_at"],
+        }
+        overrides = load_overrides(supabase, booking["workspace_id"])
+        
+        if booking.get("contact_email"):
+            email = render_email("booking_reminder", context, overrides)
+            message = {"to": booking["contact_email"], "subject": email.subject, "content": email.content}
+            if booking["workspace_id"] not in email_templates:
+                email_templates[booking["workspace_id"]] = render_email_template("booking_reminder", context, overrides)
+            template = email_templates[booking["workspace_id"]]
+            if template is not None:
+                message.update(template.personalize(context, email.content))
+            emails.append((booking, message))
+        
+        if booking.get("contact_phone"):
+            texts.append((booking, {"to": booking["contact_phone"], "content": render_sms("booking_reminder", context, overrides)}))
+    
+    # Both channels at once, one batched send per channel and sending account
+    prefetch_credentials(supabase, [booking["workspace_id"] for booking in bookings])
+    
+    async def send_all():
+        return await asyncio.gather(
+            send_batches(emails, lambda ws: email_service_for(ws, supabase)),
+            send_batches(texts, lambda ws: sms_service_for(ws, supabase)),
+        )
+    
+    email_results, sms_results = run_async(send_all())
+    
+    attempted = set()
+    delivered = set()
+    for (booking, message), result in zip(emails + texts, email_results + sms_results):
+        if result.get("skipped"):
+            continue
+        attempted.add(booking["id"])
+        if result["success"]:
+            delivered.add(booking["id"])
+        else:
+            logger.warning(
+                "booking_reminder_failed",
+                booking_id=booking["id"],
+                recipient=message["to"],
+                error=result.get("error"),
+            )
+    
+    # Bookings with no address or provider to send to have nothing to send; don't claim them again
+    sent = [booking["id"] for booking in bookings if booking["id"] in delivered or booking["id"] not in attempted]
+    failed = [booking["id"] for booking in bookings if booking["id"] in attempted - delivered]
+    supabase.rpc("finish_reminders", {"p_sent": sent, "p_failed": failed}).execute()
+    
+    record_automated_messages(supabase, [
+        (booking["workspace_id"], booking["contact_id"], "email", message["subject"])
+        for (booking, message), result in zip(emails, email_results) if result["success"]
+    ] + [
+        (booking["workspace_id"], booking["contact_id"], "sms", message["content"])
+        for (booking, message), result in zip(texts, sms_results) if result["success"]
+    ])
+    
+    logger.info(
+        "booking_reminders_sent",
+        count=len(bookings),
+        emails=sum(r["success"] for r in email_results),
+        sms=sum(r["success"] for r in sms_results),
+        failed=len(failed),
+    )
+
+
 @celery_app.task(name="app.tasks.automation_tasks.send_form_after_booking")
 def send_form_after_booking(booking_id: str):
     """Send forms after booking creation"""
@@ -165,19 +466,24 @@ def send_form_after_booking(booking_id: str):
         # Create form submissions for each linked form
         form_links = []
         for form in linked_forms:
+            # Generate the ID up front so the signed token is stored with the insert
+            submission_id = str(uuid4())
+            access_token = create_form_access_token(submission_id, booking_data["workspace_id"])
+            
             submission = supabase.table("form_submissions").insert({
+                "id": submission_id,
                 "form_template_id": form["id"],
                 "booking_id": booking_id,
                 "contact_id": booking_data["contact_id"],
                 "workspace_id": booking_data["workspace_id"],
                 "status": FormStatus.PENDING.value,
-                "data": {}
+                "data": {},
+                "access_token": access_token,
             }).execute()
             
             if submission.data:
-                submission_id = submission.data[0]["id"]
                 # Generate public URL for form access
-                form_url = f"{workspace.get('public_url', 'https://app.careops.com')}/forms/{submission_id}"
+                form_url = f"{workspace.get('public_url', 'https://app.careops.com')}/forms/{submission_id}?token={access_token}"
                 form_links.append({
                     "name": form["name"],
                     "url": form_url,
@@ -186,28 +492,22 @@ def send_form_after_booking(booking_id: str):
         
         # Send email with form links
         if contact.get("email") and form_links:
-            email_service = EmailService()
-            
-            # Build form links HTML
-            forms_html = "<ul>"
-            for form_link in form_links:
-                forms_html += f'<li><a href="{form_link["url"]}">{form_link["name"]}</a></li>'
-            forms_html += "</ul>"
-            
-            scheduled_time = datetime.fromisoformat(booking_data["scheduled_at"])
-            
-            email_service.send_email(
-                to=contact["email"],
-                subject=f"Required Forms for Your {booking_type['name']} Appointment",
-                content=f"""
-                <h2>Please Complete These Forms</h2>
-                <p>Thank you for booking {booking_type['name']} on {scheduled_time.strftime('%B %d, %Y at %I:%M %p')}.</p>
-                <p>Please complete the following forms before your appointment:</p>
-                {forms_html}
-                <p>If you have any questions, please contact us at {workspace.get('contact_email', workspace.get('email', ''))}.</p>
-                <p>Thank you!</p>
-                <p><strong>{workspace['name']}</strong></p>
-                """
+            email = render_email(
+                "forms_request",
+                {
+                    "workspace_name": workspace["name"],
+                    "service": booking_type["name"],
+                    "scheduled_at": booking_data["scheduled_at"],
+                    "forms": form_links,
+                    "contact_email": workspace.get("contact_email", workspace.get("email", "")),
+                },
+                load_overrides(supabase, booking_data["workspace_id"]),
+            )
+            run_async(email_service_for(booking_data["workspace_id"], supabase).send_email(
+                to=contact["email"], subject=email.subject, content=email.content
+            ))
+            record_automated_message(
+                supabase, booking_data["workspace_id"], booking_data["contact_id"], "email", email.subject
             )
         
         logger.info("forms_sent_after_booking", booking_id=booking_id, form_count=len(linked_forms))
@@ -215,32 +515,39 @@ def send_form_after_booking(booking_id: str):
         logger.exception("send_forms_failed", booking_id=booking_id, error=str(e))
 
 
+# Submissions marked per mark_overdue_forms() call, and calls per run; a
+# larger backlog is worked off over successive runs
+OVERDUE_FORMS_PAGE = 1000
+MAX_OVERDUE_FORM_PAGES = 50
+
+
 @celery_app.task(name="app.tasks.automation_tasks.check_overdue_forms")
 def check_overdue_forms():
-    """Check for overdue forms and create alerts"""
+    """Mark pending forms past their due_at overdue and create alerts
+
+    mark_overdue_forms() updates a page of due submissions and inserts their
+    alerts in one statement; alerts are deduplicated per form, so a re-run
+    or an overlapping run never alerts twice.
+    """
     try:
         supabase = get_supabase_client().service_client
         
-        # Get pending forms older than 48 hours
-        cutoff = datetime.now() - timedelta(hours=48)
+        marked = 0
+        changed_workspaces = set()
+        for _ in range(MAX_OVERDUE_FORM_PAGES):
+            rows = supabase.rpc("mark_overdue_forms", {"p_limit": OVERDUE_FORMS_PAGE}).execute().data or []
+            marked += len(rows)
+            for row in rows:
+                changed_workspaces.add(row["workspace_id"])
+                if row.get("alert"):
+                    publish_event(row["workspace_id"], ALERT_CREATED, row["alert"])
+            if len(rows) < OVERDUE_FORMS_PAGE:
+                break
         
-        forms = supabase.table("form_submissions").select("*").eq("status", FormStatus.PENDING.value).lt("created_at", cutoff.isoformat()).execute()
+        for workspace_id in changed_workspaces:
+            publish_event(workspace_id, COUNTERS_CHANGED, {"sections": ["forms", "alerts"]})
         
-        for form in forms.data:
-            # Update status to overdue
-            supabase.table("form_submissions").update({"status": FormStatus.OVERDUE.value}).eq("id", form["id"]).execute()
-            
-            # Create alert
-            supabase.table("alerts").insert({
-                "workspace_id": form["workspace_id"],
-                "alert_type": AlertType.OVERDUE_FORM.value,
-                "priority": AlertPriority.MEDIUM.value,
-                "title": "Form Overdue",
-                "message": f"Form submission {form['id']} is overdue",
-                "metadata": {"form_id": form["id"], "booking_id": form["booking_id"]}
-            }).execute()
-        
-        logger.info("overdue_forms_checked", count=len(forms.data))
+        logger.info("overdue_forms_checked", count=marked, workspaces=len(changed_workspaces))
     except Exception as e:
         logger.exception("check_overdue_forms_failed", error=str(e))
 
@@ -254,6 +561,7 @@ def check_inventory_levels():
         # Get low stock items
         items = supabase.table("inventory_items").select("*").eq("is_low_stock", True).execute()
         
+        alerted_workspaces = set()
         for item in items.data:
             priority = AlertPriority.CRITICAL.value if item["quantity"] == 0 else AlertPriority.HIGH.value
             alert_type = AlertType.CRITICAL_INVENTORY.value if item["quantity"] == 0 else AlertType.LOW_INVENTORY.value
@@ -262,7 +570,7 @@ def check_inventory_levels():
             existing = supabase.table("alerts").select("id").eq("workspace_id", item["workspace_id"]).eq("alert_type", alert_type).contains("metadata", {"item_id": item["id"]}).eq("is_resolved", False).execute()
             
             if not existing.data:
-                supabase.table("alerts").insert({
+                alert = supabase.table("alerts").insert({
                     "workspace_id": item["workspace_id"],
                     "alert_type": alert_type,
                     "priority": priority,
@@ -270,6 +578,12 @@ def check_inventory_levels():
                     "message": f"{item['name']} has {item['quantity']} {item['unit']} remaining",
                     "metadata": {"item_id": item["id"], "quantity": item["quantity"]}
                 }).execute()
+                if alert.data:
+                    publish_event(item["workspace_id"], ALERT_CREATED, alert.data[0])
+                    alerted_workspaces.add(item["workspace_id"])
+        
+        for workspace_id in alerted_workspaces:
+            publish_event(workspace_id, COUNTERS_CHANGED, {"sections": ["alerts"]})
         
         logger.info("inventory_levels_checked", low_stock_count=len(items.data))
     except Exception as e:
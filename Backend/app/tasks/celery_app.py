@@ -1,12 +1,18 @@
 """Celery application configuration"""
+import asyncio
+import threading
+from typing import Any, Coroutine, TypeVar
+
 from celery import Celery
 from app.core.config import settings
 
+T = TypeVar("T")
+
 celery_app = Celery(
     "careops",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=["app.tasks.automation_tasks"]
+    include=["app.tasks.automation_tasks", "app.tasks.maintenance_tasks"]
 )
 
 celery_app.conf.update(
@@ -20,6 +26,7 @@ celery_app.conf.update(
     task_soft_time_limit=240,
 )
 
+
 # Celery Beat Schedule for periodic tasks
 celery_app.conf.beat_schedule = {
     "check-overdue-forms": {
@@ -28,10 +35,35 @@ celery_app.conf.beat_schedule = {
     },
     "send-booking-reminders": {
         "task": "app.tasks.automation_tasks.send_booking_reminders",
-        "schedule": 1800.0,  # Every 30 minutes
+        # Reminders themselves are ETA tasks, queued within a short horizon
+        "schedule": settings.REMINDER_SWEEP_MINUTES * 60.0,
     },
     "check-inventory-levels": {
         "task": "app.tasks.automation_tasks.check_inventory_levels",
         "schedule": 3600.0,  # Every hour
     },
+    "reconcile-workspace-counters": {
+        "task": "app.tasks.maintenance_tasks.reconcile_workspace_counters",
+        "schedule": 900.0,  # Every 15 minutes
+    },
+    "rollup-analytics-events": {
+        "task": "app.tasks.maintenance_tasks.rollup_analytics_events",
+        "schedule": 300.0,  # Every 5 minutes
+    },
 }
+
+
+_worker_loop = threading.local()
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine from a task on the worker's long-lived event loop
+
+    Reusing one loop per worker thread (rather than asyncio.run per call)
+    keeps the pooled provider HTTP connections alive between tasks.
+    """
+    loop = getattr(_worker_loop, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _worker_loop.loop = loop
+    return loop.run_until_complete(coro)
@@ -0,0 +1,82 @@
+"""Periodic maintenance tasks for derived data"""
+import structlog
+from app.tasks.celery_app import celery_app
+from app.db.supabase_client import get_supabase_client
+
+logger = structlog.get_logger()
+
+
+# Workspaces listed per query; the run pages through them by id
+WORKSPACE_PAGE_SIZE = 1000
+
+
+@celery_app.task(name="app.tasks.maintenance_tasks.reconcile_workspace_counters")
+def reconcile_workspace_counters():
+    """Recompute trigger-maintained dashboard counters for every workspace"""
+    try:
+        supabase = get_supabase_client().service_client
+
+        workspaces = 0
+        drifted = 0
+        failed = 0
+        last_id = None
+        while True:
+            query = supabase.table("workspaces").select("id").order("id").limit(WORKSPACE_PAGE_SIZE)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            page = query.execute().data or []
+
+            for workspace in page:
+                try:
+                    response = supabase.rpc(
+                        "reconcile_workspace_counters", {"p_workspace_id": workspace["id"]}
+                    ).execute()
+                    if response.data:
+                        drifted += 1
+                        logger.warning("workspace_counters_drifted", workspace_id=workspace["id"])
+                except Exception as e:
+                    failed += 1
+                    logger.error("workspace_counters_reconcile_failed", workspace_id=workspace["id"], error=str(e))
+
+            workspaces += len(page)
+            if len(page) < WORKSPACE_PAGE_SIZE:
+                break
+            last_id = page[-1]["id"]
+
+        logger.info(
+            "workspace_counters_reconciled",
+            workspaces=workspaces,
+            drifted=drifted,
+            failed=failed,
+        )
+    except Exception as e:
+        logger.exception("reconcile_workspace_counters_failed", error=str(e))
+
+
+# Slices per run; each covers at most a day of events, so a backlog is
+# worked off over successive runs instead of in one long transaction
+MAX_ROLLUP_SLICES = 24
+
+
+@celery_app.task(name="app.tasks.maintenance_tasks.rollup_analytics_events")
+def rollup_analytics_events():
+    """Fold new analytics_events into the hourly and daily rollups"""
+    try:
+        supabase = get_supabase_client().service_client
+
+        events = 0
+        result = {}
+        for _ in range(MAX_ROLLUP_SLICES):
+            result = supabase.rpc("rollup_analytics_events", {}).execute().data or {}
+            events += result.get("events", 0)
+            if result.get("caught_up", True):
+                break
+
+        logger.info(
+            "analytics_rolled_up",
+            events=events,
+            high_water_mark=result.get("to"),
+            caught_up=result.get("caught_up"),
+        )
+    except Exception as e:
+        logger.exception("rollup_analytics_events_failed", error=str(e))
@@ -0,0 +1,94 @@
+"""Helpers for benchmarks that need a real Postgres database
+
+Benchmarks using this module run against DATABASE_URL (a database with the
+migrations in migrations/ applied). Each run seeds a throwaway workspace and
+deletes it afterwards; all seeded rows cascade from that workspace.
+"""
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterator, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.engine import Connection  # noqa: E402
+
+
+def get_connection_url() -> str:
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        sys.exit("DATABASE_URL is not set; point it at a database with migrations/ applied")
+    return url
+
+
+@contextmanager
+def connect() -> Iterator[Connection]:
+    """Autocommit connection to DATABASE_URL"""
+    engine = create_engine(get_connection_url(), isolation_level="AUTOCOMMIT")
+    try:
+        with engine.connect() as conn:
+            yield conn
+    finally:
+        engine.dispose()
+
+
+@contextmanager
+def benchmark_workspace(conn: Connection) -> Iterator[str]:
+    """Create an owner and workspace, yielding the workspace id"""
+    user_id = str(uuid.uuid4())
+    workspace_id = str(uuid.uuid4())
+    conn.execute(
+        text(
+            "INSERT INTO users (id, email, password_hash, full_name, role) "
+            "VALUES (:id, :email, 'x', 'Benchmark Owner', 'owner')"
+        ),
+        {"id": user_id, "email": f"bench-{user_id}@example.com"},
+    )
+    conn.execute(
+        text(
+            "INSERT INTO workspaces (id, name, address, contact_email, status, onboarding_step, owner_id) "
+            "VALUES (:id, 'Benchmark', '', 'bench@example.com', 'active', 'completed', :owner)"
+        ),
+        {"id": workspace_id, "owner": user_id},
+    )
+    try:
+        yield workspace_id
+    finally:
+        conn.execute(text("DELETE FROM workspaces WHERE id = :id"), {"id": workspace_id})
+        conn.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+
+
+def seed_contacts_and_bookings(conn: Connection, workspace_id: str, rows: int) -> None:
+    """Seed `rows` contacts and bookings spread over +/- 30 days"""
+    params = {"ws": workspace_id, "rows": rows}
+    conn.execute(text(
+        "INSERT INTO contacts (workspace_id, name, email) "
+        "SELECT :ws, 'Contact ' || g, 'contact' || g || '@example.com' FROM generate_series(1, :rows) g"
+    ), params)
+    conn.execute(text(
+        "INSERT INTO booking_types (workspace_id, name, duration_minutes) VALUES (:ws, 'Benchmark', 30)"
+    ), params)
+    conn.execute(text(
+        "INSERT INTO bookings (workspace_id, booking_type_id, contact_id, scheduled_at, status) "
+        "SELECT :ws, bt.id, c.id, "
+        "       NOW() + ((row_number() OVER () % 86400) - 43200) * INTERVAL '1 minute', "
+        "       (ARRAY['pending','confirmed','completed','no_show','cancelled'])[1 + row_number() OVER () % 5] "
+        "FROM contacts c CROSS JOIN LATERAL "
+        "     (SELECT id FROM booking_types WHERE workspace_id = :ws LIMIT 1) bt "
+        "WHERE c.workspace_id = :ws"
+    ), params)
+    conn.execute(text("ANALYZE contacts; ANALYZE bookings"))
+
+
+def timed(fn: Callable[[], object], repeat: int = 5) -> Tuple[float, object]:
+    """Best wall time over `repeat` runs and the last result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
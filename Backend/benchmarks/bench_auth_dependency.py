@@ -0,0 +1,69 @@
+"""Benchmark the require_staff_or_owner dependency chain
+
+Measures get_current_user + require_staff_or_owner per call with a cold
+token cache (full JWT verification every time, the old behaviour) and with
+the verified-token cache warm.
+
+Usage:
+    python benchmarks/bench_auth_dependency.py [iterations]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for key in ("SECRET_KEY", "SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY"):
+    os.environ.setdefault(key, "http://localhost" if key == "SUPABASE_URL" else "benchmark")
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.core.security import (  # noqa: E402
+    create_access_token,
+    decode_token,
+    get_current_user,
+    require_staff_or_owner,
+)
+
+
+async def dependency_chain(credentials: HTTPAuthorizationCredentials) -> None:
+    await require_staff_or_owner(await get_current_user(credentials))
+
+
+async def run(iterations: int, cached: bool) -> float:
+    token = create_access_token({
+        "sub": "user-1",
+        "email": "staff@example.com",
+        "role": "staff",
+        "workspace_id": "workspace-1",
+    })
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    security._token_cache.clear()
+
+    start = time.perf_counter()
+    if cached:
+        for _ in range(iterations):
+            await dependency_chain(credentials)
+    else:
+        for _ in range(iterations):
+            await require_staff_or_owner(decode_token(token))
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    uncached = asyncio.run(run(iterations, cached=False))
+    cached = asyncio.run(run(iterations, cached=True))
+
+    print(f"iterations: {iterations}")
+    print(f"uncached (verify every call): {uncached * 1e6:8.2f} us/call")
+    print(f"cached:                       {cached * 1e6:8.2f} us/call")
+    print(f"speedup: {uncached / cached:.1f}x")
+    print(f"cache stats: {security._token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark dashboard statistics: row download vs aggregates vs counters
+
+Seeds a workspace with N rows in each of bookings, conversations,
+form_submissions, inventory_items and alerts, then compares the old
+approach (fetch every row the endpoint selected and count in Python)
+against one dashboard_stats() call and the trigger-maintained
+get_workspace_counters() read.
+
+Requires DATABASE_URL pointing at a database with migrations/ applied.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/bench_dashboard_stats.py [rows]
+"""
+import sys
+from datetime import datetime, timedelta
+
+from _pg import benchmark_workspace, connect, seed_contacts_and_bookings, timed
+from sqlalchemy import text
+
+
+def seed(conn, workspace_id: str, rows: int) -> None:
+    seed_contacts_and_bookings(conn, workspace_id, rows)
+    params = {"ws": workspace_id, "rows": rows}
+    conn.execute(text(
+        "INSERT INTO conversations (workspace_id, contact_id, unread_count, is_automated_paused) "
+        "SELECT :ws, id, (random() * 3)::int, random() < 0.2 FROM contacts WHERE workspace_id = :ws"
+    ), params)
+    conn.execute(text(
+        "INSERT INTO form_templates (workspace_id, name, fields) VALUES (:ws, 'Benchmark', '[]')"
+    ), params)
+    conn.execute(text(
+        "INSERT INTO form_submissions (form_template_id, booking_id, contact_id, workspace_id, status, data) "
+        "SELECT ft.id, b.id, b.contact_id, :ws, "
+        "       (ARRAY['pending','in_progress','completed','overdue'])[1 + row_number() OVER () % 4], '{}' "
+        "FROM bookings b CROSS JOIN LATERAL "
+        "     (SELECT id FROM form_templates WHERE workspace_id = :ws LIMIT 1) ft "
+        "WHERE b.workspace_id = :ws"
+    ), params)
+    conn.execute(text(
+        "INSERT INTO inventory_items (workspace_id, name, quantity, low_stock_threshold, is_low_stock) "
+        "SELECT :ws, 'Item ' || g, g % 20, 5, g % 20 <= 5 FROM generate_series(1, :rows) g"
+    ), params)
+    conn.execute(text(
+        "INSERT INTO alerts (workspace_id, alert_type, priority, title, message, is_resolved) "
+        "SELECT :ws, 'benchmark', (ARRAY['low','medium','high','critical'])[1 + g % 4], "
+        "       'Alert ' || g, 'Benchmark alert', g % 3 = 0 "
+        "FROM generate_series(1, :rows) g"
+    ), params)
+    conn.execute(text("ANALYZE conversations; ANALYZE form_submissions; ANALYZE inventory_items; ANALYZE alerts"))
+
+
+def python_counts(conn, workspace_id: str) -> dict:
+    """What the endpoint used to do: download rows, count in Python"""
+    now = datetime.now()
+    today = now.date()
+    params = {
+        "ws": workspace_id,
+        "today_start": datetime.combine(today, datetime.min.time()),
+        "today_end": datetime.combine(today, datetime.max.time()),
+        "now": now,
+        "upcoming_end": now + timedelta(days=7),
+    }
+    fetch = lambda sql: [dict(r._mapping) for r in conn.execute(text(sql), params)]  # noqa: E731
+
+    today_bookings = fetch(
+        "SELECT * FROM bookings WHERE workspace_id = :ws AND scheduled_at BETWEEN :today_start AND :today_end"
+    )
+    upcoming = fetch("SELECT * FROM bookings WHERE workspace_id = :ws AND scheduled_at BETWEEN :now AND :upcoming_end")
+    conversations = fetch("SELECT * FROM conversations WHERE workspace_id = :ws")
+    forms = fetch("SELECT status FROM form_submissions WHERE workspace_id = :ws")
+    inventory = fetch("SELECT * FROM inventory_items WHERE workspace_id = :ws")
+    alerts = fetch("SELECT * FROM alerts WHERE workspace_id = :ws AND is_resolved = FALSE")
+
+    return {
+        "today_count": len(today_bookings),
+        "upcoming_count": len(upcoming),
+        "new_inquiries": len(conversations),
+        "unanswered_messages": len([c for c in conversations if c["unread_count"] > 0]),
+        "pending_count": len([f for f in forms if f["status"] == "pending"]),
+        "low_stock_items": len([i for i in inventory if i["is_low_stock"]]),
+        "total_alerts": len(alerts),
+    }
+
+
+def sql_counts(conn, workspace_id: str) -> dict:
+    return conn.execute(text("SELECT dashboard_stats(:ws)"), {"ws": workspace_id}).scalar()
+
+
+def counter_read(conn, workspace_id: str) -> dict:
+    return conn.execute(text("SELECT get_workspace_counters(:ws)"), {"ws": workspace_id}).scalar()
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with connect() as conn, benchmark_workspace(conn) as workspace_id:
+        print(f"seeding {rows} rows per table...")
+        seed(conn, workspace_id, rows)
+
+        old, old_result = timed(lambda: python_counts(conn, workspace_id), repeat=3)
+        new, new_result = timed(lambda: sql_counts(conn, workspace_id), repeat=5)
+        counters, counters_result = timed(lambda: counter_read(conn, workspace_id), repeat=5)
+
+        assert old_result["total_alerts"] == new_result["total_alerts"] == counters_result["total_alerts"]
+        assert old_result["pending_count"] == new_result["forms"]["pending_count"]
+        assert new_result["forms"] == counters_result["forms"]
+
+        print(f"rows per table: {rows}")
+        print(f"download + count in Python: {old * 1000:9.1f} ms")
+        print(f"dashboard_stats():          {new * 1000:9.1f} ms  ({old / new:.1f}x)")
+        print(f"get_workspace_counters():   {counters * 1000:9.3f} ms  ({old / counters:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark reminder-style bulk email: one request per email vs send_batch
+
+Sends N reminder emails to a local stand-in for the Resend API (fixed
+simulated latency) through EmailService, first with send_email per
+recipient (up to `concurrency` in flight) and then with send_batch, and
+reports emails/s and how many HTTP requests each approach made.
+
+Usage:
+    python benchmarks/bench_email_batch.py [emails] [concurrency] [latency_ms]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for key in ("SECRET_KEY", "SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY"):
+    os.environ.setdefault(key, "http://localhost" if key == "SUPABASE_URL" else "benchmark")
+os.environ["COMMUNICATION_MODE"] = "local"
+
+from app.core.config import settings  # noqa: E402
+from app.services.communication.email_provider import EmailService  # noqa: E402
+from app.services.communication.http_client import close_http_client  # noqa: E402
+from app.services.communication.standin import serve  # noqa: E402
+
+
+def reminders(emails: int) -> list:
+    return [
+        {"to": f"user{i}@example.com", "subject": "Reminder: Consultation Tomorrow", "content": "<p>See you</p>"}
+        for i in range(emails)
+    ]
+
+
+async def send_individually(messages: list, concurrency: int) -> None:
+    service = EmailService()
+    limit = asyncio.Semaphore(concurrency)
+
+    async def send(message: dict) -> None:
+        async with limit:
+            await service.send_email(message["to"], message["subject"], message["content"])
+
+    try:
+        await asyncio.gather(*(send(m) for m in messages))
+    finally:
+        await close_http_client()
+
+
+async def send_batched(messages: list) -> None:
+    try:
+        results = await EmailService().send_batch(messages)
+        assert all(r["success"] for r in results)
+    finally:
+        await close_http_client()
+
+
+def main() -> None:
+    emails = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000
+    messages = reminders(emails)
+
+    with serve(latency=latency) as standin:
+        settings.LOCAL_PROVIDER_URL = standin["url"]
+        stats = standin["stats"]
+
+        start = time.perf_counter()
+        asyncio.run(send_individually(messages, concurrency))
+        individual = time.perf_counter() - start
+        individual_requests = stats.requests
+
+        stats.requests = 0
+        start = time.perf_counter()
+        asyncio.run(send_batched(messages))
+        batched = time.perf_counter() - start
+
+        print(f"emails: {emails}, simulated provider latency: {latency * 1000:.0f} ms")
+        print(
+            f"send_email each: {emails / individual:9.1f} emails/s, {individual_requests} requests "
+            f"(concurrency {concurrency})"
+        )
+        print(
+            f"send_batch:      {emails / batched:9.1f} emails/s, {stats.requests} requests "
+            f"({individual / batched:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
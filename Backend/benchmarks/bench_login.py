@@ -0,0 +1,117 @@
+"""Benchmark login throughput under concurrent load
+
+Fires concurrent /auth/login requests at the app in-process (Supabase is
+mocked) while a probe hits /health, comparing bcrypt inline on the event
+loop with bcrypt on the password hashing pool. The probe measures how long
+an unrelated request waits end to end, including time spent queued behind
+a blocked event loop.
+
+Usage:
+    python benchmarks/bench_login.py [logins] [concurrency]
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for key in ("SECRET_KEY", "SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY"):
+    os.environ.setdefault(key, "http://localhost" if key == "SUPABASE_URL" else "benchmark")
+os.environ.setdefault("BCRYPT_ROUNDS", "10")
+
+from httpx import AsyncClient, ASGITransport  # noqa: E402
+
+from app.core.security import hash_password, verify_password  # noqa: E402
+from app.db.supabase_client import get_supabase_service  # noqa: E402
+from app.main import app  # noqa: E402
+
+PASSWORD = "benchmark-password"
+
+
+async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+    """The old behaviour: bcrypt directly on the event loop"""
+    return verify_password(plain_password, hashed_password)
+
+
+def install_mock_supabase() -> None:
+    supabase = Mock()
+    supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = Mock(
+        data=[{
+            "id": "user-1",
+            "email": "owner@example.com",
+            "password_hash": hash_password(PASSWORD),
+            "role": "owner",
+            "workspace_id": "workspace-1",
+            "is_active": True,
+        }]
+    )
+    app.dependency_overrides[get_supabase_service] = lambda: supabase
+
+
+async def run(logins: int, concurrency: int) -> dict:
+    transport = ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    probe_latencies = []
+    done = asyncio.Event()
+
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def login() -> None:
+            async with semaphore:
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    json={"email": "owner@example.com", "password": PASSWORD},
+                )
+                assert response.status_code == 200, response.text
+
+        async def probe() -> None:
+            interval = 0.01
+            while not done.is_set():
+                # Latency is measured from when the probe should have fired
+                scheduled = time.perf_counter() + interval
+                await asyncio.sleep(interval)
+                await client.get("/health")
+                probe_latencies.append(time.perf_counter() - scheduled)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    return {
+        "throughput": logins / elapsed,
+        "probe_p50": statistics.median(probe_latencies) * 1000,
+        "probe_max": max(probe_latencies) * 1000,
+    }
+
+
+def report(label: str, result: dict) -> None:
+    print(
+        f"{label:<8} {result['throughput']:7.1f} logins/s   "
+        f"/health p50 {result['probe_p50']:7.1f} ms   max {result['probe_max']:7.1f} ms"
+    )
+
+
+def main() -> None:
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    install_mock_supabase()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    print(f"logins: {logins}  concurrency: {concurrency}  cpus: {os.cpu_count()}  "
+          f"bcrypt rounds: {os.environ['BCRYPT_ROUNDS']}")
+
+    with patch("app.api.v1.endpoints.auth.verify_password_async", verify_inline):
+        report("inline", asyncio.run(run(logins, concurrency)))
+
+    report("pool", asyncio.run(run(logins, concurrency)))
+
+
+if __name__ == "__main__":
+    main()
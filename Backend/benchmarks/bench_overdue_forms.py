@@ -0,0 +1,110 @@
+"""Benchmark overdue form detection: per-row round-trips vs mark_overdue_forms()
+
+Seeds a workspace with N form submissions, a quarter of them pending and
+past due, then compares the old task (fetch every pending submission older
+than 48 hours, then one UPDATE and one alert INSERT per row) against
+draining mark_overdue_forms() pages. Each side starts from the same seeded
+state; a second mark_overdue_forms() run checks that no alert is duplicated.
+
+Requires DATABASE_URL pointing at a database with migrations/ applied.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/bench_overdue_forms.py [rows]
+"""
+import sys
+import time
+
+from _pg import benchmark_workspace, connect, seed_contacts_and_bookings
+from sqlalchemy import text
+
+PAGE = 1000
+
+
+def seed(conn, workspace_id: str, rows: int) -> None:
+    seed_contacts_and_bookings(conn, workspace_id, rows)
+    params = {"ws": workspace_id}
+    conn.execute(text(
+        "INSERT INTO form_templates (workspace_id, name, fields) VALUES (:ws, 'Benchmark', '[]')"
+    ), params)
+    conn.execute(text(
+        "INSERT INTO form_submissions (form_template_id, booking_id, contact_id, workspace_id, status, data, created_at, due_at) "
+        "SELECT ft.id, b.id, b.contact_id, :ws, "
+        "       (ARRAY['pending','in_progress','completed','pending'])[1 + n % 4], '{}', "
+        "       NOW() - (n % 96) * INTERVAL '1 hour', NOW() - (n % 96) * INTERVAL '1 hour' + INTERVAL '48 hours' "
+        "FROM (SELECT b.*, row_number() OVER () AS n FROM bookings b WHERE b.workspace_id = :ws) b "
+        "CROSS JOIN LATERAL (SELECT id FROM form_templates WHERE workspace_id = :ws LIMIT 1) ft"
+    ), params)
+    conn.execute(text("ANALYZE form_submissions"))
+
+
+def reset(conn, workspace_id: str) -> None:
+    """Undo a run: back to pending, alerts removed"""
+    params = {"ws": workspace_id}
+    conn.execute(text("DELETE FROM alerts WHERE workspace_id = :ws AND alert_type = 'overdue_form'"), params)
+    conn.execute(text("UPDATE form_submissions SET status = 'pending' WHERE workspace_id = :ws AND status = 'overdue'"), params)
+
+
+def per_row(conn, workspace_id: str) -> int:
+    """What the task used to do"""
+    forms = conn.execute(text(
+        "SELECT * FROM form_submissions WHERE status = 'pending' AND created_at < NOW() - INTERVAL '48 hours'"
+    )).mappings().all()
+    for form in forms:
+        conn.execute(text("UPDATE form_submissions SET status = 'overdue' WHERE id = :id"), {"id": form["id"]})
+        conn.execute(text(
+            "INSERT INTO alerts (workspace_id, alert_type, priority, title, message, metadata) "
+            "VALUES (:ws, 'overdue_form', 'medium', 'Form Overdue', :message, "
+            "        jsonb_build_object('form_id', CAST(:id AS TEXT), 'booking_id', CAST(:booking AS TEXT)))"
+        ), {
+            "ws": form["workspace_id"], "id": str(form["id"]), "booking": str(form["booking_id"]),
+            "message": f"Form submission {form['id']} is overdue",
+        })
+    return len(forms)
+
+
+def set_based(conn) -> int:
+    marked = 0
+    while True:
+        rows = conn.execute(text("SELECT * FROM mark_overdue_forms(:limit)"), {"limit": PAGE}).fetchall()
+        marked += len(rows)
+        if len(rows) < PAGE:
+            return marked
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with connect() as conn, benchmark_workspace(conn) as workspace_id:
+        print(f"seeding {rows} form submissions...")
+        seed(conn, workspace_id, rows)
+
+        start = time.perf_counter()
+        old_marked = per_row(conn, workspace_id)
+        old = time.perf_counter() - start
+        reset(conn, workspace_id)
+
+        start = time.perf_counter()
+        new_marked = set_based(conn)
+        new = time.perf_counter() - start
+
+        conn.execute(text(
+            "UPDATE form_submissions SET status = 'pending' WHERE workspace_id = :ws AND status = 'overdue'"
+        ), {"ws": workspace_id})
+        set_based(conn)
+        alerts = conn.execute(text(
+            "SELECT count(*), count(DISTINCT metadata->>'form_id') FROM alerts "
+            "WHERE workspace_id = :ws AND alert_type = 'overdue_form'"
+        ), {"ws": workspace_id}).one()
+        reset(conn, workspace_id)
+
+        assert old_marked == new_marked
+        assert alerts[0] == alerts[1] == new_marked
+
+        print(f"overdue submissions: {new_marked}")
+        print(f"per-row UPDATE + INSERT:  {old * 1000:9.1f} ms")
+        print(f"mark_overdue_forms():     {new * 1000:9.1f} ms  ({old / new:.1f}x)")
+        print(f"after a re-run: {alerts[0]} alerts for {alerts[1]} forms (no duplicates)")
+
+
+if __name__ == "__main__":
+    main()
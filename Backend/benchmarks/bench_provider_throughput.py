@@ -0,0 +1,89 @@
+"""Benchmark email send throughput through the provider HTTP layer
+
+Sends N emails to a local stand-in for the Resend API (fixed simulated
+latency) two ways:
+
+- per-call clients: a new blocking HTTP client for every send, one after
+  the other, which is what constructing EmailService and its SDK clients
+  inside each task amounted to
+- shared client: EmailService over the process-wide httpx.AsyncClient,
+  with up to `concurrency` sends in flight
+
+and reports sends/s and how many TCP connections the stand-in saw.
+
+Usage:
+    python benchmarks/bench_provider_throughput.py [emails] [concurrency] [latency_ms]
+"""
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for key in ("SECRET_KEY", "SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY"):
+    os.environ.setdefault(key, "http://localhost" if key == "SUPABASE_URL" else "benchmark")
+os.environ["COMMUNICATION_MODE"] = "local"
+
+from app.core.config import settings  # noqa: E402
+from app.services.communication.email_provider import EmailService  # noqa: E402
+from app.services.communication.http_client import close_http_client  # noqa: E402
+from app.services.communication.standin import serve  # noqa: E402
+
+
+def send_per_call(url: str, emails: int) -> None:
+    for i in range(emails):
+        with httpx.Client() as client:
+            response = client.post(
+                f"{url}/emails",
+                headers={"Authorization": "Bearer re_benchmark"},
+                json={"from": "a@example.com", "to": [f"user{i}@example.com"], "subject": "Hi", "html": "<p>Hi</p>"},
+            )
+            response.raise_for_status()
+
+
+async def send_shared(emails: int, concurrency: int) -> None:
+    service = EmailService()
+    limit = asyncio.Semaphore(concurrency)
+
+    async def send(i: int) -> None:
+        async with limit:
+            await service.send_email(f"user{i}@example.com", "Hi", "<p>Hi</p>")
+
+    try:
+        await asyncio.gather(*(send(i) for i in range(emails)))
+    finally:
+        await close_http_client()
+
+
+def main() -> None:
+    emails = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000
+
+    with serve(latency=latency) as standin:
+        settings.LOCAL_PROVIDER_URL = standin["url"]
+        stats = standin["stats"]
+
+        start = time.perf_counter()
+        send_per_call(standin["url"], emails)
+        per_call = time.perf_counter() - start
+        per_call_connections = len(stats.connections)
+
+        stats.connections.clear()
+        start = time.perf_counter()
+        asyncio.run(send_shared(emails, concurrency))
+        shared = time.perf_counter() - start
+
+        print(f"emails: {emails}, simulated provider latency: {latency * 1000:.0f} ms")
+        print(f"per-call clients: {emails / per_call:8.1f} sends/s, {per_call_connections} connections")
+        print(
+            f"shared client:    {emails / shared:8.1f} sends/s, {len(stats.connections)} connections "
+            f"(concurrency {concurrency}, {per_call / shared:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
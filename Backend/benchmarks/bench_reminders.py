@@ -0,0 +1,120 @@
+"""Benchmark the booking reminder scan: window re-read vs claimed pages
+
+Seeds a workspace with a day's worth of confirmed bookings (default
+100,000) spread over the next 24 hours, plus as many past, already reminded
+bookings, then compares:
+
+- the old task: every 30 minutes, read every confirmed booking in the next
+  24 hours with its contact, booking type and workspace embedded, and
+  remind all of them (so each booking is read and reminded ~48 times);
+- claim_due_reminders() pages of REMINDER_CHUNK_SIZE, each finished with
+  finish_reminders(), drained by several concurrent workers as the chunk
+  subtasks would be; every booking is claimed exactly once, and the next
+  run finds nothing to do.
+
+claim_due_reminders() is not workspace-scoped, so run this against a
+scratch database: it also claims any other due bookings there.
+
+Requires DATABASE_URL pointing at a database with migrations/ applied.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/bench_reminders.py [bookings_per_day] [workers]
+"""
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from _pg import benchmark_workspace, connect, get_connection_url, timed
+from sqlalchemy import create_engine, text
+
+RUNS_PER_DAY = 48
+CHUNK_SIZE = 500
+
+
+def seed(conn, workspace_id: str, rows: int) -> None:
+    params = {"ws": workspace_id, "rows": rows}
+    conn.execute(text(
+        "INSERT INTO contacts (workspace_id, name, email, phone) "
+        "SELECT :ws, 'Contact ' || g, 'contact' || g || '@example.com', '+1555' || lpad(g::text, 7, '0') "
+        "FROM generate_series(1, :rows) g"
+    ), params)
+    conn.execute(text(
+        "INSERT INTO booking_types (workspace_id, name, duration_minutes) VALUES (:ws, 'Benchmark', 30)"
+    ), params)
+    # Today's schedule, then yesterday's (already past and reminded)
+    conn.execute(text(
+        "INSERT INTO bookings (workspace_id, booking_type_id, contact_id, scheduled_at, status, reminder_sent_at) "
+        "SELECT :ws, bt.id, c.id, NOW() + day.shift + (row_number() OVER (PARTITION BY day.shift) * INTERVAL '86399 seconds') / :rows, "
+        "       'confirmed', CASE WHEN day.shift < INTERVAL '0' THEN NOW() - INTERVAL '1 day' END "
+        "FROM contacts c "
+        "CROSS JOIN (VALUES (INTERVAL '0'), (INTERVAL '-1 day')) AS day(shift) "
+        "CROSS JOIN LATERAL (SELECT id FROM booking_types WHERE workspace_id = :ws LIMIT 1) bt "
+        "WHERE c.workspace_id = :ws"
+    ), params)
+    conn.execute(text("ANALYZE contacts; ANALYZE bookings"))
+
+
+def window_scan(conn) -> int:
+    """What one run of the old task read"""
+    rows = conn.execute(text(
+        "SELECT b.*, to_jsonb(c) AS contacts, to_jsonb(bt) AS booking_types, to_jsonb(w) AS workspaces "
+        "FROM bookings b "
+        "JOIN contacts c ON c.id = b.contact_id "
+        "JOIN booking_types bt ON bt.id = b.booking_type_id "
+        "JOIN workspaces w ON w.id = b.workspace_id "
+        "WHERE b.scheduled_at >= NOW() AND b.scheduled_at <= NOW() + INTERVAL '24 hours' "
+        "AND b.status = 'confirmed'"
+    )).fetchall()
+    return len(rows)
+
+
+def drain(engine) -> list:
+    """One chunk worker: claim and finish pages until none are due"""
+    claimed = []
+    with engine.connect() as conn:
+        while True:
+            page = conn.execute(
+                text("SELECT id FROM claim_due_reminders(INTERVAL '24 hours', :limit)"), {"limit": CHUNK_SIZE}
+            ).scalars().all()
+            if not page:
+                return claimed
+            conn.execute(text("SELECT finish_reminders(CAST(:sent AS UUID[]))"), {"sent": [str(i) for i in page]})
+            claimed.extend(page)
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with connect() as conn, benchmark_workspace(conn) as workspace_id:
+        print(f"seeding {rows} upcoming and {rows} past bookings...")
+        seed(conn, workspace_id, rows)
+
+        scan, scanned = timed(lambda: window_scan(conn), repeat=3)
+
+        engine = create_engine(get_connection_url(), isolation_level="AUTOCOMMIT", pool_size=workers)
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(workers) as pool:
+                claimed = [i for ids in pool.map(lambda _: drain(engine), range(workers)) for i in ids]
+            claim = time.perf_counter() - start
+        finally:
+            engine.dispose()
+
+        duplicates = sum(n - 1 for n in Counter(claimed).values() if n > 1)
+        idle, leftover = timed(lambda: conn.execute(text("SELECT count(*) FROM claim_due_reminders()")).scalar())
+
+        print(f"bookings due in the next 24h: {rows}")
+        print("old task, one run (read whole window with embeds):")
+        print(f"  {scan * 1000:9.1f} ms, {scanned} rows read and reminded")
+        print(f"  per day ({RUNS_PER_DAY} runs): {scan * RUNS_PER_DAY:7.1f} s, "
+              f"{scanned * RUNS_PER_DAY} reminders ({RUNS_PER_DAY}x per booking)")
+        print(f"claimed pages ({workers} workers x {CHUNK_SIZE}/page):")
+        print(f"  drain all due: {claim * 1000:9.1f} ms, {len(claimed)} claimed, {duplicates} duplicates")
+        print(f"  next run:      {idle * 1000:9.3f} ms, {leftover} claimed")
+        print(f"  per day:       {len(claimed)} reminders (1x per booking)")
+
+
+if __name__ == "__main__":
+    main()
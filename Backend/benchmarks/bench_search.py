@@ -0,0 +1,113 @@
+"""Benchmark message and contact search: ILIKE scans vs indexed search
+
+Seeds a workspace with N messages (spread over N / 100 contacts and their
+conversations, random words from a small vocabulary plus a rare marker
+word), then compares an unindexed `content ILIKE '%term%'` scan against
+search_messages() for a common and a rare term, and a contact ILIKE scan
+with the trigram indexes disabled against search_contacts().
+
+Requires DATABASE_URL pointing at a database with migrations/ applied.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/bench_search.py [messages]
+"""
+import sys
+
+from _pg import benchmark_workspace, connect, timed
+from sqlalchemy import text
+
+WORDS = [
+    "appointment", "booking", "reschedule", "cancel", "invoice", "payment", "reminder",
+    "tomorrow", "morning", "afternoon", "thanks", "question", "insurance", "address",
+    "parking", "forms", "confirm", "available", "schedule", "follow",
+]
+RARE_WORD = "refund"
+
+
+def seed(conn, workspace_id: str, messages: int) -> None:
+    contacts = max(1, messages // 100)
+    params = {"ws": workspace_id, "contacts": contacts, "messages": messages, "words": WORDS}
+    conn.execute(text(
+        "INSERT INTO contacts (workspace_id, name, email, phone) "
+        "SELECT :ws, 'Contact ' || g || ' ' || md5(g::text), 'contact' || g || '@example.com', "
+        "       '555' || lpad(g::text, 7, '0') "
+        "FROM generate_series(1, :contacts) g"
+    ), params)
+    conn.execute(text(
+        "INSERT INTO conversations (workspace_id, contact_id) "
+        "SELECT :ws, id FROM contacts WHERE workspace_id = :ws"
+    ), params)
+    conn.execute(text(
+        "INSERT INTO messages (conversation_id, content, channel, message_type, sent_at) "
+        "SELECT conv.ids[1 + g % array_length(conv.ids, 1)], "
+        "       (SELECT string_agg((:words)[1 + ((g * 7 + w * 13) % 20)], ' ') FROM generate_series(1, 12) w) "
+        "       || CASE WHEN g % 10000 = 0 THEN ' " + RARE_WORD + "' ELSE '' END, "
+        "       (ARRAY['email','sms'])[1 + g % 2], 'automated', "
+        "       NOW() - g * INTERVAL '1 second' "
+        "FROM generate_series(1, :messages) g, "
+        "     (SELECT array_agg(id) AS ids FROM conversations WHERE workspace_id = :ws) conv"
+    ), params)
+    conn.execute(text("ANALYZE contacts; ANALYZE conversations; ANALYZE messages"))
+
+
+def scan_messages(conn, workspace_id: str, term: str) -> list:
+    """What staff had without search: an unindexed substring scan"""
+    return conn.execute(text(
+        "SELECT m.id FROM messages m JOIN conversations c ON c.id = m.conversation_id "
+        "WHERE c.workspace_id = :ws AND m.content ILIKE :pattern "
+        "ORDER BY m.sent_at DESC LIMIT 20"
+    ), {"ws": workspace_id, "pattern": f"%{term}%"}).fetchall()
+
+
+def search_messages(conn, workspace_id: str, term: str) -> list:
+    return conn.execute(
+        text("SELECT id FROM search_messages(:ws, :q, 20)"), {"ws": workspace_id, "q": term}
+    ).fetchall()
+
+
+def scan_contacts(conn, workspace_id: str, term: str) -> list:
+    """Substring match with the trigram indexes unusable"""
+    conn.execute(text("SET enable_bitmapscan = off"))
+    try:
+        return conn.execute(text(
+            "SELECT id FROM contacts WHERE workspace_id = :ws "
+            "AND (name ILIKE :pattern OR email ILIKE :pattern OR phone ILIKE :pattern) LIMIT 20"
+        ), {"ws": workspace_id, "pattern": f"%{term}%"}).fetchall()
+    finally:
+        conn.execute(text("RESET enable_bitmapscan"))
+
+
+def search_contacts(conn, workspace_id: str, term: str) -> list:
+    return conn.execute(
+        text("SELECT id FROM search_contacts(:ws, :q, 20)"), {"ws": workspace_id, "q": term}
+    ).fetchall()
+
+
+def main() -> None:
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with connect() as conn, benchmark_workspace(conn) as workspace_id:
+        print(f"seeding {messages} messages...")
+        seed(conn, workspace_id, messages)
+
+        print(f"messages: {messages}, contacts: {max(1, messages // 100)}")
+        for label, term in (("common", "insurance"), ("rare", RARE_WORD)):
+            scan, scan_rows = timed(lambda: scan_messages(conn, workspace_id, term), repeat=3)
+            search, search_rows = timed(lambda: search_messages(conn, workspace_id, term), repeat=5)
+            assert len(scan_rows) == len(search_rows)
+            print(
+                f"messages, {label:6} term: ILIKE scan {scan * 1000:9.1f} ms | "
+                f"search_messages() {search * 1000:8.1f} ms ({scan / search:.1f}x)"
+            )
+
+        term = "5550001"
+        scan, _ = timed(lambda: scan_contacts(conn, workspace_id, term), repeat=3)
+        search, _ = timed(lambda: search_contacts(conn, workspace_id, term), repeat=5)
+        print(
+            f"contacts, phone fragment:  ILIKE scan {scan * 1000:9.1f} ms | "
+            f"search_contacts() {search * 1000:8.1f} ms ({scan / search:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
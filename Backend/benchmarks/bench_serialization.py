@@ -0,0 +1,95 @@
+"""Benchmark list response serialization
+
+Compares the default FastAPI path (model instances -> response_model
+revalidation -> jsonable_encoder -> json.dumps) with the orjson /
+pydantic-core path used by list endpoints.
+
+Usage:
+    python benchmarks/bench_serialization.py [rows]
+"""
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for key in ("SECRET_KEY", "SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY"):
+    os.environ.setdefault(key, "http://localhost" if key == "SUPABASE_URL" else "benchmark")
+
+from fastapi._compat import ModelField  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from pydantic.fields import FieldInfo  # noqa: E402
+
+from app.core.responses import model_list_response  # noqa: E402
+from app.schemas.booking import BookingResponse  # noqa: E402
+
+_response_field = ModelField(
+    name="Response",
+    field_info=FieldInfo(annotation=List[BookingResponse]),
+    mode="serialization",
+)
+
+
+def make_rows(count: int) -> List[dict]:
+    """Rows shaped like a Supabase bookings select"""
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "workspace_id": "workspace-1",
+            "booking_type_id": str(uuid.uuid4()),
+            "contact_id": str(uuid.uuid4()),
+            "scheduled_at": (now + timedelta(minutes=i)).isoformat(),
+            "status": "confirmed",
+            "notes": f"Booking note {i}" if i % 3 else None,
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def default_path(rows: List[dict]) -> bytes:
+    """What FastAPI does for `return [Model(**row) ...]` with a response_model"""
+    models = [BookingResponse(**row) for row in rows]
+    value, _ = _response_field.validate(models, {}, loc=("response",))
+    content = jsonable_encoder(_response_field.serialize(value, mode="json"))
+    return JSONResponse(content).body
+
+
+def fast_path(rows: List[dict]) -> bytes:
+    """Validate once and dump with pydantic-core"""
+    return model_list_response(rows, BookingResponse).body
+
+
+def timed(fn, rows: List[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rows = make_rows(count)
+
+    assert TypeAdapter(list).validate_json(fast_path(rows)) == TypeAdapter(list).validate_json(default_path(rows))
+
+    default = timed(default_path, rows, repeat=5)
+    fast = timed(fast_path, rows, repeat=5)
+
+    print(f"rows: {count}")
+    print(f"default (jsonable_encoder + json): {default * 1000:8.1f} ms")
+    print(f"fast (pydantic-core dump_json):   {fast * 1000:8.1f} ms")
+    print(f"speedup: {default / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark idle dashboard streams held by one process
+
+Opens N dashboard streams spread over a number of workspaces and measures
+the memory they hold while idle, then the time for one counters event to
+reach every stream of a workspace (counters read once via the shared
+snapshot, delta encoded per stream). Events are injected with
+RealtimeHub.dispatch, i.e. what the Redis reader does for each message, so
+no Redis server is needed.
+
+Usage:
+    python benchmarks/bench_sse_connections.py [connections] [workspaces]
+"""
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for key in ("SECRET_KEY", "SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY"):
+    os.environ.setdefault(key, "http://localhost" if key == "SUPABASE_URL" else "benchmark")
+
+from app.core.realtime import COUNTERS_CHANGED, workspace_channel  # noqa: E402
+from app.services import dashboard_service  # noqa: E402
+from app.services.dashboard_service import DashboardService  # noqa: E402
+
+
+def counters(total_alerts: int) -> dict:
+    return {
+        "bookings": {"today_count": 4, "upcoming_count": 12, "completed_count": 1, "no_show_count": 1},
+        "leads": {"new_inquiries": 30, "ongoing_conversations": 25, "unanswered_messages": 7},
+        "forms": {"pending_count": 5, "overdue_count": 2, "completed_count": 40},
+        "inventory": {"low_stock_items": 3, "critical_items": 1},
+        "total_alerts": total_alerts,
+        "critical_alerts": 2,
+    }
+
+
+def fake_supabase() -> Mock:
+    """Client whose counters RPC returns a new alert count on every call"""
+    calls = {"n": 0}
+
+    def execute():
+        calls["n"] += 1
+        return Mock(data=counters(calls["n"]))
+
+    supabase = Mock()
+    supabase.rpc.return_value.execute.side_effect = execute
+    return supabase
+
+
+async def run(connections: int, workspaces: int) -> None:
+    hub = dashboard_service.hub
+    hub._ensure_reader = lambda: None
+    supabase = fake_supabase()
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    streams = [
+        DashboardService(supabase).stream_events(f"ws-{i % workspaces}", heartbeat=3600)
+        for i in range(connections)
+    ]
+    await asyncio.gather(*(stream.__anext__() for stream in streams))
+
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    target = [stream for i, stream in enumerate(streams) if i % workspaces == 0]
+    reads_before = supabase.rpc.call_count
+    start = time.perf_counter()
+    hub.dispatch(workspace_channel("ws-0"), {"type": COUNTERS_CHANGED})
+    await asyncio.gather(*(stream.__anext__() for stream in target))
+    fan_out = time.perf_counter() - start
+
+    print(f"connections: {connections} over {workspaces} workspaces")
+    print(f"idle memory: {held / 1024 / 1024:.1f} MiB total, {held / connections / 1024:.1f} KiB/stream")
+    print(f"hub: {hub.stats()}")
+    print(
+        f"fan-out to {len(target)} streams: {fan_out * 1000:.1f} ms, "
+        f"counter reads: {supabase.rpc.call_count - reads_before}"
+    )
+
+    for stream in streams:
+        await stream.aclose()
+
+
+def main() -> None:
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    workspaces = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    asyncio.run(run(connections, workspaces))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark notification rendering for a bulk reminder run
+
+Renders N reminder emails (subject and HTML body) and SMS bodies:
+
+- compile per render: a fresh Jinja environment for every render, i.e.
+  parsing and compiling the template each time
+- cached: the process-wide environment from
+  app.services.communication.templates, compiled once
+- cold start: the first render in a new process (a new environment), with
+  and without the on-disk bytecode cache
+
+Usage:
+    python benchmarks/bench_template_render.py [reminders]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for key in ("SECRET_KEY", "SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY"):
+    os.environ.setdefault(key, "http://localhost" if key == "SUPABASE_URL" else "benchmark")
+
+from jinja2 import FileSystemBytecodeCache, FileSystemLoader  # noqa: E402
+from jinja2.sandbox import SandboxedEnvironment  # noqa: E402
+
+from app.services.communication import templates  # noqa: E402
+
+NAMES = ("booking_reminder.subject.txt", "booking_reminder.html", "booking_reminder.txt")
+
+
+def contexts(reminders: int) -> list:
+    return [
+        {"contact_name": f"Client {i}", "service": "Consultation", "scheduled_at": f"2026-10-20T{9 + i % 8:02d}:30:00"}
+        for i in range(reminders)
+    ]
+
+
+def new_environment(bytecode_cache=None) -> SandboxedEnvironment:
+    environment = SandboxedEnvironment(
+        loader=FileSystemLoader(templates.TEMPLATE_DIR), autoescape=True, bytecode_cache=bytecode_cache
+    )
+    environment.filters["datetime"] = templates.format_datetime
+    environment.filters["time"] = templates.format_time
+    return environment
+
+
+def render_compiling(batch: list) -> None:
+    for context in batch:
+        for name in NAMES:
+            new_environment().get_template(name).render(context)
+
+
+def render_cached(batch: list) -> None:
+    for context in batch:
+        templates.render_email("booking_reminder", context)
+        templates.render_sms("booking_reminder", context)
+
+
+def cold_start(bytecode_cache) -> float:
+    start = time.perf_counter()
+    environment = new_environment(bytecode_cache)
+    for name in NAMES:
+        environment.get_template(name).render(contexts(1)[0])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    reminders = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    batch = contexts(reminders)
+
+    compiling_batch = batch[: max(1, reminders // 10)]
+    start = time.perf_counter()
+    render_compiling(compiling_batch)
+    compiling = (time.perf_counter() - start) / len(compiling_batch)
+
+    render_cached(batch[:1])
+    start = time.perf_counter()
+    render_cached(batch)
+    cached = (time.perf_counter() - start) / reminders
+
+    with tempfile.TemporaryDirectory() as directory:
+        bytecode_cache = FileSystemBytecodeCache(directory)
+        cold_start(bytecode_cache)
+        without_cache = min(cold_start(None) for _ in range(5))
+        with_cache = min(cold_start(bytecode_cache) for _ in range(5))
+
+    print(f"reminders: {reminders} (email subject + body, SMS body each)")
+    print(f"compile per render: {1 / compiling:9.0f} reminders/s")
+    print(f"cached templates:   {1 / cached:9.0f} reminders/s ({compiling / cached:.0f}x)")
+    print(
+        f"cold start:         {without_cache * 1000:6.2f} ms without bytecode cache, "
+        f"{with_cache * 1000:6.2f} ms with it"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+-- Migration: Single-statement contact upsert on (workspace_id, lower(email))
+-- Replaces the select -> insert/update -> conversation insert sequence used by
+-- the public booking and contact form paths with one RPC round-trip.
+
+-- Step 1: Columns already written by the public endpoints
+ALTER TABLE contacts
+ADD COLUMN IF NOT EXISTS source VARCHAR(50),
+ADD COLUMN IF NOT EXISTS source_url TEXT,
+ADD COLUMN IF NOT EXISTS message TEXT;
+
+-- Step 2: Merge existing duplicates so the unique index can be built.
+-- The oldest contact per (workspace_id, lower(email)) is kept and related rows
+-- are re-pointed to it before the duplicates are removed.
+CREATE TEMP TABLE contact_duplicates AS
+SELECT id AS duplicate_id, keep_id
+FROM (
+    SELECT
+        id,
+        FIRST_VALUE(id) OVER (
+            PARTITION BY workspace_id, lower(email)
+            ORDER BY created_at, id
+        ) AS keep_id
+    FROM contacts
+    WHERE email IS NOT NULL
+) ranked
+WHERE id <> keep_id;
+
+UPDATE bookings b SET contact_id = d.keep_id
+FROM contact_duplicates d WHERE b.contact_id = d.duplicate_id;
+
+UPDATE conversations c SET contact_id = d.keep_id
+FROM contact_duplicates d WHERE c.contact_id = d.duplicate_id;
+
+UPDATE form_submissions f SET contact_id = d.keep_id
+FROM contact_duplicates d WHERE f.contact_id = d.duplicate_id;
+
+DELETE FROM contacts c
+USING contact_duplicates d WHERE c.id = d.duplicate_id;
+
+DROP TABLE contact_duplicates;
+
+-- Step 3: Unique index used as the upsert conflict target
+CREATE UNIQUE INDEX IF NOT EXISTS idx_contacts_workspace_email_unique
+ON contacts(workspace_id, lower(email))
+WHERE email IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_conversations_contact ON conversations(contact_id);
+
+-- Step 4: Upsert function
+-- Returns the contact row plus "created" (true when the row was inserted).
+-- When p_ensure_conversation is set, a conversation is created for the contact
+-- if it does not have one yet, in the same transaction.
+CREATE OR REPLACE FUNCTION upsert_contact(
+    p_workspace_id UUID,
+    p_name TEXT,
+    p_email TEXT DEFAULT NULL,
+    p_phone TEXT DEFAULT NULL,
+    p_source TEXT DEFAULT NULL,
+    p_source_url TEXT DEFAULT NULL,
+    p_message TEXT DEFAULT NULL,
+    p_ensure_conversation BOOLEAN DEFAULT FALSE,
+    p_unread_count INTEGER DEFAULT 0
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_contact contacts%ROWTYPE;
+    v_created BOOLEAN;
+BEGIN
+    IF p_email IS NULL OR p_email = '' THEN
+        INSERT INTO contacts (workspace_id, name, email, phone, source, source_url, message)
+        VALUES (p_workspace_id, p_name, NULL, p_phone, p_source, p_source_url, p_message)
+        RETURNING * INTO v_contact;
+        v_created := TRUE;
+    ELSE
+        INSERT INTO contacts (workspace_id, name, email, phone, source, source_url, message)
+        VALUES (p_workspace_id, p_name, p_email, p_phone, p_source, p_source_url, p_message)
+        ON CONFLICT (workspace_id, lower(email)) WHERE email IS NOT NULL
+        DO UPDATE SET
+            name = COALESCE(NULLIF(EXCLUDED.name, ''), contacts.name),
+            phone = COALESCE(NULLIF(EXCLUDED.phone, ''), contacts.phone),
+            message = COALESCE(EXCLUDED.message, contacts.message),
+            updated_at = NOW()
+        RETURNING * INTO v_contact;
+        -- xmax is 0 for freshly inserted tuples and non-zero for updated ones
+        SELECT xmax = 0 INTO v_created FROM contacts WHERE id = v_contact.id;
+    END IF;
+
+    IF p_ensure_conversation AND NOT EXISTS (
+        SELECT 1 FROM conversations WHERE contact_id = v_contact.id
+    ) THEN
+        INSERT INTO conversations (workspace_id, contact_id, unread_count)
+        VALUES (p_workspace_id, v_contact.id, p_unread_count);
+    END IF;
+
+    RETURN jsonb_build_object(
+        'contact', to_jsonb(v_contact),
+        'created', v_created
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION upsert_contact(UUID, TEXT, TEXT, TEXT, TEXT, TEXT, TEXT, BOOLEAN, INTEGER) TO anon, authenticated;
+
+-- Verification
+SELECT 'Migration 007 completed successfully' AS status;
@@ -0,0 +1,10 @@
+-- Migration: Signed access tokens for public form links
+-- Tokens are HMAC-signed by the API (submission_id, workspace_id, expiry) and
+-- verified without a database lookup; the column keeps the issued token for
+-- reference when links need to be re-sent.
+
+ALTER TABLE form_submissions
+ADD COLUMN IF NOT EXISTS access_token TEXT;
+
+-- Verification
+SELECT 'Migration 008 completed successfully' AS status;
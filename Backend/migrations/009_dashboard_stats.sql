@@ -0,0 +1,80 @@
+-- Migration: Aggregate dashboard statistics in one round-trip
+-- The dashboard endpoint used to download every conversation, form
+-- submission, inventory item and unresolved alert for the workspace and count
+-- them in Python. dashboard_stats() returns all counters from grouped
+-- aggregates instead.
+
+-- Step 1: Composite indexes so every aggregate is a workspace-scoped index scan
+CREATE INDEX IF NOT EXISTS idx_bookings_workspace_scheduled
+    ON bookings(workspace_id, scheduled_at);
+CREATE INDEX IF NOT EXISTS idx_form_submissions_workspace_status
+    ON form_submissions(workspace_id, status);
+CREATE INDEX IF NOT EXISTS idx_alerts_workspace_unresolved
+    ON alerts(workspace_id, priority) WHERE is_resolved = FALSE;
+
+-- Step 2: Counters function
+-- Time bounds are parameters so callers keep control of what "today" means;
+-- the defaults use the database clock.
+CREATE OR REPLACE FUNCTION dashboard_stats(
+    p_workspace_id UUID,
+    p_now TIMESTAMPTZ DEFAULT NOW(),
+    p_today_start TIMESTAMPTZ DEFAULT date_trunc('day', NOW()),
+    p_today_end TIMESTAMPTZ DEFAULT date_trunc('day', NOW()) + INTERVAL '1 day' - INTERVAL '1 microsecond',
+    p_upcoming_end TIMESTAMPTZ DEFAULT NOW() + INTERVAL '7 days'
+)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'bookings', (
+            SELECT jsonb_build_object(
+                'today_count', COUNT(*) FILTER (WHERE scheduled_at BETWEEN p_today_start AND p_today_end),
+                'upcoming_count', COUNT(*) FILTER (WHERE scheduled_at BETWEEN p_now AND p_upcoming_end),
+                'completed_count', COUNT(*) FILTER (
+                    WHERE scheduled_at BETWEEN p_today_start AND p_today_end AND status = 'completed'
+                ),
+                'no_show_count', COUNT(*) FILTER (
+                    WHERE scheduled_at BETWEEN p_today_start AND p_today_end AND status = 'no_show'
+                )
+            )
+            FROM bookings
+            WHERE workspace_id = p_workspace_id
+              AND scheduled_at BETWEEN LEAST(p_today_start, p_now) AND GREATEST(p_today_end, p_upcoming_end)
+        ),
+        'leads', (
+            SELECT jsonb_build_object(
+                'new_inquiries', COUNT(*),
+                'ongoing_conversations', COUNT(*) FILTER (WHERE NOT COALESCE(is_automated_paused, FALSE)),
+                'unanswered_messages', COUNT(*) FILTER (WHERE COALESCE(unread_count, 0) > 0)
+            )
+            FROM conversations
+            WHERE workspace_id = p_workspace_id
+        ),
+        'forms', (
+            SELECT jsonb_build_object(
+                'pending_count', COUNT(*) FILTER (WHERE status = 'pending'),
+                'overdue_count', COUNT(*) FILTER (WHERE status = 'overdue'),
+                'completed_count', COUNT(*) FILTER (WHERE status = 'completed')
+            )
+            FROM form_submissions
+            WHERE workspace_id = p_workspace_id
+        ),
+        'inventory', (
+            SELECT jsonb_build_object(
+                'low_stock_items', COUNT(*) FILTER (WHERE is_low_stock),
+                'critical_items', COUNT(*) FILTER (WHERE quantity = 0)
+            )
+            FROM inventory_items
+            WHERE workspace_id = p_workspace_id
+        ),
+        'total_alerts', (
+            SELECT COUNT(*) FROM alerts
+            WHERE workspace_id = p_workspace_id AND is_resolved = FALSE
+        ),
+        'critical_alerts', (
+            SELECT COUNT(*) FROM alerts
+            WHERE workspace_id = p_workspace_id AND is_resolved = FALSE AND priority = 'critical'
+        )
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Verification
+SELECT 'Migration 009 completed successfully' AS status;
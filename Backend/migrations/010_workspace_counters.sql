@@ -0,0 +1,440 @@
+-- Migration: Incrementally maintained dashboard counters
+-- Triggers on bookings, conversations, form_submissions, inventory_items and
+-- alerts keep per-workspace counters current, so the dashboard reads one
+-- primary-key row (plus a short hourly booking range) instead of scanning
+-- tables. reconcile_workspace_counters() recomputes them from the source
+-- tables and runs periodically from Celery to repair any drift.
+
+-- Step 1: Counter tables
+CREATE TABLE IF NOT EXISTS workspace_counters (
+    workspace_id UUID PRIMARY KEY REFERENCES workspaces(id) ON DELETE CASCADE,
+    conversations_total INTEGER NOT NULL DEFAULT 0,
+    conversations_active INTEGER NOT NULL DEFAULT 0,
+    conversations_unanswered INTEGER NOT NULL DEFAULT 0,
+    forms_pending INTEGER NOT NULL DEFAULT 0,
+    forms_overdue INTEGER NOT NULL DEFAULT 0,
+    forms_completed INTEGER NOT NULL DEFAULT 0,
+    inventory_low_stock INTEGER NOT NULL DEFAULT 0,
+    inventory_critical INTEGER NOT NULL DEFAULT 0,
+    alerts_low INTEGER NOT NULL DEFAULT 0,
+    alerts_medium INTEGER NOT NULL DEFAULT 0,
+    alerts_high INTEGER NOT NULL DEFAULT 0,
+    alerts_critical INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    reconciled_at TIMESTAMP WITH TIME ZONE
+);
+
+-- "Today" and "upcoming" move with the clock, so bookings are counted per
+-- hour and summed over the requested window at read time.
+CREATE TABLE IF NOT EXISTS workspace_booking_counters (
+    workspace_id UUID NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE,
+    hour TIMESTAMP WITH TIME ZONE NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    no_show INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (workspace_id, hour)
+);
+
+-- Step 2: Delta helpers
+-- Only existing counter rows are updated: a workspace being deleted cascades
+-- to its rows before these triggers fire, and re-creating its counters would
+-- violate the foreign key. Missing rows are created by reconciliation.
+CREATE OR REPLACE FUNCTION bump_form_counters(p_workspace_id UUID, p_status TEXT, p_sign INTEGER)
+RETURNS VOID AS $$
+    UPDATE workspace_counters SET
+        forms_pending = forms_pending + p_sign * (p_status = 'pending')::int,
+        forms_overdue = forms_overdue + p_sign * (p_status = 'overdue')::int,
+        forms_completed = forms_completed + p_sign * (p_status = 'completed')::int,
+        updated_at = NOW()
+    WHERE workspace_id = p_workspace_id
+      AND p_status IN ('pending', 'overdue', 'completed');
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION bump_inventory_counters(
+    p_workspace_id UUID, p_is_low_stock BOOLEAN, p_quantity INTEGER, p_sign INTEGER
+)
+RETURNS VOID AS $$
+    UPDATE workspace_counters SET
+        inventory_low_stock = inventory_low_stock + p_sign * COALESCE(p_is_low_stock, FALSE)::int,
+        inventory_critical = inventory_critical + p_sign * (p_quantity = 0)::int,
+        updated_at = NOW()
+    WHERE workspace_id = p_workspace_id
+      AND (COALESCE(p_is_low_stock, FALSE) OR p_quantity = 0);
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION bump_alert_counters(
+    p_workspace_id UUID, p_priority TEXT, p_is_resolved BOOLEAN, p_sign INTEGER
+)
+RETURNS VOID AS $$
+    UPDATE workspace_counters SET
+        alerts_low = alerts_low + p_sign * (p_priority = 'low')::int,
+        alerts_medium = alerts_medium + p_sign * (p_priority = 'medium')::int,
+        alerts_high = alerts_high + p_sign * (p_priority = 'high')::int,
+        alerts_critical = alerts_critical + p_sign * (p_priority = 'critical')::int,
+        updated_at = NOW()
+    WHERE workspace_id = p_workspace_id
+      AND NOT COALESCE(p_is_resolved, FALSE);
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION bump_conversation_counters(
+    p_workspace_id UUID, p_is_automated_paused BOOLEAN, p_unread_count INTEGER, p_sign INTEGER
+)
+RETURNS VOID AS $$
+    UPDATE workspace_counters SET
+        conversations_total = conversations_total + p_sign,
+        conversations_active = conversations_active + p_sign * (NOT COALESCE(p_is_automated_paused, FALSE))::int,
+        conversations_unanswered = conversations_unanswered + p_sign * (COALESCE(p_unread_count, 0) > 0)::int,
+        updated_at = NOW()
+    WHERE workspace_id = p_workspace_id;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION bump_booking_counters(
+    p_workspace_id UUID, p_scheduled_at TIMESTAMPTZ, p_status TEXT, p_sign INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    IF p_sign > 0 THEN
+        INSERT INTO workspace_booking_counters AS c (workspace_id, hour, total, completed, no_show)
+        VALUES (
+            p_workspace_id,
+            date_trunc('hour', p_scheduled_at),
+            1,
+            (p_status = 'completed')::int,
+            (p_status = 'no_show')::int
+        )
+        ON CONFLICT (workspace_id, hour) DO UPDATE SET
+            total = c.total + EXCLUDED.total,
+            completed = c.completed + EXCLUDED.completed,
+            no_show = c.no_show + EXCLUDED.no_show;
+    ELSE
+        UPDATE workspace_booking_counters SET
+            total = total - 1,
+            completed = completed - (p_status = 'completed')::int,
+            no_show = no_show - (p_status = 'no_show')::int
+        WHERE workspace_id = p_workspace_id
+          AND hour = date_trunc('hour', p_scheduled_at);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Step 3: Triggers
+-- Updates that do not change a counted column return early, so hot paths
+-- such as message timestamps never touch the counter rows.
+CREATE OR REPLACE FUNCTION form_submissions_counters_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.workspace_id = NEW.workspace_id
+       AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_form_counters(OLD.workspace_id, OLD.status, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_form_counters(NEW.workspace_id, NEW.status, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION inventory_items_counters_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.workspace_id = NEW.workspace_id
+       AND OLD.is_low_stock IS NOT DISTINCT FROM NEW.is_low_stock
+       AND (OLD.quantity = 0) IS NOT DISTINCT FROM (NEW.quantity = 0) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_inventory_counters(OLD.workspace_id, OLD.is_low_stock, OLD.quantity, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_inventory_counters(NEW.workspace_id, NEW.is_low_stock, NEW.quantity, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION alerts_counters_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.workspace_id = NEW.workspace_id
+       AND OLD.priority IS NOT DISTINCT FROM NEW.priority
+       AND OLD.is_resolved IS NOT DISTINCT FROM NEW.is_resolved THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_alert_counters(OLD.workspace_id, OLD.priority, OLD.is_resolved, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_alert_counters(NEW.workspace_id, NEW.priority, NEW.is_resolved, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION conversations_counters_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.workspace_id = NEW.workspace_id
+       AND OLD.is_automated_paused IS NOT DISTINCT FROM NEW.is_automated_paused
+       AND (COALESCE(OLD.unread_count, 0) > 0) = (COALESCE(NEW.unread_count, 0) > 0) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_conversation_counters(OLD.workspace_id, OLD.is_automated_paused, OLD.unread_count, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_conversation_counters(NEW.workspace_id, NEW.is_automated_paused, NEW.unread_count, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bookings_counters_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.workspace_id = NEW.workspace_id
+       AND date_trunc('hour', OLD.scheduled_at) = date_trunc('hour', NEW.scheduled_at)
+       AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_booking_counters(OLD.workspace_id, OLD.scheduled_at, OLD.status, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_booking_counters(NEW.workspace_id, NEW.scheduled_at, NEW.status, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION workspaces_counters_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO workspace_counters (workspace_id) VALUES (NEW.id)
+    ON CONFLICT (workspace_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS form_submissions_counters ON form_submissions;
+CREATE TRIGGER form_submissions_counters
+    AFTER INSERT OR UPDATE OR DELETE ON form_submissions
+    FOR EACH ROW EXECUTE FUNCTION form_submissions_counters_trigger();
+
+DROP TRIGGER IF EXISTS inventory_items_counters ON inventory_items;
+CREATE TRIGGER inventory_items_counters
+    AFTER INSERT OR UPDATE OR DELETE ON inventory_items
+    FOR EACH ROW EXECUTE FUNCTION inventory_items_counters_trigger();
+
+DROP TRIGGER IF EXISTS alerts_counters ON alerts;
+CREATE TRIGGER alerts_counters
+    AFTER INSERT OR UPDATE OR DELETE ON alerts
+    FOR EACH ROW EXECUTE FUNCTION alerts_counters_trigger();
+
+DROP TRIGGER IF EXISTS conversations_counters ON conversations;
+CREATE TRIGGER conversations_counters
+    AFTER INSERT OR UPDATE OR DELETE ON conversations
+    FOR EACH ROW EXECUTE FUNCTION conversations_counters_trigger();
+
+DROP TRIGGER IF EXISTS bookings_counters ON bookings;
+CREATE TRIGGER bookings_counters
+    AFTER INSERT OR UPDATE OR DELETE ON bookings
+    FOR EACH ROW EXECUTE FUNCTION bookings_counters_trigger();
+
+DROP TRIGGER IF EXISTS workspaces_counters ON workspaces;
+CREATE TRIGGER workspaces_counters
+    AFTER INSERT ON workspaces
+    FOR EACH ROW EXECUTE FUNCTION workspaces_counters_trigger();
+
+-- Step 4: Reconciliation
+-- Recomputes one workspace's counters from the source tables. The counter
+-- tables are locked against concurrent trigger updates for the duration, so
+-- a write that commits mid-reconcile is neither lost nor counted twice.
+-- Booking buckets older than a day are dropped since no window reads them.
+-- Returns TRUE when the stored counters had drifted.
+CREATE OR REPLACE FUNCTION reconcile_workspace_counters(p_workspace_id UUID)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_before workspace_counters%ROWTYPE;
+    v_after workspace_counters%ROWTYPE;
+    v_bookings_drifted BOOLEAN;
+BEGIN
+    LOCK TABLE workspace_counters, workspace_booking_counters IN SHARE ROW EXCLUSIVE MODE;
+
+    SELECT * INTO v_before FROM workspace_counters WHERE workspace_id = p_workspace_id;
+
+    INSERT INTO workspace_counters AS wc (
+        workspace_id,
+        conversations_total, conversations_active, conversations_unanswered,
+        forms_pending, forms_overdue, forms_completed,
+        inventory_low_stock, inventory_critical,
+        alerts_low, alerts_medium, alerts_high, alerts_critical,
+        updated_at, reconciled_at
+    )
+    SELECT
+        p_workspace_id,
+        conv.total, conv.active, conv.unanswered,
+        forms.pending, forms.overdue, forms.completed,
+        inv.low_stock, inv.critical,
+        al.low, al.medium, al.high, al.critical,
+        NOW(), NOW()
+    FROM
+        (SELECT
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE NOT COALESCE(is_automated_paused, FALSE)) AS active,
+            COUNT(*) FILTER (WHERE COALESCE(unread_count, 0) > 0) AS unanswered
+         FROM conversations WHERE workspace_id = p_workspace_id) conv,
+        (SELECT
+            COUNT(*) FILTER (WHERE status = 'pending') AS pending,
+            COUNT(*) FILTER (WHERE status = 'overdue') AS overdue,
+            COUNT(*) FILTER (WHERE status = 'completed') AS completed
+         FROM form_submissions WHERE workspace_id = p_workspace_id) forms,
+        (SELECT
+            COUNT(*) FILTER (WHERE is_low_stock) AS low_stock,
+            COUNT(*) FILTER (WHERE quantity = 0) AS critical
+         FROM inventory_items WHERE workspace_id = p_workspace_id) inv,
+        (SELECT
+            COUNT(*) FILTER (WHERE priority = 'low') AS low,
+            COUNT(*) FILTER (WHERE priority = 'medium') AS medium,
+            COUNT(*) FILTER (WHERE priority = 'high') AS high,
+            COUNT(*) FILTER (WHERE priority = 'critical') AS critical
+         FROM alerts WHERE workspace_id = p_workspace_id AND is_resolved = FALSE) al
+    ON CONFLICT (workspace_id) DO UPDATE SET
+        conversations_total = EXCLUDED.conversations_total,
+        conversations_active = EXCLUDED.conversations_active,
+        conversations_unanswered = EXCLUDED.conversations_unanswered,
+        forms_pending = EXCLUDED.forms_pending,
+        forms_overdue = EXCLUDED.forms_overdue,
+        forms_completed = EXCLUDED.forms_completed,
+        inventory_low_stock = EXCLUDED.inventory_low_stock,
+        inventory_critical = EXCLUDED.inventory_critical,
+        alerts_low = EXCLUDED.alerts_low,
+        alerts_medium = EXCLUDED.alerts_medium,
+        alerts_high = EXCLUDED.alerts_high,
+        alerts_critical = EXCLUDED.alerts_critical,
+        updated_at = NOW(),
+        reconciled_at = NOW()
+    RETURNING * INTO v_after;
+
+    WITH actual AS (
+        SELECT
+            date_trunc('hour', scheduled_at) AS hour,
+            COUNT(*)::int AS total,
+            (COUNT(*) FILTER (WHERE status = 'completed'))::int AS completed,
+            (COUNT(*) FILTER (WHERE status = 'no_show'))::int AS no_show
+        FROM bookings
+        WHERE workspace_id = p_workspace_id
+          AND scheduled_at >= date_trunc('hour', NOW() - INTERVAL '1 day')
+        GROUP BY 1
+    ),
+    stored AS (
+        SELECT hour, total, completed, no_show
+        FROM workspace_booking_counters
+        WHERE workspace_id = p_workspace_id
+          AND hour >= date_trunc('hour', NOW() - INTERVAL '1 day')
+          AND total <> 0
+    )
+    SELECT EXISTS (
+        (SELECT * FROM actual EXCEPT SELECT * FROM stored)
+        UNION ALL
+        (SELECT * FROM stored EXCEPT SELECT * FROM actual)
+    ) INTO v_bookings_drifted;
+
+    DELETE FROM workspace_booking_counters WHERE workspace_id = p_workspace_id;
+
+    INSERT INTO workspace_booking_counters (workspace_id, hour, total, completed, no_show)
+    SELECT
+        p_workspace_id,
+        date_trunc('hour', scheduled_at),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE status = 'completed'),
+        COUNT(*) FILTER (WHERE status = 'no_show')
+    FROM bookings
+    WHERE workspace_id = p_workspace_id
+      AND scheduled_at >= date_trunc('hour', NOW() - INTERVAL '1 day')
+    GROUP BY 2;
+
+    RETURN v_bookings_drifted
+        OR v_before.workspace_id IS NULL
+        OR (v_before.conversations_total, v_before.conversations_active, v_before.conversations_unanswered,
+            v_before.forms_pending, v_before.forms_overdue, v_before.forms_completed,
+            v_before.inventory_low_stock, v_before.inventory_critical,
+            v_before.alerts_low, v_before.alerts_medium, v_before.alerts_high, v_before.alerts_critical)
+           IS DISTINCT FROM
+           (v_after.conversations_total, v_after.conversations_active, v_after.conversations_unanswered,
+            v_after.forms_pending, v_after.forms_overdue, v_after.forms_completed,
+            v_after.inventory_low_stock, v_after.inventory_critical,
+            v_after.alerts_low, v_after.alerts_medium, v_after.alerts_high, v_after.alerts_critical);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Step 5: Read function
+-- Same JSONB shape as dashboard_stats(). Falls back to it for a workspace
+-- whose counters have not been created yet.
+CREATE OR REPLACE FUNCTION get_workspace_counters(
+    p_workspace_id UUID,
+    p_now TIMESTAMPTZ DEFAULT NOW(),
+    p_today_start TIMESTAMPTZ DEFAULT date_trunc('day', NOW()),
+    p_today_end TIMESTAMPTZ DEFAULT date_trunc('day', NOW()) + INTERVAL '1 day' - INTERVAL '1 microsecond',
+    p_upcoming_end TIMESTAMPTZ DEFAULT NOW() + INTERVAL '7 days'
+)
+RETURNS JSONB AS $$
+DECLARE
+    c workspace_counters%ROWTYPE;
+    v_bookings JSONB;
+BEGIN
+    SELECT * INTO c FROM workspace_counters WHERE workspace_id = p_workspace_id;
+
+    IF NOT FOUND THEN
+        RETURN dashboard_stats(p_workspace_id, p_now, p_today_start, p_today_end, p_upcoming_end);
+    END IF;
+
+    -- Hour buckets: the windows are widened to whole hours
+    SELECT jsonb_build_object(
+        'today_count', COALESCE(SUM(total) FILTER (
+            WHERE hour BETWEEN date_trunc('hour', p_today_start) AND p_today_end), 0),
+        'upcoming_count', COALESCE(SUM(total) FILTER (
+            WHERE hour BETWEEN date_trunc('hour', p_now) AND p_upcoming_end), 0),
+        'completed_count', COALESCE(SUM(completed) FILTER (
+            WHERE hour BETWEEN date_trunc('hour', p_today_start) AND p_today_end), 0),
+        'no_show_count', COALESCE(SUM(no_show) FILTER (
+            WHERE hour BETWEEN date_trunc('hour', p_today_start) AND p_today_end), 0)
+    ) INTO v_bookings
+    FROM workspace_booking_counters
+    WHERE workspace_id = p_workspace_id
+      AND hour BETWEEN date_trunc('hour', LEAST(p_today_start, p_now)) AND GREATEST(p_today_end, p_upcoming_end);
+
+    RETURN jsonb_build_object(
+        'bookings', v_bookings,
+        'leads', jsonb_build_object(
+            'new_inquiries', c.conversations_total,
+            'ongoing_conversations', c.conversations_active,
+            'unanswered_messages', c.conversations_unanswered
+        ),
+        'forms', jsonb_build_object(
+            'pending_count', c.forms_pending,
+            'overdue_count', c.forms_overdue,
+            'completed_count', c.forms_completed
+        ),
+        'inventory', jsonb_build_object(
+            'low_stock_items', c.inventory_low_stock,
+            'critical_items', c.inventory_critical
+        ),
+        'total_alerts', c.alerts_low + c.alerts_medium + c.alerts_high + c.alerts_critical,
+        'critical_alerts', c.alerts_critical
+    );
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Step 6: Backfill existing workspaces
+SELECT reconcile_workspace_counters(id) FROM workspaces;
+
+-- Verification
+SELECT 'Migration 010 completed successfully' AS status;
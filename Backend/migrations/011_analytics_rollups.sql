@@ -0,0 +1,153 @@
+-- Migration: Hourly and daily rollups of analytics_events
+-- analytics_events is append-only and grows with every page view. A Celery
+-- beat job folds new events into per-workspace hourly and daily counts,
+-- resuming from a stored high-water mark, and the analytics endpoints read
+-- only the rollups.
+
+-- Step 1: Rollup tables
+-- Buckets are UTC hour/day starts. The primary keys serve the per-workspace
+-- range reads.
+CREATE TABLE IF NOT EXISTS analytics_hourly (
+    workspace_id UUID NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE,
+    event_type VARCHAR(100) NOT NULL,
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (workspace_id, event_type, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_daily (
+    workspace_id UUID NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE,
+    event_type VARCHAR(100) NOT NULL,
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (workspace_id, event_type, bucket)
+);
+
+-- Step 2: High-water mark
+-- Events with created_at below the mark have been rolled up.
+CREATE TABLE IF NOT EXISTS analytics_rollup_state (
+    name VARCHAR(50) PRIMARY KEY,
+    high_water_mark TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+INSERT INTO analytics_rollup_state (name) VALUES ('analytics_events')
+ON CONFLICT (name) DO NOTHING;
+
+-- Step 3: Incremental rollup
+-- Folds events in [mark, upper) into the rollups and advances the mark, all
+-- in one transaction. upper stays p_settle behind the clock so rows from
+-- transactions still in flight (created_at is their start time) are not
+-- skipped, and at most p_max_span is processed per call so the first run
+-- over a large table is done in slices. Concurrent runs serialize on the
+-- state row.
+CREATE OR REPLACE FUNCTION rollup_analytics_events(
+    p_settle INTERVAL DEFAULT INTERVAL '2 minutes',
+    p_max_span INTERVAL DEFAULT INTERVAL '1 day'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_limit TIMESTAMPTZ := NOW() - p_settle;
+    v_from TIMESTAMPTZ;
+    v_to TIMESTAMPTZ;
+    v_events BIGINT := 0;
+BEGIN
+    SELECT high_water_mark INTO v_from
+    FROM analytics_rollup_state
+    WHERE name = 'analytics_events'
+    FOR UPDATE;
+
+    IF v_from IS NULL THEN
+        SELECT COALESCE(date_trunc('hour', MIN(created_at)), v_limit) INTO v_from
+        FROM analytics_events;
+    END IF;
+
+    v_to := GREATEST(v_from, LEAST(v_limit, v_from + p_max_span));
+
+    IF v_to > v_from THEN
+        WITH new_counts AS (
+            SELECT workspace_id, event_type, date_trunc('hour', created_at) AS bucket, COUNT(*) AS event_count
+            FROM analytics_events
+            WHERE created_at >= v_from AND created_at < v_to
+            GROUP BY 1, 2, 3
+        ),
+        hourly AS (
+            INSERT INTO analytics_hourly (workspace_id, event_type, bucket, event_count)
+            SELECT workspace_id, event_type, bucket, event_count FROM new_counts
+            ON CONFLICT (workspace_id, event_type, bucket)
+            DO UPDATE SET event_count = analytics_hourly.event_count + EXCLUDED.event_count
+        ),
+        daily AS (
+            INSERT INTO analytics_daily (workspace_id, event_type, bucket, event_count)
+            SELECT workspace_id, event_type, date_trunc('day', bucket), SUM(event_count)
+            FROM new_counts
+            GROUP BY 1, 2, 3
+            ON CONFLICT (workspace_id, event_type, bucket)
+            DO UPDATE SET event_count = analytics_daily.event_count + EXCLUDED.event_count
+        )
+        SELECT COALESCE(SUM(event_count), 0) INTO v_events FROM new_counts;
+    END IF;
+
+    UPDATE analytics_rollup_state
+    SET high_water_mark = v_to, updated_at = NOW()
+    WHERE name = 'analytics_events';
+
+    RETURN jsonb_build_object(
+        'from', v_from,
+        'to', v_to,
+        'events', v_events,
+        'caught_up', v_to >= v_limit
+    );
+END;
+$$ LANGUAGE plpgsql SET timezone = 'UTC';
+
+-- Step 4: Readers
+-- Both return a single JSONB value so large ranges are not cut off by the
+-- API row limit.
+CREATE OR REPLACE FUNCTION analytics_timeseries(
+    p_workspace_id UUID,
+    p_granularity TEXT,
+    p_start TIMESTAMPTZ,
+    p_end TIMESTAMPTZ,
+    p_event_types TEXT[] DEFAULT NULL
+)
+RETURNS JSONB AS $$
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+        'bucket', bucket, 'event_type', event_type, 'count', event_count
+    ) ORDER BY bucket, event_type), '[]'::jsonb)
+    FROM (
+        SELECT bucket, event_type, event_count FROM analytics_hourly
+        WHERE p_granularity = 'hour'
+          AND workspace_id = p_workspace_id
+          AND bucket >= date_trunc('hour', p_start) AND bucket < p_end
+          AND (p_event_types IS NULL OR event_type = ANY(p_event_types))
+        UNION ALL
+        SELECT bucket, event_type, event_count FROM analytics_daily
+        WHERE p_granularity = 'day'
+          AND workspace_id = p_workspace_id
+          AND bucket >= date_trunc('day', p_start) AND bucket < p_end
+          AND (p_event_types IS NULL OR event_type = ANY(p_event_types))
+    ) counts;
+$$ LANGUAGE sql STABLE SET timezone = 'UTC';
+
+-- Totals per event type over whole hours in [p_start, p_end)
+CREATE OR REPLACE FUNCTION analytics_totals(
+    p_workspace_id UUID,
+    p_start TIMESTAMPTZ,
+    p_end TIMESTAMPTZ,
+    p_event_types TEXT[] DEFAULT NULL
+)
+RETURNS JSONB AS $$
+    SELECT COALESCE(jsonb_object_agg(event_type, total), '{}'::jsonb)
+    FROM (
+        SELECT event_type, SUM(event_count) AS total
+        FROM analytics_hourly
+        WHERE workspace_id = p_workspace_id
+          AND bucket >= date_trunc('hour', p_start) AND bucket < p_end
+          AND (p_event_types IS NULL OR event_type = ANY(p_event_types))
+        GROUP BY event_type
+    ) totals;
+$$ LANGUAGE sql STABLE SET timezone = 'UTC';
+
+-- Verification
+SELECT 'Migration 011 completed successfully' AS status;
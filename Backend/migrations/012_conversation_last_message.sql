@@ -0,0 +1,53 @@
+-- Migration: Denormalized last message on conversations
+-- The inbox list used to run one messages query per conversation to find
+-- its latest message. The preview and channel now live on the conversation
+-- row, kept current by a trigger on messages, so the list is a single
+-- indexed query ordered by last_message_at.
+
+-- Step 1: Columns
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS last_message_preview TEXT;
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS last_channel VARCHAR(50);
+
+-- Step 2: Keep them current
+-- Fires for every inserted message, whether sent from the API, by an
+-- automation or received from a provider. A message older than the current
+-- latest one (late delivery) does not replace it.
+CREATE OR REPLACE FUNCTION messages_last_message_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE conversations SET
+        last_message_at = NEW.sent_at,
+        last_message_preview = left(NEW.content, 100),
+        last_channel = NEW.channel
+    WHERE id = NEW.conversation_id
+      AND (last_channel IS NULL OR last_message_at <= NEW.sent_at);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS messages_last_message ON messages;
+CREATE TRIGGER messages_last_message
+    AFTER INSERT ON messages
+    FOR EACH ROW EXECUTE FUNCTION messages_last_message_trigger();
+
+-- Step 3: Backfill
+UPDATE conversations c SET
+    last_message_at = m.sent_at,
+    last_message_preview = left(m.content, 100),
+    last_channel = m.channel
+FROM (
+    SELECT DISTINCT ON (conversation_id) conversation_id, sent_at, content, channel
+    FROM messages
+    ORDER BY conversation_id, sent_at DESC
+) m
+WHERE c.id = m.conversation_id;
+
+UPDATE conversations SET last_message_at = created_at WHERE last_message_at IS NULL;
+ALTER TABLE conversations ALTER COLUMN last_message_at SET NOT NULL;
+
+-- Step 4: Inbox ordering and keyset pagination
+CREATE INDEX IF NOT EXISTS idx_conversations_workspace_last_message
+    ON conversations(workspace_id, last_message_at DESC, id DESC);
+
+-- Verification
+SELECT 'Migration 012 completed successfully' AS status;
@@ -0,0 +1,18 @@
+-- Migration: Composite index for cursor-paginated message history
+-- Message history pages on (sent_at, id) within a conversation in both
+-- directions ("load older" and "since"). One composite index serves both as
+-- a range scan and supersedes the single-column conversation index.
+
+-- Step 1: sent_at is part of the sort key, so it must not be NULL
+UPDATE messages SET sent_at = NOW() WHERE sent_at IS NULL;
+ALTER TABLE messages ALTER COLUMN sent_at SET NOT NULL;
+
+-- Step 2: Composite index
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_sent
+    ON messages(conversation_id, sent_at, id);
+
+-- Step 3: Drop the index it supersedes
+DROP INDEX IF EXISTS idx_messages_conversation;
+
+-- Verification
+SELECT 'Migration 013 completed successfully' AS status;
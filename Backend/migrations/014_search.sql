@@ -0,0 +1,129 @@
+-- Migration: Ranked search over messages and contacts
+-- Message content gets a stored tsvector with a GIN index for full-text
+-- search; contact name, email and phone get pg_trgm GIN indexes so substring
+-- and fuzzy matches ("jon" -> "Jonathan", "555 01") avoid a scan. Both
+-- searches are workspace-scoped RPCs returning one ranked page at a time.
+
+-- Step 1: Extensions
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Step 2: Message search vector
+-- A generated column keeps the vector in step with content without a
+-- trigger. Adding it rewrites the messages table once.
+ALTER TABLE messages
+ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', COALESCE(content, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_messages_search
+    ON messages USING GIN (search_vector);
+
+-- Step 3: Contact trigram indexes
+CREATE INDEX IF NOT EXISTS idx_contacts_name_trgm
+    ON contacts USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_contacts_email_trgm
+    ON contacts USING GIN (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_contacts_phone_trgm
+    ON contacts USING GIN (phone gin_trgm_ops);
+
+-- Step 4: Message search
+-- p_query uses web search syntax ("quoted phrases", -excluded, or). Results
+-- are ordered by (rank, id) descending; rank is rounded so it round-trips
+-- exactly through a cursor, and the next page is requested with the last
+-- row's (rank, id). Snippets are built for the returned page only.
+CREATE OR REPLACE FUNCTION search_messages(
+    p_workspace_id UUID,
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_after_rank NUMERIC DEFAULT NULL,
+    p_after_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    conversation_id UUID,
+    contact_id UUID,
+    sender_id UUID,
+    content TEXT,
+    channel VARCHAR,
+    message_type VARCHAR,
+    is_read BOOLEAN,
+    sent_at TIMESTAMPTZ,
+    headline TEXT,
+    rank NUMERIC
+) AS $$
+    WITH q AS (
+        SELECT websearch_to_tsquery('english', p_query) AS query
+    ),
+    page AS (
+        SELECT m.*, c.contact_id AS conversation_contact_id,
+               ROUND(ts_rank_cd(m.search_vector, q.query, 32)::numeric, 6) AS match_rank
+        FROM messages m
+        JOIN conversations c ON c.id = m.conversation_id
+        CROSS JOIN q
+        WHERE c.workspace_id = p_workspace_id
+          AND m.search_vector @@ q.query
+    ),
+    after_cursor AS (
+        SELECT * FROM page
+        WHERE p_after_rank IS NULL
+           OR (page.match_rank, page.id) < (p_after_rank, p_after_id)
+        ORDER BY page.match_rank DESC, page.id DESC
+        LIMIT p_limit
+    )
+    SELECT a.id, a.conversation_id, a.conversation_contact_id, a.sender_id, a.content,
+           a.channel, a.message_type, a.is_read, a.sent_at,
+           ts_headline('english', a.content, q.query, 'MaxFragments=1, MaxWords=20, MinWords=5'),
+           a.match_rank
+    FROM after_cursor a CROSS JOIN q
+    ORDER BY a.match_rank DESC, a.id DESC;
+$$ LANGUAGE sql STABLE;
+
+-- Step 5: Contact search
+-- Matches p_query as a substring of name, email or phone (LIKE wildcards in
+-- the query are literal), or a name within trigram similarity of it. Ranked
+-- by the best similarity across the three fields, paged like search_messages.
+CREATE OR REPLACE FUNCTION search_contacts(
+    p_workspace_id UUID,
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_after_rank NUMERIC DEFAULT NULL,
+    p_after_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    workspace_id UUID,
+    name VARCHAR,
+    email VARCHAR,
+    phone VARCHAR,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    rank NUMERIC
+) AS $$
+    WITH pattern AS (
+        SELECT '%' || replace(replace(replace(p_query, '\', '\\'), '%', '\%'), '_', '\_') || '%' AS value
+    ),
+    matches AS (
+        SELECT c.id, c.workspace_id, c.name, c.email, c.phone, c.created_at, c.updated_at,
+               ROUND(GREATEST(
+                   similarity(c.name, p_query),
+                   similarity(COALESCE(c.email, ''), p_query),
+                   similarity(COALESCE(c.phone, ''), p_query)
+               )::numeric, 6) AS match_rank
+        FROM contacts c CROSS JOIN pattern
+        WHERE c.workspace_id = p_workspace_id
+          AND (
+              c.name ILIKE pattern.value
+              OR c.email ILIKE pattern.value
+              OR c.phone ILIKE pattern.value
+              OR c.name % p_query
+          )
+    )
+    SELECT m.id, m.workspace_id, m.name, m.email, m.phone, m.created_at, m.updated_at, m.match_rank
+    FROM matches m
+    WHERE p_after_rank IS NULL
+       OR (m.match_rank, m.id) < (p_after_rank, p_after_id)
+    ORDER BY m.match_rank DESC, m.id DESC
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- Verification
+SELECT 'Migration 014 completed successfully' AS status;
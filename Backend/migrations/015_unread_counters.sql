@@ -0,0 +1,284 @@
+-- Migration: Atomic unread counters and bulk mark-as-read
+-- conversations.unread_count was set once when a conversation was created
+-- and reset by mark-read with a blind UPDATE. Inbound activity now
+-- increments it in a single UPDATE, mark-read is one workspace-scoped RPC
+-- for any number of conversations, and workspace_counters carries the
+-- workspace's total unread count for inbox badges.
+
+-- Step 1: Workspace unread total
+ALTER TABLE workspace_counters
+ADD COLUMN IF NOT EXISTS unread_total INTEGER NOT NULL DEFAULT 0;
+
+UPDATE conversations SET unread_count = 0 WHERE unread_count IS NULL OR unread_count < 0;
+ALTER TABLE conversations ALTER COLUMN unread_count SET NOT NULL;
+
+-- Step 2: Keep the total in step with conversations
+-- Same shape as migration 010: the trigger removes the old row's
+-- contribution and adds the new one, and now also fires when only the
+-- unread count changes.
+CREATE OR REPLACE FUNCTION bump_conversation_counters(
+    p_workspace_id UUID, p_is_automated_paused BOOLEAN, p_unread_count INTEGER, p_sign INTEGER
+)
+RETURNS VOID AS $$
+    UPDATE workspace_counters SET
+        conversations_total = conversations_total + p_sign,
+        conversations_active = conversations_active + p_sign * (NOT COALESCE(p_is_automated_paused, FALSE))::int,
+        conversations_unanswered = conversations_unanswered + p_sign * (COALESCE(p_unread_count, 0) > 0)::int,
+        unread_total = unread_total + p_sign * GREATEST(COALESCE(p_unread_count, 0), 0),
+        updated_at = NOW()
+    WHERE workspace_id = p_workspace_id;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION conversations_counters_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.workspace_id = NEW.workspace_id
+       AND OLD.is_automated_paused IS NOT DISTINCT FROM NEW.is_automated_paused
+       AND OLD.unread_count IS NOT DISTINCT FROM NEW.unread_count THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_conversation_counters(OLD.workspace_id, OLD.is_automated_paused, OLD.unread_count, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_conversation_counters(NEW.workspace_id, NEW.is_automated_paused, NEW.unread_count, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Step 3: Atomic increment
+-- A single UPDATE takes the row lock, so concurrent inbound messages never
+-- lose an increment. Returns the new count (NULL if there is no such
+-- conversation).
+CREATE OR REPLACE FUNCTION increment_conversation_unread(p_conversation_id UUID, p_by INTEGER DEFAULT 1)
+RETURNS INTEGER AS $$
+    UPDATE conversations SET unread_count = unread_count + p_by
+    WHERE id = p_conversation_id
+    RETURNING unread_count;
+$$ LANGUAGE sql;
+
+-- Step 4: Inbound contact activity increments instead of being dropped
+-- Same as migration 007, except a contact that already has a conversation
+-- gets its unread count incremented by p_unread_count.
+CREATE OR REPLACE FUNCTION upsert_contact(
+    p_workspace_id UUID,
+    p_name TEXT,
+    p_email TEXT DEFAULT NULL,
+    p_phone TEXT DEFAULT NULL,
+    p_source TEXT DEFAULT NULL,
+    p_source_url TEXT DEFAULT NULL,
+    p_message TEXT DEFAULT NULL,
+    p_ensure_conversation BOOLEAN DEFAULT FALSE,
+    p_unread_count INTEGER DEFAULT 0
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_contact contacts%ROWTYPE;
+    v_created BOOLEAN;
+    v_conversation_id UUID;
+BEGIN
+    IF p_email IS NULL OR p_email = '' THEN
+        INSERT INTO contacts (workspace_id, name, email, phone, source, source_url, message)
+        VALUES (p_workspace_id, p_name, NULL, p_phone, p_source, p_source_url, p_message)
+        RETURNING * INTO v_contact;
+        v_created := TRUE;
+    ELSE
+        INSERT INTO contacts (workspace_id, name, email, phone, source, source_url, message)
+        VALUES (p_workspace_id, p_name, p_email, p_phone, p_source, p_source_url, p_message)
+        ON CONFLICT (workspace_id, lower(email)) WHERE email IS NOT NULL
+        DO UPDATE SET
+            name = COALESCE(NULLIF(EXCLUDED.name, ''), contacts.name),
+            phone = COALESCE(NULLIF(EXCLUDED.phone, ''), contacts.phone),
+            message = COALESCE(EXCLUDED.message, contacts.message),
+            updated_at = NOW()
+        RETURNING * INTO v_contact;
+        -- xmax is 0 for freshly inserted tuples and non-zero for updated ones
+        SELECT xmax = 0 INTO v_created FROM contacts WHERE id = v_contact.id;
+    END IF;
+
+    IF p_ensure_conversation THEN
+        SELECT id INTO v_conversation_id FROM conversations WHERE contact_id = v_contact.id LIMIT 1;
+        IF v_conversation_id IS NULL THEN
+            INSERT INTO conversations (workspace_id, contact_id, unread_count)
+            VALUES (p_workspace_id, v_contact.id, p_unread_count);
+        ELSIF p_unread_count > 0 THEN
+            PERFORM increment_conversation_unread(v_conversation_id, p_unread_count);
+        END IF;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'contact', to_jsonb(v_contact),
+        'created', v_created
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Step 5: Bulk mark-as-read
+-- Only conversations in p_workspace_id are touched. Returns the ids whose
+-- unread count was reset and the workspace's new unread total.
+CREATE OR REPLACE FUNCTION mark_conversations_read(p_workspace_id UUID, p_conversation_ids UUID[])
+RETURNS JSONB AS $$
+DECLARE
+    v_ids UUID[];
+BEGIN
+    WITH owned AS (
+        SELECT id FROM conversations
+        WHERE workspace_id = p_workspace_id AND id = ANY(p_conversation_ids)
+    ),
+    read_messages AS (
+        UPDATE messages SET is_read = TRUE
+        WHERE conversation_id IN (SELECT id FROM owned) AND is_read IS NOT TRUE
+    ),
+    reset AS (
+        UPDATE conversations SET unread_count = 0
+        WHERE id IN (SELECT id FROM owned) AND unread_count <> 0
+        RETURNING id
+    )
+    SELECT COALESCE(array_agg(id), '{}') INTO v_ids FROM reset;
+
+    RETURN jsonb_build_object(
+        'conversation_ids', to_jsonb(v_ids),
+        'unread_total', (SELECT unread_total FROM workspace_counters WHERE workspace_id = p_workspace_id)
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Step 6: Badge read
+CREATE OR REPLACE FUNCTION get_unread_counts(p_workspace_id UUID)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'unread_total', COALESCE(MAX(unread_total), 0),
+        'unread_conversations', COALESCE(MAX(conversations_unanswered), 0)
+    )
+    FROM workspace_counters
+    WHERE workspace_id = p_workspace_id;
+$$ LANGUAGE sql STABLE;
+
+-- Step 7: Reconciliation includes the unread total
+CREATE OR REPLACE FUNCTION reconcile_workspace_counters(p_workspace_id UUID)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_before workspace_counters%ROWTYPE;
+    v_after workspace_counters%ROWTYPE;
+    v_bookings_drifted BOOLEAN;
+BEGIN
+    LOCK TABLE workspace_counters, workspace_booking_counters IN SHARE ROW EXCLUSIVE MODE;
+
+    SELECT * INTO v_before FROM workspace_counters WHERE workspace_id = p_workspace_id;
+
+    INSERT INTO workspace_counters AS wc (
+        workspace_id,
+        conversations_total, conversations_active, conversations_unanswered, unread_total,
+        forms_pending, forms_overdue, forms_completed,
+        inventory_low_stock, inventory_critical,
+        alerts_low, alerts_medium, alerts_high, alerts_critical,
+        updated_at, reconciled_at
+    )
+    SELECT
+        p_workspace_id,
+        conv.total, conv.active, conv.unanswered, conv.unread,
+        forms.pending, forms.overdue, forms.completed,
+        inv.low_stock, inv.critical,
+        al.low, al.medium, al.high, al.critical,
+        NOW(), NOW()
+    FROM
+        (SELECT
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE NOT COALESCE(is_automated_paused, FALSE)) AS active,
+            COUNT(*) FILTER (WHERE COALESCE(unread_count, 0) > 0) AS unanswered,
+            COALESCE(SUM(GREATEST(unread_count, 0)), 0) AS unread
+         FROM conversations WHERE workspace_id = p_workspace_id) conv,
+        (SELECT
+            COUNT(*) FILTER (WHERE status = 'pending') AS pending,
+            COUNT(*) FILTER (WHERE status = 'overdue') AS overdue,
+            COUNT(*) FILTER (WHERE status = 'completed') AS completed
+         FROM form_submissions WHERE workspace_id = p_workspace_id) forms,
+        (SELECT
+            COUNT(*) FILTER (WHERE is_low_stock) AS low_stock,
+            COUNT(*) FILTER (WHERE quantity = 0) AS critical
+         FROM inventory_items WHERE workspace_id = p_workspace_id) inv,
+        (SELECT
+            COUNT(*) FILTER (WHERE priority = 'low') AS low,
+            COUNT(*) FILTER (WHERE priority = 'medium') AS medium,
+            COUNT(*) FILTER (WHERE priority = 'high') AS high,
+            COUNT(*) FILTER (WHERE priority = 'critical') AS critical
+         FROM alerts WHERE workspace_id = p_workspace_id AND is_resolved = FALSE) al
+    ON CONFLICT (workspace_id) DO UPDATE SET
+        conversations_total = EXCLUDED.conversations_total,
+        conversations_active = EXCLUDED.conversations_active,
+        conversations_unanswered = EXCLUDED.conversations_unanswered,
+        unread_total = EXCLUDED.unread_total,
+        forms_pending = EXCLUDED.forms_pending,
+        forms_overdue = EXCLUDED.forms_overdue,
+        forms_completed = EXCLUDED.forms_completed,
+        inventory_low_stock = EXCLUDED.inventory_low_stock,
+        inventory_critical = EXCLUDED.inventory_critical,
+        alerts_low = EXCLUDED.alerts_low,
+        alerts_medium = EXCLUDED.alerts_medium,
+        alerts_high = EXCLUDED.alerts_high,
+        alerts_critical = EXCLUDED.alerts_critical,
+        updated_at = NOW(),
+        reconciled_at = NOW()
+    RETURNING * INTO v_after;
+
+    WITH actual AS (
+        SELECT
+            date_trunc('hour', scheduled_at) AS hour,
+            COUNT(*)::int AS total,
+            (COUNT(*) FILTER (WHERE status = 'completed'))::int AS completed,
+            (COUNT(*) FILTER (WHERE status = 'no_show'))::int AS no_show
+        FROM bookings
+        WHERE workspace_id = p_workspace_id
+          AND scheduled_at >= date_trunc('hour', NOW() - INTERVAL '1 day')
+        GROUP BY 1
+    ),
+    stored AS (
+        SELECT hour, total, completed, no_show
+        FROM workspace_booking_counters
+        WHERE workspace_id = p_workspace_id
+          AND hour >= date_trunc('hour', NOW() - INTERVAL '1 day')
+          AND total <> 0
+    )
+    SELECT EXISTS (
+        (SELECT * FROM actual EXCEPT SELECT * FROM stored)
+        UNION ALL
+        (SELECT * FROM stored EXCEPT SELECT * FROM actual)
+    ) INTO v_bookings_drifted;
+
+    DELETE FROM workspace_booking_counters WHERE workspace_id = p_workspace_id;
+
+    INSERT INTO workspace_booking_counters (workspace_id, hour, total, completed, no_show)
+    SELECT
+        p_workspace_id,
+        date_trunc('hour', scheduled_at),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE status = 'completed'),
+        COUNT(*) FILTER (WHERE status = 'no_show')
+    FROM bookings
+    WHERE workspace_id = p_workspace_id
+      AND scheduled_at >= date_trunc('hour', NOW() - INTERVAL '1 day')
+    GROUP BY 2;
+
+    RETURN v_bookings_drifted
+        OR v_before.workspace_id IS NULL
+        OR (v_before.conversations_total, v_before.conversations_active, v_before.conversations_unanswered,
+            v_before.unread_total,
+            v_before.forms_pending, v_before.forms_overdue, v_before.forms_completed,
+            v_before.inventory_low_stock, v_before.inventory_critical,
+            v_before.alerts_low, v_before.alerts_medium, v_before.alerts_high, v_before.alerts_critical)
+           IS DISTINCT FROM
+           (v_after.conversations_total, v_after.conversations_active, v_after.conversations_unanswered,
+            v_after.unread_total,
+            v_after.forms_pending, v_after.forms_overdue, v_after.forms_completed,
+            v_after.inventory_low_stock, v_after.inventory_critical,
+            v_after.alerts_low, v_after.alerts_medium, v_after.alerts_high, v_after.alerts_critical);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Step 8: Backfill
+SELECT reconcile_workspace_counters(id) FROM workspaces;
+
+-- Verification
+SELECT 'Migration 015 completed successfully' AS status;
@@ -0,0 +1,20 @@
+-- Migration: Per-workspace notification template overrides
+-- Notification bodies are Jinja templates shipped with the backend
+-- (app/templates/notifications). A row here replaces one of those template
+-- files for a single workspace.
+
+-- Step 1: Overrides table
+-- name is the template file being replaced, e.g. 'booking_reminder.html',
+-- 'booking_reminder.subject.txt' or 'booking_reminder.txt' (SMS).
+CREATE TABLE IF NOT EXISTS notification_templates (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    workspace_id UUID NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE,
+    name VARCHAR(100) NOT NULL,
+    source TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE (workspace_id, name)
+);
+
+-- Verification
+SELECT 'Migration 016 completed successfully' AS status;
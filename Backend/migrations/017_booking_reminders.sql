@@ -0,0 +1,90 @@
+-- Migration: Claimed, once-only booking reminders
+-- The reminder task re-read every confirmed booking in the next 24 hours on
+-- each run and had no record of what it had already sent, so a booking was
+-- reminded on every run until it started. Bookings now record when their
+-- reminder went out; the task claims due bookings in pages (a short lease
+-- in reminder_claimed_at, so a crashed worker's page is retried) and marks
+-- them sent or releases them once the sends finish.
+
+-- Step 1: Reminder state
+ALTER TABLE bookings
+ADD COLUMN IF NOT EXISTS reminder_sent_at TIMESTAMPTZ,
+ADD COLUMN IF NOT EXISTS reminder_claimed_at TIMESTAMPTZ;
+
+-- Bookings the old task has already reminded (it ran every 30 minutes over
+-- the next 24 hours) and bookings already past must not be reminded again
+UPDATE bookings SET reminder_sent_at = NOW()
+WHERE reminder_sent_at IS NULL
+  AND status = 'confirmed'
+  AND scheduled_at <= NOW() + INTERVAL '24 hours'
+  AND (scheduled_at <= NOW() OR created_at <= NOW() - INTERVAL '30 minutes');
+
+-- Step 2: Due-reminder index
+-- Only confirmed bookings still waiting for a reminder, so the index stays
+-- about the size of the upcoming schedule however large bookings grows.
+CREATE INDEX IF NOT EXISTS idx_bookings_reminder_due
+    ON bookings(scheduled_at, id)
+    WHERE status = 'confirmed' AND reminder_sent_at IS NULL;
+
+-- Step 3: Claim a page of due reminders
+-- Claims up to p_limit confirmed, unreminded bookings starting within
+-- p_horizon whose claim is missing or older than p_lease. SKIP LOCKED lets
+-- overlapping runs claim disjoint pages. Returns what a reminder needs, so
+-- the sender does not re-read bookings, contacts and booking types.
+CREATE OR REPLACE FUNCTION claim_due_reminders(
+    p_horizon INTERVAL DEFAULT INTERVAL '24 hours',
+    p_limit INTEGER DEFAULT 500,
+    p_lease INTERVAL DEFAULT INTERVAL '15 minutes'
+)
+RETURNS TABLE (
+    id UUID,
+    workspace_id UUID,
+    contact_id UUID,
+    scheduled_at TIMESTAMPTZ,
+    contact_name TEXT,
+    contact_email TEXT,
+    contact_phone TEXT,
+    service TEXT
+) AS $$
+    WITH due AS (
+        SELECT b.id
+        FROM bookings b
+        WHERE b.status = 'confirmed'
+          AND b.reminder_sent_at IS NULL
+          AND b.scheduled_at > NOW()
+          AND b.scheduled_at <= NOW() + p_horizon
+          AND (b.reminder_claimed_at IS NULL OR b.reminder_claimed_at < NOW() - p_lease)
+        ORDER BY b.scheduled_at, b.id
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ), claimed AS (
+        UPDATE bookings b SET reminder_claimed_at = NOW()
+        FROM due
+        WHERE b.id = due.id
+        RETURNING b.id, b.workspace_id, b.contact_id, b.booking_type_id, b.scheduled_at
+    )
+    SELECT c.id, c.workspace_id, c.contact_id, c.scheduled_at,
+           ct.name, ct.email, ct.phone, bt.name
+    FROM claimed c
+    JOIN contacts ct ON ct.id = c.contact_id
+    JOIN booking_types bt ON bt.id = c.booking_type_id
+    ORDER BY c.scheduled_at, c.id;
+$$ LANGUAGE sql;
+
+-- Step 4: Finish a claimed page
+-- Sent bookings are stamped; failed ones have their claim released so the
+-- next run retries them while they are still upcoming.
+CREATE OR REPLACE FUNCTION finish_reminders(
+    p_sent UUID[] DEFAULT '{}',
+    p_failed UUID[] DEFAULT '{}'
+)
+RETURNS VOID AS $$
+    UPDATE bookings SET reminder_sent_at = NOW(), reminder_claimed_at = NULL
+    WHERE id = ANY(p_sent) AND reminder_sent_at IS NULL;
+
+    UPDATE bookings SET reminder_claimed_at = NULL
+    WHERE id = ANY(p_failed) AND reminder_sent_at IS NULL;
+$$ LANGUAGE sql;
+
+-- Verification
+SELECT 'Migration 017 completed successfully' AS status;
@@ -0,0 +1,65 @@
+-- Migration: ETA-scheduled booking reminders
+-- Each reminder is now a Celery task scheduled for scheduled_at minus the
+-- lead time when the booking is confirmed (or, for bookings further out, by
+-- the reconciliation sweep once it comes within the scheduling horizon). The
+-- booking records the task so a cancel or reschedule can revoke it.
+
+-- Step 1: Scheduled task id
+ALTER TABLE bookings
+ADD COLUMN IF NOT EXISTS reminder_task_id TEXT;
+
+-- Step 2: A rescheduled booking is reminded again for its new time
+CREATE OR REPLACE FUNCTION bookings_reminder_reset_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.scheduled_at IS DISTINCT FROM OLD.scheduled_at THEN
+        NEW.reminder_sent_at := NULL;
+        NEW.reminder_claimed_at := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS bookings_reminder_reset ON bookings;
+CREATE TRIGGER bookings_reminder_reset
+    BEFORE UPDATE OF scheduled_at ON bookings
+    FOR EACH ROW EXECUTE FUNCTION bookings_reminder_reset_trigger();
+
+-- Step 3: Claim one booking's reminder for its ETA task
+-- Same lease and result shape as claim_due_reminders (migration 017). The
+-- task passes the scheduled_at it was scheduled for, so a task that
+-- outlived a reschedule or a cancel (revokes are best effort) claims nothing.
+CREATE OR REPLACE FUNCTION claim_booking_reminder(
+    p_booking_id UUID,
+    p_scheduled_at TIMESTAMPTZ,
+    p_lease INTERVAL DEFAULT INTERVAL '15 minutes'
+)
+RETURNS TABLE (
+    id UUID,
+    workspace_id UUID,
+    contact_id UUID,
+    scheduled_at TIMESTAMPTZ,
+    contact_name TEXT,
+    contact_email TEXT,
+    contact_phone TEXT,
+    service TEXT
+) AS $$
+    WITH claimed AS (
+        UPDATE bookings b SET reminder_claimed_at = NOW()
+        WHERE b.id = p_booking_id
+          AND b.scheduled_at = p_scheduled_at
+          AND b.scheduled_at > NOW()
+          AND b.status = 'confirmed'
+          AND b.reminder_sent_at IS NULL
+          AND (b.reminder_claimed_at IS NULL OR b.reminder_claimed_at < NOW() - p_lease)
+        RETURNING b.id, b.workspace_id, b.contact_id, b.booking_type_id, b.scheduled_at
+    )
+    SELECT c.id, c.workspace_id, c.contact_id, c.scheduled_at,
+           ct.name, ct.email, ct.phone, bt.name
+    FROM claimed c
+    JOIN contacts ct ON ct.id = c.contact_id
+    JOIN booking_types bt ON bt.id = c.booking_type_id;
+$$ LANGUAGE sql;
+
+-- Verification
+SELECT 'Migration 018 completed successfully' AS status;
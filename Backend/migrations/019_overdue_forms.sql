@@ -0,0 +1,77 @@
+-- Migration: Set-based overdue form detection
+-- check_overdue_forms read every pending submission older than 48 hours
+-- across all workspaces, then updated and alerted on each one in its own
+-- round-trips. Submissions now carry a due date, pending ones are indexed by
+-- it, and mark_overdue_forms() flips a page of due submissions to overdue
+-- and inserts their alerts in one statement. Alerts get a dedupe key, so a
+-- form is never alerted on twice.
+
+-- Step 1: Due date
+ALTER TABLE form_submissions
+ADD COLUMN IF NOT EXISTS due_at TIMESTAMPTZ;
+
+UPDATE form_submissions SET due_at = created_at + INTERVAL '48 hours' WHERE due_at IS NULL;
+
+ALTER TABLE form_submissions ALTER COLUMN due_at SET DEFAULT NOW() + INTERVAL '48 hours';
+ALTER TABLE form_submissions ALTER COLUMN due_at SET NOT NULL;
+
+-- Step 2: Pending-by-due-date index
+-- Only pending submissions, so it stays about the size of what is
+-- outstanding rather than of every form ever sent.
+CREATE INDEX IF NOT EXISTS idx_form_submissions_pending_due
+    ON form_submissions(due_at)
+    WHERE status = 'pending';
+
+-- Step 3: Alert dedupe key
+ALTER TABLE alerts
+ADD COLUMN IF NOT EXISTS dedupe_key TEXT;
+
+-- Existing overdue-form alerts, keeping only the first per form
+UPDATE alerts a SET dedupe_key = 'overdue_form:' || (a.metadata->>'form_id')
+FROM (
+    SELECT DISTINCT ON (workspace_id, metadata->>'form_id') id
+    FROM alerts
+    WHERE alert_type = 'overdue_form' AND metadata ? 'form_id'
+    ORDER BY workspace_id, metadata->>'form_id', created_at
+) oldest
+WHERE a.id = oldest.id AND a.dedupe_key IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_alerts_dedupe
+    ON alerts(workspace_id, dedupe_key)
+    WHERE dedupe_key IS NOT NULL;
+
+-- Step 4: Mark a page of due submissions overdue and alert on them
+-- SKIP LOCKED lets overlapping runs take disjoint pages; ON CONFLICT skips
+-- forms that already have an alert. Returns one row per submission marked,
+-- with the alert created for it (NULL when one already existed).
+CREATE OR REPLACE FUNCTION mark_overdue_forms(p_limit INTEGER DEFAULT 1000)
+RETURNS TABLE (form_id UUID, workspace_id UUID, alert JSONB) AS $$
+    WITH due AS (
+        SELECT f.id
+        FROM form_submissions f
+        WHERE f.status = 'pending' AND f.due_at <= NOW()
+        ORDER BY f.due_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ), marked AS (
+        UPDATE form_submissions f SET status = 'overdue'
+        FROM due
+        WHERE f.id = due.id
+        RETURNING f.id, f.workspace_id, f.booking_id
+    ), alerted AS (
+        INSERT INTO alerts (workspace_id, alert_type, priority, title, message, metadata, dedupe_key)
+        SELECT m.workspace_id, 'overdue_form', 'medium', 'Form Overdue',
+               'Form submission ' || m.id || ' is overdue',
+               jsonb_build_object('form_id', m.id, 'booking_id', m.booking_id),
+               'overdue_form:' || m.id
+        FROM marked m
+        ON CONFLICT (workspace_id, dedupe_key) WHERE dedupe_key IS NOT NULL DO NOTHING
+        RETURNING *
+    )
+    SELECT m.id, m.workspace_id, to_jsonb(a)
+    FROM marked m
+    LEFT JOIN alerted a ON a.dedupe_key = 'overdue_form:' || m.id;
+$$ LANGUAGE sql;
+
+-- Verification
+SELECT 'Migration 019 completed successfully' AS status;
@@ -0,0 +1,266 @@
+-- Migration: Per-workspace counter locking and RLS on the counter tables
+-- reconcile_workspace_counters() locked both counter tables in SHARE ROW
+-- EXCLUSIVE mode, so reconciling one workspace stalled counter updates, and
+-- with them writes to bookings, conversations, forms, inventory and alerts,
+-- in every workspace. It now takes an exclusive advisory lock keyed on the
+-- workspace, and the delta helpers take the same lock in shared mode: writers
+-- never block each other, and only the workspace being reconciled waits.
+-- The counter tables also get row level security like the tables they
+-- summarise.
+
+-- Step 1: Lock key
+CREATE OR REPLACE FUNCTION workspace_counters_lock_key(p_workspace_id UUID)
+RETURNS BIGINT AS $$
+    SELECT hashtextextended('workspace_counters:' || p_workspace_id::text, 0);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Step 2: Delta helpers take the shared lock
+-- Same as migrations 010 and 015 otherwise. Held until the writing
+-- transaction ends, so a reconcile waits for in-flight writes to commit and
+-- writes that start mid-reconcile apply their delta after it. SECURITY
+-- DEFINER so the triggers still update the counters under RLS.
+CREATE OR REPLACE FUNCTION bump_form_counters(p_workspace_id UUID, p_status TEXT, p_sign INTEGER)
+RETURNS VOID AS $$
+    SELECT pg_advisory_xact_lock_shared(workspace_counters_lock_key(p_workspace_id));
+    UPDATE workspace_counters SET
+        forms_pending = forms_pending + p_sign * (p_status = 'pending')::int,
+        forms_overdue = forms_overdue + p_sign * (p_status = 'overdue')::int,
+        forms_completed = forms_completed + p_sign * (p_status = 'completed')::int,
+        updated_at = NOW()
+    WHERE workspace_id = p_workspace_id
+      AND p_status IN ('pending', 'overdue', 'completed');
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION bump_inventory_counters(
+    p_workspace_id UUID, p_is_low_stock BOOLEAN, p_quantity INTEGER, p_sign INTEGER
+)
+RETURNS VOID AS $$
+    SELECT pg_advisory_xact_lock_shared(workspace_counters_lock_key(p_workspace_id));
+    UPDATE workspace_counters SET
+        inventory_low_stock = inventory_low_stock + p_sign * COALESCE(p_is_low_stock, FALSE)::int,
+        inventory_critical = inventory_critical + p_sign * (p_quantity = 0)::int,
+        updated_at = NOW()
+    WHERE workspace_id = p_workspace_id
+      AND (COALESCE(p_is_low_stock, FALSE) OR p_quantity = 0);
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION bump_alert_counters(
+    p_workspace_id UUID, p_priority TEXT, p_is_resolved BOOLEAN, p_sign INTEGER
+)
+RETURNS VOID AS $$
+    SELECT pg_advisory_xact_lock_shared(workspace_counters_lock_key(p_workspace_id));
+    UPDATE workspace_counters SET
+        alerts_low = alerts_low + p_sign * (p_priority = 'low')::int,
+        alerts_medium = alerts_medium + p_sign * (p_priority = 'medium')::int,
+        alerts_high = alerts_high + p_sign * (p_priority = 'high')::int,
+        alerts_critical = alerts_critical + p_sign * (p_priority = 'critical')::int,
+        updated_at = NOW()
+    WHERE workspace_id = p_workspace_id
+      AND NOT COALESCE(p_is_resolved, FALSE);
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION bump_conversation_counters(
+    p_workspace_id UUID, p_is_automated_paused BOOLEAN, p_unread_count INTEGER, p_sign INTEGER
+)
+RETURNS VOID AS $$
+    SELECT pg_advisory_xact_lock_shared(workspace_counters_lock_key(p_workspace_id));
+    UPDATE workspace_counters SET
+        conversations_total = conversations_total + p_sign,
+        conversations_active = conversations_active + p_sign * (NOT COALESCE(p_is_automated_paused, FALSE))::int,
+        conversations_unanswered = conversations_unanswered + p_sign * (COALESCE(p_unread_count, 0) > 0)::int,
+        unread_total = unread_total + p_sign * GREATEST(COALESCE(p_unread_count, 0), 0),
+        updated_at = NOW()
+    WHERE workspace_id = p_workspace_id;
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION bump_booking_counters(
+    p_workspace_id UUID, p_scheduled_at TIMESTAMPTZ, p_status TEXT, p_sign INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock_shared(workspace_counters_lock_key(p_workspace_id));
+    IF p_sign > 0 THEN
+        INSERT INTO workspace_booking_counters AS c (workspace_id, hour, total, completed, no_show)
+        VALUES (
+            p_workspace_id,
+            date_trunc('hour', p_scheduled_at),
+            1,
+            (p_status = 'completed')::int,
+            (p_status = 'no_show')::int
+        )
+        ON CONFLICT (workspace_id, hour) DO UPDATE SET
+            total = c.total + EXCLUDED.total,
+            completed = c.completed + EXCLUDED.completed,
+            no_show = c.no_show + EXCLUDED.no_show;
+    ELSE
+        UPDATE workspace_booking_counters SET
+            total = total - 1,
+            completed = completed - (p_status = 'completed')::int,
+            no_show = no_show - (p_status = 'no_show')::int
+        WHERE workspace_id = p_workspace_id
+          AND hour = date_trunc('hour', p_scheduled_at);
+    END IF;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION workspaces_counters_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO workspace_counters (workspace_id) VALUES (NEW.id)
+    ON CONFLICT (workspace_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Step 3: Reconciliation locks only its workspace
+-- Same as migration 015 otherwise.
+CREATE OR REPLACE FUNCTION reconcile_workspace_counters(p_workspace_id UUID)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_before workspace_counters%ROWTYPE;
+    v_after workspace_counters%ROWTYPE;
+    v_bookings_drifted BOOLEAN;
+BEGIN
+    PERFORM pg_advisory_xact_lock(workspace_counters_lock_key(p_workspace_id));
+
+    SELECT * INTO v_before FROM workspace_counters WHERE workspace_id = p_workspace_id;
+
+    INSERT INTO workspace_counters AS wc (
+        workspace_id,
+        conversations_total, conversations_active, conversations_unanswered, unread_total,
+        forms_pending, forms_overdue, forms_completed,
+        inventory_low_stock, inventory_critical,
+        alerts_low, alerts_medium, alerts_high, alerts_critical,
+        updated_at, reconciled_at
+    )
+    SELECT
+        p_workspace_id,
+        conv.total, conv.active, conv.unanswered, conv.unread,
+        forms.pending, forms.overdue, forms.completed,
+        inv.low_stock, inv.critical,
+        al.low, al.medium, al.high, al.critical,
+        NOW(), NOW()
+    FROM
+        (SELECT
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE NOT COALESCE(is_automated_paused, FALSE)) AS active,
+            COUNT(*) FILTER (WHERE COALESCE(unread_count, 0) > 0) AS unanswered,
+            COALESCE(SUM(GREATEST(unread_count, 0)), 0) AS unread
+         FROM conversations WHERE workspace_id = p_workspace_id) conv,
+        (SELECT
+            COUNT(*) FILTER (WHERE status = 'pending') AS pending,
+            COUNT(*) FILTER (WHERE status = 'overdue') AS overdue,
+            COUNT(*) FILTER (WHERE status = 'completed') AS completed
+         FROM form_submissions WHERE workspace_id = p_workspace_id) forms,
+        (SELECT
+            COUNT(*) FILTER (WHERE is_low_stock) AS low_stock,
+            COUNT(*) FILTER (WHERE quantity = 0) AS critical
+         FROM inventory_items WHERE workspace_id = p_workspace_id) inv,
+        (SELECT
+            COUNT(*) FILTER (WHERE priority = 'low') AS low,
+            COUNT(*) FILTER (WHERE priority = 'medium') AS medium,
+            COUNT(*) FILTER (WHERE priority = 'high') AS high,
+            COUNT(*) FILTER (WHERE priority = 'critical') AS critical
+         FROM alerts WHERE workspace_id = p_workspace_id AND is_resolved = FALSE) al
+    ON CONFLICT (workspace_id) DO UPDATE SET
+        conversations_total = EXCLUDED.conversations_total,
+        conversations_active = EXCLUDED.conversations_active,
+        conversations_unanswered = EXCLUDED.conversations_unanswered,
+        unread_total = EXCLUDED.unread_total,
+        forms_pending = EXCLUDED.forms_pending,
+        forms_overdue = EXCLUDED.forms_overdue,
+        forms_completed = EXCLUDED.forms_completed,
+        inventory_low_stock = EXCLUDED.inventory_low_stock,
+        inventory_critical = EXCLUDED.inventory_critical,
+        alerts_low = EXCLUDED.alerts_low,
+        alerts_medium = EXCLUDED.alerts_medium,
+        alerts_high = EXCLUDED.alerts_high,
+        alerts_critical = EXCLUDED.alerts_critical,
+        updated_at = NOW(),
+        reconciled_at = NOW()
+    RETURNING * INTO v_after;
+
+    WITH actual AS (
+        SELECT
+            date_trunc('hour', scheduled_at) AS hour,
+            COUNT(*)::int AS total,
+            (COUNT(*) FILTER (WHERE status = 'completed'))::int AS completed,
+            (COUNT(*) FILTER (WHERE status = 'no_show'))::int AS no_show
+        FROM bookings
+        WHERE workspace_id = p_workspace_id
+          AND scheduled_at >= date_trunc('hour', NOW() - INTERVAL '1 day')
+        GROUP BY 1
+    ),
+    stored AS (
+        SELECT hour, total, completed, no_show
+        FROM workspace_booking_counters
+        WHERE workspace_id = p_workspace_id
+          AND hour >= date_trunc('hour', NOW() - INTERVAL '1 day')
+          AND total <> 0
+    )
+    SELECT EXISTS (
+        (SELECT * FROM actual EXCEPT SELECT * FROM stored)
+        UNION ALL
+        (SELECT * FROM stored EXCEPT SELECT * FROM actual)
+    ) INTO v_bookings_drifted;
+
+    DELETE FROM workspace_booking_counters WHERE workspace_id = p_workspace_id;
+
+    INSERT INTO workspace_booking_counters (workspace_id, hour, total, completed, no_show)
+    SELECT
+        p_workspace_id,
+        date_trunc('hour', scheduled_at),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE status = 'completed'),
+        COUNT(*) FILTER (WHERE status = 'no_show')
+    FROM bookings
+    WHERE workspace_id = p_workspace_id
+      AND scheduled_at >= date_trunc('hour', NOW() - INTERVAL '1 day')
+    GROUP BY 2;
+
+    RETURN v_bookings_drifted
+        OR v_before.workspace_id IS NULL
+        OR (v_before.conversations_total, v_before.conversations_active, v_before.conversations_unanswered,
+            v_before.unread_total,
+            v_before.forms_pending, v_before.forms_overdue, v_before.forms_completed,
+            v_before.inventory_low_stock, v_before.inventory_critical,
+            v_before.alerts_low, v_before.alerts_medium, v_before.alerts_high, v_before.alerts_critical)
+           IS DISTINCT FROM
+           (v_after.conversations_total, v_after.conversations_active, v_after.conversations_unanswered,
+            v_after.unread_total,
+            v_after.forms_pending, v_after.forms_overdue, v_after.forms_completed,
+            v_after.inventory_low_stock, v_after.inventory_critical,
+            v_after.alerts_low, v_after.alerts_medium, v_after.alerts_high, v_after.alerts_critical);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Step 4: Row level security
+-- Reads are limited to the workspace's own users; all writes go through the
+-- SECURITY DEFINER helpers above or the service role.
+ALTER TABLE public.workspace_counters ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.workspace_booking_counters ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view counters for their workspace" ON public.workspace_counters;
+CREATE POLICY "Users can view counters for their workspace"
+ON public.workspace_counters FOR SELECT
+USING (
+    EXISTS (
+        SELECT 1 FROM public.users
+        WHERE users.workspace_id = workspace_counters.workspace_id
+        AND users.id = auth.uid()
+    )
+);
+
+DROP POLICY IF EXISTS "Users can view booking counters for their workspace" ON public.workspace_booking_counters;
+CREATE POLICY "Users can view booking counters for their workspace"
+ON public.workspace_booking_counters FOR SELECT
+USING (
+    EXISTS (
+        SELECT 1 FROM public.users
+        WHERE users.workspace_id = workspace_booking_counters.workspace_id
+        AND users.id = auth.uid()
+    )
+);
+
+-- Verification
+SELECT 'Migration 020 completed successfully' AS status;
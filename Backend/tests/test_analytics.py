@@ -0,0 +1,158 @@
+"""Tests for rollup-backed analytics"""
+from datetime import datetime, timezone
+import pytest
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import Mock, patch
+
+from app.main import app
+from app.db.supabase_client import get_supabase_service
+from app.core.security import create_access_token
+from app.services.analytics_service import AnalyticsService
+from app.tasks.maintenance_tasks import rollup_analytics_events
+
+START = datetime(2026, 10, 1, 10, 30, tzinfo=timezone.utc)
+END = datetime(2026, 10, 1, 13, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def mock_supabase():
+    """Mock Supabase service client injected into the app"""
+    mock = Mock()
+    app.dependency_overrides[get_supabase_service] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_supabase_service, None)
+
+
+def auth_headers(workspace_id="workspace-123"):
+    token = create_access_token({
+        "sub": "user-123",
+        "email": "owner@example.com",
+        "role": "owner",
+        "workspace_id": workspace_id,
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestAnalyticsService:
+    """Tests for AnalyticsService"""
+
+    @pytest.mark.asyncio
+    async def test_timeseries_is_zero_filled(self):
+        """Test every bucket in range is returned, missing ones as zero"""
+        supabase = Mock()
+        supabase.rpc.return_value.execute.return_value = Mock(data=[
+            {"bucket": "2026-10-01T11:00:00+00:00", "event_type": "workspace_view", "count": 12},
+        ])
+
+        series = await AnalyticsService(supabase).get_timeseries(
+            "workspace-123", "hour", START, END, ["workspace_view"]
+        )
+
+        name, params = supabase.rpc.call_args[0]
+        assert name == "analytics_timeseries"
+        assert params["p_start"] == "2026-10-01T10:00:00+00:00"
+        assert params["p_granularity"] == "hour"
+        assert [(p["bucket"].hour, p["count"]) for p in series["points"]] == [(10, 0), (11, 12), (12, 0)]
+
+    @pytest.mark.asyncio
+    async def test_funnel_conversion(self):
+        """Test step and overall conversion rates"""
+        supabase = Mock()
+        supabase.rpc.return_value.execute.return_value = Mock(data={
+            "workspace_view": 200, "contact_form_submit": 20,
+        })
+
+        funnel = await AnalyticsService(supabase).get_funnel("workspace-123", START, END)
+
+        assert supabase.rpc.call_args[0][0] == "analytics_totals"
+        assert [(s["count"], s["conversion_rate"]) for s in funnel["steps"]] == [
+            (200, None), (20, 0.1), (0, 0.0)
+        ]
+        assert funnel["overall_conversion_rate"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_funnel_without_views(self):
+        """Test rates are null rather than dividing by zero"""
+        supabase = Mock()
+        supabase.rpc.return_value.execute.return_value = Mock(data={})
+
+        funnel = await AnalyticsService(supabase).get_funnel("workspace-123", START, END)
+
+        assert funnel["steps"][1]["conversion_rate"] is None
+        assert funnel["overall_conversion_rate"] is None
+
+
+class TestAnalyticsEndpoints:
+    """Tests for /analytics endpoints"""
+
+    @pytest.mark.asyncio
+    async def test_daily_timeseries(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data=[])
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/analytics/timeseries",
+                params={"start": "2026-09-01T00:00:00Z", "end": "2026-09-08T00:00:00Z"},
+                headers=auth_headers(),
+            )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["granularity"] == "day"
+        assert len(body["points"]) == 7 * 4
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_range(self, mock_supabase):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/analytics/timeseries",
+                params={"granularity": "hour", "start": "2025-01-01T00:00:00Z", "end": "2026-01-01T00:00:00Z"},
+                headers=auth_headers(),
+            )
+
+        assert response.status_code == 400
+        mock_supabase.rpc.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_event_type(self, mock_supabase):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/analytics/timeseries",
+                params={"event_type": "page_scroll"},
+                headers=auth_headers(),
+            )
+
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_funnel(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={
+            "workspace_view": 50, "contact_form_submit": 10, "booking_created": 5,
+        })
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/v1/analytics/funnel", headers=auth_headers())
+
+        assert response.status_code == 200
+        assert response.json()["overall_conversion_rate"] == 0.1
+
+
+class TestRollupAnalyticsEvents:
+    """Tests for the rollup task"""
+
+    def test_runs_slices_until_caught_up(self):
+        """Test a backlog is rolled up slice by slice"""
+        supabase = Mock()
+        supabase.rpc.return_value.execute.side_effect = [
+            Mock(data={"events": 500, "caught_up": False, "to": "2026-10-02T00:00:00+00:00"}),
+            Mock(data={"events": 20, "caught_up": True, "to": "2026-10-02T06:00:00+00:00"}),
+        ]
+
+        with patch("app.tasks.maintenance_tasks.get_supabase_client") as mock_client:
+            mock_client.return_value.service_client = supabase
+            rollup_analytics_events()
+
+        assert supabase.rpc.call_count == 2
+        assert supabase.rpc.call_args[0][0] == "rollup_analytics_events"
@@ -0,0 +1,302 @@
+"""Tests for ETA-scheduled booking reminders and the reconciliation sweep"""
+import threading
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.core.config import settings
+from app.core.exceptions import ProviderNotConfiguredException
+from app.tasks import automation_tasks
+
+
+def due_booking(i, email=True, phone=True):
+    return {
+        "id": f"booking-{i}",
+        "workspace_id": "workspace-123",
+        "contact_id": f"contact-{i}",
+        "scheduled_at": "2026-10-20T14:30:00+00:00",
+        "contact_name": f"Contact {i}",
+        "contact_email": f"contact{i}@example.com" if email else None,
+        "contact_phone": f"+1555000{i:04d}" if phone else None,
+        "service": "Cut & Color",
+    }
+
+
+def supabase_with_pages(pages, unscheduled=()):
+    """Supabase mock: claim_due_reminders returns `pages` in turn, and the
+    sweep's bookings query returns `unscheduled` pages in turn"""
+    supabase = Mock()
+    responses = iter(pages)
+    unscheduled = iter(unscheduled)
+
+    def rpc(name, params):
+        call = Mock()
+        call.execute.return_value = Mock(data=next(responses, []) if name == "claim_due_reminders" else None)
+        return call
+
+    query = Mock()
+    for name in ("select", "eq", "is_", "gt", "lte", "order", "limit", "update"):
+        getattr(query, name).return_value = query
+    query.execute.side_effect = lambda: Mock(data=next(unscheduled, []))
+
+    supabase.rpc.side_effect = rpc
+    supabase.table.return_value = query
+    return supabase
+
+
+def booking_at(hours_ahead, status="confirmed", **fields):
+    scheduled_at = datetime.now(timezone.utc) + timedelta(hours=hours_ahead)
+    return {"id": "booking-1", "scheduled_at": scheduled_at.isoformat(), "status": status, **fields}
+
+
+def service_returning(success):
+    """Email/SMS service whose batch sends all succeed or all fail"""
+    return Mock(send_batch=AsyncMock(side_effect=lambda messages: [
+        {"to": m["to"], "success": success(m["to"])} for m in messages
+    ]))
+
+
+@pytest.fixture
+def run_task():
+    """Run a task body against a mock Supabase, capturing enqueued chunks"""
+    def run(task, supabase, *args):
+        client = Mock(service_client=supabase)
+        with patch.object(automation_tasks, "get_supabase_client", return_value=client), \
+                patch.object(automation_tasks.send_booking_reminder_chunk, "delay") as delay:
+            task(*args)
+        return delay
+    return run
+
+
+class TestSweep:
+    """Tests for claiming overdue reminders in chunk tasks"""
+
+    def test_sweep_starts_a_chunk_without_claiming(self, run_task):
+        supabase = supabase_with_pages([[due_booking(1)]])
+
+        delay = run_task(automation_tasks.send_booking_reminders, supabase)
+
+        delay.assert_called_once_with(settings.REMINDER_MAX_CHUNKS_PER_RUN)
+        supabase.rpc.assert_not_called()
+
+    def test_full_page_queues_the_next_chunk(self, run_task):
+        supabase = supabase_with_pages([[due_booking(1), due_booking(2)]])
+
+        with patch.object(settings, "REMINDER_CHUNK_SIZE", 2), \
+                patch.object(automation_tasks, "send_reminders") as send:
+            delay = run_task(automation_tasks.send_booking_reminder_chunk, supabase, 5)
+
+        delay.assert_called_once_with(4)
+        assert supabase.rpc.call_args.args[1]["p_limit"] == 2
+        assert len(send.call_args.args[1]) == 2
+
+    def test_short_page_ends_the_run(self, run_task):
+        supabase = supabase_with_pages([[due_booking(1)]])
+
+        with patch.object(settings, "REMINDER_CHUNK_SIZE", 2), \
+                patch.object(automation_tasks, "send_reminders") as send:
+            delay = run_task(automation_tasks.send_booking_reminder_chunk, supabase, 5)
+
+        delay.assert_not_called()
+        send.assert_called_once()
+
+    def test_nothing_due(self, run_task):
+        supabase = supabase_with_pages([])
+
+        with patch.object(automation_tasks, "send_reminders") as send:
+            delay = run_task(automation_tasks.send_booking_reminder_chunk, supabase, 5)
+
+        delay.assert_not_called()
+        send.assert_not_called()
+
+    def test_chunks_per_run_are_bounded(self, run_task):
+        supabase = supabase_with_pages([[due_booking(1)]])
+
+        with patch.object(settings, "REMINDER_CHUNK_SIZE", 1), \
+                patch.object(automation_tasks, "send_reminders"):
+            delay = run_task(automation_tasks.send_booking_reminder_chunk, supabase, 1)
+
+        delay.assert_not_called()
+
+
+class TestChunk:
+    """Tests for sending a claimed chunk and recording the outcome"""
+
+    def run_chunk(self, run_task, bookings, email, sms):
+        supabase = supabase_with_pages([bookings])
+        with patch.object(automation_tasks, "prefetch_credentials"), \
+                patch.object(automation_tasks, "load_overrides", return_value={}), \
+                patch.object(automation_tasks, "email_service_for", return_value=email), \
+                patch.object(automation_tasks, "sms_service_for", return_value=sms), \
+                patch.object(automation_tasks, "record_automated_messages") as record:
+            run_task(automation_tasks.send_booking_reminder_chunk, supabase)
+        finish = [c for c in supabase.rpc.call_args_list if c.args[0] == "finish_reminders"]
+        return finish[0].args[1], record
+
+    def test_sent_bookings_are_marked(self, run_task):
+        email = service_returning(lambda to: True)
+        sms = service_returning(lambda to: True)
+
+        finished, record = self.run_chunk(run_task, [due_booking(1), due_booking(2)], email, sms)
+
+        assert finished == {"p_sent": ["booking-1", "booking-2"], "p_failed": []}
+        assert email.send_batch.await_count == 1
+        assert len(record.call_args.args[1]) == 4
+
+    def test_failed_bookings_are_released(self, run_task):
+        email = service_returning(lambda to: to != "contact2@example.com")
+        sms = service_returning(lambda to: False)
+        bookings = [due_booking(1), due_booking(2), due_booking(3, email=False, phone=False)]
+
+        finished, record = self.run_chunk(run_task, bookings, email, sms)
+
+        # booking-1's email went out, so its failed SMS does not make it retry
+        assert finished == {"p_sent": ["booking-1", "booking-3"], "p_failed": ["booking-2"]}
+        assert [send[2] for send in record.call_args.args[1]] == ["email"]
+
+    def test_channel_without_provider_is_not_retried(self, run_task):
+        email = service_returning(lambda to: False)
+        sms = Mock(send_batch=AsyncMock(side_effect=ProviderNotConfiguredException("No SMS provider configured", service="SMS")))
+        bookings = [due_booking(1, email=False), due_booking(2)]
+
+        finished, record = self.run_chunk(run_task, bookings, email, sms)
+
+        # Nothing could ever send booking-1's text; booking-2's email really failed
+        assert finished == {"p_sent": ["booking-1"], "p_failed": ["booking-2"]}
+        assert record.call_args.args[1] == []
+
+
+@pytest.fixture
+def celery_calls():
+    """Capture reminder tasks queued and revoked"""
+    with patch.object(automation_tasks.send_booking_reminder, "apply_async") as apply_async, \
+            patch.object(automation_tasks.celery_app.control, "revoke") as revoke:
+        yield apply_async, revoke
+
+
+class TestScheduling:
+    """Tests for queueing, revoking and re-queueing reminder ETA tasks"""
+
+    def test_confirmed_booking_within_horizon(self, celery_calls):
+        apply_async, revoke = celery_calls
+        supabase = supabase_with_pages([], [[{"id": "booking-1"}]])
+        booking = booking_at(24.5)
+
+        task_id = automation_tasks.schedule_booking_reminder(supabase, booking)
+
+        assert task_id is not None
+        call = apply_async.call_args
+        assert call.args[0] == ("booking-1", booking["scheduled_at"])
+        assert call.kwargs["task_id"] == task_id
+        expected_eta = datetime.fromisoformat(booking["scheduled_at"]) - timedelta(hours=settings.REMINDER_LEAD_HOURS)
+        assert call.kwargs["eta"] == expected_eta
+        supabase.table.return_value.is_.assert_called_with("reminder_task_id", "null")
+        revoke.assert_not_called()
+
+    def test_short_notice_booking_sends_now(self, celery_calls):
+        apply_async, _ = celery_calls
+        supabase = supabase_with_pages([], [[{"id": "booking-1"}]])
+
+        automation_tasks.schedule_booking_reminder(supabase, booking_at(2))
+
+        assert apply_async.call_args.kwargs["eta"] <= datetime.now(timezone.utc)
+
+    def test_far_out_booking_left_to_sweep(self, celery_calls):
+        apply_async, _ = celery_calls
+        supabase = supabase_with_pages([])
+
+        assert automation_tasks.schedule_booking_reminder(supabase, booking_at(24 * 7)) is None
+
+        apply_async.assert_not_called()
+        supabase.table.assert_not_called()
+
+    def test_horizon_stays_inside_visibility_timeout(self, celery_calls):
+        apply_async, _ = celery_calls
+        supabase = supabase_with_pages([], [[{"id": "booking-1"}]])
+
+        # Due in an hour: past the horizon, so a worker never holds it unacked that long
+        assert automation_tasks.schedule_booking_reminder(supabase, booking_at(25)) is None
+
+        apply_async.assert_not_called()
+        assert settings.REMINDER_ETA_HORIZON_MINUTES < 60
+
+    def test_cancel_revokes_and_clears(self, celery_calls):
+        apply_async, revoke = celery_calls
+        supabase = supabase_with_pages([], [[{"id": "booking-1"}]])
+
+        automation_tasks.schedule_booking_reminder(
+            supabase, booking_at(27, status="cancelled", reminder_task_id="task-old")
+        )
+
+        revoke.assert_called_once_with("task-old")
+        supabase.table.return_value.update.assert_called_with({"reminder_task_id": None})
+        supabase.table.return_value.eq.assert_called_with("reminder_task_id", "task-old")
+        apply_async.assert_not_called()
+
+    def test_reschedule_replaces_task(self, celery_calls):
+        apply_async, revoke = celery_calls
+        supabase = supabase_with_pages([], [[{"id": "booking-1"}]])
+
+        task_id = automation_tasks.schedule_booking_reminder(
+            supabase, booking_at(24.5, reminder_task_id="task-old")
+        )
+
+        revoke.assert_called_once_with("task-old")
+        assert apply_async.call_args.kwargs["task_id"] == task_id != "task-old"
+
+    def test_lost_race_queues_nothing(self, celery_calls):
+        apply_async, _ = celery_calls
+        supabase = supabase_with_pages([], [[]])
+
+        assert automation_tasks.schedule_booking_reminder(supabase, booking_at(24.5)) is None
+        apply_async.assert_not_called()
+
+    def test_sweep_queues_unscheduled_bookings(self, run_task, celery_calls):
+        apply_async, _ = celery_calls
+        page = [{**booking_at(24.2 + i / 10), "id": f"booking-{i}"} for i in range(3)]
+        supabase = supabase_with_pages([], [page, [{"id": "x"}], [{"id": "x"}], [{"id": "x"}]])
+
+        delay = run_task(automation_tasks.send_booking_reminders, supabase)
+
+        assert apply_async.call_count == 3
+        delay.assert_called_once_with(settings.REMINDER_MAX_CHUNKS_PER_RUN)
+
+
+class TestReminderTask:
+    """Tests for the per-booking ETA task"""
+
+    def test_moved_or_cancelled_booking_is_skipped(self, run_task):
+        supabase = supabase_with_pages([])
+
+        with patch.object(automation_tasks, "send_reminders") as send:
+            run_task(automation_tasks.send_booking_reminder, supabase, "booking-1", "2026-10-20T14:30:00+00:00")
+
+        assert supabase.rpc.call_args.args[0] == "claim_booking_reminder"
+        assert supabase.rpc.call_args.args[1]["p_scheduled_at"] == "2026-10-20T14:30:00+00:00"
+        send.assert_not_called()
+
+    def test_claimed_booking_is_sent(self, run_task):
+        supabase = Mock()
+        supabase.rpc.return_value.execute.return_value = Mock(data=[due_booking(1)])
+
+        with patch.object(automation_tasks, "send_reminders") as send:
+            run_task(automation_tasks.send_booking_reminder, supabase, "booking-1", "2026-10-20T14:30:00+00:00")
+
+        assert send.call_args.args[1] == [due_booking(1)]
+
+
+class TestSyncReminder:
+    """Tests for rescheduling from the API"""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_the_event_loop(self):
+        from app.services.booking_service import BookingService
+
+        loop_thread = threading.get_ident()
+        threads = []
+
+        with patch("app.services.booking_service.schedule_booking_reminder",
+                   side_effect=lambda supabase, booking: threads.append(threading.get_ident())):
+            await BookingService(Mock()).sync_reminder(booking_at(24.5))
+
+        assert threads and threads[0] != loop_thread
@@ -0,0 +1,388 @@
+"""Tests for email and SMS providers over the shared HTTP client"""
+import asyncio
+import json
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.core.exceptions import IntegrationException
+from app.main import app
+from app.services.communication import http_client, provider_health, standin
+from app.services.communication.email_provider import EmailService, get_email_service
+from app.services.communication.sms_provider import SMSService
+from app.tasks.celery_app import run_async
+
+
+def use_transport(handler):
+    """Route the running loop's provider client through a mock transport"""
+    requests = []
+
+    def record(request):
+        requests.append(request)
+        return handler(request)
+
+    http_client._clients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(record))
+    return requests
+
+
+@pytest.fixture(autouse=True)
+def fresh_provider_health():
+    provider_health._registry.clear()
+    yield
+    provider_health._registry.clear()
+
+
+@pytest.fixture
+def email_settings():
+    with patch.object(settings, "RESEND_API_KEY", "re_test"), \
+            patch.object(settings, "SENDGRID_API_KEY", "SG.test"), \
+            patch.object(settings, "EMAIL_FROM", "clinic@example.com"):
+        yield
+
+
+@pytest.fixture
+def sms_settings():
+    with patch.object(settings, "TWILIO_ACCOUNT_SID", "AC123"), \
+            patch.object(settings, "TWILIO_AUTH_TOKEN", "secret"), \
+            patch.object(settings, "TWILIO_PHONE_NUMBER", "+15550000000"):
+        yield
+
+
+class TestEmailProviders:
+    """Tests for EmailService"""
+
+    @pytest.mark.asyncio
+    async def test_resend_request(self, email_settings):
+        requests = use_transport(lambda request: httpx.Response(200, json={"id": "email-1"}))
+
+        result = await EmailService().send_email("jane@example.com", "Hello", "<p>Hi</p>")
+
+        assert result == {"success": True, "message_id": "email-1"}
+        request = requests[0]
+        assert str(request.url) == "https://api.resend.com/emails"
+        assert request.headers["Authorization"] == "Bearer re_test"
+        assert json.loads(request.content) == {
+            "from": "clinic@example.com",
+            "to": ["jane@example.com"],
+            "subject": "Hello",
+            "html": "<p>Hi</p>",
+        }
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_sendgrid(self, email_settings):
+        def handler(request):
+            if request.url.host == "api.resend.com":
+                return httpx.Response(500)
+            return httpx.Response(202, headers={"X-Message-Id": "sg-1"})
+
+        requests = use_transport(handler)
+
+        result = await EmailService().send_email("jane@example.com", "Hello", "<p>Hi</p>")
+
+        assert result["message_id"] == "sg-1"
+        assert [r.url.host for r in requests] == ["api.resend.com", "api.sendgrid.com"]
+        body = json.loads(requests[1].content)
+        assert body["personalizations"] == [{"to": [{"email": "jane@example.com"}]}]
+
+    @pytest.mark.asyncio
+    async def test_all_providers_failing_raises(self, email_settings):
+        use_transport(lambda request: httpx.Response(503))
+
+        with pytest.raises(IntegrationException):
+            await EmailService().send_email("jane@example.com", "Hello", "<p>Hi</p>")
+
+    @pytest.mark.asyncio
+    async def test_resend_batch_chunks(self, email_settings):
+        def handler(request):
+            emails = json.loads(request.content)
+            return httpx.Response(200, json={"data": [{"id": f"id-{e['to'][0]}"} for e in emails]})
+
+        requests = use_transport(handler)
+        messages = [
+            {"to": f"user{i}@example.com", "subject": "Reminder", "content": "<p>Tomorrow</p>"}
+            for i in range(250)
+        ]
+
+        results = await EmailService().send_batch(messages)
+
+        assert [r.url.path for r in requests] == ["/emails/batch"] * 3
+        assert sorted(len(json.loads(r.content)) for r in requests) == [50, 100, 100]
+        assert all(r["success"] and r["provider"] == "Resend" for r in results)
+        assert results[249]["message_id"] == "id-user249@example.com"
+
+    @pytest.mark.asyncio
+    async def test_batch_falls_back_per_recipient(self, email_settings):
+        def handler(request):
+            if request.url.host == "api.resend.com":
+                emails = json.loads(request.content)
+                if any(e["to"] == ["bad@example.com"] for e in emails):
+                    return httpx.Response(422)
+                return httpx.Response(200, json={"data": [{"id": "re-1"} for _ in emails]})
+            return httpx.Response(202, headers={"X-Message-Id": "sg-1"})
+
+        with patch("app.services.communication.email_provider.RESEND_BATCH_SIZE", 2):
+            requests = use_transport(handler)
+            results = await EmailService().send_batch([
+                {"to": "a@example.com", "subject": "A", "content": "<p>Hi</p>"},
+                {"to": "b@example.com", "subject": "B", "content": "<p>Hi</p>"},
+                {"to": "bad@example.com", "subject": "C", "content": "<p>Hi</p>"},
+                {"to": "d@example.com", "subject": "D", "content": "<p>Hi</p>"},
+            ])
+
+        assert [(r["provider"], r["message_id"]) for r in results] == [
+            ("Resend", "re-1"), ("Resend", "re-1"), ("SendGrid", "sg-1"), ("SendGrid", "sg-1"),
+        ]
+        sendgrid = [r for r in requests if r.url.host == "api.sendgrid.com"]
+        assert len(sendgrid) == 1
+        assert json.loads(sendgrid[0].content)["personalizations"] == [
+            {"to": [{"email": "bad@example.com"}], "subject": "C"},
+            {"to": [{"email": "d@example.com"}], "subject": "D"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_sendgrid_shares_template_body(self, email_settings):
+        requests = use_transport(lambda request: httpx.Response(202, headers={"X-Message-Id": "sg-1"}))
+
+        with patch.object(settings, "RESEND_API_KEY", ""):
+            results = await EmailService().send_batch([
+                {"to": "a@example.com", "subject": "A", "content": "<p>Hi Ann</p>",
+                 "template": "<p>Hi [%0%]</p>", "substitutions": {"[%0%]": "Ann"}},
+                {"to": "b@example.com", "subject": "B", "content": "<p>Hi Bob</p>",
+                 "template": "<p>Hi [%0%]</p>", "substitutions": {"[%0%]": "Bob"}},
+                {"to": "c@example.com", "subject": "C", "content": "<p>Other</p>"},
+            ])
+
+        assert all(r["success"] for r in results)
+        assert len(requests) == 2
+        payload = json.loads(requests[0].content)
+        assert payload["content"] == [{"type": "text/html", "value": "<p>Hi [%0%]</p>"}]
+        assert [p["substitutions"] for p in payload["personalizations"]] == [{"[%0%]": "Ann"}, {"[%0%]": "Bob"}]
+
+    @pytest.mark.asyncio
+    async def test_batch_reports_failures(self, email_settings):
+        def handler(request):
+            if request.url.host == "api.resend.com":
+                return httpx.Response(503)
+            if "bad" in request.content.decode():
+                return httpx.Response(400)
+            return httpx.Response(202, headers={"X-Message-Id": "sg-1"})
+
+        use_transport(handler)
+
+        results = await EmailService().send_batch([
+            {"to": "a@example.com", "subject": "A", "content": "<p>One</p>"},
+            {"to": "bad@example.com", "subject": "B", "content": "<p>Other</p>"},
+        ])
+
+        assert results[0]["success"] is True
+        assert results[1]["success"] is False
+        assert results[1]["provider"] == "SendGrid"
+        assert "400" in results[1]["error"]
+
+    def test_service_is_shared(self, email_settings):
+        get_email_service.cache_clear()
+        try:
+            assert get_email_service() is get_email_service()
+        finally:
+            get_email_service.cache_clear()
+
+
+class TestSMSProvider:
+    """Tests for SMSService"""
+
+    @pytest.mark.asyncio
+    async def test_twilio_request(self, sms_settings):
+        requests = use_transport(lambda request: httpx.Response(201, json={"sid": "SM1"}))
+
+        result = await SMSService().send_sms("+15551234567", "Reminder")
+
+        assert result == {"success": True, "message_sid": "SM1"}
+        request = requests[0]
+        assert request.url.path == "/2010-04-01/Accounts/AC123/Messages.json"
+        assert request.headers["Authorization"].startswith("Basic ")
+        assert dict(httpx.QueryParams(request.content.decode())) == {
+            "Body": "Reminder", "From": "+15550000000", "To": "+15551234567",
+        }
+
+    @pytest.mark.asyncio
+    async def test_batch_reports_each_recipient(self, sms_settings):
+        def handler(request):
+            if "%2B15559999999" in request.content.decode():
+                return httpx.Response(400)
+            return httpx.Response(201, json={"sid": "SM1"})
+
+        use_transport(handler)
+
+        results = await SMSService().send_batch([
+            {"to": "+15551234567", "content": "Reminder"},
+            {"to": "+15559999999", "content": "Reminder"},
+        ])
+
+        assert [r["success"] for r in results] == [True, False]
+        assert results[0]["to"] == "+15551234567"
+
+
+class TestProviderRouting:
+    """Tests for provider health tracking and routing"""
+
+    @pytest.mark.asyncio
+    async def test_circuit_opens_and_skips_provider(self, email_settings):
+        def handler(request):
+            if request.url.host == "api.resend.com":
+                return httpx.Response(500)
+            return httpx.Response(202, headers={"X-Message-Id": "sg-1"})
+
+        requests = use_transport(handler)
+        service = EmailService()
+
+        with patch.object(settings, "PROVIDER_CIRCUIT_FAILURE_THRESHOLD", 2):
+            for _ in range(3):
+                await service.send_email("jane@example.com", "Hello", "<p>Hi</p>")
+
+        assert [r.url.host for r in requests] == [
+            "api.resend.com", "api.sendgrid.com",
+            "api.resend.com", "api.sendgrid.com",
+            "api.sendgrid.com",
+        ]
+        stats = provider_health.get_provider_stats()
+        assert stats["Resend"]["state"] == "open"
+        assert stats["Resend"]["circuit_opens"] == 1
+        assert stats["SendGrid"]["error_rate"] == 0.0
+
+    def test_half_open_probe(self):
+        health = provider_health.ProviderHealth("Resend")
+        with patch.object(settings, "PROVIDER_CIRCUIT_FAILURE_THRESHOLD", 1), \
+                patch.object(settings, "PROVIDER_CIRCUIT_RESET_SECONDS", 30.0), \
+                patch.object(provider_health, "monotonic", return_value=100.0) as clock:
+            health.record(0.1, ok=False)
+            assert not health.available()
+
+            clock.return_value = 131.0
+            assert health.state == "half_open"
+            health.begin_attempt()
+            assert not health.available()
+
+            health.record(0.1, ok=True)
+            assert health.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_slow_provider_is_demoted(self, email_settings):
+        requests = use_transport(lambda request: httpx.Response(202, headers={"X-Message-Id": "sg-1"}))
+        for _ in range(5):
+            provider_health.get_provider_health("Resend").record(5.0, ok=True)
+
+        result = await EmailService().send_email("jane@example.com", "Hello", "<p>Hi</p>")
+
+        assert result["message_id"] == "sg-1"
+        assert [r.url.host for r in requests] == ["api.sendgrid.com"]
+
+    @pytest.mark.asyncio
+    async def test_hedged_send(self, email_settings):
+        async def handler(request):
+            if request.url.host == "api.resend.com":
+                await asyncio.sleep(5)
+                return httpx.Response(200, json={"id": "re-1"})
+            return httpx.Response(202, headers={"X-Message-Id": "sg-1"})
+
+        use_transport(handler)
+
+        with patch.object(settings, "EMAIL_HEDGE_AFTER_SECONDS", 0.05):
+            result = await asyncio.wait_for(
+                EmailService().send_email("jane@example.com", "Hello", "<p>Hi</p>"), timeout=2
+            )
+
+        assert result["message_id"] == "sg-1"
+        assert provider_health.get_provider_stats()["Resend"]["window"] == 0
+
+    @pytest.mark.asyncio
+    async def test_metrics_expose_provider_health(self, email_settings):
+        provider_health.get_provider_health("Resend").record(0.2, ok=True)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            with patch.object(settings, "METRICS_TOKEN", "metrics-secret"):
+                response = await client.get("/health/metrics", headers={"X-Metrics-Token": "metrics-secret"})
+
+        assert response.json()["providers"]["Resend"]["latency_p50_ms"] == 200.0
+
+
+@pytest.fixture
+def local_mode():
+    with patch.object(settings, "COMMUNICATION_MODE", "local"), \
+            patch.object(settings, "LOCAL_PROVIDER_URL", "http://standin.test"), \
+            patch.object(settings, "RESEND_API_KEY", ""), \
+            patch.object(settings, "SENDGRID_API_KEY", ""), \
+            patch.object(settings, "TWILIO_ACCOUNT_SID", ""), \
+            patch.object(settings, "TWILIO_AUTH_TOKEN", ""):
+        yield
+
+
+def use_standin(**options):
+    """Route the running loop's provider client to an in-process stand-in"""
+    stats = standin.StandInStats()
+    app = standin.build_app(latency=0, stats=stats, seed=1, **options)
+    http_client._clients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    return stats
+
+
+class TestLocalMode:
+    """Tests for local provider mode and the stand-in"""
+
+    def test_providers_target_standin_without_credentials(self, local_mode):
+        email = EmailService()
+        sms = SMSService()
+
+        assert [p.url for p in email.providers] == [
+            "http://standin.test/emails", "http://standin.test/v3/mail/send",
+        ]
+        assert sms.provider.account_url == "http://standin.test/2010-04-01/Accounts/AClocal"
+
+    @pytest.mark.asyncio
+    async def test_sends_through_standin(self, local_mode):
+        stats = use_standin()
+        messages = [{"to": f"user{i}@example.com", "subject": "Hi", "content": "<p>Hi</p>"} for i in range(3)]
+
+        results = await EmailService().send_batch(messages)
+        sms = await SMSService().send_sms("+15551234567", "Reminder")
+
+        assert all(r["success"] and r["message_id"] for r in results)
+        assert sms["message_sid"].startswith("SM")
+        assert stats.as_dict() == {"requests": 2, "messages": 4, "errors": 0, "connections": 1}
+
+    @pytest.mark.asyncio
+    async def test_injected_errors(self, local_mode):
+        stats = use_standin(error_rate=1.0)
+
+        results = await EmailService().send_batch([{"to": "a@example.com", "subject": "Hi", "content": "<p>Hi</p>"}])
+
+        assert results[0]["success"] is False
+        assert "500" in results[0]["error"]
+        assert stats.errors == 2
+        assert stats.messages == 0
+
+
+class TestSharedClient:
+    """Tests for connection reuse"""
+
+    @pytest.mark.asyncio
+    async def test_one_client_per_loop(self):
+        first = http_client.get_http_client()
+        try:
+            assert http_client.get_http_client() is first
+        finally:
+            await http_client.close_http_client()
+        assert http_client.get_http_client() is not first
+        await http_client.close_http_client()
+
+    def test_tasks_share_loop_and_client(self):
+        """Test run_async keeps the loop, and so the pooled client, between tasks"""
+
+        async def current():
+            return asyncio.get_running_loop(), http_client.get_http_client()
+
+        first_loop, first_client = run_async(current())
+        second_loop, second_client = run_async(current())
+
+        assert first_loop is second_loop
+        assert first_client is second_client
+        run_async(http_client.close_http_client())
@@ -0,0 +1,119 @@
+"""Unit tests for ContactService"""
+import pytest
+from unittest.mock import Mock
+from app.services.contact_service import ContactService
+from app.core.exceptions import IntegrationException
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def mock_supabase():
+    """Mock Supabase client"""
+    mock = Mock()
+    mock.rpc = Mock(return_value=mock)
+    mock.execute = Mock()
+    return mock
+
+
+@pytest.fixture
+def contact_service(mock_supabase):
+    """Create ContactService instance with mocked Supabase"""
+    return ContactService(mock_supabase)
+
+
+class TestUpsertContact:
+    """Tests for upsert_contact method"""
+
+    @pytest.mark.asyncio
+    async def test_upsert_contact_created(self, contact_service, mock_supabase):
+        """Test a new contact is reported as created"""
+        mock_supabase.execute.return_value = Mock(data={
+            "contact": {"id": "contact-123", "email": "jane@example.com"},
+            "created": True,
+        })
+
+        contact, created = await contact_service.upsert_contact(
+            workspace_id="workspace-123",
+            name="Jane",
+            email="jane@example.com",
+            ensure_conversation=True,
+            unread_count=1,
+        )
+
+        assert contact["id"] == "contact-123"
+        assert created is True
+        mock_supabase.rpc.assert_called_once()
+        name, params = mock_supabase.rpc.call_args[0]
+        assert name == "upsert_contact"
+        assert params["p_workspace_id"] == "workspace-123"
+        assert params["p_email"] == "jane@example.com"
+        assert params["p_ensure_conversation"] is True
+        assert params["p_unread_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_upsert_contact_existing(self, contact_service, mock_supabase):
+        """Test an existing contact is reported as not created"""
+        mock_supabase.execute.return_value = Mock(data={
+            "contact": {"id": "contact-123"},
+            "created": False,
+        })
+
+        contact, created = await contact_service.upsert_contact("workspace-123", "Jane", "jane@example.com")
+
+        assert contact["id"] == "contact-123"
+        assert created is False
+
+    @pytest.mark.asyncio
+    async def test_upsert_contact_single_round_trip(self, contact_service, mock_supabase):
+        """Test upsert never issues table queries"""
+        mock_supabase.execute.return_value = Mock(data={"contact": {"id": "c"}, "created": True})
+
+        await contact_service.upsert_contact("workspace-123", "Jane", "jane@example.com")
+
+        assert mock_supabase.execute.call_count == 1
+        assert not mock_supabase.table.called
+
+    @pytest.mark.asyncio
+    async def test_upsert_contact_no_data(self, contact_service, mock_supabase):
+        """Test failure when RPC returns nothing"""
+        mock_supabase.execute.return_value = Mock(data=None)
+
+        with pytest.raises(IntegrationException):
+            await contact_service.upsert_contact("workspace-123", "Jane")
+
+
+def search_hit(index, rank):
+    return {"id": f"contact-{index}", "name": f"Jane {index}", "rank": rank}
+
+
+class TestSearchContacts:
+    """Tests for search_contacts method"""
+
+    @pytest.mark.asyncio
+    async def test_first_page(self, contact_service, mock_supabase):
+        """Test one extra row is fetched to detect a next page"""
+        mock_supabase.execute.return_value = Mock(data=[search_hit(1, 0.9), search_hit(2, 0.5), search_hit(3, 0.4)])
+
+        contacts, next_cursor = await contact_service.search_contacts("workspace-123", "jane", limit=2)
+
+        assert [c["id"] for c in contacts] == ["contact-1", "contact-2"]
+        assert decode_cursor(next_cursor, 2) == [0.5, "contact-2"]
+        mock_supabase.rpc.assert_called_once_with("search_contacts", {
+            "p_workspace_id": "workspace-123",
+            "p_query": "jane",
+            "p_limit": 3,
+            "p_after_rank": None,
+            "p_after_id": None,
+        })
+
+    @pytest.mark.asyncio
+    async def test_cursor_continues_after_rank_and_id(self, contact_service, mock_supabase):
+        mock_supabase.execute.return_value = Mock(data=[search_hit(3, 0.4)])
+
+        contacts, next_cursor = await contact_service.search_contacts(
+            "workspace-123", "jane", limit=2, cursor=encode_cursor(0.5, "contact-2")
+        )
+
+        assert len(contacts) == 1 and next_cursor is None
+        params = mock_supabase.rpc.call_args[0][1]
+        assert (params["p_after_rank"], params["p_after_id"]) == (0.5, "contact-2")
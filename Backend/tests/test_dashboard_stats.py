@@ -0,0 +1,203 @@
+"""Tests for aggregate-backed dashboard statistics"""
+import time
+import pytest
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import Mock, patch
+
+from app.main import app
+from app.db.supabase_client import get_supabase_service
+from app.core.security import create_access_token
+from app.services.dashboard_service import DashboardService
+from app.tasks.maintenance_tasks import reconcile_workspace_counters
+
+STATS = {
+    "bookings": {"today_count": 4, "upcoming_count": 12, "completed_count": 1, "no_show_count": 1},
+    "leads": {"new_inquiries": 30, "ongoing_conversations": 25, "unanswered_messages": 7},
+    "forms": {"pending_count": 5, "overdue_count": 2, "completed_count": 40},
+    "inventory": {"low_stock_items": 3, "critical_items": 1},
+    "total_alerts": 6,
+    "critical_alerts": 2,
+}
+
+
+@pytest.fixture
+def mock_supabase():
+    """Mock Supabase service client injected into the app"""
+    mock = Mock()
+    mock.rpc.return_value.execute.return_value = Mock(data=STATS)
+    app.dependency_overrides[get_supabase_service] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_supabase_service, None)
+
+
+def auth_headers(workspace_id="workspace-123"):
+    token = create_access_token({
+        "sub": "user-123",
+        "email": "owner@example.com",
+        "role": "owner",
+        "workspace_id": workspace_id,
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestDashboardStats:
+    """Tests for GET /dashboard/stats"""
+
+    @pytest.mark.asyncio
+    async def test_single_rpc_round_trip(self, mock_supabase):
+        """Test counters come from one get_workspace_counters call"""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/v1/dashboard/stats", headers=auth_headers())
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["bookings"] == STATS["bookings"]
+        assert body["forms"]["overdue_count"] == 2
+        assert body["critical_alerts"] == 2
+
+        mock_supabase.rpc.assert_called_once()
+        name, params = mock_supabase.rpc.call_args[0]
+        assert name == "get_workspace_counters"
+        assert params["p_workspace_id"] == "workspace-123"
+        assert not mock_supabase.table.called
+
+
+class TestReconcileWorkspaceCounters:
+    """Tests for the counter reconciliation task"""
+
+    def workspaces_query(self, supabase, pages):
+        query = Mock()
+        for name in ("select", "order", "limit", "gt"):
+            getattr(query, name).return_value = query
+        query.execute.side_effect = [Mock(data=page) for page in pages]
+        supabase.table.return_value = query
+        return query
+
+    def test_reconciles_every_workspace(self):
+        """Test each workspace is reconciled and failures do not stop the run"""
+        supabase = Mock()
+        self.workspaces_query(supabase, [[{"id": "workspace-1"}, {"id": "workspace-2"}, {"id": "workspace-3"}]])
+        supabase.rpc.return_value.execute.side_effect = [
+            Mock(data=True),
+            Exception("deadlock detected"),
+            Mock(data=False),
+        ]
+
+        with patch("app.tasks.maintenance_tasks.get_supabase_client") as mock_client:
+            mock_client.return_value.service_client = supabase
+            reconcile_workspace_counters()
+
+        assert supabase.rpc.call_count == 3
+        assert supabase.rpc.call_args_list[2][0] == (
+            "reconcile_workspace_counters", {"p_workspace_id": "workspace-3"}
+        )
+
+    def test_pages_through_workspaces(self):
+        """Test workspaces are listed a page at a time, keyed on id"""
+        supabase = Mock()
+        query = self.workspaces_query(supabase, [
+            [{"id": "workspace-1"}, {"id": "workspace-2"}],
+            [{"id": "workspace-3"}],
+        ])
+        supabase.rpc.return_value.execute.return_value = Mock(data=False)
+
+        with patch("app.tasks.maintenance_tasks.get_supabase_client") as mock_client, \
+                patch("app.tasks.maintenance_tasks.WORKSPACE_PAGE_SIZE", 2):
+            mock_client.return_value.service_client = supabase
+            reconcile_workspace_counters()
+
+        assert supabase.rpc.call_count == 3
+        query.limit.assert_called_with(2)
+        query.gt.assert_called_once_with("id", "workspace-2")
+
+
+def chain_mock(execute):
+    """Query builder mock where every filter returns the builder itself"""
+    builder = Mock()
+    for method in ("select", "eq", "gte", "lte", "gt", "or_", "limit"):
+        getattr(builder, method).return_value = builder
+    builder.execute.side_effect = execute
+    return builder
+
+
+class TestDashboardFanOut:
+    """Tests for the concurrent fallback queries"""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_counters_fail(self):
+        """Test every counter is computed by count queries when the RPC fails"""
+        supabase = Mock()
+        supabase.rpc.return_value.execute.side_effect = Exception("function does not exist")
+        supabase.table.side_effect = lambda name: chain_mock(lambda: Mock(count=3))
+
+        stats = await DashboardService(supabase, timeout=1).get_stats("workspace-123")
+
+        assert stats["partial"] is False
+        assert stats["bookings"]["today_count"] == 3
+        assert stats["forms"] == {"pending_count": 3, "overdue_count": 3, "completed_count": 3}
+        assert stats["total_alerts"] == 3
+        assert supabase.table.call_count == 14
+
+    @pytest.mark.asyncio
+    async def test_slow_section_flagged_partial(self):
+        """Test a slow source is zeroed and flagged instead of delaying the response"""
+
+        def execute_for(name):
+            def execute():
+                if name == "inventory_items":
+                    time.sleep(0.5)
+                return Mock(count=2)
+            return execute
+
+        supabase = Mock()
+        supabase.table.side_effect = lambda name: chain_mock(execute_for(name))
+
+        start = time.perf_counter()
+        stats = await DashboardService(supabase, timeout=0.1).get_stats_fan_out("workspace-123")
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.4
+        assert stats["partial"] is True
+        assert stats["unavailable_sections"] == ["inventory"]
+        assert stats["inventory"] == {"low_stock_items": 0, "critical_items": 0}
+        assert stats["leads"]["new_inquiries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_counter_timeout_skips_fan_out(self):
+        """Test a timed out RPC is not followed by fourteen more queries"""
+        supabase = Mock()
+        supabase.rpc.return_value.execute.side_effect = lambda: time.sleep(0.3)
+
+        start = time.perf_counter()
+        stats = await DashboardService(supabase, timeout=0.1).get_stats("workspace-123")
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.25
+        assert stats["partial"] is True
+        assert stats["unavailable_sections"] == ["bookings", "leads", "forms", "inventory", "alerts"]
+        assert stats["total_alerts"] == 0
+        assert not supabase.table.called
+
+    @pytest.mark.asyncio
+    async def test_fan_out_shares_the_deadline(self):
+        """Test the fallback only gets what is left of the request's timeout"""
+
+        def failing_rpc():
+            time.sleep(0.15)
+            raise Exception("function does not exist")
+
+        def slow_count():
+            time.sleep(0.1)
+            return Mock(count=1)
+
+        supabase = Mock()
+        supabase.rpc.return_value.execute.side_effect = failing_rpc
+        supabase.table.side_effect = lambda name: chain_mock(slow_count)
+
+        start = time.perf_counter()
+        stats = await DashboardService(supabase, timeout=0.2).get_stats("workspace-123")
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.3
+        assert stats["partial"] is True
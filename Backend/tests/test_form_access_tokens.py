@@ -0,0 +1,161 @@
+"""Tests for signed public form access tokens"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import Mock, AsyncMock, patch
+from app.main import app
+from app.db.supabase_client import get_supabase
+from app.core.security import create_form_access_token, verify_form_access_token
+
+
+class TestFormAccessToken:
+    """Tests for token creation and verification"""
+
+    def test_valid_token_returns_workspace(self):
+        """Test a freshly issued token verifies"""
+        token = create_form_access_token("submission-123", "workspace-123")
+
+        assert verify_form_access_token("submission-123", token) == "workspace-123"
+
+    def test_token_bound_to_submission(self):
+        """Test a token cannot be reused for another submission"""
+        token = create_form_access_token("submission-123", "workspace-123")
+
+        assert verify_form_access_token("submission-456", token) is None
+
+    def test_tampered_workspace_rejected(self):
+        """Test changing the workspace invalidates the signature"""
+        token = create_form_access_token("submission-123", "workspace-123")
+        _, expires_at, signature = token.split(".")
+
+        assert verify_form_access_token("submission-123", f"workspace-456.{expires_at}.{signature}") is None
+
+    def test_expired_token_rejected(self):
+        """Test expired tokens are rejected"""
+        token = create_form_access_token("submission-123", "workspace-123", timedelta(seconds=-1))
+
+        assert verify_form_access_token("submission-123", token) is None
+
+    @pytest.mark.parametrize("token", ["", "abc", "a.b.c", "a.1.c.d"])
+    def test_malformed_token_rejected(self, token):
+        """Test malformed tokens are rejected"""
+        assert verify_form_access_token("submission-123", token) is None
+
+
+@pytest.fixture
+def mock_supabase():
+    """Mock Supabase client injected into the app"""
+    mock = Mock()
+    app.dependency_overrides[get_supabase] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_supabase, None)
+
+
+SUBMISSION_ID = "3f1c2a9e-5b7d-4e08-9c61-2d4f8a0b7e15"
+
+
+class TestPublicFormEndpoints:
+    """Tests for public form endpoints"""
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_skips_database(self, mock_supabase):
+        """Test an invalid signed token is rejected before any query"""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            with patch("app.api.v1.endpoints.public.FormSubmissionService") as mock_service:
+                token = create_form_access_token(SUBMISSION_ID, "workspace-456")
+                _, expires_at, signature = token.split(".")
+                forged = f"workspace-123.{expires_at}.{signature}"
+                response = await client.get(f"/api/v1/public/form/{SUBMISSION_ID}/{forged}")
+
+                assert response.status_code == 404
+                assert not mock_service.called
+                assert not mock_supabase.table.called
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path", [
+        f"/api/v1/public/form/{SUBMISSION_ID}/not-a-token!",
+        f"/api/v1/public/form/{SUBMISSION_ID}/a.b",
+        "/api/v1/public/form/submission-123/abcdefghijklmnopqrstuvwxyz",
+        "/api/v1/public/forms/view/submission-123",
+    ])
+    async def test_malformed_link_skips_database(self, mock_supabase, path):
+        """Test malformed tokens and submission ids are rejected before any query"""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            with patch("app.api.v1.endpoints.public.FormSubmissionService") as mock_service:
+                response = await client.get(path)
+
+                assert response.status_code == 404
+                assert not mock_service.called
+                assert not mock_supabase.table.called
+
+    @pytest.mark.asyncio
+    async def test_legacy_lookup_error_is_not_found(self, mock_supabase):
+        """Test a failed legacy link lookup is the same 404"""
+        mock_supabase.table.side_effect = Exception("invalid input syntax for type uuid")
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(f"/api/v1/public/forms/view/{SUBMISSION_ID}")
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_legacy_tokenless_link_still_works(self, mock_supabase):
+        """Test links emailed before signed tokens are honoured until they expire"""
+        query = Mock()
+        for name in ("select", "eq", "limit"):
+            getattr(query, name).return_value = query
+        created_at = datetime.now(timezone.utc).isoformat()
+        query.execute.return_value = Mock(data=[
+            {"workspace_id": "workspace-123", "access_token": None, "created_at": created_at}
+        ])
+        mock_supabase.table.return_value = query
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            with patch("app.api.v1.endpoints.public.FormSubmissionService.update_public_submission",
+                       new=AsyncMock(return_value={"id": SUBMISSION_ID})) as update:
+                response = await client.post(f"/api/v1/public/forms/track-download/{SUBMISSION_ID}")
+
+        assert response.status_code == 200
+        assert update.await_args.args[:2] == (SUBMISSION_ID, "workspace-123")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("row", [
+        # Issued with a signed link: a tokenless request is not enough
+        {"workspace_id": "workspace-123", "access_token": "ws.1.sig", "created_at": "2026-10-01T00:00:00+00:00"},
+        # Older than the link lifetime
+        {"workspace_id": "workspace-123", "access_token": None, "created_at": "2020-01-01T00:00:00+00:00"},
+    ])
+    async def test_legacy_link_rejected(self, mock_supabase, row):
+        """Test tokenless links only work for unexpired pre-token submissions"""
+        query = Mock()
+        for name in ("select", "eq", "limit"):
+            getattr(query, name).return_value = query
+        query.execute.return_value = Mock(data=[row])
+        mock_supabase.table.return_value = query
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(f"/api/v1/public/forms/view/{SUBMISSION_ID}")
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_valid_token_reaches_service(self, mock_supabase):
+        """Test a valid token reaches the submission service"""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            token = create_form_access_token(SUBMISSION_ID, "workspace-123")
+
+            with patch("app.api.v1.endpoints.public.FormSubmissionService") as mock_service:
+                mock_instance = Mock()
+                mock_instance.get_public_submission = AsyncMock(return_value=None)
+                mock_service.return_value = mock_instance
+
+                response = await client.get(f"/api/v1/public/form/{SUBMISSION_ID}/{token}")
+
+                assert response.status_code == 404
+                mock_instance.get_public_submission.assert_awaited_once_with(SUBMISSION_ID, "workspace-123")
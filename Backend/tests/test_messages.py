@@ -0,0 +1,525 @@
+"""Tests for the inbox: conversation list and message pagination"""
+import pytest
+from datetime import timedelta
+from fastapi import HTTPException
+from httpx import AsyncClient, ASGITransport
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.main import app
+from app.db.supabase_client import get_supabase
+from app.api.v1.endpoints import messages as messages_endpoint
+from app.core.pagination import decode_cursor, encode_cursor, keyset_filter, split_page
+from app.core.realtime import CONVERSATION_UPDATED, RealtimeHub, conversation_channel, workspace_channel
+from app.core.security import create_access_token
+from app.services.message_service import MessageService
+
+
+def conversation(index, last_message_at="2026-10-01T12:00:00+00:00"):
+    return {
+        "id": f"conv-{index:03d}",
+        "workspace_id": "workspace-123",
+        "contact_id": f"contact-{index}",
+        "last_message_at": last_message_at,
+        "last_message_preview": "See you tomorrow",
+        "last_channel": "email",
+        "unread_count": 0,
+        "is_automated_paused": False,
+        "created_at": "2026-09-01T12:00:00+00:00",
+    }
+
+
+def chain_mock(data):
+    """Query builder mock whose every builder call returns itself"""
+    query = Mock()
+    for name in ("select", "eq", "or_", "order", "limit", "gt", "lt", "gte", "lte"):
+        getattr(query, name).return_value = query
+    query.execute.return_value = Mock(data=data)
+    return query
+
+
+@pytest.fixture
+def mock_supabase():
+    """Mock Supabase client injected into the app"""
+    mock = Mock()
+    app.dependency_overrides[get_supabase] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_supabase, None)
+
+
+def access_token(**claims):
+    return create_access_token({
+        "sub": "user-123",
+        "email": "owner@example.com",
+        "role": "owner",
+        "workspace_id": "workspace-123",
+        **claims,
+    })
+
+
+def auth_headers():
+    return {"Authorization": f"Bearer {access_token()}"}
+
+
+class TestCursors:
+    """Tests for cursor encoding"""
+
+    def test_round_trip(self):
+        cursor = encode_cursor("2026-10-01T12:00:00.123456+00:00", "conv-1")
+        assert "=" not in cursor
+        assert decode_cursor(cursor, 2) == ["2026-10-01T12:00:00.123456+00:00", "conv-1"]
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("only-one")])
+    def test_invalid_cursor_is_rejected(self, cursor):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(cursor, 2)
+        assert exc.value.status_code == 400
+
+    def test_keyset_filter_breaks_ties_on_id(self):
+        expression = keyset_filter("last_message_at", "2026-10-01T12:00:00+00:00", "conv-1")
+        assert expression == (
+            'last_message_at.lt."2026-10-01T12:00:00+00:00",'
+            'and(last_message_at.eq."2026-10-01T12:00:00+00:00",id.lt."conv-1")'
+        )
+
+    def test_split_page(self):
+        rows = [{"sent_at": f"t{i}", "id": f"m{i}"} for i in range(4)]
+
+        page, cursor = split_page(rows, 3, ("sent_at", "id"))
+        assert len(page) == 3
+        assert decode_cursor(cursor, 2) == ["t2", "m2"]
+
+        page, cursor = split_page(rows[:3], 3, ("sent_at", "id"))
+        assert len(page) == 3 and cursor is None
+
+
+class TestConversationList:
+    """Tests for GET /messages/conversations"""
+
+    @pytest.mark.asyncio
+    async def test_single_query_with_next_cursor(self, mock_supabase):
+        """Test the inbox is one ordered query and returns a next-page cursor"""
+        query = chain_mock([conversation(i) for i in range(3)])
+        mock_supabase.table.return_value = query
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/messages/conversations", params={"limit": 2}, headers=auth_headers()
+            )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [c["id"] for c in body] == ["conv-000", "conv-001"]
+        assert body[0]["last_message_preview"] == "See you tomorrow"
+        assert decode_cursor(response.headers["X-Next-Cursor"], 2) == [
+            "2026-10-01T12:00:00+00:00", "conv-001"
+        ]
+
+        mock_supabase.table.assert_called_once_with("conversations")
+        query.limit.assert_called_once_with(3)
+        query.or_.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cursor_continues_after_last_row(self, mock_supabase):
+        query = chain_mock([conversation(5)])
+        mock_supabase.table.return_value = query
+        cursor = encode_cursor("2026-10-01T12:00:00+00:00", "conv-001")
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/messages/conversations", params={"cursor": cursor}, headers=auth_headers()
+            )
+
+        assert response.status_code == 200
+        assert "X-Next-Cursor" not in response.headers
+        query.or_.assert_called_once_with(
+            keyset_filter("last_message_at", "2026-10-01T12:00:00+00:00", "conv-001")
+        )
+
+
+class TestSendMessage:
+    """Tests for MessageService.send_message"""
+
+    @pytest.mark.asyncio
+    async def test_pauses_automation(self):
+        supabase = Mock()
+        supabase.table.return_value.insert.return_value.execute.return_value = Mock(data=[{"id": "m-1"}])
+
+        message = await MessageService(supabase).send_message(
+            "conv-1", {"content": "Hi", "channel": "email"}, "user-1"
+        )
+
+        assert message == {"id": "m-1"}
+        inserted = supabase.table.return_value.insert.call_args[0][0]
+        assert inserted["conversation_id"] == "conv-1"
+        assert inserted["message_type"] == "manual"
+        supabase.table.return_value.update.assert_called_once_with({"is_automated_paused": True})
+
+
+def message(index):
+    return {
+        "id": f"msg-{index:03d}",
+        "conversation_id": "conv-1",
+        "sender_id": None,
+        "content": f"Message {index}",
+        "channel": "sms",
+        "message_type": "automated",
+        "is_read": False,
+        "sent_at": f"2026-10-01T12:{index:02d}:00+00:00",
+    }
+
+
+def history_supabase(rows, owned=True):
+    """Client returning `rows` for messages and the ownership check result"""
+    conversations = chain_mock([{"id": "conv-1"}] if owned else [])
+    messages = chain_mock(rows)
+    supabase = Mock()
+    supabase.table.side_effect = lambda name: conversations if name == "conversations" else messages
+    return supabase, messages
+
+
+class TestMessageHistory:
+    """Tests for MessageService.list_messages"""
+
+    @pytest.mark.asyncio
+    async def test_latest_page_is_oldest_first(self):
+        """Test the default page is the newest messages, in display order"""
+        supabase, query = history_supabase([message(i) for i in (9, 8, 7)])
+
+        messages, next_cursor, since_cursor = await MessageService(supabase).list_messages(
+            "conv-1", "workspace-123", limit=2
+        )
+
+        assert [m["id"] for m in messages] == ["msg-008", "msg-009"]
+        assert decode_cursor(next_cursor, 2) == ["2026-10-01T12:08:00+00:00", "msg-008"]
+        assert decode_cursor(since_cursor, 2) == ["2026-10-01T12:09:00+00:00", "msg-009"]
+        query.order.assert_any_call("sent_at", desc=True)
+
+    @pytest.mark.asyncio
+    async def test_before_loads_older(self):
+        supabase, query = history_supabase([message(7)])
+        before = encode_cursor("2026-10-01T12:08:00+00:00", "msg-008")
+
+        messages, next_cursor, since_cursor = await MessageService(supabase).list_messages(
+            "conv-1", "workspace-123", limit=2, before=before
+        )
+
+        assert [m["id"] for m in messages] == ["msg-007"]
+        assert next_cursor is None and since_cursor is None
+        query.or_.assert_called_once_with(
+            keyset_filter("sent_at", "2026-10-01T12:08:00+00:00", "msg-008", descending=True)
+        )
+
+    @pytest.mark.asyncio
+    async def test_since_loads_only_newer(self):
+        """Test refresh fetches ascending after the cursor and advances it"""
+        supabase, query = history_supabase([message(10), message(11)])
+        since = encode_cursor("2026-10-01T12:09:00+00:00", "msg-009")
+
+        messages, next_cursor, since_cursor = await MessageService(supabase).list_messages(
+            "conv-1", "workspace-123", since=since
+        )
+
+        assert [m["id"] for m in messages] == ["msg-010", "msg-011"]
+        assert next_cursor is None
+        assert decode_cursor(since_cursor, 2) == ["2026-10-01T12:11:00+00:00", "msg-011"]
+        query.order.assert_any_call("sent_at", desc=False)
+
+    @pytest.mark.asyncio
+    async def test_since_without_new_messages_keeps_cursor(self):
+        supabase, _ = history_supabase([])
+        since = encode_cursor("2026-10-01T12:09:00+00:00", "msg-009")
+
+        messages, _, since_cursor = await MessageService(supabase).list_messages(
+            "conv-1", "workspace-123", since=since
+        )
+
+        assert messages == []
+        assert since_cursor == since
+
+    @pytest.mark.asyncio
+    async def test_other_workspace_conversation_is_not_found(self, mock_supabase):
+        supabase, _ = history_supabase([message(1)], owned=False)
+        mock_supabase.table.side_effect = supabase.table.side_effect
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/messages/conversations/conv-1/messages", headers=auth_headers()
+            )
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_endpoint_sets_cursor_headers(self, mock_supabase):
+        supabase, _ = history_supabase([message(i) for i in (3, 2, 1)])
+        mock_supabase.table.side_effect = supabase.table.side_effect
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/messages/conversations/conv-1/messages",
+                params={"limit": 2},
+                headers=auth_headers(),
+            )
+
+        assert response.status_code == 200
+        assert [m["id"] for m in response.json()] == ["msg-002", "msg-003"]
+        assert "X-Next-Cursor" in response.headers
+        assert "X-Since-Cursor" in response.headers
+
+
+class TestSearch:
+    """Tests for GET /messages/search and /contacts/search"""
+
+    @pytest.mark.asyncio
+    async def test_message_search_is_ranked_and_paged(self, mock_supabase):
+        hits = [
+            {**message(i), "contact_id": "contact-1", "headline": f"<b>Message</b> {i}", "rank": rank}
+            for i, rank in ((1, 0.8), (2, 0.6), (3, 0.1))
+        ]
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data=hits)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/messages/search", params={"q": "message", "limit": 2}, headers=auth_headers()
+            )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [m["id"] for m in body] == ["msg-001", "msg-002"]
+        assert body[0]["headline"] == "<b>Message</b> 1"
+        assert decode_cursor(response.headers["X-Next-Cursor"], 2) == [0.6, "msg-002"]
+        name, params = mock_supabase.rpc.call_args[0]
+        assert name == "search_messages"
+        assert params["p_workspace_id"] == "workspace-123"
+        assert params["p_limit"] == 3
+
+    @pytest.mark.asyncio
+    async def test_contact_search_is_not_a_contact_id(self, mock_supabase):
+        """Test /contacts/search is routed ahead of /contacts/{contact_id}"""
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data=[{
+            "id": "contact-1",
+            "workspace_id": "workspace-123",
+            "name": "Jane Doe",
+            "email": "jane@example.com",
+            "phone": None,
+            "created_at": "2026-09-01T12:00:00+00:00",
+            "updated_at": "2026-09-01T12:00:00+00:00",
+            "rank": 0.75,
+        }])
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/v1/contacts/search", params={"q": "jan"}, headers=auth_headers())
+
+        assert response.status_code == 200
+        assert response.json()[0]["rank"] == 0.75
+        assert "X-Next-Cursor" not in response.headers
+        mock_supabase.rpc.assert_called_once()
+        mock_supabase.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_query_too_short(self, mock_supabase):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/v1/messages/search", params={"q": "a"}, headers=auth_headers())
+
+        assert response.status_code == 422
+
+class TestUnread:
+    """Tests for unread counts and mark-as-read"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_mark_read_is_one_rpc(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={
+            "conversation_ids": ["conv-1", "conv-2"], "unread_total": 3,
+        })
+
+        with patch.object(messages_endpoint, "publish_event_async", AsyncMock()) as publish, \
+                patch.object(messages_endpoint, "notify_counters_changed", AsyncMock()) as notify:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/v1/messages/conversations/mark-read",
+                    json={"conversation_ids": ["conv-1", "conv-2", "conv-3"]},
+                    headers=auth_headers(),
+                )
+
+        assert response.status_code == 200
+        assert response.json() == {"conversation_ids": ["conv-1", "conv-2"], "unread_total": 3}
+        mock_supabase.rpc.assert_called_once_with("mark_conversations_read", {
+            "p_workspace_id": "workspace-123",
+            "p_conversation_ids": ["conv-1", "conv-2", "conv-3"],
+        })
+        mock_supabase.table.assert_not_called()
+        assert publish.await_count == 2
+        assert publish.await_args[0][2]["unread_total"] == 3
+        notify.assert_awaited_once_with("workspace-123", "leads")
+
+    @pytest.mark.asyncio
+    async def test_nothing_unread_publishes_nothing(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={"conversation_ids": [], "unread_total": 0})
+
+        with patch.object(messages_endpoint, "publish_event_async", AsyncMock()) as publish, \
+                patch.object(messages_endpoint, "notify_counters_changed", AsyncMock()) as notify:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/v1/messages/conversations/conv-1/mark-read", headers=auth_headers()
+                )
+
+        assert response.status_code == 200
+        assert response.json() == {"success": True}
+        assert mock_supabase.rpc.call_args[0][1]["p_conversation_ids"] == ["conv-1"]
+        publish.assert_not_awaited()
+        notify.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_bulk_mark_read_requires_ids(self, mock_supabase):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/messages/conversations/mark-read",
+                json={"conversation_ids": []},
+                headers=auth_headers(),
+            )
+
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_unread_count(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={
+            "unread_total": 12, "unread_conversations": 4,
+        })
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/v1/messages/unread-count", headers=auth_headers())
+
+        assert response.status_code == 200
+        assert response.json() == {"unread_total": 12, "unread_conversations": 4}
+        mock_supabase.rpc.assert_called_once_with("get_unread_counts", {"p_workspace_id": "workspace-123"})
+
+@pytest.fixture
+def hub():
+    """Hub without a Redis reader, swapped into the messages endpoints"""
+    hub = RealtimeHub()
+    hub._ensure_reader = lambda: None
+    with patch.object(messages_endpoint, "hub", hub):
+        yield hub
+
+
+class TestSendPublishes:
+    """Tests for realtime publishing from the inbox endpoints"""
+
+    @pytest.mark.asyncio
+    async def test_send_publishes_message(self, mock_supabase):
+        stored = message(1)
+        conversations = chain_mock([{"id": "conv-1"}])
+        messages = chain_mock([])
+        messages.insert.return_value.execute.return_value = Mock(data=[stored])
+        mock_supabase.table.side_effect = lambda name: conversations if name == "conversations" else messages
+
+        with patch.object(messages_endpoint, "publish_message_async", AsyncMock()) as publish:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/v1/messages/conversations/conv-1/messages",
+                    json={"conversation_id": "conv-1", "content": "Message 1", "channel": "sms"},
+                    headers=auth_headers(),
+                )
+
+        assert response.status_code == 200
+        publish.assert_awaited_once_with("workspace-123", stored)
+
+    @pytest.mark.asyncio
+    async def test_send_to_other_workspace_is_not_published(self, mock_supabase):
+        mock_supabase.table.return_value = chain_mock([])
+
+        with patch.object(messages_endpoint, "publish_message_async", AsyncMock()) as publish:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/v1/messages/conversations/conv-1/messages",
+                    json={"conversation_id": "conv-1", "content": "Hi", "channel": "sms"},
+                    headers=auth_headers(),
+                )
+
+        assert response.status_code == 404
+        publish.assert_not_awaited()
+
+
+class TestInboxSocket:
+    """Tests for the /messages/ws WebSocket"""
+
+    def test_rejects_invalid_token(self, mock_supabase, hub):
+        client = TestClient(app)
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect("/api/v1/messages/ws?token=invalid"):
+                pass
+        assert exc.value.code == 1008
+
+    def test_requires_inbox_permission(self, mock_supabase, hub):
+        token = access_token(role="staff")
+        client = TestClient(app)
+        with patch.object(messages_endpoint, "has_permission", return_value=False) as check:
+            with pytest.raises(WebSocketDisconnect) as exc:
+                with client.websocket_connect(f"/api/v1/messages/ws?token={token}"):
+                    pass
+        assert exc.value.code == 1008
+        assert check.call_args[0][2] == "can_access_inbox"
+
+    def test_workspace_and_conversation_events(self, mock_supabase, hub):
+        """Test the socket gets workspace events and follows subscribed threads"""
+        mock_supabase.table.return_value = chain_mock([{"id": "conv-1"}])
+        client = TestClient(app)
+
+        with client.websocket_connect(f"/api/v1/messages/ws?token={access_token()}") as ws:
+            ws.send_json({"action": "ping"})
+            assert ws.receive_json() == {"type": "pong"}
+
+            ws.portal.call(hub.dispatch, workspace_channel("workspace-123"), {
+                "type": CONVERSATION_UPDATED, "data": {"conversation_id": "conv-1"},
+            })
+            assert ws.receive_json() == {"type": CONVERSATION_UPDATED, "data": {"conversation_id": "conv-1"}}
+
+            ws.send_json({"action": "subscribe", "conversation_id": "conv-1"})
+            assert ws.receive_json() == {"type": "subscribed", "conversation_id": "conv-1"}
+            delivered = ws.portal.call(hub.dispatch, conversation_channel("conv-1"), {"type": "message.created"})
+            assert delivered == 1
+            assert ws.receive_json()["type"] == "message.created"
+
+            ws.send_json({"action": "unsubscribe", "conversation_id": "conv-1"})
+            assert ws.receive_json() == {"type": "unsubscribed", "conversation_id": "conv-1"}
+            assert ws.portal.call(hub.dispatch, conversation_channel("conv-1"), {"type": "message.created"}) == 0
+
+    def test_closed_when_token_expires(self, mock_supabase, hub):
+        token = create_access_token({
+            "sub": "user-123",
+            "email": "owner@example.com",
+            "role": "owner",
+            "workspace_id": "workspace-123",
+        }, expires_delta=timedelta(seconds=1))
+        client = TestClient(app)
+
+        with client.websocket_connect(f"/api/v1/messages/ws?token={token}") as ws:
+            ws.send_json({"action": "ping"})
+            assert ws.receive_json() == {"type": "pong"}
+            with pytest.raises(WebSocketDisconnect) as exc:
+                ws.receive_json()
+        assert exc.value.code == 1008
+        assert hub.stats()["connections"] == 0
+
+    def test_cannot_follow_other_workspace_conversation(self, mock_supabase, hub):
+        mock_supabase.table.return_value = chain_mock([])
+        client = TestClient(app)
+
+        with client.websocket_connect(f"/api/v1/messages/ws?token={access_token()}") as ws:
+            ws.send_json({"action": "subscribe", "conversation_id": "conv-9"})
+            assert ws.receive_json() == {"type": "error", "detail": "Conversation not found"}
+            assert hub.stats()["channels"] == 1
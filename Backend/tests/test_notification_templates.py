@@ -0,0 +1,243 @@
+"""Tests for notification templates and workspace overrides"""
+import pytest
+from jinja2.exceptions import SecurityError
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import Mock
+
+from app.main import app
+from app.db.supabase_client import get_supabase
+from app.core.security import create_access_token
+from app.services.communication import templates
+
+
+def chain_mock(data):
+    """Query builder mock whose every builder call returns itself"""
+    query = Mock()
+    for name in ("select", "eq", "upsert", "delete"):
+        getattr(query, name).return_value = query
+    query.execute.return_value = Mock(data=data)
+    return query
+
+
+def supabase_with_overrides(rows):
+    supabase = Mock()
+    supabase.table.return_value = chain_mock(rows)
+    return supabase
+
+
+@pytest.fixture(autouse=True)
+def fresh_override_cache():
+    templates._override_cache.clear()
+    yield
+    templates._override_cache.clear()
+
+
+@pytest.fixture
+def mock_supabase():
+    """Mock Supabase client injected into the app"""
+    mock = Mock()
+    app.dependency_overrides[get_supabase] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_supabase, None)
+
+
+def auth_headers(role="owner"):
+    token = create_access_token({
+        "sub": "user-123",
+        "email": "owner@example.com",
+        "role": role,
+        "workspace_id": "workspace-123",
+    })
+    return {"Authorization": f"Bearer {token}"}
+
+
+REMINDER = {"service": "Cut & Color", "scheduled_at": "2026-10-20T14:30:00"}
+
+
+class TestRendering:
+    """Tests for the built-in templates"""
+
+    def test_reminder_email(self):
+        email = templates.render_email("booking_reminder", REMINDER)
+
+        assert email.subject == "Reminder: Cut & Color Tomorrow"
+        assert "<strong>Service:</strong> Cut &amp; Color" in email.content
+        assert "October 20, 2026 at 02:30 PM" in email.content
+
+    def test_sms_is_not_escaped(self):
+        assert templates.render_sms("booking_reminder", REMINDER) == "Reminder: Cut & Color tomorrow at 02:30 PM"
+
+    def test_user_input_is_escaped(self):
+        email = templates.render_email("owner_new_booking", {
+            **REMINDER,
+            "contact_name": "<script>alert(1)</script>",
+            "duration_minutes": 30,
+        })
+
+        assert "<script>" not in email.content
+        assert "&lt;script&gt;" in email.content
+        assert "Not provided" in email.content
+
+    def test_templates_are_compiled_once(self):
+        environment = templates.get_environment(autoescape=True)
+        assert environment.get_template("booking_reminder.html") is environment.get_template("booking_reminder.html")
+
+
+class TestSharedTemplate:
+    """Tests for shared email bodies with per-recipient substitutions"""
+
+    def test_substitutions_reproduce_each_body(self):
+        template = templates.render_email_template("booking_reminder", REMINDER)
+        other = {**REMINDER, "service": "<Trim>", "scheduled_at": "2026-10-21T09:00:00+00:00"}
+
+        for context in (REMINDER, other):
+            fields = template.personalize(context, templates.render_email("booking_reminder", context).content)
+            rendered = fields["template"]
+            for tag, value in fields["substitutions"].items():
+                rendered = rendered.replace(tag, value)
+            assert rendered == templates.render_email("booking_reminder", context).content
+
+        assert "&lt;Trim&gt;" in template.personalize(
+            other, templates.render_email("booking_reminder", other).content
+        )["substitutions"].values()
+
+    def test_value_dependent_override_sends_own_body(self):
+        overrides = {
+            "booking_reminder.html": templates.compile_template(
+                "booking_reminder.html", "{% if service == 'Cut & Color' %}Colour{% else %}{{ service }}{% endif %}"
+            ),
+        }
+        template = templates.render_email_template("booking_reminder", REMINDER, overrides)
+
+        content = templates.render_email("booking_reminder", REMINDER, overrides).content
+
+        assert template.personalize(REMINDER, content) == {}
+
+
+class TestOverrides:
+    """Tests for per-workspace overrides"""
+
+    def test_override_replaces_file(self):
+        supabase = supabase_with_overrides([
+            {"name": "booking_reminder.subject.txt", "source": "See you soon for {{ service }}"},
+        ])
+        overrides = templates.load_overrides(supabase, "workspace-123")
+
+        email = templates.render_email("booking_reminder", REMINDER, overrides)
+
+        assert email.subject == "See you soon for Cut & Color"
+        assert "Your appointment is tomorrow" in email.content
+
+    def test_overrides_cached_until_invalidated(self):
+        supabase = supabase_with_overrides([])
+
+        templates.load_overrides(supabase, "workspace-123")
+        templates.load_overrides(supabase, "workspace-123")
+        assert supabase.table.call_count == 1
+
+        templates.invalidate_overrides("workspace-123")
+        templates.load_overrides(supabase, "workspace-123")
+        assert supabase.table.call_count == 2
+
+    def test_broken_override_falls_back(self):
+        supabase = supabase_with_overrides([
+            {"name": "booking_reminder.txt", "source": "{% if %}"},
+            {"name": "booking_reminder.subject.txt", "source": "{{ 1 / 0 }}"},
+        ])
+        overrides = templates.load_overrides(supabase, "workspace-123")
+
+        assert "booking_reminder.txt" not in overrides
+        assert templates.render_email("booking_reminder", REMINDER, overrides).subject == "Reminder: Cut & Color Tomorrow"
+
+    def test_override_is_sandboxed(self):
+        template = templates.compile_template("welcome.html", "{{ ''.__class__.__mro__ }}")
+        with pytest.raises(SecurityError):
+            template.render({})
+
+    @pytest.mark.parametrize("source", [
+        "{% for a in range(1000) %}{% for b in range(1000) %}{% endfor %}{% endfor %}",
+        "{{ 'x' * 10 ** 9 }}",
+        "{{ 10 ** (10 ** 10) }}",
+        "{% set ns = namespace(s='x') %}{% for i in range(60) %}{% set ns.s = ns.s ~ ns.s %}{% endfor %}",
+        "{% for i in range(5000) %}{{ service * 10 }}{% endfor %}",
+    ])
+    def test_runaway_override_falls_back(self, source):
+        supabase = supabase_with_overrides([{"name": "booking_reminder.txt", "source": source}])
+        overrides = templates.load_overrides(supabase, "workspace-123")
+
+        with pytest.raises(SecurityError):
+            templates.validate_override("booking_reminder.txt", source)
+        assert templates.render_sms("booking_reminder", REMINDER, overrides).startswith("Reminder")
+
+    def test_bounded_loops_render(self):
+        source = "{% for form in forms %}{{ loop.index }}/{{ loop.length }} {{ form.name }}{% endfor %}"
+
+        template = templates.validate_override("forms_request.html", source)
+
+        assert templates.render_override(template, {"forms": [{"name": "A"}, {"name": "B"}]}) == "1/2 A2/2 B"
+
+
+class TestOverrideEndpoints:
+    """Tests for the notification template endpoints"""
+
+    @pytest.mark.asyncio
+    async def test_set_override(self, mock_supabase):
+        query = chain_mock([])
+        mock_supabase.table.return_value = query
+        templates._override_cache.set("workspace-123", {})
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.put(
+                "/api/v1/workspaces/workspace-123/notification-templates/welcome.html",
+                json={"source": "<p>Hi {{ contact_name }}</p>"},
+                headers=auth_headers(),
+            )
+
+        assert response.status_code == 200
+        assert response.json()["is_overridden"] is True
+        assert query.upsert.call_args.kwargs["on_conflict"] == "workspace_id,name"
+        assert templates._override_cache.get("workspace-123") is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_override_rejected(self, mock_supabase):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.put(
+                "/api/v1/workspaces/workspace-123/notification-templates/welcome.html",
+                json={"source": "{% for %}"},
+                headers=auth_headers(),
+            )
+
+        assert response.status_code == 422
+        mock_supabase.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_runaway_override_rejected(self, mock_supabase):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.put(
+                "/api/v1/workspaces/workspace-123/notification-templates/welcome.html",
+                json={"source": "{% for i in range(100000) %}{{ contact_name }}{% endfor %}"},
+                headers=auth_headers(),
+            )
+
+        assert response.status_code == 422
+        mock_supabase.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unknown_template_or_workspace(self, mock_supabase):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            unknown = await client.put(
+                "/api/v1/workspaces/workspace-123/notification-templates/_layout.html",
+                json={"source": "x"},
+                headers=auth_headers(),
+            )
+            other = await client.get(
+                "/api/v1/workspaces/workspace-999/notification-templates",
+                headers=auth_headers(),
+            )
+
+        assert unknown.status_code == 404
+        assert other.status_code == 404
@@ -0,0 +1,55 @@
+"""Tests for set-based overdue form detection"""
+from unittest.mock import Mock, patch
+
+from app.tasks import automation_tasks
+
+
+def marked(i, workspace_id="workspace-123", alert=True):
+    return {
+        "form_id": f"form-{i}",
+        "workspace_id": workspace_id,
+        "alert": {"id": f"alert-{i}", "alert_type": "overdue_form"} if alert else None,
+    }
+
+
+def run_check(pages):
+    supabase = Mock()
+    supabase.rpc.return_value.execute.side_effect = [Mock(data=page) for page in pages]
+    client = Mock(service_client=supabase)
+    with patch.object(automation_tasks, "get_supabase_client", return_value=client), \
+            patch.object(automation_tasks, "publish_event") as publish:
+        automation_tasks.check_overdue_forms()
+    return supabase, publish
+
+
+class TestCheckOverdueForms:
+    """Tests for check_overdue_forms"""
+
+    def test_one_rpc_per_page(self):
+        with patch.object(automation_tasks, "OVERDUE_FORMS_PAGE", 2):
+            supabase, publish = run_check([[marked(1), marked(2)], [marked(3, "workspace-456")]])
+
+        assert supabase.rpc.call_count == 2
+        assert supabase.rpc.call_args.args == ("mark_overdue_forms", {"p_limit": 2})
+        supabase.table.assert_not_called()
+        events = [c.args[1] for c in publish.call_args_list]
+        assert events.count(automation_tasks.ALERT_CREATED) == 3
+        assert events.count(automation_tasks.COUNTERS_CHANGED) == 2
+
+    def test_deduplicated_alert_is_not_announced(self):
+        supabase, publish = run_check([[marked(1, alert=False)]])
+
+        assert [c.args[1] for c in publish.call_args_list] == [automation_tasks.COUNTERS_CHANGED]
+
+    def test_nothing_due(self):
+        supabase, publish = run_check([[]])
+
+        assert supabase.rpc.call_count == 1
+        publish.assert_not_called()
+
+    def test_pages_per_run_are_bounded(self):
+        with patch.object(automation_tasks, "OVERDUE_FORMS_PAGE", 1), \
+                patch.object(automation_tasks, "MAX_OVERDUE_FORM_PAGES", 3):
+            supabase, _ = run_check([[marked(i)] for i in range(5)])
+
+        assert supabase.rpc.call_count == 3
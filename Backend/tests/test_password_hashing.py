@@ -0,0 +1,158 @@
+"""Tests for off-loop password hashing and rehash-on-login"""
+import bcrypt
+import pytest
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import Mock, patch
+
+from app.main import app
+from app.db.supabase_client import get_supabase_service
+from app.core.security import (
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
+    shutdown_password_executor,
+)
+
+
+@pytest.fixture
+def low_rounds():
+    """Keep bcrypt cheap in tests"""
+    with patch("app.core.security.settings.BCRYPT_ROUNDS", 4):
+        yield 4
+
+
+def make_hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+class TestPasswordHashing:
+    """Tests for async hashing helpers"""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_roundtrip(self, low_rounds):
+        """Test hashes made on the pool verify on the pool"""
+        hashed = await hash_password_async("correct horse")
+
+        assert hashed.startswith("$2b$04$")
+        assert await verify_password_async("correct horse", hashed)
+        assert not await verify_password_async("wrong horse", hashed)
+
+    @pytest.mark.asyncio
+    async def test_hash_rejects_long_password(self, low_rounds):
+        """Test validation errors propagate from the pool"""
+        with pytest.raises(ValueError):
+            await hash_password_async("x" * 73)
+
+    @pytest.mark.asyncio
+    async def test_pool_restarts_after_shutdown(self, low_rounds):
+        """Test the pool is recreated when the app lifespan runs again"""
+        shutdown_password_executor()
+        shutdown_password_executor()
+
+        assert (await hash_password_async("secret")).startswith("$2b$04$")
+
+    def test_needs_rehash_on_cost_change(self, low_rounds):
+        """Test hashes at another cost are flagged"""
+        assert not password_needs_rehash(make_hash("secret", 4))
+        assert password_needs_rehash(make_hash("secret", 5))
+
+    @pytest.mark.parametrize("value", ["", "not-a-hash", None])
+    def test_needs_rehash_on_malformed_hash(self, value):
+        """Test unparseable hashes are flagged"""
+        assert password_needs_rehash(value)
+
+
+@pytest.fixture
+def mock_supabase():
+    """Mock Supabase service client injected into the app"""
+    mock = Mock()
+    app.dependency_overrides[get_supabase_service] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_supabase_service, None)
+
+
+def login_user(password_hash: str) -> dict:
+    return {
+        "id": "user-123",
+        "email": "owner@example.com",
+        "password_hash": password_hash,
+        "role": "owner",
+        "workspace_id": "workspace-123",
+        "is_active": True,
+    }
+
+
+class TestLoginRehash:
+    """Tests for transparent rehash on login"""
+
+    @pytest.mark.asyncio
+    async def test_login_rehashes_old_cost(self, low_rounds, mock_supabase):
+        """Test a hash at an old cost is replaced after successful login"""
+        mock_supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = Mock(
+            data=[login_user(make_hash("password123", 5))]
+        )
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"email": "owner@example.com", "password": "password123"},
+            )
+
+        assert response.status_code == 200
+        update = mock_supabase.table.return_value.update
+        update.assert_called_once()
+        new_hash = update.call_args[0][0]["password_hash"]
+        assert new_hash.startswith("$2b$04$")
+        assert bcrypt.checkpw(b"password123", new_hash.encode("utf-8"))
+
+    @pytest.mark.asyncio
+    async def test_login_keeps_current_cost(self, low_rounds, mock_supabase):
+        """Test a hash at the current cost is left alone"""
+        mock_supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = Mock(
+            data=[login_user(make_hash("password123", 4))]
+        )
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"email": "owner@example.com", "password": "password123"},
+            )
+
+        assert response.status_code == 200
+        assert not mock_supabase.table.return_value.update.called
+
+    @pytest.mark.asyncio
+    async def test_wrong_password_not_rehashed(self, low_rounds, mock_supabase):
+        """Test failed logins never touch the stored hash"""
+        mock_supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = Mock(
+            data=[login_user(make_hash("password123", 5))]
+        )
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"email": "owner@example.com", "password": "wrong-password"},
+            )
+
+        assert response.status_code == 401
+        assert not mock_supabase.table.return_value.update.called
+
+    @pytest.mark.asyncio
+    async def test_inactive_account_not_rehashed(self, low_rounds, mock_supabase):
+        """Test a deactivated account is refused before any rehash"""
+        mock_supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = Mock(
+            data=[{**login_user(make_hash("password123", 5)), "is_active": False}]
+        )
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"email": "owner@example.com", "password": "password123"},
+            )
+
+        assert response.status_code == 403
+        assert not mock_supabase.table.return_value.update.called
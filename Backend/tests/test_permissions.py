@@ -0,0 +1,189 @@
+"""Tests for token-embedded staff permissions"""
+import time
+import pytest
+from fastapi import HTTPException
+from unittest.mock import Mock
+
+from app.core import permissions
+from app.core.permissions import (
+    PERMISSION_BITS,
+    DEFAULT_PERMISSIONS_MASK,
+    encode_permissions,
+    invalidate_permissions,
+    load_permission_mask,
+    require_permission,
+)
+from app.models.enums import UserRole
+from app.schemas.auth import TokenData
+
+
+@pytest.fixture(autouse=True)
+def clear_permission_state():
+    permissions._permission_cache.clear()
+    permissions._permissions_changed_at.clear()
+    yield
+    permissions._permission_cache.clear()
+    permissions._permissions_changed_at.clear()
+
+
+def staff_user(perms=None, issued_at=None):
+    return TokenData(
+        user_id="user-123",
+        email="staff@example.com",
+        role=UserRole.STAFF,
+        workspace_id="workspace-123",
+        permissions=perms,
+        issued_at=issued_at,
+    )
+
+
+def supabase_with_row(row):
+    supabase = Mock()
+    execute = supabase.table.return_value.select.return_value.eq.return_value.limit.return_value.execute
+    execute.return_value = Mock(data=[row] if row is not None else [])
+    return supabase
+
+
+class TestEncodePermissions:
+    """Tests for the permission bitmask"""
+
+    def test_encode_selected_flags(self):
+        """Test only granted flags are set"""
+        mask = encode_permissions({
+            "can_access_inbox": True,
+            "can_manage_bookings": False,
+            "can_view_forms": True,
+            "can_view_inventory": False,
+        })
+
+        assert mask == PERMISSION_BITS["can_access_inbox"] | PERMISSION_BITS["can_view_forms"]
+
+    def test_missing_row_uses_defaults(self):
+        """Test staff without a permissions row get the column defaults"""
+        assert encode_permissions(None) == DEFAULT_PERMISSIONS_MASK
+
+
+class TestRequirePermission:
+    """Tests for the require_permission dependency"""
+
+    def test_unknown_permission_rejected(self):
+        """Test typos fail at import time"""
+        with pytest.raises(ValueError):
+            require_permission("can_do_anything")
+
+    @pytest.mark.asyncio
+    async def test_claim_grants_without_query(self):
+        """Test a permission in the token claim needs no database access"""
+        supabase = Mock()
+        dependency = require_permission("can_manage_bookings")
+        user = staff_user(perms=PERMISSION_BITS["can_manage_bookings"], issued_at=int(time.time()))
+
+        assert await dependency(current_user=user, supabase=supabase) is user
+        assert not supabase.table.called
+
+    @pytest.mark.asyncio
+    async def test_claim_denies(self):
+        """Test a missing bit in the claim is forbidden"""
+        dependency = require_permission("can_view_inventory")
+        user = staff_user(perms=PERMISSION_BITS["can_access_inbox"], issued_at=int(time.time()))
+
+        with pytest.raises(HTTPException) as exc:
+            await dependency(current_user=user, supabase=Mock())
+
+        assert exc.value.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_owner_always_allowed(self):
+        """Test owners bypass permission checks"""
+        supabase = Mock()
+        owner = TokenData(
+            user_id="owner-1", email="owner@example.com", role=UserRole.OWNER, workspace_id="workspace-123"
+        )
+
+        assert await require_permission("can_view_forms")(current_user=owner, supabase=supabase) is owner
+        assert not supabase.table.called
+
+    @pytest.mark.asyncio
+    async def test_token_without_claim_uses_cached_lookup(self):
+        """Test older tokens fall back to one cached lookup"""
+        supabase = supabase_with_row({
+            "can_access_inbox": True,
+            "can_manage_bookings": True,
+            "can_view_forms": False,
+            "can_view_inventory": False,
+        })
+        dependency = require_permission("can_manage_bookings")
+
+        await dependency(current_user=staff_user(), supabase=supabase)
+        await dependency(current_user=staff_user(), supabase=supabase)
+
+        assert supabase.table.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_claim_rechecked_after_update(self):
+        """Test claims issued before a permission change are not trusted"""
+        issued_at = int(time.time()) - 60
+        user = staff_user(perms=PERMISSION_BITS["can_view_inventory"], issued_at=issued_at)
+        supabase = supabase_with_row({
+            "can_access_inbox": True,
+            "can_manage_bookings": True,
+            "can_view_forms": True,
+            "can_view_inventory": False,
+        })
+
+        invalidate_permissions("user-123")
+
+        with pytest.raises(HTTPException) as exc:
+            await require_permission("can_view_inventory")(current_user=user, supabase=supabase)
+
+        assert exc.value.status_code == 403
+        assert supabase.table.called
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("issued_at", [None, int(time.time()) - permissions.PERMISSION_CLAIM_MAX_AGE - 1])
+    async def test_claim_without_recent_iat_rechecked(self, issued_at):
+        """Test claims with no or an old issue time fall back to a lookup"""
+        user = staff_user(perms=PERMISSION_BITS["can_view_inventory"], issued_at=issued_at)
+        supabase = supabase_with_row({
+            "can_access_inbox": True,
+            "can_manage_bookings": True,
+            "can_view_forms": True,
+            "can_view_inventory": False,
+        })
+
+        with pytest.raises(HTTPException) as exc:
+            await require_permission("can_view_inventory")(current_user=user, supabase=supabase)
+
+        assert exc.value.status_code == 403
+        assert supabase.table.called
+
+
+class TestPermissionCache:
+    """Tests for the staff_permissions cache"""
+
+    def test_invalidate_forces_reload(self):
+        """Test invalidation drops the cached mask"""
+        supabase = supabase_with_row({"can_access_inbox": True, "can_manage_bookings": True,
+                                      "can_view_forms": True, "can_view_inventory": True})
+
+        load_permission_mask(supabase, "user-123")
+        invalidate_permissions("user-123")
+        load_permission_mask(supabase, "user-123")
+
+        assert supabase.table.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_update_staff_permissions_invalidates(self):
+        """Test the staff service invalidates after an update"""
+        from app.services.staff_service import StaffService
+
+        supabase = Mock()
+        supabase.table.return_value.update.return_value.eq.return_value.execute.return_value = Mock(
+            data=[{"user_id": "user-123", "can_view_inventory": False}]
+        )
+        permissions._permission_cache.set("user-123", DEFAULT_PERMISSIONS_MASK)
+
+        await StaffService(supabase).update_staff_permissions("user-123", {"can_view_inventory": False})
+
+        assert permissions._permission_cache.get("user-123") is None
+        assert "user-123" in permissions._permissions_changed_at
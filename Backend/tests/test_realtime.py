@@ -0,0 +1,281 @@
+"""Tests for realtime workspace events and the dashboard stream"""
+import asyncio
+import copy
+import json
+import time
+import pytest
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import Mock, patch
+
+from app.main import app
+from app.db.supabase_client import get_supabase_service
+from app.core.realtime import (
+    ALERT_CREATED,
+    CONVERSATION_UPDATED,
+    COUNTERS_CHANGED,
+    MESSAGE_CREATED,
+    RealtimeHub,
+    _message_events,
+    conversation_channel,
+    workspace_channel,
+)
+from app.core.security import create_access_token
+from app.services import dashboard_service
+from app.services.dashboard_service import DashboardService, counter_delta, format_sse
+
+WS1 = workspace_channel("ws-1")
+WS2 = workspace_channel("ws-2")
+
+STATS = {
+    "bookings": {"today_count": 4, "upcoming_count": 12, "completed_count": 1, "no_show_count": 1},
+    "leads": {"new_inquiries": 30, "ongoing_conversations": 25, "unanswered_messages": 7},
+    "forms": {"pending_count": 5, "overdue_count": 2, "completed_count": 40},
+    "inventory": {"low_stock_items": 3, "critical_items": 1},
+    "total_alerts": 6,
+    "critical_alerts": 2,
+}
+
+
+@pytest.fixture
+def hub():
+    """Hub without a Redis reader, swapped into the dashboard service"""
+    hub = RealtimeHub(queue_size=2)
+    hub._ensure_reader = lambda: None
+    with patch.object(dashboard_service, "hub", hub):
+        yield hub
+
+
+@pytest.fixture(autouse=True)
+def clear_snapshots():
+    dashboard_service._snapshot_cache.clear()
+    yield
+    dashboard_service._snapshot_cache.clear()
+
+
+def parse_events(chunks):
+    """(event, data) pairs from SSE chunks, keepalives as ("keepalive", None)"""
+    events = []
+    for chunk in chunks:
+        if chunk.startswith(":"):
+            events.append(("keepalive", None))
+            continue
+        lines = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestRealtimeHub:
+    """Tests for in-process fan-out"""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_reaches_workspace_subscribers_only(self, hub):
+        """Test events go to every subscriber of the workspace and nobody else"""
+        async with hub.subscribe(WS1) as first, hub.subscribe(WS1) as second, \
+                hub.subscribe(WS2) as other:
+            delivered = hub.dispatch(WS1, {"type": COUNTERS_CHANGED})
+
+            assert delivered == 2
+            assert first.get_nowait()["type"] == COUNTERS_CHANGED
+            assert second.get_nowait()["type"] == COUNTERS_CHANGED
+            assert other.empty()
+
+    @pytest.mark.asyncio
+    async def test_subscribers_get_their_own_copy(self, hub):
+        """Test one subscriber changing an event never affects another"""
+        async with hub.subscribe(WS1) as socket, hub.subscribe(WS1) as stream:
+            hub.dispatch(WS1, {"type": COUNTERS_CHANGED})
+
+            socket.get_nowait().pop("seq")
+
+            assert stream.get_nowait()["seq"] == hub.sequence
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_skipped(self, hub):
+        """Test a slow subscriber drops events instead of blocking others"""
+        async with hub.subscribe(WS1) as slow:
+            for _ in range(3):
+                hub.dispatch(WS1, {"type": COUNTERS_CHANGED})
+
+            assert slow.qsize() == 2
+            assert hub.stats()["dropped_events"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_cleans_up(self, hub):
+        """Test closed streams are removed from the hub"""
+        async with hub.subscribe(WS1):
+            assert hub.stats() == {"connections": 1, "channels": 1, "dropped_events": 0}
+
+        assert hub.stats() == {"connections": 0, "channels": 0, "dropped_events": 0}
+        assert hub.dispatch(WS1, {"type": COUNTERS_CHANGED}) == 0
+
+    @pytest.mark.asyncio
+    async def test_redis_message_is_routed_by_channel(self, hub):
+        """Test pattern messages are decoded and routed to their workspace"""
+        async with hub.subscribe(WS1) as queue:
+            hub._handle_message({
+                "type": "pmessage",
+                "channel": b"careops:workspace:ws-1",
+                "data": json.dumps({"type": ALERT_CREATED, "data": {"id": "a-1"}}),
+            })
+            hub._handle_message({"type": "pmessage", "channel": b"careops:workspace:ws-1", "data": "{"})
+
+            event = queue.get_nowait()
+            assert event["type"] == ALERT_CREATED
+            assert event["data"] == {"id": "a-1"}
+            assert queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_attach_and_detach_conversation(self, hub):
+        """Test a socket can follow conversations on top of its workspace"""
+        conversation = conversation_channel("conv-1")
+        async with hub.subscribe(WS1) as queue:
+            hub.attach(queue, conversation)
+            assert hub.dispatch(conversation, {"type": MESSAGE_CREATED}) == 1
+            assert hub.stats()["channels"] == 2
+
+            hub.detach(queue, conversation)
+            assert hub.dispatch(conversation, {"type": MESSAGE_CREATED}) == 0
+            assert hub.dispatch(WS1, {"type": COUNTERS_CHANGED}) == 1
+
+            hub.attach(queue, conversation)
+
+        assert hub.stats() == {"connections": 0, "channels": 0, "dropped_events": 0}
+
+    def test_message_events(self):
+        """Test a message goes in full to its conversation and summarised to the workspace"""
+        message = {
+            "id": "m-1", "conversation_id": "conv-1", "content": "x" * 150,
+            "channel": "sms", "message_type": "manual", "sent_at": "2026-10-01T12:00:00+00:00",
+        }
+
+        (thread, full), (workspace, summary) = _message_events("ws-1", message)
+
+        assert thread == conversation_channel("conv-1")
+        assert json.loads(full) == {"type": MESSAGE_CREATED, "data": message}
+        assert workspace == WS1
+        summary = json.loads(summary)
+        assert summary["type"] == CONVERSATION_UPDATED
+        assert summary["data"]["last_message_preview"] == "x" * 100
+        assert summary["data"]["last_channel"] == "sms"
+
+
+class TestCounterDelta:
+    """Tests for counter_delta"""
+
+    def test_only_changed_counters(self):
+        new = copy.deepcopy(STATS)
+        new["bookings"]["today_count"] += 1
+        new["total_alerts"] -= 2
+
+        assert counter_delta(STATS, new) == {"bookings": {"today_count": 1}, "total_alerts": -2}
+
+    def test_ignores_flags_and_lists(self):
+        old = {**STATS, "partial": False, "unavailable_sections": []}
+        new = {**STATS, "partial": True, "unavailable_sections": ["forms"]}
+
+        assert counter_delta(old, new) == {}
+
+
+class TestDashboardStream:
+    """Tests for the dashboard Server-Sent Events stream"""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_then_counter_deltas(self, hub):
+        """Test the stream sends a snapshot, then deltas after counter events"""
+        updated = copy.deepcopy(STATS)
+        updated["bookings"]["today_count"] = 5
+        supabase = Mock()
+        supabase.rpc.return_value.execute.side_effect = [Mock(data=STATS), Mock(data=updated)]
+
+        stream = DashboardService(supabase).stream_events("ws-1", heartbeat=5)
+        snapshot = await stream.__anext__()
+        hub.dispatch(WS1, {"type": COUNTERS_CHANGED, "data": {"sections": ["bookings"]}})
+        counters = await stream.__anext__()
+        hub.dispatch(WS1, {"type": ALERT_CREATED, "data": {"id": "a-1"}})
+        alert = await stream.__anext__()
+        await stream.aclose()
+
+        events = parse_events([snapshot, counters, alert])
+        assert events[0] == ("snapshot", STATS)
+        assert events[1] == ("counters", {"delta": {"bookings": {"today_count": 1}}, "counters": updated})
+        assert events[2] == (ALERT_CREATED, {"id": "a-1"})
+        assert hub.stats()["connections"] == 0
+
+    @pytest.mark.asyncio
+    async def test_keepalive_when_idle(self, hub):
+        """Test an idle stream sends SSE comments"""
+        supabase = Mock()
+        supabase.rpc.return_value.execute.return_value = Mock(data=STATS)
+
+        stream = DashboardService(supabase).stream_events("ws-1", heartbeat=0.01)
+        await stream.__anext__()
+        keepalive = await stream.__anext__()
+        await stream.aclose()
+
+        assert keepalive == ": keepalive\n\n"
+
+    @pytest.mark.asyncio
+    async def test_stream_ends_when_token_expires(self, hub):
+        """Test the stream sends `expired` and ends at the token's expiry"""
+        supabase = Mock()
+        supabase.rpc.return_value.execute.return_value = Mock(data=STATS)
+
+        stream = DashboardService(supabase).stream_events("ws-1", heartbeat=5, expires_at=time.time() + 0.05)
+        await stream.__anext__()
+        expired = await asyncio.wait_for(stream.__anext__(), timeout=1)
+
+        assert parse_events([expired]) == [("expired", {})]
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        assert hub.stats()["connections"] == 0
+
+    @pytest.mark.asyncio
+    async def test_streams_share_one_read_per_event(self, hub):
+        """Test many streams of a workspace cause one counters read per event"""
+        updated = {**STATS, "total_alerts": 7}
+        supabase = Mock()
+        supabase.rpc.return_value.execute.side_effect = [Mock(data=STATS), Mock(data=updated)]
+        streams = [DashboardService(supabase).stream_events("ws-1", heartbeat=5) for _ in range(5)]
+
+        await asyncio.gather(*(stream.__anext__() for stream in streams))
+        assert supabase.rpc.call_count == 1
+
+        hub.dispatch(WS1, {"type": COUNTERS_CHANGED})
+        chunks = await asyncio.gather(*(stream.__anext__() for stream in streams))
+        assert supabase.rpc.call_count == 2
+        assert all(event == "counters" for event, _ in parse_events(chunks))
+
+        for stream in streams:
+            await stream.aclose()
+
+    def test_format_sse(self):
+        assert format_sse("snapshot", {"a": 1}) == 'event: snapshot\ndata: {"a": 1}\n\n'
+
+
+class TestDashboardStreamEndpoint:
+    """Tests for GET /dashboard/stream"""
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_token(self):
+        app.dependency_overrides[get_supabase_service] = lambda: Mock()
+        try:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.get("/api/v1/dashboard/stream", params={"token": "bad"})
+        finally:
+            app.dependency_overrides.pop(get_supabase_service, None)
+
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_requires_workspace(self):
+        token = create_access_token({"sub": "user-1", "email": "o@example.com", "role": "owner", "workspace_id": ""})
+        app.dependency_overrides[get_supabase_service] = lambda: Mock()
+        try:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.get("/api/v1/dashboard/stream", params={"token": token})
+        finally:
+            app.dependency_overrides.pop(get_supabase_service, None)
+
+        assert response.status_code == 400
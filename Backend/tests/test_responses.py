@@ -0,0 +1,70 @@
+"""Tests for fast JSON response helpers"""
+import json
+import pytest
+from datetime import datetime
+from pydantic import ValidationError
+
+from app.core.responses import PydanticJSONResponse, model_list_response
+from app.schemas.booking import BookingResponse
+
+
+def booking_row(**overrides):
+    row = {
+        "id": "booking-1",
+        "workspace_id": "workspace-1",
+        "booking_type_id": "type-1",
+        "contact_id": "contact-1",
+        "scheduled_at": "2024-01-15T10:00:00",
+        "status": "confirmed",
+        "notes": None,
+        "created_at": "2024-01-01T00:00:00",
+        "updated_at": "2024-01-01T00:00:00",
+    }
+    row.update(overrides)
+    return row
+
+
+class TestPydanticJSONResponse:
+    """Tests for PydanticJSONResponse rendering"""
+
+    def test_renders_model(self):
+        """Test a single model is dumped by pydantic"""
+        model = BookingResponse(**booking_row())
+        response = PydanticJSONResponse(model)
+
+        assert json.loads(response.body) == json.loads(model.model_dump_json())
+
+    def test_renders_list_of_models(self):
+        """Test a list of models is dumped in one call"""
+        models = [BookingResponse(**booking_row(id=f"booking-{i}")) for i in range(3)]
+        response = PydanticJSONResponse(models)
+
+        assert [b["id"] for b in json.loads(response.body)] == ["booking-0", "booking-1", "booking-2"]
+
+    def test_falls_back_to_orjson(self):
+        """Test plain content is rendered by orjson"""
+        response = PydanticJSONResponse({"at": datetime(2024, 1, 1), "items": []})
+
+        assert json.loads(response.body) == {"at": "2024-01-01T00:00:00", "items": []}
+
+
+class TestModelListResponse:
+    """Tests for model_list_response"""
+
+    def test_matches_model_serialization(self):
+        """Test output matches serializing each model individually"""
+        rows = [booking_row(id="booking-1"), booking_row(id="booking-2", notes="note")]
+        response = model_list_response(rows, BookingResponse)
+
+        expected = [json.loads(BookingResponse(**r).model_dump_json()) for r in rows]
+        assert json.loads(response.body) == expected
+        assert response.media_type == "application/json"
+
+    def test_empty_list(self):
+        """Test an empty result renders as an empty array"""
+        assert model_list_response([], BookingResponse).body == b"[]"
+
+    def test_invalid_row_raises(self):
+        """Test rows are still validated against the model"""
+        with pytest.raises(ValidationError):
+            model_list_response([booking_row(status="not-a-status")], BookingResponse)
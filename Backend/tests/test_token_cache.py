@@ -0,0 +1,127 @@
+"""Tests for the verified access token cache"""
+import pytest
+from datetime import timedelta
+from fastapi import HTTPException
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import patch
+
+from app.main import app
+from app.core import security
+from app.core.config import settings
+from app.core.security import create_access_token, create_refresh_token, decode_token_cached
+from app.models.enums import UserRole
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    security._token_cache.clear()
+    yield
+    security._token_cache.clear()
+
+
+def make_token(expires_delta=None):
+    return create_access_token(
+        {"sub": "user-123", "email": "staff@example.com", "role": "staff", "workspace_id": "workspace-123"},
+        expires_delta,
+    )
+
+
+class TestDecodeTokenCached:
+    """Tests for decode_token_cached"""
+
+    def test_second_decode_skips_verification(self):
+        """Test a verified token is served from cache"""
+        token = make_token()
+        first = decode_token_cached(token)
+
+        with patch("app.core.security.jwt.decode") as mock_decode:
+            second = decode_token_cached(token)
+
+        assert not mock_decode.called
+        assert second == first
+        assert second.role == UserRole.STAFF
+
+    def test_invalid_token_not_cached(self):
+        """Test failed verification is never cached"""
+        with pytest.raises(HTTPException):
+            decode_token_cached("not-a-jwt")
+
+        assert len(security._token_cache) == 0
+
+    def test_expired_token_rejected(self):
+        """Test an expired token is rejected and not cached"""
+        with pytest.raises(HTTPException) as exc:
+            decode_token_cached(make_token(timedelta(seconds=-10)))
+
+        assert exc.value.status_code == 401
+        assert len(security._token_cache) == 0
+
+    def test_refresh_token_rejected(self):
+        """Test a refresh token is not accepted as a bearer token"""
+        token = create_refresh_token({"sub": "user-123", "email": "staff@example.com", "role": "staff"})
+
+        with pytest.raises(HTTPException) as exc:
+            decode_token_cached(token)
+
+        assert exc.value.status_code == 401
+        assert len(security._token_cache) == 0
+
+    def test_refresh_token_carries_no_permissions(self):
+        """Test the long-lived refresh token never embeds perms"""
+        token = create_refresh_token({"sub": "user-123", "email": "staff@example.com", "role": "staff", "perms": 15})
+
+        claims = security.jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+        assert "perms" not in claims
+        assert claims["type"] == "refresh"
+
+    def test_entry_expires_with_token(self):
+        """Test cached entries do not outlive the token"""
+        token = make_token(timedelta(seconds=30))
+        decode_token_cached(token)
+
+        with patch("app.core.cache.monotonic", return_value=10**9):
+            with patch("app.core.security.jwt.decode", side_effect=security.JWTError("expired")):
+                with pytest.raises(HTTPException):
+                    decode_token_cached(token)
+
+    def test_hit_rate_tracked(self):
+        """Test hits and misses are counted"""
+        security._token_cache.hits = security._token_cache.misses = 0
+        token = make_token()
+        decode_token_cached(token)
+        decode_token_cached(token)
+        decode_token_cached(token)
+
+        stats = security._token_cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+
+class TestHealthMetrics:
+    """Tests for the metrics endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_metrics_expose_token_cache(self):
+        """Test cache stats are reported"""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            with patch.object(settings, "METRICS_TOKEN", "metrics-secret"):
+                response = await client.get("/health/metrics", headers={"X-Metrics-Token": "metrics-secret"})
+
+        assert response.status_code == 200
+        assert "hit_rate" in response.json()["caches"]["access_tokens"]
+
+    @pytest.mark.asyncio
+    async def test_metrics_require_token(self):
+        """Test metrics are refused without the internal token"""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            with patch.object(settings, "METRICS_TOKEN", "metrics-secret"):
+                missing = await client.get("/health/metrics")
+                wrong = await client.get("/health/metrics", headers={"X-Metrics-Token": "guess"})
+            disabled = await client.get("/health/metrics", headers={"X-Metrics-Token": ""})
+
+        assert missing.status_code == 401
+        assert wrong.status_code == 401
+        assert disabled.status_code == 404
@@ -0,0 +1,205 @@
+"""Tests for per-workspace provider resolution"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.core.config import settings
+from app.core.exceptions import IntegrationException
+from app.models.enums import IntegrationProvider
+from app.services.communication import workspace_providers
+from app.services.communication.email_provider import get_email_service
+from app.services.communication.sms_provider import SMSService
+from app.services.communication.workspace_providers import (
+    email_service_for,
+    prefetch_credentials,
+    sms_service_for,
+)
+from app.services.integration_service import IntegrationService
+from app.tasks.automation_tasks import send_batches
+
+
+def integration(workspace_id, provider="resend", updated_at="2026-10-01T00:00:00+00:00", **config):
+    return {
+        "id": f"int-{workspace_id}-{provider}",
+        "workspace_id": workspace_id,
+        "provider": provider,
+        "config": config or {"api_key": f"re_{workspace_id}"},
+        "updated_at": updated_at,
+    }
+
+
+def supabase_with(rows):
+    """Supabase mock answering integrations queries from `rows`"""
+    supabase = Mock()
+    query = Mock()
+    filters = {}
+
+    def eq(column, value):
+        filters[column] = [value]
+        return query
+
+    def in_(column, values):
+        filters[column] = list(values)
+        return query
+
+    def execute():
+        wanted = filters.get("workspace_id", [])
+        data = [row for row in rows if row["workspace_id"] in wanted]
+        filters.clear()
+        return Mock(data=data)
+
+    query.select.return_value = query
+    query.eq.side_effect = eq
+    query.in_.side_effect = in_
+    query.insert.return_value = query
+    query.delete.return_value = query
+    query.execute.side_effect = execute
+    supabase.table.return_value = query
+    return supabase
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    workspace_providers._credential_cache.clear()
+    workspace_providers._service_pool.clear()
+    get_email_service.cache_clear()
+    with patch.object(settings, "RESEND_API_KEY", "re_platform"), \
+            patch.object(settings, "SENDGRID_API_KEY", ""), \
+            patch.object(settings, "COMMUNICATION_MODE", "live"):
+        yield
+    workspace_providers._credential_cache.clear()
+    workspace_providers._service_pool.clear()
+    get_email_service.cache_clear()
+
+
+class TestResolution:
+    """Tests for choosing and pooling a workspace's services"""
+
+    def test_workspace_integration_is_used_and_pooled(self):
+        supabase = supabase_with([integration("ws-1")])
+
+        service = email_service_for("ws-1", supabase)
+
+        assert service.providers[0].headers["Authorization"] == "Bearer re_ws-1"
+        assert service.providers[0].health_key == "Resend:ws-1"
+        assert email_service_for("ws-1", supabase) is service
+        assert supabase.table.call_count == 1
+
+    def test_platform_fallback_is_cached(self):
+        supabase = supabase_with([])
+
+        assert email_service_for("ws-2", supabase) is get_email_service()
+        assert email_service_for("ws-2", supabase) is get_email_service()
+        assert supabase.table.call_count == 1
+
+    def test_email_provider_order_and_sms(self):
+        supabase = supabase_with([
+            integration("ws-1", "sendgrid", api_key="SG.ws"),
+            integration("ws-1", "resend"),
+            integration("ws-1", "twilio", account_sid="ACws", auth_token="t", phone_number="+15550001111"),
+        ])
+
+        email = email_service_for("ws-1", supabase)
+        sms = sms_service_for("ws-1", supabase)
+
+        assert [p.provider_name for p in email.providers] == ["Resend", "SendGrid"]
+        assert sms.provider.from_number == "+15550001111"
+        assert supabase.table.call_count == 1
+
+    def test_prefetch_loads_many_workspaces_at_once(self):
+        rows = [integration(f"ws-{i}") for i in range(0, 500, 2)]
+        supabase = supabase_with(rows)
+        workspaces = [f"ws-{i}" for i in range(500)]
+
+        prefetch_credentials(supabase, workspaces + workspaces)
+        queries = supabase.table.call_count
+        services = {ws: email_service_for(ws, supabase) for ws in workspaces}
+
+        assert queries == 3
+        assert supabase.table.call_count == queries
+        assert services["ws-1"] is get_email_service()
+        assert services["ws-2"].providers[0].headers["Authorization"] == "Bearer re_ws-2"
+
+    def test_changed_credentials_rebuild_service(self):
+        rows = [integration("ws-1")]
+        supabase = supabase_with(rows)
+        first = email_service_for("ws-1", supabase)
+
+        rows[0] = integration("ws-1", updated_at="2026-10-02T00:00:00+00:00", api_key="re_rotated")
+        workspace_providers.invalidate_credentials("ws-1")
+        second = email_service_for("ws-1", supabase)
+
+        assert second is not first
+        assert second.providers[0].headers["Authorization"] == "Bearer re_rotated"
+
+    def test_pool_evicts_least_recently_used(self):
+        supabase = supabase_with([integration(f"ws-{i}") for i in range(3)])
+
+        with patch.object(workspace_providers._service_pool, "maxsize", 2):
+            first = email_service_for("ws-0", supabase)
+            email_service_for("ws-1", supabase)
+            email_service_for("ws-2", supabase)
+
+            assert email_service_for("ws-0", supabase) is not first
+        assert workspace_providers._service_pool.evictions >= 1
+
+    @pytest.mark.parametrize("provider", ["resend", "sendgrid"])
+    def test_integration_without_key_does_not_borrow_platform_key(self, provider):
+        supabase = supabase_with([integration("ws-1", provider, from_email="ws@example.com")])
+
+        with patch.object(settings, "SENDGRID_API_KEY", "SG.platform"), \
+                pytest.raises(IntegrationException):
+            email_service_for("ws-1", supabase)
+
+    def test_twilio_integration_without_number_does_not_borrow_platform_number(self):
+        supabase = supabase_with([integration("ws-1", "twilio", account_sid="ACws", auth_token="t")])
+
+        with patch.object(settings, "TWILIO_PHONE_NUMBER", "+15559999999"), \
+                pytest.raises(IntegrationException):
+            sms_service_for("ws-1", supabase)
+
+    def test_workspace_sms_provider_kept_in_local_mode(self):
+        provider = Mock()
+
+        with patch.object(settings, "COMMUNICATION_MODE", "local"):
+            assert SMSService(provider).provider is provider
+
+
+class TestInvalidation:
+    """Tests for invalidation from IntegrationService"""
+
+    @pytest.mark.asyncio
+    async def test_create_and_delete_invalidate(self):
+        rows = []
+        supabase = supabase_with(rows)
+        assert email_service_for("ws-1", supabase) is get_email_service()
+
+        rows.append(integration("ws-1"))
+        supabase.table.return_value.execute.side_effect = None
+        supabase.table.return_value.execute.return_value = Mock(data=[rows[0]])
+        await IntegrationService(supabase).create_integration("ws-1", IntegrationProvider.RESEND, rows[0]["config"])
+        assert workspace_providers._credential_cache.get("ws-1") is None
+
+        workspace_providers._credential_cache.set("ws-1", {"resend": rows[0]})
+        await IntegrationService(supabase).delete_integration("ws-1", rows[0]["id"])
+        assert workspace_providers._credential_cache.get("ws-1") is None
+
+
+class TestSendBatches:
+    """Tests for grouping bulk sends by sending service"""
+
+    @pytest.mark.asyncio
+    async def test_groups_by_service(self):
+        platform = Mock(send_batch=AsyncMock(side_effect=lambda ms: [{"to": m["to"], "success": True} for m in ms]))
+        own = Mock(send_batch=AsyncMock(side_effect=RuntimeError("bad key")))
+        services = {"ws-1": platform, "ws-2": platform, "ws-3": own}
+        sends = [
+            ({"workspace_id": ws}, {"to": f"{ws}@example.com", "subject": "Hi", "content": "<p>Hi</p>"})
+            for ws in ("ws-1", "ws-3", "ws-2")
+        ]
+
+        results = await send_batches(sends, services.__getitem__)
+
+        assert platform.send_batch.await_count == 1
+        assert len(platform.send_batch.await_args.args[0]) == 2
+        assert [r["success"] for r in results] == [True, False, True]
+        assert results[1]["error"] == "bad key"
@@ -3,16 +3,48 @@
  * Manages dashboard data and statistics
  */
 
-import { useQuery } from '@tanstack/react-query';
-import { dashboardService, DashboardStats } from '@/lib/api';
+import { useEffect } from 'react';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
+import { apiClient, dashboardService, DashboardStats } from '@/lib/api';
+
+type DashboardCounters = Omit<DashboardStats, 'generated_at'>;
 
 export const useDashboard = () => {
+  const queryClient = useQueryClient();
+
   const { data, isLoading, error, refetch } = useQuery<DashboardStats>({
     queryKey: ['dashboardStats'],
     queryFn: () => dashboardService.getStats(),
-    refetchInterval: 30000, // Refetch every 30 seconds
+    refetchInterval: 300000, // Fallback when the live stream is unavailable
   });
 
+  // Live updates over Server-Sent Events; EventSource reconnects on its own
+  useEffect(() => {
+    const token = localStorage.getItem('access_token');
+    if (!token || typeof EventSource === 'undefined') return;
+
+    const source = new EventSource(
+      `${apiClient.defaults.baseURL}/dashboard/stream?token=${encodeURIComponent(token)}`
+    );
+
+    const applyCounters = (counters: DashboardCounters) => {
+      queryClient.setQueryData<DashboardStats>(['dashboardStats'], (previous) => ({
+        ...previous,
+        ...counters,
+        generated_at: new Date().toISOString(),
+      }));
+    };
+
+    source.addEventListener('snapshot', (event) => {
+      applyCounters(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('counters', (event) => {
+      applyCounters(JSON.parse((event as MessageEvent).data).counters);
+    });
+
+    return () => source.close();
+  }, [queryClient]);
+
   return {
     stats: data,
     isLoading,
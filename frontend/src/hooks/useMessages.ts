@@ -3,32 +3,89 @@
  * Manages conversations and messages
  */
 
+import { useEffect, useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { messageService, Conversation, Message, MessageCreate } from '@/lib/api';
+import { apiClient, messageService, Conversation, Message, MessageCreate } from '@/lib/api';
 import { toast } from 'sonner';
 
 export const useMessages = () => {
   const queryClient = useQueryClient();
+  const [live, setLive] = useState(false);
 
-  // Get conversations with messages
+  // Live inbox over a WebSocket; polling slows down while it is connected
+  useEffect(() => {
+    const token = localStorage.getItem('access_token');
+    if (!token || typeof WebSocket === 'undefined') return;
+
+    const url = `${String(apiClient.defaults.baseURL).replace(/^http/, 'ws')}/messages/ws?token=${encodeURIComponent(token)}`;
+    let socket: WebSocket | null = null;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+    let attempts = 0;
+    let closed = false;
+
+    const connect = () => {
+      socket = new WebSocket(url);
+      socket.onopen = () => {
+        attempts = 0;
+        setLive(true);
+      };
+      socket.onmessage = (event) => {
+        const payload = JSON.parse(event.data);
+        if (payload.type === 'conversation.updated' || payload.type === 'message.created') {
+          queryClient.invalidateQueries({ queryKey: ['conversations'] });
+        }
+      };
+      socket.onclose = (event) => {
+        setLive(false);
+        // 1008: token rejected, reconnecting would not help
+        if (closed || event.code === 1008) return;
+        attempts += 1;
+        retry = setTimeout(connect, Math.min(30000, 1000 * 2 ** attempts));
+      };
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      socket?.close();
+    };
+  }, [queryClient]);
+
+  // Get conversations with messages. After the first load only conversations
+  // with new activity are refetched, and only their new messages.
   const { data: conversations, isLoading: conversationsLoading } = useQuery<Conversation[]>({
     queryKey: ['conversations'],
     queryFn: async () => {
+      const previous = new Map(
+        (queryClient.getQueryData<Conversation[]>(['conversations']) || []).map((c) => [c.id, c])
+      );
       const convos = await messageService.getConversations();
-      // Fetch messages for each conversation
       const convosWithMessages = await Promise.all(
         convos.map(async (convo) => {
+          const cached = previous.get(convo.id);
           try {
-            const messages = await messageService.getMessages(convo.id);
-            return { ...convo, messages };
+            if (cached?.messages && cached.messagesSinceCursor) {
+              if (cached.last_message_at === convo.last_message_at) {
+                return { ...convo, messages: cached.messages, messagesSinceCursor: cached.messagesSinceCursor };
+              }
+              const page = await messageService.getMessagesPage(convo.id, { since: cached.messagesSinceCursor });
+              return {
+                ...convo,
+                messages: [...cached.messages, ...page.messages],
+                messagesSinceCursor: page.sinceCursor,
+              };
+            }
+            const page = await messageService.getMessagesPage(convo.id);
+            return { ...convo, messages: page.messages, messagesSinceCursor: page.sinceCursor };
           } catch {
-            return { ...convo, messages: [] };
+            return { ...convo, messages: cached?.messages || [], messagesSinceCursor: cached?.messagesSinceCursor };
           }
         })
       );
       return convosWithMessages;
     },
-    refetchInterval: 10000, // Refetch every 10 seconds for new messages
+    refetchInterval: live ? 60000 : 10000, // Fallback polling for missed events
   });
 
   // Send message
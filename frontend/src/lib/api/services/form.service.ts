@@ -50,16 +50,16 @@ export const formService = {
   },
 
   // Public endpoints
-  async getPublicFormSubmission(submissionId: string): Promise<any> {
-    const response = await apiClient.get(`/public/forms/view/${submissionId}`);
+  async getPublicFormSubmission(submissionId: string, token?: string): Promise<any> {
+    const response = await apiClient.get(`/public/forms/view/${submissionId}`, { params: { token } });
     return response.data;
   },
 
-  async trackDownload(submissionId: string): Promise<void> {
-    await apiClient.post(`/public/forms/track-download/${submissionId}`);
+  async trackDownload(submissionId: string, token?: string): Promise<void> {
+    await apiClient.post(`/public/forms/track-download/${submissionId}`, null, { params: { token } });
   },
 
-  async markComplete(submissionId: string): Promise<void> {
-    await apiClient.post(`/public/forms/mark-complete/${submissionId}`);
+  async markComplete(submissionId: string, token?: string): Promise<void> {
+    await apiClient.post(`/public/forms/mark-complete/${submissionId}`, null, { params: { token } });
   },
 };
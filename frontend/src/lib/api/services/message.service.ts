@@ -4,7 +4,7 @@
  */
 
 import apiClient from '../client';
-import { Message, Conversation, MessageCreate } from '../types';
+import { Message, Conversation, MessageCreate, MessagePage } from '../types';
 
 export const messageService = {
   /**
@@ -23,6 +23,26 @@ export const messageService = {
     return response.data;
   },
 
+  /**
+   * Get one page of messages, oldest first.
+   * `before` loads older history; `since` loads only messages newer than a
+   * previous page's sinceCursor.
+   */
+  async getMessagesPage(
+    conversationId: string,
+    params: { before?: string; since?: string; limit?: number } = {}
+  ): Promise<MessagePage> {
+    const response = await apiClient.get<Message[]>(
+      `/messages/conversations/${conversationId}/messages`,
+      { params }
+    );
+    return {
+      messages: response.data,
+      nextCursor: response.headers['x-next-cursor'],
+      sinceCursor: response.headers['x-since-cursor'],
+    };
+  },
+
   /**
    * Send a message
    */
@@ -44,4 +64,22 @@ export const messageService = {
   async markAsRead(conversationId: string): Promise<void> {
     await apiClient.post(`/messages/conversations/${conversationId}/mark-read`);
   },
+
+  /**
+   * Mark several conversations as read in one request
+   */
+  async markManyAsRead(conversationIds: string[]): Promise<{ conversation_ids: string[]; unread_total: number }> {
+    const response = await apiClient.post('/messages/conversations/mark-read', {
+      conversation_ids: conversationIds,
+    });
+    return response.data;
+  },
+
+  /**
+   * Unread badge counts for the workspace
+   */
+  async getUnreadCount(): Promise<{ unread_total: number; unread_conversations: number }> {
+    const response = await apiClient.get('/messages/unread-count');
+    return response.data;
+  },
 };
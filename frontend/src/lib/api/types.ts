@@ -139,6 +139,12 @@ export interface Message {
   sent_at: string;
 }
 
+export interface MessagePage {
+  messages: Message[];
+  nextCursor?: string;
+  sinceCursor?: string;
+}
+
 export interface Conversation {
   id: string;
   workspace_id: string;
@@ -149,6 +155,7 @@ export interface Conversation {
   unread_count: number;
   is_automated_paused: boolean;
   messages?: Message[];
+  messagesSinceCursor?: string;
   created_at: string;
 }
 
@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react';
-import { useParams } from 'react-router-dom';
+import { useParams, useSearchParams } from 'react-router-dom';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '../components/ui/card';
 import { Button } from '../components/ui/button';
 import { Alert, AlertDescription } from '../components/ui/alert';
@@ -9,19 +9,21 @@ import { formService } from '../lib/api/services/form.service';
 
 export default function PublicFormView() {
   const { submissionId } = useParams<{ submissionId: string }>();
+  const [searchParams] = useSearchParams();
+  const token = searchParams.get('token') ?? undefined;
   const [formData, setFormData] = useState<any>(null);
   const [loading, setLoading] = useState(true);
   const [marking, setMarking] = useState(false);
 
   useEffect(() => {
     loadForm();
-  }, [submissionId]);
+  }, [submissionId, token]);
 
   const loadForm = async () => {
     if (!submissionId) return;
 
     try {
-      const data = await formService.getPublicFormSubmission(submissionId);
+      const data = await formService.getPublicFormSubmission(submissionId, token);
       setFormData(data);
     } catch (error: any) {
       toast.error('Failed to load form');
@@ -35,7 +37,7 @@ export default function PublicFormView() {
 
     try {
       // Track download
-      await formService.trackDownload(submissionId);
+      await formService.trackDownload(submissionId, token);
       
       // Open file in new tab
       window.open(formData.file_url, '_blank');
@@ -51,7 +53,7 @@ export default function PublicFormView() {
 
     setMarking(true);
     try {
-      await formService.markComplete(submissionId);
+      await formService.markComplete(submissionId, token);
       toast.success('Form marked as complete!');
       
       // Reload form data